@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+from starlette.responses import JSONResponse
+from src.Helper.DonationsHelper import DONATION_MAPPER
+from src.Helper.JsonResponseHelper import _BACKENDS, FastJSONResponse, JsonResponseHelper
+from src.Helper.ReceiversHelper import RECEIVER_MAPPER
+
+# Benchmark do encode das respostas JSON.
+# Uma rota que devolve os modelos direto passa pelo serialize_response do FastAPI (jsonable_encoder)
+# antes do FastJSONResponse; só RowsResponse e respostas criadas na rota pulam o encoder.
+# Uso: python MainBenchmarks.py [--rows 10000] [--repeat 5] > bench_output.txt
+
+def donation_rows(count: int) -> list[tuple]:
+    start = datetime(2024, 1, 1, 8, 0)
+    return [
+        (i, f"Doador {i}", f"ONG Ação {i % 50}", Decimal(f"{(i % 500) + 1}.{i % 100:02d}"),
+         "Obrigado pelo trabalho!" if i % 3 else None, start + timedelta(minutes=i))
+        for i in range(1, count + 1)
+    ]
+
+def receiver_rows(count: int) -> list[tuple]:
+    start = datetime(2023, 6, 1)
+    return [
+        (i, f"ONG Ação {i}", f"contato{i}@ong.org.br", f"{i:014d}", f"{85000000 + i:08d}",
+         "Arrecadação de alimentos e roupas para famílias em situação de vulnerabilidade.",
+         start + timedelta(hours=i))
+        for i in range(1, count + 1)
+    ]
+
+def measure(func, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func()
+        best = min(best, time.perf_counter() - start)
+        size = len(body)
+    return best, size
+
+def run(rows: int, repeat: int):
+    configured = JsonResponseHelper.Backend
+    payloads = {
+        "donations": (DONATION_MAPPER, donation_rows(rows), None),
+        "receivers": (RECEIVER_MAPPER, receiver_rows(rows), "receivers"),
+    }
+    backends = [name for name, dumps in _BACKENDS.items() if dumps]
+    loop = asyncio.new_event_loop()
+
+    def route_body(content) -> bytes:
+        # O mesmo caminho de uma rota sem response_model com default_response_class=FastJSONResponse
+        return FastJSONResponse(loop.run_until_complete(serialize_response(response_content=content))).body
+
+    print(f"rows={rows} repeat={repeat} (melhor tempo de cada caso)")
+    print(f"{'payload':<10} {'caso':<44} {'ms':>9} {'linhas/s':>12} {'MB/s':>8}")
+    for name, (mapper, data, root) in payloads.items():
+        models = [mapper.ToModel(row) for row in data]
+        content = {root: models} if root else models
+
+        cases = {"jsonable_encoder + JSONResponse (antes)":
+                 lambda: JSONResponse(jsonable_encoder(content)).body}
+        for backend in backends:
+            cases[f"[{backend}] rota devolvendo modelos (encoder)"] = lambda: route_body(content)
+            cases[f"[{backend}] FastJSONResponse explícito"] = lambda: FastJSONResponse(content).body
+            cases[f"[{backend}] RowMapper.Dumps modelos"] = lambda: mapper.Dumps(models, root)
+            cases[f"[{backend}] RowMapper.Dumps tuplas"] = lambda: mapper.Dumps(data, root)
+
+        for case, func in cases.items():
+            if case.startswith("["):
+                JsonResponseHelper.UseBackend(case[1:case.index("]")])
+            seconds, size = measure(func, repeat)
+            print(f"{name:<10} {case:<44} {seconds * 1000:>9.1f} {rows / seconds:>12,.0f} {size / seconds / 1e6:>8.1f}")
+    JsonResponseHelper.UseBackend(configured)
+    loop.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara o encode JSON das listagens")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
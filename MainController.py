@@ -1,15 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 import uvicorn
 from src.Controller.LoginController import LoginController
 from src.Controller.DonatorController import DonatorController
 from src.Controller.ReceiverController import ReceiverController
+from src.Controller.AdminController import AdminController
 from src.Helper.SecurityHelper import add_security_middleware
+from src.Helper.DeadlineHelper import add_deadline_middleware
+from src.Helper.ConnectionHelper import ConnectionHelper
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.ExecutorHelper import ExecutorHelper
+from src.Helper.DonationBufferHelper import DonationBufferHelper
+from src.Helper.DonationFeedHelper import DonationFeedHelper
+from src.Helper.JsonResponseHelper import FastJSONResponse
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Abre as conexões mínimas do pool assíncrono antes da primeira requisição
+    await AsyncConnectionHelper().AsyncPool().warm_up()
+    yield
+    # Grava as doações ainda no buffer antes de fechar os pools
+    await DonationBufferHelper.CloseBuffersAsync()
+    # Encerra os streams SSE e a conexão de LISTEN
+    DonationFeedHelper.CloseFeeds()
+    # Fecha as conexões do pool ao desligar o servidor
+    AsyncConnectionHelper.CloseAsyncPools()
+    ConnectionHelper.ClosePools()
+    ExecutorHelper.ShutdownExecutors()
+
+# Respostas JSON pelo backend rápido (orjson por padrão, configurável por GCA_JSON_BACKEND)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Adiciona o middleware de segurança
 add_security_middleware(app)
 
+# Prazo por rota; adicionado por último para envolver os demais middlewares
+add_deadline_middleware(app)
+
 # Rotas principais
 @app.get("/")
 async def root():
@@ -19,6 +46,7 @@ async def root():
 app.include_router(LoginController.router)
 app.include_router(DonatorController.router)
 app.include_router(ReceiverController.router)
+app.include_router(AdminController.router)
 
 # Iniciar o servidor
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from src.Helper.DonationImportHelper import DonationImportHelper
+from src.Helper.SecurityHelper import get_current_user_from_token
+from src.Model.ImportResultModel import ImportResultModel
+from src.Model.TokenModel import TokenModel
+
+class AdminController:
+
+    router = APIRouter(prefix="/admin", tags=["Admin"])
+
+    @router.post("/donations/import")
+    async def import_donations(request: Request,
+        import_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+        user: TokenModel = Depends(get_current_user_from_token)) -> ImportResultModel:
+        if user.KindOfUser != 'admin':
+            raise HTTPException(status_code=403, detail="Unauthorized: Only admins can import donations")
+
+        # Corpo cru (CSV com cabeçalho ou NDJSON), uma doação por linha, lido aos poucos
+        return await DonationImportHelper().ImportStreamAsync(request.stream(), import_format)
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, Body, HTTPException, Depends, Header, Query
 from src.Model.DeactivateModel import DeactivateModel 
 from src.Model.AddFavoriteModel import AddFavoriteModel 
 from src.Model.DonationModel import DonationModel
-from src.Helper.DonationsHelper import DonationsHelper
-from src.Helper.ReceiversHelper import ReceiversHelper
+from src.Helper.DonationsHelper import DONATION_MAPPER, MAX_DONATIONS_PER_REQUEST, DonationsHelper
+from src.Helper.DonationBufferHelper import DonationBufferHelper
+from src.Helper.ReceiversHelper import RECEIVER_TOTALS_MAPPER, ReceiversHelper
 from src.Helper.SecurityHelper import get_current_user_from_token
-from src.Helper.ConnectionHelper import ConnectionHelper 
 from src.Helper.SignInHelper import SignInHelper
+from src.Helper.TokenHelper import TokenHelper
 from src.Model.TokenModel import TokenModel
-from src.Helper.ProductHelper import ProductHelper
-from src.Helper.FavoritesHelper import FavoriteHelper  
+from src.Helper.ProductHelper import PRODUCT_MAPPER, ProductHelper
+from src.Helper.FavoritesHelper import FAVORITE_MAPPER, FavoriteHelper
+from src.Helper.UnitOfWorkHelper import UnitOfWork, unit_of_work
+from src.Helper.IdempotencyHelper import IDEMPOTENCY_HEADER, MAX_IDEMPOTENCY_KEY_LENGTH, IdempotencyHelper
+from src.Helper.PaginationHelper import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
+from src.Helper.RowMapperHelper import RowsResponse
 
 class DonatorController:
     
@@ -20,19 +25,27 @@ class DonatorController:
         return {"message": "Donator endpoint is working!"}
     
     @router.get("/list_receivers/{TypeOfOrder}")
-    async def list_receivers(TypeOfOrder: str, user: TokenModel = Depends(get_current_user_from_token)):
+    async def list_receivers(TypeOfOrder: str,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: str | None = None,
+        user: TokenModel = Depends(get_current_user_from_token)):
         
         if user.KindOfUser != "doador":
             raise HTTPException(status_code=403, detail="Unauthorized access: Only donators can access this endpoint")
         try:
             helper = ReceiversHelper()
-            receivers = helper.get_receivers(TypeOfOrder)
-            return {"receivers": receivers}
+            page = await helper.get_receivers_async(TypeOfOrder, limit, after)
+            response = RowsResponse(page.Items, RECEIVER_TOTALS_MAPPER, root="receivers")
+            set_next_cursor(response, page)
+            return response
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=404, detail=f"Error fetching receivers: {e}")
 
     @router.post("/deactivate")
-    async def deactivate_donator(request: DeactivateModel, user: TokenModel = Depends(get_current_user_from_token)):
+    async def deactivate_donator(request: DeactivateModel,
+        unit: UnitOfWork = Depends(unit_of_work, scope="function"),
+        user: TokenModel = Depends(get_current_user_from_token)):
         # Verificar se é doador ou admin
         if user.KindOfUser not in ['doador', 'admin']:
             raise HTTPException(status_code=403, detail="Unauthorized: Only donators or admins can deactivate donators")
@@ -41,80 +54,121 @@ class DonatorController:
         if user.KindOfUser != 'admin' and request.id_usuario != user.UserId:
             raise HTTPException(status_code=403, detail="Unauthorized: You can only deactivate your own account")
 
-        # Conectar ao banco e validar/inativar
-        conn_helper = ConnectionHelper()
-        connection = conn_helper.Connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-
+        # Validar/inativar no banco
         try:
-            cursor = connection.cursor()
-            cursor.execute("SELECT ativo, tipo_usuario FROM usuarios WHERE id_usuario = %s", (request.id_usuario,))
-            result = cursor.fetchone()
-            if not result or not result[0]:  # Não encontrado ou já inativo
+            kind_of_user = await SignInHelper().DeactivateUserAsync(request.id_usuario, 'doador')
+            if kind_of_user is None:  # Não encontrado ou já inativo
                 raise HTTPException(status_code=404, detail="User not found or already inactive")
-            if result[1] != 'doador':  # Garantir que é um doador
+            if kind_of_user != 'doador':  # Garantir que é um doador
                 raise HTTPException(status_code=403, detail="Unauthorized: Can only deactivate donators")
 
-            # UPDATE: Inativar
-            cursor.execute("UPDATE usuarios SET ativo = false WHERE id_usuario = %s", (request.id_usuario,))
-            connection.commit()
+            # A revogação já foi gravada no banco (tokens_revogados_em) junto com a inativação;
+            # o cache deste processo só é atualizado depois do commit, para não revogar algo desfeito
+            user_id = request.id_usuario
+            unit.AfterCommit(lambda: TokenHelper().revoke_user(user_id))
             return {"message": f"Donator with ID {request.id_usuario} deactivated successfully"}
         except HTTPException:
             raise
         except Exception as e:
-            connection.rollback()
             raise HTTPException(status_code=500, detail=f"Error deactivating donator: {e}")
-        finally:
-            conn_helper.CloseConnection(connection)
 
     @router.post("/favorite/{cause_id}")
-    async def favorite_cause(cause_id: int, user: TokenModel = Depends(get_current_user_from_token)):
+    async def favorite_cause(cause_id: int,
+        unit: UnitOfWork = Depends(unit_of_work, scope="function"),
+        user: TokenModel = Depends(get_current_user_from_token)):
         if user.KindOfUser != 'doador':
             raise HTTPException(status_code=403, detail="Unauthorized: Only donators can favorite causes")
 
         receivers_helper = ReceiversHelper()
-        if not receivers_helper.validate_cause_id(cause_id):
+        if not await receivers_helper.validate_cause_id_async(cause_id):
             raise HTTPException(status_code=404, detail="Cause not found or not active")
 
         fav_info = AddFavoriteModel(CauseId=cause_id, UserId=user.UserId)
 
-        return FavoriteHelper().add_favorite(fav_info)
+        return await FavoriteHelper().add_favorite_async(fav_info)
 
     @router.delete("/favorite/{fav_id}")
-    async def remove_favorite(fav_id: int, user: TokenModel = Depends(get_current_user_from_token)):
+    async def remove_favorite(fav_id: int,
+        unit: UnitOfWork = Depends(unit_of_work, scope="function"),
+        user: TokenModel = Depends(get_current_user_from_token)):
         if user.KindOfUser != "doador":
             raise HTTPException(status_code=403, detail="Unauthorized: Only donators can remove favorites")
         
-        return FavoriteHelper().remove_favorite(fav_id)
+        return await FavoriteHelper().remove_favorite_async(fav_id)
     
     @router.get("/favorites")
-    async def list_favorites(user: TokenModel = Depends(get_current_user_from_token)):
+    async def list_favorites(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: str | None = None,
+        user: TokenModel = Depends(get_current_user_from_token)):
         if user.KindOfUser != 'doador':
             raise HTTPException(status_code=403, detail="Unauthorized: Only donators can view favorites")
 
-        return FavoriteHelper().list_favorites(user.UserId)
+        page = await FavoriteHelper().list_favorites_async(user.UserId, limit, after)
+        response = RowsResponse(page.Items, FAVORITE_MAPPER)
+        set_next_cursor(response, page)
+        return response
     
     @router.post("/add_donation")
-    async def add_donation(donation_info: DonationModel, user: TokenModel = Depends(get_current_user_from_token)):
+    async def add_donation(donation_info: DonationModel,
+        idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_HEADER, max_length=MAX_IDEMPOTENCY_KEY_LENGTH),
+        unit: UnitOfWork = Depends(unit_of_work, scope="function"),
+        user: TokenModel = Depends(get_current_user_from_token)):
         if user.KindOfUser != 'doador':
             raise HTTPException(status_code=403, detail="Unauthorized: Only donators can add donations")
 
         donation_info.DonorId = user.UserId
 
+        # Com o buffer ligado, a doação é gravada em lote com as das outras requisições.
+        # Com Idempotency-Key, a gravação precisa ficar na transação da chave
+        buffer_helper = DonationBufferHelper()
+        if buffer_helper.Enabled and idempotency_key is None:
+            return await buffer_helper.AddAsync(donation_info)
+
         donations_helper = DonationsHelper()
-        return donations_helper.add_donations(donation_info)
+        # Repetição com a mesma chave devolve a resposta original sem gravar de novo
+        return await IdempotencyHelper().RunOnceAsync(
+            user.UserId, "add_donation", idempotency_key, donation_info.model_dump(),
+            lambda: donations_helper.add_donations_async(donation_info))
+
+    @router.post("/add_donations")
+    async def add_donations(
+        donations: list[DonationModel] = Body(..., min_length=1, max_length=MAX_DONATIONS_PER_REQUEST),
+        idempotency_key: str | None = Header(None, alias=IDEMPOTENCY_HEADER, max_length=MAX_IDEMPOTENCY_KEY_LENGTH),
+        unit: UnitOfWork = Depends(unit_of_work, scope="function"),
+        user: TokenModel = Depends(get_current_user_from_token)):
+        if user.KindOfUser != 'doador':
+            raise HTTPException(status_code=403, detail="Unauthorized: Only donators can add donations")
+
+        for donation_info in donations:
+            donation_info.DonorId = user.UserId
+
+        async def add_batch():
+            donation_ids = await DonationsHelper().add_donations_batch_async(donations)
+            return {"message": "Donations efetuated successfully", "DonationIds": donation_ids}
+
+        return await IdempotencyHelper().RunOnceAsync(
+            user.UserId, "add_donations", idempotency_key, [donation.model_dump() for donation in donations], add_batch)
     
     @router.get("/list_donations_made")
-    async def list_donations(user: TokenModel = Depends(get_current_user_from_token)):
+    async def list_donations(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: str | None = None,
+        user: TokenModel = Depends(get_current_user_from_token)):
         if user.KindOfUser != "doador":
             raise HTTPException(status_code=403, detail="Unauthorized: Only donators can list donations made")
         
-        return DonationsHelper().list_donations_by_user(user.UserId)
+        page = await DonationsHelper().list_donations_by_user_async(user.UserId, limit, after)
+        response = RowsResponse(page.Items, DONATION_MAPPER)
+        set_next_cursor(response, page)
+        return response
 
     @router.get("/get_cause_products/{causeId}")
-    async def get_cause_products(causeId: int, user: TokenModel = Depends(get_current_user_from_token)):
+    async def get_cause_products(causeId: int,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: str | None = None,
+        user: TokenModel = Depends(get_current_user_from_token)):
         if user.KindOfUser != "doador":
             raise HTTPException(status_code=403, detail="Unauthorized: Only donators can view products by cause")      
 
-        return ProductHelper().list_products(causeId)
+        page = await ProductHelper().list_products_async(causeId, limit, after)
+        response = RowsResponse(page.Items, PRODUCT_MAPPER)
+        set_next_cursor(response, page)
+        return response
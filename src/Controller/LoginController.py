@@ -10,9 +10,9 @@ class LoginController:
     @router.post("/cadastrate")
     async def cadastrate(request: CadastrateModel.CadastrateModel):
         if request.IsReceiver == "receptor":
-            if SignInHelper().ValidateAddress(request.Address) == False:
+            if await SignInHelper().ValidateAddressAsync(request.Address) == False:
                 raise HTTPException(status_code=400, detail="Invalid Address")
-            elif SignInHelper().Cadastrate(request):
+            elif await SignInHelper().CadastrateAsync(request):
                 return {"message": "Receiver login successful", "user": request.Name}
             else:
                 raise HTTPException(status_code=400, detail="Cadastration failed")
@@ -20,7 +20,7 @@ class LoginController:
             request.Cause = None
             request.Document = None
             request.Address = None
-            if SignInHelper().Cadastrate(request):
+            if await SignInHelper().CadastrateAsync(request):
                 return {"message": "Donor login successful", "user": request.Name}
             else: 
                 raise HTTPException(status_code=400, detail="Cadastration failed")
@@ -29,13 +29,18 @@ class LoginController:
     
     @router.post("/login")
     async def login(request: LoginModel.LoginModel):
-        if SignInHelper().SignIn(request):
+        if await SignInHelper().SignInAsync(request):
             # Gera token após login bem-sucedido
-            UserInfo = SignInHelper().GetKindOfUser(str(request.Username))
+            UserInfo = await SignInHelper().GetKindOfUserAsync(str(request.Username))
             if not UserInfo:
                 raise HTTPException(status_code=404, detail="Error retrieving user type")
             # Correção: Usar o email (request.Username) como 'sub' em vez de UserInfo.KindOfUser
-            access_token = TokenHelper().create_access_token(data={"sub": request.Username})
+            # id e tipo vão nas claims para as rotas protegidas não consultarem o banco
+            access_token = TokenHelper().create_access_token(data={
+                "sub": request.Username,
+                "uid": UserInfo.UserId,
+                "role": UserInfo.KindOfUser,
+            })
             return {"message": "Login successful", "user": request.Username, "access_token": access_token, "token_type": "bearer"}
         else:
             raise HTTPException(status_code=401, detail="Invalid credentials")
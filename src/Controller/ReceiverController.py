@@ -1,18 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
-from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime
 from src.Model.PixModel import PixModel
 from src.Model.PixDeleteModel import PixDeleteModel
 from src.Model.DeactivateModel import DeactivateModel  
-from src.Helper.DonationsHelper import DonationsHelper
+from src.Helper.DonationsHelper import DONATION_MAPPER, DonationsHelper
+from src.Helper.DonationExportHelper import EXPORT_FORMATS, DonationExportHelper
+from src.Helper.DonationFeedHelper import DonationFeedHelper
+from src.Helper.DonationStatsHelper import DonationStatsHelper
+from src.Helper.ReceiverDirectoryHelper import ReceiverDirectoryHelper
+from src.Helper.ReceiversHelper import ReceiversHelper
 from src.Model.DeleteProductModel import DeleteProductModel
 from src.Model.ListProductModel import ListProductModel 
 from src.Helper.PixHelper import PixHelper as ph
 from src.Helper.SecurityHelper import get_current_user_from_token
-from src.Helper.ConnectionHelper import ConnectionHelper  
-from src.Helper.SignInHelper import SignInHelper  
+from src.Helper.SignInHelper import SignInHelper
+from src.Helper.TokenHelper import TokenHelper  
 from src.Model.TokenModel import TokenModel
 from src.Model.ProductModel import ProductModel
-from src.Helper.ProductHelper import ProductHelper
+from src.Helper.ProductHelper import PRODUCT_MAPPER, ProductHelper
+from src.Helper.UnitOfWorkHelper import UnitOfWork, unit_of_work
+from src.Helper.PaginationHelper import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
+from src.Helper.RowMapperHelper import RowsResponse
 
 class ReceiverController:
     
@@ -24,6 +33,7 @@ class ReceiverController:
     
     @router.post("/add_pix_key")
     async def add_pix_key(request: PixModel,
+        unit: UnitOfWork = Depends(unit_of_work, scope="function"),
         user: TokenModel = Depends(get_current_user_from_token)):
         
         if user.KindOfUser != "receptor":
@@ -34,10 +44,11 @@ class ReceiverController:
         if not request.CreatedAt:
             request.CreatedAt = datetime.now().isoformat()
 
-        return {"message": ph().add_pix_key(request)}
+        return {"message": await ph().add_pix_key_async(request)}
     
     @router.delete("/delete_pix_key")
     async def delete_pix_key(request: PixDeleteModel,
+        unit: UnitOfWork = Depends(unit_of_work, scope="function"),
         user: TokenModel = Depends(get_current_user_from_token)):
 
         if user.KindOfUser != "receptor":
@@ -45,11 +56,13 @@ class ReceiverController:
         
         request.UserId = user.UserId
 
-        return {"message": ph().delete_pix_key(request)}
+        return {"message": await ph().delete_pix_key_async(request)}
 
     # Novo endpoint para inativação de receptor
     @router.post("/deactivate")
-    async def deactivate_receiver(request: DeactivateModel, user: TokenModel = Depends(get_current_user_from_token)):
+    async def deactivate_receiver(request: DeactivateModel,
+        unit: UnitOfWork = Depends(unit_of_work, scope="function"),
+        user: TokenModel = Depends(get_current_user_from_token)):
         if user.KindOfUser not in ['receptor', 'admin']:  # Nota: assumindo 'receptor' como 'receptor' no enum
             raise HTTPException(status_code=403, detail="Unauthorized: Only receivers or admins can deactivate receivers")
 
@@ -57,48 +70,97 @@ class ReceiverController:
         if user.KindOfUser != 'admin' and request.id_usuario != user.UserId:
             raise HTTPException(status_code=403, detail="Unauthorized: You can only deactivate your own account")
 
-        # Conectar ao banco e validar/inativar
-        conn_helper = ConnectionHelper()
-        connection = conn_helper.Connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-
+        # Validar/inativar no banco
         try:
-            cursor = connection.cursor()
-            # SELECT: Verificar se o ID existe e está ativo
-            cursor.execute("SELECT ativo, tipo_usuario FROM usuarios WHERE id_usuario = %s", (request.id_usuario,))
-            result = cursor.fetchone()
-            if not result or not result[0]:  # Não encontrado ou já inativo
+            kind_of_user = await SignInHelper().DeactivateUserAsync(request.id_usuario, 'receptor')
+            if kind_of_user is None:  # Não encontrado ou já inativo
                 raise HTTPException(status_code=404, detail="User not found or already inactive")
-            if result[1] != 'receptor':  # Garantir que é um receptor
+            if kind_of_user != 'receptor':  # Garantir que é um receptor
                 raise HTTPException(status_code=403, detail="Unauthorized: Can only deactivate receivers")
 
-            # UPDATE: Inativar
-            cursor.execute("UPDATE usuarios SET ativo = false WHERE id_usuario = %s", (request.id_usuario,))
-            connection.commit()
+            # A revogação já foi gravada no banco (tokens_revogados_em) junto com a inativação;
+            # o cache de tokens e o diretório deste processo só mudam depois do commit, para não
+            # refletir algo desfeito. Uma recarga do diretório iniciada antes é descartada pelo remove
+            user_id = request.id_usuario
+            unit.AfterCommit(lambda: TokenHelper().revoke_user(user_id))
+            unit.AfterCommit(lambda: ReceiverDirectoryHelper().remove(user_id))
             return {"message": f"Receiver with ID {request.id_usuario} deactivated successfully"}
         except HTTPException:
             raise
         except Exception as e:
-            connection.rollback()
             raise HTTPException(status_code=500, detail=f"Error deactivating receiver: {e}")
-        finally:
-            conn_helper.CloseConnection(connection)
 
     @router.get("/list_donations_received")
-    async def list_donations_received(user: TokenModel = Depends(get_current_user_from_token)):
+    async def list_donations_received(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: str | None = None,
+        user: TokenModel = Depends(get_current_user_from_token)):
         if user.KindOfUser != 'receptor':
             raise HTTPException(status_code=403, detail="Unauthorized: Only receivers can access this endpoint")
 
         try:
             donations_helper = DonationsHelper()
-            donations = donations_helper.list_donations_received(user.UserId)
-            return {"donations": donations}
+            page = await donations_helper.list_donations_received_async(user.UserId, limit, after)
+            response = RowsResponse(page.Items, DONATION_MAPPER, root="donations")
+            set_next_cursor(response, page)
+            return response
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error fetching donations: {e}")
 
+    @router.get("/summary")
+    async def get_summary(user: TokenModel = Depends(get_current_user_from_token)):
+        if user.KindOfUser != 'receptor':
+            raise HTTPException(status_code=403, detail="Unauthorized: Only receivers can access this endpoint")
+
+        try:
+            return await ReceiversHelper().get_summary_async(user.UserId)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching summary: {e}")
+
+    @router.get("/stats")
+    async def get_stats(
+        bucket: str = Query("day", pattern="^(day|week|month)$"),
+        from_date: date | None = Query(None, alias="from"),
+        to_date: date | None = Query(None, alias="to"),
+        user: TokenModel = Depends(get_current_user_from_token)):
+        if user.KindOfUser != 'receptor':
+            raise HTTPException(status_code=403, detail="Unauthorized: Only receivers can access this endpoint")
+
+        # Série pronta para gráfico; substitui baixar o list_donations_received inteiro para somar no cliente
+        return await DonationStatsHelper().GetStatsAsync(user.UserId, bucket, from_date, to_date)
+
+    @router.get("/donations/export")
+    async def export_donations(
+        export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+        user: TokenModel = Depends(get_current_user_from_token)):
+        if user.KindOfUser != 'receptor':
+            raise HTTPException(status_code=403, detail="Unauthorized: Only receivers can access this endpoint")
+
+        # O corpo sai em blocos direto do banco; erros depois do primeiro byte só interrompem o download
+        chunks = DonationExportHelper().Export(user.UserId, export_format)
+        return StreamingResponse(chunks, media_type=EXPORT_FORMATS[export_format], headers={
+            "Content-Disposition": f'attachment; filename="donations.{export_format}"',
+        })
+
+    @router.get("/donations/stream")
+    async def stream_donations(
+        last_event_id: int | None = Header(None, alias="Last-Event-ID"),
+        user: TokenModel = Depends(get_current_user_from_token)):
+        if user.KindOfUser != 'receptor':
+            raise HTTPException(status_code=403, detail="Unauthorized: Only receivers can access this endpoint")
+
+        # Eventos SSE das novas doações; substitui a consulta periódica do list_donations_received
+        events = await DonationFeedHelper().StreamAsync(user.UserId, last_event_id)
+        return StreamingResponse(events, media_type="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        })
+
     @router.post("/create_product")
-    async def create_product(request: ProductModel, user: TokenModel = Depends(get_current_user_from_token)):
+    async def create_product(request: ProductModel,
+        unit: UnitOfWork = Depends(unit_of_work, scope="function"),
+        user: TokenModel = Depends(get_current_user_from_token)):
         
         request.CauseId = user.UserId
         
@@ -106,7 +168,7 @@ class ReceiverController:
              raise HTTPException(status_code=403, detail="Unauthorized access: Only receivers can create products")
 
         helper = ProductHelper()
-        new_id = helper.create_product(request)
+        new_id = await helper.create_product_async(request)
 
         if new_id:
             return {"message": "Product created successfully", "productId": new_id}
@@ -114,15 +176,22 @@ class ReceiverController:
             raise HTTPException(status_code=500, detail="Failed to create product")
 
     @router.delete("/delete_product")
-    async def delete_product(request: DeleteProductModel, user: TokenModel = Depends(get_current_user_from_token)):
+    async def delete_product(request: DeleteProductModel,
+        unit: UnitOfWork = Depends(unit_of_work, scope="function"),
+        user: TokenModel = Depends(get_current_user_from_token)):
         if user.KindOfUser != "receptor":
              raise HTTPException(status_code=403, detail="Unauthorized access: Only receivers can delete products")
 
-        return ProductHelper().delete_product(request)
+        return await ProductHelper().delete_product_async(request)
        
     @router.get("/get_products")
-    async def get_products(user: TokenModel = Depends(get_current_user_from_token)):
+    async def get_products(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), after: str | None = None,
+        user: TokenModel = Depends(get_current_user_from_token)):
         if user.KindOfUser != "receptor":
             raise HTTPException(status_code=403, detail="Unauthorized access: Only receivers can list products")
 
-        return ProductHelper().list_products()
+        page = await ProductHelper().list_products_async(limit=limit, after=after)
+        response = RowsResponse(page.Items, PRODUCT_MAPPER)
+        set_next_cursor(response, page)
+        return response
@@ -0,0 +1,453 @@
+import asyncio
+import collections
+import time
+import psycopg2 as pg
+from psycopg2 import extensions as pg_ext
+from fastapi import HTTPException
+from src.Helper.ConnectionHelper import ConnectionHelper, PoolTimeoutError
+from src.Helper.DeadlineHelper import DEADLINE_EXCEEDED_DETAIL, DeadlineHelper, check_deadline, remaining
+from src.Helper.ExecutorHelper import ExecutorHelper
+from src.Helper.PreparedStatementHelper import PreparedQuery, PreparedStatementHelper
+from src.Helper.QueryMetricsHelper import QueryMetricsHelper
+from src.Helper.UnitOfWorkHelper import current_unit
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+async def wait_ready(connection):
+    """
+    Aguarda uma conexão assíncrona do psycopg2 terminar a operação atual,
+    devolvendo o controle ao event loop enquanto o socket não está pronto.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        state = connection.poll()
+        if state == pg_ext.POLL_OK:
+            return
+
+        fd = connection.fileno()
+        future = loop.create_future()
+        if state == pg_ext.POLL_READ:
+            loop.add_reader(fd, _wake, future)
+            remove = loop.remove_reader
+        elif state == pg_ext.POLL_WRITE:
+            loop.add_writer(fd, _wake, future)
+            remove = loop.remove_writer
+        else:
+            raise pg.OperationalError(f"Unexpected poll state: {state}")
+
+        try:
+            await future
+        finally:
+            remove(fd)
+
+class AsyncConnectionPool:
+    """
+    Versão assíncrona do ConnectionPool, usando o modo async do psycopg2.
+    As conexões ficam em autocommit; transações precisam de BEGIN/COMMIT explícitos.
+    """
+    def __init__(self, connect_kwargs: dict, min_size: int = 1, max_size: int = 50,
+                 timeout: float = 5.0, health_check_after: float = 30.0, max_lifetime: float = 1800.0):
+        self.ConnectKwargs = connect_kwargs
+        self.MinSize = min_size
+        self.MaxSize = max_size
+        self.Timeout = timeout
+        self.HealthCheckAfter = health_check_after
+        self.MaxLifetime = max_lifetime
+
+        self._idle: list[tuple] = []
+        self._in_use: dict[int, tuple] = {}
+        self._waiters: collections.deque = collections.deque()
+        self._size = 0
+        self._closed = False
+
+    async def _open(self):
+        connection = pg.connect(**self.ConnectKwargs, async_=True)
+        try:
+            await wait_ready(connection)
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def _notify_waiter(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        self._size -= 1
+        self._notify_waiter()
+
+    async def _is_healthy(self, connection, created_at: float, last_used: float) -> bool:
+        if connection.closed:
+            return False
+        now = time.monotonic()
+        if now - created_at > self.MaxLifetime:
+            return False
+        if now - last_used < self.HealthCheckAfter:
+            return True
+
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            await wait_ready(connection)
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    async def warm_up(self):
+        while self._size < self.MinSize:
+            self._size += 1
+            try:
+                connection = await self._open()
+            except pg.Error:
+                self._size -= 1
+                return
+            now = time.monotonic()
+            self._idle.append((connection, now, now))
+
+    async def acquire(self, timeout: float = None):
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + (self.Timeout if timeout is None else timeout)
+
+        while True:
+            if self._closed:
+                raise PoolTimeoutError("Connection pool is closed")
+
+            if self._idle:
+                connection, created_at, last_used = self._idle.pop()
+                if not await self._is_healthy(connection, created_at, last_used):
+                    self._discard(connection)
+                    continue
+                break
+
+            if self._size < self.MaxSize:
+                self._size += 1
+                try:
+                    connection = await self._open()
+                except BaseException:
+                    self._size -= 1
+                    self._notify_waiter()
+                    raise
+                created_at = time.monotonic()
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise PoolTimeoutError(f"Timed out waiting for a connection (max {self.MaxSize})")
+
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                raise PoolTimeoutError(f"Timed out waiting for a connection (max {self.MaxSize})")
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+        self._in_use[id(connection)] = (connection, created_at)
+        return connection
+
+    async def release(self, connection, discard: bool = False):
+        entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            connection.close()
+            return
+
+        if discard or self._closed or connection.closed:
+            self._discard(connection)
+            return
+
+        try:
+            status = connection.get_transaction_status()
+            if status == pg_ext.TRANSACTION_STATUS_UNKNOWN or connection.isexecuting():
+                self._discard(connection)
+                return
+            if status != pg_ext.TRANSACTION_STATUS_IDLE:
+                # Transação esquecida aberta: desfaz antes de devolver ao pool
+                cursor = connection.cursor()
+                cursor.execute("ROLLBACK")
+                await wait_ready(connection)
+                cursor.close()
+        except Exception:
+            self._discard(connection)
+            return
+
+        self._idle.append((connection, entry[1], time.monotonic()))
+        self._notify_waiter()
+
+    def close(self):
+        self._closed = True
+        idle = self._idle
+        self._idle = []
+        for connection, _, _ in idle:
+            self._discard(connection)
+        while self._waiters:
+            _wake(self._waiters.popleft())
+
+    def stats(self) -> dict:
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": len(self._in_use),
+            "waiting": len(self._waiters),
+            "max_size": self.MaxSize,
+        }
+
+class AsyncConnectionHelper(ConnectionHelper):
+    # Um pool assíncrono por banco de destino, compartilhado pelo processo
+    _async_pools: dict[tuple, AsyncConnectionPool] = {}
+
+    def __init__(self):
+        super().__init__()
+        # Conexões assíncronas custam pouco ao worker, então o limite pode ser maior
+        self.AsyncPoolMaxSize = 50
+
+        # Alternativa ao modo async do psycopg2: as consultas rodam no pool síncrono,
+        # dentro das threads do ExecutorHelper ("auth", "reads" ou "writes")
+        self.UseThreadedFallback = False
+        # Executor fixo para todas as consultas do helper; None escolhe pelo tipo de comando
+        self.ExecutorName = None
+
+    def AsyncPool(self) -> AsyncConnectionPool:
+        key = self._PoolKey()
+        pool = AsyncConnectionHelper._async_pools.get(key)
+        if pool is None:
+            pool = AsyncConnectionPool(
+                connect_kwargs={
+                    "database": self.Database,
+                    "user": self.User,
+                    "password": self.Password,
+                    "host": self.Host,
+                    "port": self.Port,
+                },
+                min_size=self.PoolMinSize,
+                max_size=self.AsyncPoolMaxSize,
+                timeout=self.PoolTimeout,
+                health_check_after=self.PoolHealthCheckAfter,
+                max_lifetime=self.PoolMaxLifetime,
+            )
+            AsyncConnectionHelper._async_pools[key] = pool
+        return pool
+
+    async def ConnectionAsync(self):
+        # Sob sobrecarga, não espera pelo pool além do prazo da requisição
+        left = remaining()
+        timeout = self.PoolTimeout if left is None else max(0.0, min(self.PoolTimeout, left))
+        try:
+            return await self.AsyncPool().acquire(timeout=timeout)
+        except (pg.Error, PoolTimeoutError) as e:
+            print(f"Error connecting to database: {e}")
+            return None
+
+    async def CloseConnectionAsync(self, connection, discard: bool = False):
+        if not connection:
+            return
+
+        pool = AsyncConnectionHelper._async_pools.get(self._PoolKey())
+        if pool is None:
+            connection.close()
+        else:
+            await pool.release(connection, discard=discard)
+
+    def _ExecutorFor(self, query: str) -> str:
+        if self.ExecutorName:
+            return self.ExecutorName
+        return "reads" if query.lstrip().upper().startswith("SELECT") else "writes"
+
+    def _ExecutePreparedSync(self, connection, cursor, query: PreparedQuery, params):
+        registry = PreparedStatementHelper()
+        if not registry.IsPrepared(connection, query.Name):
+            if registry.NeedsPlanningSample(query.Name):
+                cursor.execute(registry.ExplainSql(query), params)
+                registry.RecordPlanningSample(query.Name, cursor.fetchone())
+            cursor.execute(registry.PrepareSql(query))
+            registry.MarkPrepared(connection, query.Name)
+        registry.RecordExecution(query.Name)
+        cursor.execute(registry.ExecuteSql(query), params)
+
+    def _ExecuteSync(self, connection, cursor, query: str, params, owns_transaction: bool = False):
+        if not (self.UsePreparedStatements and isinstance(query, PreparedQuery)):
+            cursor.execute(query, params)
+            return
+        try:
+            self._ExecutePreparedSync(connection, cursor, query, params)
+        except pg.errors.InvalidSqlStatementName:
+            PreparedStatementHelper().Forget(connection)
+            # O rollback desfaria o que a transação já gravou: só repete quando ela é só desta consulta
+            if not owns_transaction:
+                raise
+            # O servidor não tem mais o statement: prepara de novo e repete uma vez
+            connection.rollback()
+            PreparedStatementHelper().Forget(connection)
+            DeadlineHelper().Forget(connection)
+            self._ApplyDeadlineSync(connection, cursor)
+            self._ExecutePreparedSync(connection, cursor, query, params)
+
+    async def _ExecutePreparedAsync(self, connection, cursor, query: PreparedQuery, params):
+        registry = PreparedStatementHelper()
+        if not registry.IsPrepared(connection, query.Name):
+            if registry.NeedsPlanningSample(query.Name):
+                cursor.execute(registry.ExplainSql(query), params)
+                await wait_ready(connection)
+                registry.RecordPlanningSample(query.Name, cursor.fetchone())
+            cursor.execute(registry.PrepareSql(query))
+            await wait_ready(connection)
+            registry.MarkPrepared(connection, query.Name)
+        registry.RecordExecution(query.Name)
+        cursor.execute(registry.ExecuteSql(query), params)
+        await wait_ready(connection)
+
+    async def _ExecuteAsync(self, connection, cursor, query: str, params):
+        if not (self.UsePreparedStatements and isinstance(query, PreparedQuery)):
+            cursor.execute(query, params)
+            await wait_ready(connection)
+            return
+        # Em autocommit a conexão está ociosa; numa unidade de trabalho há uma transação aberta
+        idle = connection.get_transaction_status() == pg_ext.TRANSACTION_STATUS_IDLE
+        try:
+            await self._ExecutePreparedAsync(connection, cursor, query, params)
+        except pg.errors.InvalidSqlStatementName:
+            PreparedStatementHelper().Forget(connection)
+            # Dentro de uma transação o erro já a abortou (a repetição daria InFailedSqlTransaction):
+            # sobe o erro e a unidade de trabalho desfaz tudo
+            if not idle:
+                raise
+            # O servidor não tem mais o statement: prepara de novo e repete uma vez
+            await self._ExecutePreparedAsync(connection, cursor, query, params)
+
+    def _ApplyDeadlineSync(self, connection, cursor):
+        statement_timeout = DeadlineHelper().StatementTimeoutSql(connection)
+        if statement_timeout:
+            cursor.execute(statement_timeout)
+            DeadlineHelper().MarkApplied(connection)
+
+    async def _ApplyDeadlineAsync(self, connection, cursor):
+        statement_timeout = DeadlineHelper().StatementTimeoutSql(connection)
+        if statement_timeout:
+            cursor.execute(statement_timeout)
+            await wait_ready(connection)
+            DeadlineHelper().MarkApplied(connection)
+
+    def _CancelQuery(self, connection):
+        # Pede ao servidor para interromper a consulta; a conexão em si é descartada depois
+        try:
+            connection.cancel()
+        except Exception as e:
+            print(f"Error cancelling query: {e}")
+
+    def _RunSync(self, query: str, params, fetch: str):
+        check_deadline()
+        connection = self.Connection()
+        if not connection:
+            raise HTTPException(status_code=500, detail="Database connection failed")
+
+        cursor = connection.cursor()
+        try:
+            self._ApplyDeadlineSync(connection, cursor)
+            # A transação desta conexão só tem o SET statement_timeout, que a repetição refaz
+            self._ExecuteSync(connection, cursor, query, params, owns_transaction=True)
+            if fetch == "all":
+                result = cursor.fetchall()
+            elif fetch == "one":
+                result = cursor.fetchone()
+            else:
+                result = cursor.rowcount
+            connection.commit()
+            return result
+        except Exception as e:
+            # O rollback desfaz também o SET statement_timeout
+            connection.rollback()
+            DeadlineHelper().Forget(connection)
+            if isinstance(e, pg.errors.QueryCanceled) and remaining() is not None:
+                raise HTTPException(status_code=504, detail=DEADLINE_EXCEEDED_DETAIL)
+            raise
+        finally:
+            cursor.close()
+            self.CloseConnection(connection)
+
+    async def _RunOnConnectionAsync(self, connection, query: str, params, fetch: str):
+        cancelled = False
+        cursor = connection.cursor()
+        try:
+            await self._ApplyDeadlineAsync(connection, cursor)
+            # Mede até o servidor terminar (o execute do modo async só envia a consulta)
+            start = time.perf_counter()
+            try:
+                await self._ExecuteAsync(connection, cursor, query, params)
+            finally:
+                QueryMetricsHelper().Record(query, params, time.perf_counter() - start, cursor.rowcount)
+            if fetch == "all":
+                return cursor.fetchall()
+            if fetch == "one":
+                return cursor.fetchone()
+            return cursor.rowcount
+        except pg.errors.QueryCanceled:
+            # statement_timeout estourou: o prazo da requisição acabou no servidor
+            if remaining() is not None:
+                raise HTTPException(status_code=504, detail=DEADLINE_EXCEEDED_DETAIL)
+            raise
+        except asyncio.CancelledError:
+            # Prazo estourado ou cliente desconectou: cancela a consulta no servidor
+            cancelled = True
+            self._CancelQuery(connection)
+            raise
+        finally:
+            if not cancelled:
+                cursor.close()
+
+    async def _RunAsync(self, query: str, params, fetch: str):
+        # Dentro de uma unidade de trabalho, usa a conexão/transação da requisição
+        unit = current_unit()
+        if unit is not None:
+            return await unit.Run(self, query, params, fetch)
+
+        if self.UseThreadedFallback:
+            return await ExecutorHelper().RunAsync(self._ExecutorFor(query), self._RunSync, query, params, fetch)
+
+        check_deadline()
+        connection = await self.ConnectionAsync()
+        if not connection:
+            check_deadline()
+            raise HTTPException(status_code=500, detail="Database connection failed")
+
+        discard = False
+        try:
+            return await self._RunOnConnectionAsync(connection, query, params, fetch)
+        except asyncio.CancelledError:
+            # A consulta foi cancelada no meio: descarta a conexão, liberando a vaga do pool na hora
+            discard = True
+            raise
+        finally:
+            await self.CloseConnectionAsync(connection, discard=discard)
+
+    async def FetchAllAsync(self, query: str, params=None) -> list[tuple]:
+        return await self._RunAsync(query, params, "all")
+
+    async def FetchOneAsync(self, query: str, params=None):
+        return await self._RunAsync(query, params, "one")
+
+    async def ExecuteAsync(self, query: str, params=None) -> int:
+        """
+        Executa um comando sem retorno de linhas. Como as conexões estão em
+        autocommit, cada comando já é confirmado ao terminar, exceto dentro de
+        uma unidade de trabalho (UnitOfWorkHelper), que confirma no fim da requisição.
+        """
+        return await self._RunAsync(query, params, "rowcount")
+
+    @classmethod
+    def CloseAsyncPools(cls):
+        pools = list(cls._async_pools.values())
+        cls._async_pools.clear()
+        for pool in pools:
+            pool.close()
@@ -0,0 +1,301 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+import psycopg2 as pg
+import requests
+from requests.adapters import HTTPAdapter
+from src.Helper.CepIndexHelper import CepRangeIndex
+from src.Helper.ConnectionHelper import ConnectionHelper
+
+LOAD_CEP_QUERY = """SELECT valido, EXTRACT(EPOCH FROM (expira_em - CURRENT_TIMESTAMP))
+        FROM cep_cache
+        WHERE cep = %s AND expira_em > CURRENT_TIMESTAMP"""
+STORE_CEP_QUERY = """
+                INSERT INTO cep_cache (cep, valido, expira_em)
+                VALUES (%s, %s, CURRENT_TIMESTAMP + %s * INTERVAL '1 second')
+                ON CONFLICT (cep) DO UPDATE SET valido = EXCLUDED.valido, expira_em = EXCLUDED.expira_em
+            """
+
+def normalize_cep(address: str) -> str | None:
+    # mantém só dígitos; CEP precisa ter 8
+    digits = re.sub(r"\D", "", address or "")
+    return digits if len(digits) == 8 else None
+
+class CircuitBreaker:
+    """
+    Depois de FailureThreshold falhas seguidas, para de chamar o serviço por ResetTimeout segundos.
+    Passado esse tempo, deixa uma chamada de teste passar (meio-aberto): sucesso fecha o circuito,
+    falha abre de novo.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.FailureThreshold = failure_threshold
+        self.ResetTimeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = CircuitBreaker.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def State(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == CircuitBreaker.CLOSED:
+                return True
+            if self._state == CircuitBreaker.OPEN and time.monotonic() - self._opened_at >= self.ResetTimeout:
+                self._state = CircuitBreaker.HALF_OPEN
+                return True
+            # Aberto, ou meio-aberto com a chamada de teste ainda em andamento
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = CircuitBreaker.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == CircuitBreaker.HALF_OPEN or self._failures >= self.FailureThreshold:
+                self._state = CircuitBreaker.OPEN
+                self._opened_at = time.monotonic()
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._state = CircuitBreaker.CLOSED
+
+class CepHelper(ConnectionHelper):
+    """
+    Consulta de CEP no ViaCEP com cache em dois níveis: LRU em memória (por processo)
+    e tabela cep_cache no banco (compartilhada entre processos e reinícios).
+    Se existir a tabela offline de faixas de CEP, ela é consultada antes de tudo.
+    """
+    # Compartilhados pelo processo: sessão HTTP (mantém as conexões abertas), cache e circuito
+    _session: requests.Session | None = None
+    _session_lock = threading.Lock()
+    _memory: OrderedDict = OrderedDict()
+    _memory_lock = threading.Lock()
+    _breaker = CircuitBreaker()
+    _stats = {"offline_hits": 0, "memory_hits": 0, "persistent_hits": 0,
+              "remote_calls": 0, "remote_failures": 0, "short_circuited": 0}
+    _stats_lock = threading.Lock()
+    # Caminho -> tabela de faixas aberta (None quando o arquivo não existe)
+    _offline_indexes: dict = {}
+    _offline_lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__()
+        self.BaseUrl = "https://viacep.com.br/ws"
+        self.Timeout = 2.0                    # segundos por chamada ao ViaCEP
+        self.HttpPoolSize = 8                 # conexões HTTP mantidas abertas (igual às threads do executor "http")
+        self.MemoryCacheSize = 10000
+        self.PositiveTtl = 30 * 24 * 3600.0   # CEP existente quase nunca deixa de existir
+        self.NegativeTtl = 24 * 3600.0        # CEP inexistente pode passar a existir
+        self.UsePersistentCache = True
+        # Tabela gerada por "python -m src.Helper.CepIndexHelper"; sem o arquivo, o modo offline fica desligado
+        self.OfflineIndexPath = Path(__file__).resolve().parent.parent / "Data" / "cep_ranges.bin"
+
+    def Session(self) -> requests.Session:
+        session = CepHelper._session
+        if session is not None:
+            return session
+
+        with CepHelper._session_lock:
+            if CepHelper._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.HttpPoolSize, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                CepHelper._session = session
+            return CepHelper._session
+
+    def _Count(self, name: str):
+        with CepHelper._stats_lock:
+            CepHelper._stats[name] += 1
+
+    # ===== Tabela offline =====
+
+    def OfflineIndex(self) -> CepRangeIndex | None:
+        if not self.OfflineIndexPath:
+            return None
+
+        key = str(self.OfflineIndexPath)
+        if key in CepHelper._offline_indexes:
+            return CepHelper._offline_indexes[key]
+
+        with CepHelper._offline_lock:
+            if key not in CepHelper._offline_indexes:
+                index = None
+                if Path(key).exists():
+                    try:
+                        index = CepRangeIndex(key)
+                    except (OSError, ValueError) as e:
+                        print(f"Error loading CEP index: {e}")
+                CepHelper._offline_indexes[key] = index
+            return CepHelper._offline_indexes[key]
+
+    def LocalResult(self, cep: str) -> bool | None:
+        """
+        Resposta sem rede nem banco: tabela offline e cache em memória.
+        CEP fora das faixas da tabela não é inválido, só não está coberto por ela.
+        """
+        index = self.OfflineIndex()
+        if index is not None and index.contains(cep):
+            self._Count("offline_hits")
+            return True
+        return self.CachedResult(cep)
+
+    # ===== Cache em memória =====
+
+    def CachedResult(self, cep: str) -> bool | None:
+        with CepHelper._memory_lock:
+            entry = CepHelper._memory.get(cep)
+            if entry is None:
+                return None
+            valid, expires_at = entry
+            if expires_at <= time.monotonic():
+                del CepHelper._memory[cep]
+                return None
+            CepHelper._memory.move_to_end(cep)
+            self._Count("memory_hits")
+            return valid
+
+    def _Remember(self, cep: str, valid: bool, ttl: float):
+        with CepHelper._memory_lock:
+            CepHelper._memory[cep] = (valid, time.monotonic() + ttl)
+            CepHelper._memory.move_to_end(cep)
+            while len(CepHelper._memory) > self.MemoryCacheSize:
+                CepHelper._memory.popitem(last=False)
+
+    # ===== Cache no banco =====
+
+    def _LoadPersistent(self, cep: str):
+        connection = self.Connection()
+        if not connection:
+            return None
+        try:
+            cursor = connection.cursor()
+            cursor.execute(LOAD_CEP_QUERY, (cep,))
+            row = cursor.fetchone()
+            cursor.close()
+            return (row[0], float(row[1])) if row else None
+        except pg.Error as e:
+            print(f"Error reading CEP cache: {e}")
+            return None
+        finally:
+            self.CloseConnection(connection)
+
+    def _StorePersistent(self, cep: str, valid: bool, ttl: float):
+        connection = self.Connection()
+        if not connection:
+            return
+        try:
+            cursor = connection.cursor()
+            cursor.execute(STORE_CEP_QUERY, (cep, valid, ttl))
+            connection.commit()
+            cursor.close()
+        except pg.Error as e:
+            print(f"Error writing CEP cache: {e}")
+        finally:
+            self.CloseConnection(connection)
+
+    # ===== ViaCEP =====
+
+    def _FetchRemote(self, cep: str) -> bool | None:
+        """
+        Retorna True/False quando o ViaCEP dá uma resposta definitiva,
+        ou None quando não foi possível consultar (rede, status inesperado, circuito aberto).
+        """
+        breaker = CepHelper._breaker
+        if not breaker.allow():
+            self._Count("short_circuited")
+            return None
+
+        self._Count("remote_calls")
+        try:
+            resp = self.Session().get(f"{self.BaseUrl}/{cep}/json/", timeout=self.Timeout)
+        except requests.RequestException:
+            self._Count("remote_failures")
+            breaker.record_failure()
+            return None
+
+        # 400 é a resposta do ViaCEP para CEP mal formado: definitiva como um {"erro": true}
+        if resp.status_code == 400:
+            breaker.record_success()
+            return False
+
+        data = None
+        if resp.status_code == 200:
+            try:
+                data = resp.json()
+            except ValueError:
+                pass
+        if not isinstance(data, dict):
+            # 429, 403, 4xx de proxy, 5xx ou corpo inesperado: não diz nada sobre o CEP,
+            # então não entra no cache negativo e conta como falha para o circuito
+            self._Count("remote_failures")
+            breaker.record_failure()
+            return None
+
+        breaker.record_success()
+        # ViaCEP retorna {"erro": true} quando o CEP não existe
+        return data.get("erro") not in (True, "true")
+
+    def IsValid(self, cep: str) -> bool:
+        cached = self.LocalResult(cep)
+        if cached is not None:
+            return cached
+
+        if self.UsePersistentCache:
+            stored = self._LoadPersistent(cep)
+            if stored is not None:
+                valid, remaining = stored
+                self._Count("persistent_hits")
+                self._Remember(cep, valid, remaining)
+                return valid
+
+        valid = self._FetchRemote(cep)
+        if valid is None:
+            # Falha temporária: não guarda no cache e recusa, como antes
+            return False
+
+        ttl = self.PositiveTtl if valid else self.NegativeTtl
+        self._Remember(cep, valid, ttl)
+        if self.UsePersistentCache:
+            self._StorePersistent(cep, valid, ttl)
+        return valid
+
+    def Stats(self) -> dict:
+        with CepHelper._memory_lock:
+            size = len(CepHelper._memory)
+        with CepHelper._stats_lock:
+            stats = dict(CepHelper._stats)
+        return dict(stats, memory_size=size, breaker=CepHelper._breaker.State)
+
+    @classmethod
+    def Reset(cls):
+        with cls._memory_lock:
+            cls._memory.clear()
+        with cls._session_lock:
+            if cls._session is not None:
+                cls._session.close()
+            cls._session = None
+        cls._breaker.reset()
+        with cls._offline_lock:
+            indexes = list(cls._offline_indexes.values())
+            cls._offline_indexes.clear()
+        for index in indexes:
+            if index is not None:
+                index.close()
+        with cls._stats_lock:
+            for key in cls._stats:
+                cls._stats[key] = 0
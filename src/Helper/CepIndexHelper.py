@@ -0,0 +1,95 @@
+import csv
+import mmap
+import struct
+import sys
+from pathlib import Path
+
+# Formato do arquivo: cabeçalho (assinatura, versão, quantidade de faixas)
+# seguido das faixas (cep_inicial, cep_final) como inteiros de 32 bits, ordenadas e sem sobreposição
+INDEX_MAGIC = b"CEPR"
+INDEX_VERSION = 1
+HEADER = struct.Struct("<4sII")
+RANGE = struct.Struct("<II")
+
+def merge_ranges(ranges) -> list[tuple[int, int]]:
+    """
+    Ordena as faixas e junta as que se sobrepõem ou são contíguas.
+    """
+    merged: list[list[int]] = []
+    for start, end in sorted((int(s), int(e)) for s, e in ranges):
+        if start > end:
+            raise ValueError(f"Invalid CEP range: {start:08d}-{end:08d}")
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+def load_ranges_csv(path) -> list[tuple[int, int]]:
+    """
+    Lê um CSV com as colunas cep_inicial e cep_final (com ou sem hífen).
+    Linhas sem cep_final são tratadas como um CEP único.
+    """
+    ranges = []
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            start = row["cep_inicial"].replace("-", "").strip()
+            end = (row.get("cep_final") or start).replace("-", "").strip()
+            ranges.append((int(start), int(end)))
+    return ranges
+
+def build_index(ranges, path) -> int:
+    merged = merge_ranges(ranges)
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(merged)))
+        for start, end in merged:
+            file.write(RANGE.pack(start, end))
+    return len(merged)
+
+class CepRangeIndex:
+    """
+    Tabela de faixas de CEP mapeada em memória. A busca é binária direto no arquivo,
+    sem carregar as faixas para objetos Python; as páginas ficam no cache do sistema
+    e são compartilhadas entre os processos que abrem o mesmo arquivo.
+    """
+    def __init__(self, path):
+        self.Path = Path(path)
+        with open(self.Path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise ValueError(f"Invalid CEP index file: {self.Path}")
+        magic, version, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or len(self._mmap) != HEADER.size + count * RANGE.size:
+            self.close()
+            raise ValueError(f"Invalid CEP index file: {self.Path}")
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def contains(self, cep) -> bool:
+        value = int(cep)
+        low, high = 0, self._count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            start, end = RANGE.unpack_from(self._mmap, HEADER.size + middle * RANGE.size)
+            if value < start:
+                high = middle - 1
+            elif value > end:
+                low = middle + 1
+            else:
+                return True
+        return False
+
+    def close(self):
+        self._mmap.close()
+
+if __name__ == "__main__":
+    # Uso: python -m src.Helper.CepIndexHelper faixas.csv src/Data/cep_ranges.bin
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.Helper.CepIndexHelper <ranges.csv> <output.bin>")
+        sys.exit(1)
+    total = build_index(load_ranges_csv(sys.argv[1]), sys.argv[2])
+    print(f"{total} CEP range(s) written to {sys.argv[2]}")
@@ -1,6 +1,182 @@
+import threading
+import time
 import psycopg2 as pg
+from psycopg2 import extensions as pg_ext
+from src.Helper.DeadlineHelper import DeadlineHelper
+from src.Helper.QueryMetricsHelper import InstrumentedCursor
+
+class PoolTimeoutError(Exception):
+    pass
+
+class ConnectionPool:
+    """
+    Pool de conexões compartilhado pelo processo.
+    Mantém entre MinSize e MaxSize conexões abertas, valida as conexões
+    ociosas antes de emprestar e descarta as que estiverem quebradas.
+    """
+    def __init__(self, connect_kwargs: dict, min_size: int = 1, max_size: int = 10,
+                 timeout: float = 5.0, health_check_after: float = 30.0, max_lifetime: float = 1800.0):
+        self.ConnectKwargs = connect_kwargs
+        self.MinSize = min_size
+        self.MaxSize = max_size
+        self.Timeout = timeout
+        self.HealthCheckAfter = health_check_after
+        self.MaxLifetime = max_lifetime
+
+        # Conexões ociosas: (conexão, criada_em, último_uso). Usada como pilha (LIFO)
+        self._idle: list[tuple] = []
+        # Conexões emprestadas: id(conexão) -> (conexão, criada_em)
+        self._in_use: dict[int, tuple] = {}
+        # Total de conexões abertas ou sendo abertas
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._warm_up()
+
+    def _open(self):
+        return pg.connect(**self.ConnectKwargs)
+
+    def _warm_up(self):
+        for _ in range(self.MinSize):
+            try:
+                connection = self._open()
+            except pg.Error:
+                # O erro real aparece no primeiro acquire()
+                return
+            now = time.monotonic()
+            with self._condition:
+                self._size += 1
+                self._idle.append((connection, now, now))
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _is_healthy(self, connection, created_at: float, last_used: float) -> bool:
+        if connection.closed:
+            return False
+        now = time.monotonic()
+        if now - created_at > self.MaxLifetime:
+            return False
+        if now - last_used < self.HealthCheckAfter:
+            return True
+
+        # Ficou muito tempo parada: confirma com o servidor antes de emprestar
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _reset(self, connection) -> bool:
+        if connection.closed:
+            return False
+        try:
+            status = connection.get_transaction_status()
+            if status == pg_ext.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status != pg_ext.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            # O SET statement_timeout confirmado fica na sessão: o prazo da requisição
+            # não pode valer para quem pegar a conexão depois (cache de CEP, migrações)
+            if DeadlineHelper().Applied(connection):
+                cursor = connection.cursor()
+                cursor.execute("RESET statement_timeout")
+                cursor.close()
+                connection.commit()
+                DeadlineHelper().Forget(connection)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, timeout: float = None):
+        deadline = time.monotonic() + (self.Timeout if timeout is None else timeout)
+
+        while True:
+            entry = None
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.MaxSize:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(f"Timed out waiting for a connection (max {self.MaxSize})")
+                    self._condition.wait(remaining)
+
+            if entry is None:
+                try:
+                    connection = self._open()
+                except Exception:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+                created_at = time.monotonic()
+            else:
+                connection, created_at, last_used = entry
+                if not self._is_healthy(connection, created_at, last_used):
+                    self._discard(connection)
+                    continue
+
+            with self._condition:
+                self._in_use[id(connection)] = (connection, created_at)
+            return connection
+
+    def release(self, connection):
+        with self._condition:
+            entry = self._in_use.pop(id(connection), None)
+
+        # Conexão que não saiu deste pool: apenas fecha
+        if entry is None:
+            connection.close()
+            return
+
+        if self._closed or not self._reset(connection):
+            self._discard(connection)
+            return
+
+        with self._condition:
+            self._idle.append((connection, entry[1], time.monotonic()))
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._condition.notify_all()
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "max_size": self.MaxSize,
+            }
 
 class ConnectionHelper:
+    # Um pool por banco de destino, compartilhado por todos os helpers do processo
+    _pools: dict[tuple, ConnectionPool] = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self):
         self.Database = "helper"
         self.User = "postgres"
@@ -8,20 +184,69 @@ class ConnectionHelper:
         self.Host = "localhost"
         self.Port = 5432
 
+        # Configuração do pool
+        self.PoolMinSize = 1
+        self.PoolMaxSize = 13
+        self.PoolTimeout = 5.0            # segundos esperando uma conexão livre
+        self.PoolHealthCheckAfter = 30.0  # segundos ociosa antes de testar com SELECT 1
+        self.PoolMaxLifetime = 1800.0     # segundos até reciclar a conexão
+
+        # Consultas marcadas com prepared() rodam como prepared statements no servidor.
+        # Desligar atrás do PgBouncer em modo transaction/statement, onde a conexão do servidor muda
+        self.UsePreparedStatements = True
+
+    def _PoolKey(self) -> tuple:
+        return (self.Host, self.Port, self.Database, self.User)
+
+    def Pool(self) -> ConnectionPool:
+        key = self._PoolKey()
+        pool = ConnectionHelper._pools.get(key)
+        if pool is not None:
+            return pool
+
+        with ConnectionHelper._pools_lock:
+            pool = ConnectionHelper._pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(
+                    connect_kwargs={
+                        "database": self.Database,
+                        "user": self.User,
+                        "password": self.Password,
+                        "host": self.Host,
+                        "port": self.Port,
+                        # Toda consulta feita pelos helpers passa pelo cursor instrumentado
+                        "cursor_factory": InstrumentedCursor,
+                    },
+                    min_size=self.PoolMinSize,
+                    max_size=self.PoolMaxSize,
+                    timeout=self.PoolTimeout,
+                    health_check_after=self.PoolHealthCheckAfter,
+                    max_lifetime=self.PoolMaxLifetime,
+                )
+                ConnectionHelper._pools[key] = pool
+            return pool
+
     def Connection(self):
         try:
-            connection = pg.connect(
-                database=self.Database,
-                user=self.User,
-                password=self.Password,
-                host=self.Host,
-                port=self.Port
-            )
-            return connection
-        except pg.Error as e:
+            return self.Pool().acquire()
+        except (pg.Error, PoolTimeoutError) as e:
             print(f"Error connecting to database: {e}")
             return None
-        
+
     def CloseConnection(self, connection: pg.extensions.connection):
-        if connection:
-            connection.close()
\ No newline at end of file
+        if not connection:
+            return
+
+        pool = ConnectionHelper._pools.get(self._PoolKey())
+        if pool is None:
+            connection.close()
+        else:
+            pool.release(connection)
+
+    @classmethod
+    def ClosePools(cls):
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            pool.close()
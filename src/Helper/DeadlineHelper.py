@@ -0,0 +1,177 @@
+import asyncio
+import contextlib
+import contextvars
+import json
+import math
+import threading
+import time
+import weakref
+from fastapi import HTTPException
+
+# Prazo padrão (segundos) de cada requisição, do recebimento até a resposta
+DEFAULT_DEADLINE = 10.0
+
+# Prazos por rota (prefixo do caminho). O prefixo mais longo que casar vence
+ROUTE_DEADLINES = {
+    "/login": 3.0,
+    "/cadastrate": 8.0,
+    "/receiver/donations/export": 300.0,
+    "/admin/donations/import": 300.0,
+    # Conexão longa de propósito; ao fim do prazo o EventSource reconecta
+    "/receiver/donations/stream": 3600.0,
+}
+
+DEADLINE_EXCEEDED_DETAIL = "Request deadline exceeded"
+
+# Instante (time.monotonic) em que a requisição atual expira; None fora de requisições
+_deadline: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+def deadline_for_path(path: str) -> float:
+    matches = [prefix for prefix in ROUTE_DEADLINES if path == prefix or path.startswith(prefix + "/")]
+    if not matches:
+        return DEFAULT_DEADLINE
+    return ROUTE_DEADLINES[max(matches, key=len)]
+
+def remaining() -> float | None:
+    """
+    Segundos que restam até o prazo da requisição atual (None quando não há prazo).
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def check_deadline() -> float | None:
+    """
+    Devolve o tempo restante ou responde 504 se o prazo já acabou,
+    para não ocupar uma conexão com uma resposta que ninguém vai esperar.
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise HTTPException(status_code=504, detail=DEADLINE_EXCEEDED_DETAIL)
+    return left
+
+@contextlib.contextmanager
+def deadline_scope(seconds: float):
+    """
+    Define o prazo do código dentro do bloco (usado pelo middleware e por scripts/testes).
+    Um prazo externo mais curto continua valendo.
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+class DeadlineHelper:
+    """
+    Repassa o prazo da requisição ao Postgres como statement_timeout. O valor é
+    arredondado para cima em segundos inteiros e só é reenviado quando muda, então
+    a maioria das consultas não paga um round trip extra; a precisão fina fica
+    com o cancelamento feito pelo middleware.
+    """
+    # Conexão -> statement_timeout (ms) aplicado nela; 0 = sem limite
+    _applied = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    def TimeoutMs(self) -> int:
+        left = remaining()
+        if left is None:
+            return 0
+        return max(1, math.ceil(left)) * 1000
+
+    def StatementTimeoutSql(self, connection) -> str | None:
+        """
+        Comando SET a executar antes da consulta, ou None se a conexão já está com o valor certo.
+        """
+        timeout_ms = self.TimeoutMs()
+        with DeadlineHelper._lock:
+            if DeadlineHelper._applied.get(connection, 0) == timeout_ms:
+                return None
+        return f"SET statement_timeout = {timeout_ms}"
+
+    def MarkApplied(self, connection):
+        with DeadlineHelper._lock:
+            DeadlineHelper._applied[connection] = self.TimeoutMs()
+
+    def Applied(self, connection) -> int:
+        """
+        statement_timeout (ms) deixado na sessão da conexão; 0 = sem limite.
+        """
+        with DeadlineHelper._lock:
+            return DeadlineHelper._applied.get(connection, 0)
+
+    def Forget(self, connection):
+        with DeadlineHelper._lock:
+            DeadlineHelper._applied.pop(connection, None)
+
+    @classmethod
+    def Reset(cls):
+        with cls._lock:
+            cls._applied = weakref.WeakKeyDictionary()
+
+class DeadlineMiddleware:
+    """
+    Middleware ASGI que aplica o prazo da rota e cancela o processamento quando
+    o prazo acaba ou quando o cliente desconecta. O cancelamento chega ao
+    AsyncConnectionHelper, que cancela a consulta no servidor e libera a vaga do pool.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seconds = deadline_for_path(scope["path"])
+        messages: asyncio.Queue = asyncio.Queue()
+        state = {"started": False, "disconnected": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["started"] = True
+            await send(message)
+
+        # A task herda o contexto atual, então o prazo vale para tudo que a rota chamar
+        with deadline_scope(seconds):
+            app_task = asyncio.ensure_future(self.app(scope, messages.get, send_wrapper))
+
+        async def listen_for_disconnect():
+            # Lê o receive em paralelo para perceber a desconexão mesmo depois do corpo
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    state["disconnected"] = True
+                    app_task.cancel()
+                    return
+
+        listener = asyncio.ensure_future(listen_for_disconnect())
+        try:
+            await asyncio.wait_for(app_task, timeout=seconds)
+        except asyncio.TimeoutError:
+            if not state["started"]:
+                await self._send_timeout(send)
+        except asyncio.CancelledError:
+            if not state["disconnected"]:
+                raise
+        finally:
+            listener.cancel()
+
+    async def _send_timeout(self, send):
+        body = json.dumps({"detail": DEADLINE_EXCEEDED_DETAIL}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 504,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+def add_deadline_middleware(app):
+    """
+    Função auxiliar para adicionar o middleware de prazos ao app FastAPI.
+    """
+    app.add_middleware(DeadlineMiddleware)
@@ -0,0 +1,177 @@
+import asyncio
+import collections
+import contextvars
+import os
+import psycopg2 as pg
+from fastapi import HTTPException
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.DonationsHelper import ADD_DONATIONS_BATCH_QUERY
+from src.Model.DonationModel import DonationModel
+
+# Liga o caminho com buffer em /donator/add_donation ("1" liga; desligado por padrão)
+DONATION_BUFFER_ENV = "GCA_DONATION_BUFFER"
+
+class DonationBuffer:
+    """
+    Fila de doações de um event loop. Uma tarefa junta os pedidos que chegam em até
+    MaxDelay segundos (ou até o lote encher) e grava todos com um INSERT e um commit.
+    Enquanto um lote está no banco, o próximo vai se formando.
+    """
+    def __init__(self, helper: "DonationBufferHelper", max_batch_size: int, max_delay: float):
+        self._helper = helper
+        self.MaxBatchSize = max_batch_size
+        self.MaxDelay = max_delay
+
+        self._pending = collections.deque()
+        self._arrived = asyncio.Event()
+        self._full = asyncio.Event()
+        self._closed = False
+        self._task = None
+        self.Flushes = 0
+        self.Flushed = 0
+
+    async def Submit(self, params: tuple) -> int:
+        """
+        Enfileira a doação e espera o commit do lote dela. Devolve o id gravado.
+        """
+        if self._closed:
+            raise HTTPException(status_code=503, detail="Donation buffer is closed")
+
+        entry = (params, asyncio.get_running_loop().create_future())
+        self._pending.append(entry)
+        self._arrived.set()
+        if len(self._pending) >= self.MaxBatchSize:
+            self._full.set()
+        self._EnsureTask()
+
+        try:
+            return await entry[1]
+        except asyncio.CancelledError:
+            # Ainda na fila: sai sem ser gravada. Já no banco: o lote segue normalmente
+            try:
+                self._pending.remove(entry)
+            except ValueError:
+                pass
+            raise
+
+    def _EnsureTask(self):
+        if self._task is None or self._task.done():
+            # Contexto vazio: o lote não herda o prazo nem a unidade de trabalho de quem chegou primeiro
+            self._task = asyncio.get_running_loop().create_task(self._Run(), context=contextvars.Context())
+
+    def _TakeBatch(self) -> list:
+        batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.MaxBatchSize))]
+        if not self._pending:
+            self._arrived.clear()
+        if len(self._pending) < self.MaxBatchSize:
+            self._full.clear()
+        return batch
+
+    async def _Run(self):
+        while True:
+            if self._closed and not self._pending:
+                return
+            await self._arrived.wait()
+            if not self._pending:
+                self._arrived.clear()
+                continue
+            # Espera juntar mais pedidos, sem passar do atraso máximo
+            if len(self._pending) < self.MaxBatchSize and not self._closed:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.MaxDelay)
+                except asyncio.TimeoutError:
+                    pass
+            await self._Flush(self._TakeBatch())
+
+    async def _Flush(self, batch: list):
+        entries = [(params, future) for params, future in batch if not future.done()]
+        if not entries:
+            return
+
+        try:
+            ids = await self._helper.InsertBatchAsync([params for params, _ in entries])
+        except (pg.IntegrityError, pg.DataError):
+            # Um pedido inválido (receptor inexistente, valor fora da faixa) não derruba os outros
+            await self._FlushOneByOne(entries)
+            return
+        except Exception as e:
+            print(f"Error flushing donation buffer: {e}")
+            error = e if isinstance(e, HTTPException) else HTTPException(status_code=500, detail=str(e))
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.Flushes += 1
+        self.Flushed += len(entries)
+        for (_, future), donation_id in zip(entries, ids):
+            if not future.done():
+                future.set_result(donation_id)
+
+    async def _FlushOneByOne(self, entries: list):
+        for params, future in entries:
+            try:
+                donation_id = (await self._helper.InsertBatchAsync([params]))[0]
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(HTTPException(status_code=500, detail=str(e)))
+                continue
+            self.Flushes += 1
+            self.Flushed += 1
+            if not future.done():
+                future.set_result(donation_id)
+
+    async def Close(self):
+        """
+        Para de aceitar pedidos e espera os já enfileirados serem gravados.
+        """
+        self._closed = True
+        self._arrived.set()
+        self._full.set()
+        if self._task is not None:
+            await self._task
+
+class DonationBufferHelper(AsyncConnectionHelper):
+    """
+    Caminho opcional de escrita para picos de doação (campanhas ao vivo): em vez de um
+    INSERT e um commit por requisição, as doações são gravadas em lotes (group commit).
+    Cada requisição só responde depois que o lote dela foi confirmado.
+    """
+    # Um buffer por event loop, compartilhado pelo processo
+    _buffers: dict = {}
+
+    def __init__(self):
+        super().__init__()
+        self.Enabled = os.getenv(DONATION_BUFFER_ENV, "0") == "1"
+        self.MaxBatchSize = 200
+        self.MaxDelay = 0.005   # segundos esperando o lote encher
+
+    def Buffer(self) -> DonationBuffer:
+        loop = asyncio.get_running_loop()
+        buffer = DonationBufferHelper._buffers.get(loop)
+        if buffer is None:
+            buffer = DonationBuffer(self, self.MaxBatchSize, self.MaxDelay)
+            DonationBufferHelper._buffers[loop] = buffer
+        return buffer
+
+    async def InsertBatchAsync(self, rows: list[tuple]) -> list[int]:
+        # Mesmo INSERT de várias linhas do /donator/add_donations; um statement em autocommit = um commit
+        params = tuple(list(column) for column in zip(*rows))
+        result = await self.FetchAllAsync(ADD_DONATIONS_BATCH_QUERY, params)
+        return sorted(row[0] for row in result)
+
+    async def AddAsync(self, donation_info: DonationModel) -> dict:
+        await self.Buffer().Submit((donation_info.DonorId, donation_info.ReceiverId, donation_info.Amount,
+                                    donation_info.Message, donation_info.Date))
+        return {"message": "Donation efetuated successfully"}
+
+    @classmethod
+    async def CloseBuffersAsync(cls):
+        loop = asyncio.get_running_loop()
+        buffer = cls._buffers.pop(loop, None)
+        if buffer is not None:
+            await buffer.Close()
+
+    @classmethod
+    def Reset(cls):
+        cls._buffers.clear()
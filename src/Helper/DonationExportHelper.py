@@ -0,0 +1,183 @@
+import asyncio
+import time
+from fastapi import HTTPException
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.DeadlineHelper import DeadlineHelper, remaining
+from src.Helper.DonationsHelper import DONATION_MAPPER
+from src.Helper.ExecutorHelper import ExecutorHelper, ExecutorSaturatedError
+from src.Helper.JsonResponseHelper import dumps
+
+# Formato -> media type da resposta
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Mesmas colunas da listagem; os apelidos viram o cabeçalho do CSV
+EXPORT_DONATIONS_QUERY = """SELECT d.id_doacao AS "DonationId",
+                    u.nome AS "DonorName",
+                    ub.nome AS "ReceiverName",
+                    d.valor_doacao AS "Amount",
+                    d.mensagem AS "Message",
+                    d.data_doacao AS "Date"
+                FROM doacoes d
+                    INNER JOIN usuarios u ON u.id_usuario = d.id_doador
+                    INNER JOIN usuarios ub ON ub.id_usuario = d.id_causa
+                WHERE d.id_causa = %s
+                ORDER BY d.id_doacao"""
+COPY_TEMPLATE = "COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+
+class ExportAbortedError(Exception):
+    pass
+
+class _ChunkWriter:
+    """
+    Arquivo falso que o COPY/cursor da thread preenche. Junta os dados em blocos e os
+    entrega ao event loop por uma fila limitada: se o cliente lê devagar, a thread
+    espera (a memória não cresce com o tamanho do histórico). Se ninguém consome a fila
+    por idle_timeout segundos (gerador nunca iterado, cliente parado), a thread desiste.
+    """
+    def __init__(self, loop, queue: asyncio.Queue, chunk_size: int, idle_timeout: float):
+        self._loop = loop
+        self._queue = queue
+        self._chunk_size = chunk_size
+        self._idle_timeout = idle_timeout
+        self._buffer = bytearray()
+        self._sent_first = False
+        self.Aborted = False
+
+    def write(self, data):
+        if self.Aborted:
+            raise ExportAbortedError("Export cancelled by client")
+        self._buffer += data.encode() if isinstance(data, str) else data
+        # O primeiro bloco (cabeçalho/primeiras linhas) sai na hora
+        if not self._sent_first or len(self._buffer) >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+            self._sent_first = True
+
+    def _put(self, item):
+        future = asyncio.run_coroutine_threadsafe(self._queue.put(item), self._loop)
+        idle_until = time.monotonic() + self._idle_timeout
+        while True:
+            # Também desiste quando o prazo acaba ou a fila fica parada, com ou sem prazo na requisição
+            left = remaining()
+            if self.Aborted or (left is not None and left <= 0) or time.monotonic() >= idle_until:
+                self.Aborted = True
+                future.cancel()
+                raise ExportAbortedError("Export cancelled by client")
+            try:
+                future.result(timeout=0.1)
+                return
+            except TimeoutError:
+                continue
+
+    def finish(self, error: BaseException = None):
+        self._put(error if error is not None else None)
+
+class DonationExportHelper(AsyncConnectionHelper):
+    """
+    Exporta o histórico de doações recebidas direto do Postgres, sem carregar tudo:
+    CSV pelo COPY TO STDOUT e NDJSON por um cursor no servidor. O trabalho roda numa
+    thread do executor "exports" (o modo async do psycopg2 não faz COPY nem cursor nomeado).
+    """
+    def __init__(self):
+        super().__init__()
+        self.ChunkSize = 64 * 1024
+        self.QueueSize = 8
+        self.CursorBatchSize = 2000
+        self.IdleTimeout = 60.0    # segundos sem o cliente consumir um bloco até liberar thread e conexão
+
+    def _CopyCsv(self, connection, cursor, receiver_id: int, writer: _ChunkWriter):
+        query = cursor.mogrify(EXPORT_DONATIONS_QUERY, (receiver_id,)).decode()
+        cursor.copy_expert(COPY_TEMPLATE.format(query=query), writer)
+
+    def _StreamNdjson(self, connection, receiver_id: int, writer: _ChunkWriter):
+        cursor = connection.cursor(name="export_donations")
+        cursor.itersize = self.CursorBatchSize
+        try:
+            cursor.execute(EXPORT_DONATIONS_QUERY, (receiver_id,))
+            while True:
+                rows = cursor.fetchmany(self.CursorBatchSize)
+                if not rows:
+                    break
+                writer.write(b"".join(dumps(DONATION_MAPPER.ToDict(row)) + b"\n" for row in rows))
+        finally:
+            cursor.close()
+
+    def _Produce(self, receiver_id: int, export_format: str, writer: _ChunkWriter):
+        connection = self.Connection()
+        if not connection:
+            writer.finish(HTTPException(status_code=500, detail="Database connection failed"))
+            return
+
+        failed = False
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            self._ApplyDeadlineSync(connection, cursor)
+            if export_format == "csv":
+                self._CopyCsv(connection, cursor, receiver_id, writer)
+            else:
+                self._StreamNdjson(connection, receiver_id, writer)
+            writer.flush()
+            connection.commit()
+        except BaseException as e:
+            failed = True
+            # Interrompe a consulta no servidor; a conexão (talvez no meio do COPY) é descartada
+            try:
+                connection.cancel()
+            except Exception:
+                pass
+            connection.close()
+            DeadlineHelper().Forget(connection)
+            if not isinstance(e, ExportAbortedError):
+                print(f"Error exporting donations: {e}")
+                try:
+                    writer.finish(e)
+                except ExportAbortedError:
+                    pass
+        finally:
+            if cursor is not None and not connection.closed:
+                cursor.close()
+            self.CloseConnection(connection)
+
+        if not failed:
+            writer.finish()
+
+    def Export(self, receiver_id: int, export_format: str):
+        """
+        Inicia a exportação e devolve o gerador assíncrono de blocos para o StreamingResponse.
+        A thread é reservada aqui, então um executor lotado vira 503 antes de qualquer byte;
+        se o gerador nunca for iterado, o IdleTimeout devolve a thread e a conexão.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Invalid export format: {export_format}")
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QueueSize)
+        writer = _ChunkWriter(loop, queue, self.ChunkSize, self.IdleTimeout)
+        try:
+            ExecutorHelper().Executor("exports").submit(self._Produce, receiver_id, export_format, writer)
+        except ExecutorSaturatedError as e:
+            print(f"Executor saturated: {e}")
+            raise HTTPException(status_code=503, detail="Server busy, try again later")
+        return self._Stream(queue, writer)
+
+    async def _Stream(self, queue: asyncio.Queue, writer: _ChunkWriter):
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    # Cabeçalhos já foram enviados: só resta interromper o corpo
+                    raise item
+                yield item
+        finally:
+            # Cliente desconectou ou prazo acabou: libera a thread presa no put
+            writer.Aborted = True
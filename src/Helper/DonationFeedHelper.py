@@ -0,0 +1,226 @@
+import asyncio
+import json
+import psycopg2 as pg
+from fastapi import HTTPException
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper, wait_ready
+from src.Helper.DonationsHelper import DONATION_MAPPER, LIST_DONATIONS_RECEIVED_QUERY
+from src.Helper.JsonResponseHelper import dumps
+
+# Canal avisado pelo trigger tg_doacoes_notificar (migração 0007)
+DONATION_CHANNEL = "doacoes_novas"
+LISTEN_QUERY = f"LISTEN {DONATION_CHANNEL}"
+# Doações perdidas enquanto o cliente reconectava (cabeçalho Last-Event-ID)
+MISSED_DONATIONS_QUERY = LIST_DONATIONS_RECEIVED_QUERY + """
+                    AND d.id_doacao > %s
+                ORDER BY d.id_doacao
+                LIMIT %s"""
+# Intervalo (ms) que o EventSource do navegador espera antes de reconectar
+SSE_RETRY_MS = 3000
+
+class FeedSubscription:
+    """
+    Fila de eventos de um cliente conectado ao stream. None na fila encerra o stream.
+    """
+    def __init__(self, receiver_id: int, queue_size: int):
+        self.ReceiverId = receiver_id
+        self.Closed = False
+        self._queue = asyncio.Queue(maxsize=queue_size)
+
+    def Push(self, event) -> bool:
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def End(self):
+        # Descarta o que está pendente para caber o aviso de fim
+        self.Closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def Get(self):
+        return await self._queue.get()
+
+class DonationFeed:
+    """
+    Uma conexão em LISTEN por event loop (worker), repartindo os avisos do Postgres
+    entre os receptores inscritos. A conexão é aberta na primeira inscrição e lida pelo
+    próprio event loop (add_reader), sem thread nem consulta periódica.
+    """
+    def __init__(self, helper: "DonationFeedHelper"):
+        self._helper = helper
+        self._connection = None
+        self._lock = asyncio.Lock()
+        self._subscribers: dict[int, set[FeedSubscription]] = {}
+
+    def Subscribers(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    async def Subscribe(self, receiver_id: int) -> FeedSubscription:
+        await self._EnsureListening()
+        subscription = FeedSubscription(receiver_id, self._helper.SubscriberQueueSize)
+        self._subscribers.setdefault(receiver_id, set()).add(subscription)
+        return subscription
+
+    def Unsubscribe(self, subscription: FeedSubscription):
+        subscriptions = self._subscribers.get(subscription.ReceiverId)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscribers[subscription.ReceiverId]
+
+    async def _EnsureListening(self):
+        async with self._lock:
+            if self._connection is not None and not self._connection.closed:
+                return
+            connection = await self._helper.OpenListenConnectionAsync()
+            asyncio.get_running_loop().add_reader(connection.fileno(), self._OnReadable)
+            self._connection = connection
+
+    def _OnReadable(self):
+        connection = self._connection
+        try:
+            connection.poll()
+        except Exception as e:
+            print(f"Donation feed connection lost: {e}")
+            self.Close()
+            return
+        while connection.notifies:
+            self._Dispatch(connection.notifies.pop(0).payload)
+
+    def _Dispatch(self, payload: str):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        receiver_id = event.pop("ReceiverId", None)
+        for subscription in list(self._subscribers.get(receiver_id, ())):
+            if not subscription.Push(event):
+                # Cliente lento: o stream dele termina e a reconexão recupera pelo Last-Event-ID
+                self.Unsubscribe(subscription)
+                subscription.End()
+
+    def Close(self):
+        """
+        Fecha a conexão de LISTEN e encerra todos os streams (os clientes reconectam sozinhos).
+        """
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                asyncio.get_running_loop().remove_reader(connection.fileno())
+            except Exception:
+                pass
+            try:
+                connection.close()
+            except Exception:
+                pass
+        subscribers, self._subscribers = self._subscribers, {}
+        for subscriptions in subscribers.values():
+            for subscription in subscriptions:
+                subscription.End()
+
+class DonationFeedHelper(AsyncConnectionHelper):
+    """
+    Stream (Server-Sent Events) das doações recebidas, alimentado por LISTEN/NOTIFY.
+    """
+    # Um feed por event loop, compartilhado pelo processo
+    _feeds: dict = {}
+
+    def __init__(self):
+        super().__init__()
+        self.SubscriberQueueSize = 100
+        self.HeartbeatInterval = 15.0   # segundos sem eventos até mandar um comentário (mantém proxies abertos)
+        self.MaxBackfill = 100          # doações reenviadas numa reconexão
+
+    def Feed(self) -> DonationFeed:
+        loop = asyncio.get_running_loop()
+        feed = DonationFeedHelper._feeds.get(loop)
+        if feed is None:
+            feed = DonationFeed(self)
+            DonationFeedHelper._feeds[loop] = feed
+        return feed
+
+    async def OpenListenConnectionAsync(self):
+        # Conexão própria, fora do pool: fica presa no LISTEN enquanto o worker viver
+        connection = pg.connect(database=self.Database, user=self.User, password=self.Password,
+                                host=self.Host, port=self.Port, async_=True)
+        try:
+            await wait_ready(connection)
+            cursor = connection.cursor()
+            cursor.execute(LISTEN_QUERY)
+            await wait_ready(connection)
+            cursor.close()
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def FormatEvent(self, event: dict) -> bytes:
+        if "DonationId" not in event:
+            # Resumo de um comando com muitas doações (migração 0013). Sem id: o Last-Event-ID
+            # continua sendo a última doação enviada uma a uma, e a reconexão recupera o resto
+            return b"event: donations\ndata: " + dumps(event) + b"\n\n"
+        return (f"id: {event['DonationId']}\nevent: donation\ndata: ".encode()
+                + dumps(event) + b"\n\n")
+
+    async def StreamAsync(self, receiver_id: int, last_event_id: int | None = None):
+        """
+        Inscreve o receptor e devolve o gerador do corpo SSE. A inscrição acontece antes
+        da busca das doações perdidas, então nada cai no intervalo entre as duas.
+        A recuperação pelo Last-Event-ID busca ids maiores que o último recebido: uma doação
+        de id menor confirmada depois dele (transações concorrentes) não é reenviada na reconexão.
+        Importações em massa chegam como um evento "donations" por causa (DonationCount,
+        TotalAmount, LastDonationId), em vez de um "donation" por linha.
+        """
+        try:
+            subscription = await self.Feed().Subscribe(receiver_id)
+        except pg.Error as e:
+            print(f"Error opening donation feed: {e}")
+            raise HTTPException(status_code=503, detail="Live donation feed unavailable")
+        return self._Events(subscription, last_event_id)
+
+    async def _Events(self, subscription: FeedSubscription, last_event_id: int | None):
+        feed = self.Feed()
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n".encode()
+
+            # Ids enviados pela recuperação: o mesmo aviso pode chegar também ao vivo, uma vez.
+            # Fora isso, todo aviso é repassado; os ids não chegam em ordem (o NOTIFY sai no
+            # commit, e uma transação com id menor pode confirmar depois de outra com id maior)
+            backfilled = set()
+            if last_event_id is not None:
+                rows = await self.FetchAllAsync(MISSED_DONATIONS_QUERY,
+                                                (subscription.ReceiverId, last_event_id, self.MaxBackfill))
+                for row in rows:
+                    event = DONATION_MAPPER.ToDict(row)
+                    backfilled.add(event["DonationId"])
+                    yield self.FormatEvent(event)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.Get(), self.HeartbeatInterval)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if event is None:
+                    return
+                if event.get("DonationId") in backfilled:
+                    backfilled.discard(event["DonationId"])
+                    continue
+                yield self.FormatEvent(event)
+        finally:
+            feed.Unsubscribe(subscription)
+
+    @classmethod
+    def CloseFeeds(cls):
+        loop = asyncio.get_running_loop()
+        feed = cls._feeds.pop(loop, None)
+        if feed is not None:
+            feed.Close()
+
+    @classmethod
+    def Reset(cls):
+        cls._feeds.clear()
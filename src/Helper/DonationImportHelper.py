@@ -0,0 +1,310 @@
+import argparse
+import asyncio
+import codecs
+import csv
+import io
+import json
+import math
+import sys
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+import psycopg2 as pg
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.DeadlineHelper import DeadlineHelper, check_deadline
+from src.Helper.ExecutorHelper import ExecutorHelper
+from src.Model.DonationModel import DonationModel
+from src.Model.ImportResultModel import ImportErrorModel, ImportResultModel
+
+IMPORT_FORMATS = ("csv", "ndjson")
+# Limite (exclusivo) de NUMERIC(12, 2), comparado com o valor já arredondado a 2 casas
+MAX_DONATION_AMOUNT = 10 ** 10
+CENTS = Decimal("0.01")
+
+# Tabela de passagem da sessão; some no commit/rollback
+CREATE_STAGING_TABLE_QUERY = """CREATE TEMP TABLE importacao_doacoes (
+        linha          INTEGER NOT NULL,
+        id_doador      INTEGER NOT NULL,
+        id_causa       INTEGER NOT NULL,
+        valor_doacao   NUMERIC(12, 2) NOT NULL,
+        mensagem       TEXT,
+        data_doacao    TIMESTAMP NOT NULL
+    ) ON COMMIT DROP"""
+COPY_STAGING_QUERY = """COPY importacao_doacoes (linha, id_doador, id_causa, valor_doacao, mensagem, data_doacao)
+                FROM STDIN WITH (FORMAT csv)"""
+# Tabela temporária não passa pelo autovacuum: sem estatísticas o plano do merge sai ruim
+ANALYZE_STAGING_QUERY = "ANALYZE importacao_doacoes"
+# Insere de uma vez as linhas com doador e causa válidos e devolve as recusadas
+MERGE_STAGING_QUERY = """WITH conferidas AS (
+                    SELECT s.*,
+                        d.id_usuario IS NOT NULL AS doador_ok,
+                        c.id_usuario IS NOT NULL AS causa_ok
+                    FROM importacao_doacoes s
+                        LEFT JOIN usuarios d ON d.id_usuario = s.id_doador
+                            AND d.ativo AND d.tipo_usuario = 'doador'
+                        LEFT JOIN usuarios c ON c.id_usuario = s.id_causa
+                            AND c.ativo AND c.tipo_usuario = 'receptor'
+                ), inseridas AS (
+                    INSERT INTO doacoes (id_doador, id_causa, valor_doacao, mensagem, data_doacao)
+                    SELECT id_doador, id_causa, valor_doacao, mensagem, data_doacao
+                    FROM conferidas
+                    WHERE doador_ok AND causa_ok
+                    ORDER BY linha
+                )
+                SELECT linha, doador_ok, causa_ok
+                FROM conferidas
+                WHERE NOT (doador_ok AND causa_ok)
+                ORDER BY linha"""
+
+_DONATIONS_ADAPTER = TypeAdapter(list[DonationModel])
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors())
+
+class DonationImportHelper(AsyncConnectionHelper):
+    """
+    Carga em massa de doações (eventos, parceiros): valida em lotes contra o DonationModel,
+    copia as linhas válidas com COPY FROM para uma tabela temporária e faz um único
+    INSERT ... SELECT em doacoes. Tudo numa transação; os erros voltam por linha do arquivo.
+    """
+    def __init__(self):
+        super().__init__()
+        self.BatchSize = 5000
+        self.MaxReportedErrors = 1000
+
+    # ===================== Leitura =====================
+
+    def _ReadCsv(self, source):
+        reader = csv.reader(source)
+        header = next(reader, None)
+        if header is None:
+            return
+        for values in reader:
+            record = dict(zip(header, values))
+            # Campo vazio no CSV é mensagem ausente
+            if record.get("Message") == "":
+                del record["Message"]
+            yield reader.line_num, record, None
+
+    def _ReadNdjson(self, source):
+        for line_number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "Invalid JSON: expected an object"
+                continue
+            if "Message" in record and record["Message"] is None:
+                del record["Message"]
+            yield line_number, record, None
+
+    def _StreamLines(self, chunks, loop):
+        """
+        Linhas de texto de um corpo em bytes que chega aos poucos (request.stream()), lidas
+        pela thread da carga: só um pedaço do arquivo fica em memória por vez.
+        """
+        async def next_chunk(iterator):
+            try:
+                return await iterator.__anext__()
+            except StopAsyncIteration:
+                return None
+
+        # utf-8-sig: descarta o BOM que o Excel coloca no início do CSV
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        iterator = chunks.__aiter__()
+        pending = ""
+        while True:
+            chunk = asyncio.run_coroutine_threadsafe(next_chunk(iterator), loop).result()
+            try:
+                pending += decoder.decode(chunk or b"", final=chunk is None)
+            except UnicodeDecodeError:
+                raise HTTPException(status_code=400, detail="Import file must be UTF-8")
+            # Quebra só em \n, mantendo o fim de linha, como um arquivo aberto com newline=""
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line + "\n"
+            if chunk is None:
+                break
+        if pending:
+            yield pending
+
+    def Records(self, source, import_format: str):
+        if import_format not in IMPORT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Invalid import format: {import_format}")
+        return self._ReadCsv(source) if import_format == "csv" else self._ReadNdjson(source)
+
+    # ===================== Validação =====================
+
+    def _StageRow(self, line: int, donation: DonationModel):
+        """
+        Regras que o modelo não cobre mas que fariam o COPY inteiro falhar. Retorna a linha
+        pronta para a tabela temporária, ou a mensagem de erro.
+        """
+        amount = donation.Amount
+        # O Postgres arredonda para 2 casas ao gravar (metade para longe do zero): 9999999999.999
+        # viraria 10000000000.00 e estouraria a coluna no meio do COPY
+        if not math.isfinite(amount) or not 0 < Decimal(repr(amount)).quantize(CENTS, ROUND_HALF_UP) < MAX_DONATION_AMOUNT:
+            return None, "Amount: must be greater than 0 and less than 10000000000"
+        try:
+            date = datetime.fromisoformat(donation.Date)
+        except ValueError:
+            return None, "Date: invalid ISO 8601 date"
+        # TIMESTAMP sem fuso: o Postgres descartaria o deslocamento do mesmo jeito
+        text_date = donation.Date if date.tzinfo is None else date.replace(tzinfo=None).isoformat()
+        return (line, donation.DonorId, donation.ReceiverId, amount, donation.Message, text_date), None
+
+    def ValidateBatch(self, batch: list) -> tuple[list, list]:
+        """
+        Valida um lote de (linha, registro, erro de leitura). O lote inteiro passa pelo
+        pydantic de uma vez; só quando algo falha ele é refeito linha a linha para achar o culpado.
+        """
+        rows, errors = [], []
+        lines = [line for line, _, error in batch if error is None]
+        records = [record for _, record, error in batch if error is None]
+        errors.extend((line, error) for line, _, error in batch if error is not None)
+
+        try:
+            donations = _DONATIONS_ADAPTER.validate_python(records)
+        except ValidationError:
+            donations = []
+            for line, record in zip(lines, records):
+                try:
+                    donations.append(DonationModel.model_validate(record))
+                except ValidationError as e:
+                    donations.append(None)
+                    errors.append((line, _validation_message(e)))
+
+        stage_row = self._StageRow
+        for line, donation in zip(lines, donations):
+            if donation is None:
+                continue
+            row, error = stage_row(line, donation)
+            if row is None:
+                errors.append((line, error))
+            else:
+                rows.append(row)
+
+        errors.sort()
+        return rows, errors
+
+    # ===================== Carga =====================
+
+    def _CopyBatch(self, cursor, rows: list):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor.copy_expert(COPY_STAGING_QUERY, buffer)
+
+    def _Report(self, result: ImportResultModel, line: int, error: str):
+        result.Rejected += 1
+        if len(result.Errors) < self.MaxReportedErrors:
+            result.Errors.append(ImportErrorModel(Line=line, Error=error))
+
+    def ImportDonations(self, source, import_format: str) -> ImportResultModel:
+        """
+        Importa as doações de um arquivo texto (CSV com cabeçalho ou NDJSON).
+        As linhas válidas são gravadas mesmo que outras tenham sido recusadas.
+        """
+        records = self.Records(source, import_format)
+
+        connection = self.Connection()
+        if not connection:
+            raise HTTPException(status_code=500, detail="Database connection failed")
+
+        result = ImportResultModel()
+        staged = 0
+        cursor = connection.cursor()
+        try:
+            self._ApplyDeadlineSync(connection, cursor)
+            cursor.execute(CREATE_STAGING_TABLE_QUERY)
+
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= self.BatchSize:
+                    staged += self._LoadBatch(cursor, batch, result)
+                    batch = []
+            if batch:
+                staged += self._LoadBatch(cursor, batch, result)
+
+            if staged:
+                cursor.execute(ANALYZE_STAGING_QUERY)
+                cursor.execute(MERGE_STAGING_QUERY)
+                for line, donor_ok, cause_ok in cursor.fetchall():
+                    problems = []
+                    if not donor_ok:
+                        problems.append("DonorId: not an active donor")
+                    if not cause_ok:
+                        problems.append("ReceiverId: not an active receiver")
+                    self._Report(result, line, "; ".join(problems))
+
+            connection.commit()
+            result.Inserted = result.Received - result.Rejected
+            result.Errors.sort(key=lambda error: error.Line)
+            return result
+        except HTTPException:
+            connection.rollback()
+            DeadlineHelper().Forget(connection)
+            raise
+        except pg.extensions.QueryCanceledError:
+            connection.rollback()
+            DeadlineHelper().Forget(connection)
+            raise HTTPException(status_code=504, detail="Request deadline exceeded")
+        except Exception as e:
+            connection.rollback()
+            DeadlineHelper().Forget(connection)
+            raise HTTPException(status_code=500, detail=f"Error importing donations: {e}")
+        finally:
+            cursor.close()
+            self.CloseConnection(connection)
+
+    async def ImportDonationsAsync(self, source, import_format: str) -> ImportResultModel:
+        # COPY só existe nas conexões síncronas: a carga roda no executor próprio
+        return await ExecutorHelper().RunAsync("imports", self.ImportDonations, source, import_format)
+
+    async def ImportStreamAsync(self, chunks, import_format: str) -> ImportResultModel:
+        """
+        Importa direto do corpo da requisição (async iterator de bytes), sem juntá-lo antes:
+        a thread da carga lê, valida e copia um lote de cada vez enquanto o upload chega.
+        """
+        source = self._StreamLines(chunks, asyncio.get_running_loop())
+        return await self.ImportDonationsAsync(source, import_format)
+
+    def _LoadBatch(self, cursor, batch: list, result: ImportResultModel) -> int:
+        # O prazo também vale para a parte em Python (leitura e validação)
+        check_deadline()
+        rows, errors = self.ValidateBatch(batch)
+        result.Received += len(batch)
+        for line, error in errors:
+            self._Report(result, line, error)
+        if rows:
+            self._CopyBatch(cursor, rows)
+        return len(rows)
+
+if __name__ == "__main__":
+    # Uso: python -m src.Helper.DonationImportHelper arquivo.csv [--format ndjson]
+    parser = argparse.ArgumentParser(description="Importa doações em massa (CSV ou NDJSON)")
+    parser.add_argument("path", help="arquivo de entrada ('-' para stdin)")
+    parser.add_argument("--format", dest="import_format", choices=IMPORT_FORMATS, default=None,
+                        help="padrão: deduzido pela extensão do arquivo")
+    args = parser.parse_args()
+
+    import_format = args.import_format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    try:
+        if args.path == "-":
+            import_result = DonationImportHelper().ImportDonations(sys.stdin, import_format)
+        else:
+            with open(args.path, encoding="utf-8", newline="") as source:
+                import_result = DonationImportHelper().ImportDonations(source, import_format)
+    except HTTPException as e:
+        raise SystemExit(f"Import failed: {e.detail}")
+
+    for import_error in import_result.Errors:
+        print(f"line {import_error.Line}: {import_error.Error}", file=sys.stderr)
+    print(f"{import_result.Received} received, {import_result.Inserted} inserted, {import_result.Rejected} rejected")
+    raise SystemExit(1 if import_result.Rejected else 0)
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from fastapi import HTTPException
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.PreparedStatementHelper import prepared
+
+STATS_BUCKETS = ("day", "week", "month")
+
+# Usa o ix_doacoes_causa_data (migração 0009). O date_trunc do Postgres começa a semana na segunda
+DONATION_STATS_QUERY = prepared("donation_stats", """SELECT date_trunc(%s, data_doacao) AS periodo,
+                    count(*),
+                    sum(valor_doacao)
+                FROM doacoes
+                WHERE id_causa = %s AND data_doacao >= %s AND data_doacao < %s
+                GROUP BY 1
+                ORDER BY 1""")
+
+def bucket_start(bucket: str, day: date) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+def next_bucket(bucket: str, start: date) -> date:
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+def previous_bucket(bucket: str, start: date) -> date:
+    if bucket == "week":
+        return start - timedelta(days=7)
+    if bucket == "month":
+        return (start - timedelta(days=1)).replace(day=1)
+    return start - timedelta(days=1)
+
+class DonationStatsHelper(AsyncConnectionHelper):
+    """
+    Doações por dia, semana ou mês de uma causa, agregadas no banco. Períodos já fechados
+    não mudam, então ficam num LRU em memória; a cada consulta só os períodos ainda
+    abertos (em geral o atual) voltam ao banco.
+    """
+    # (receptor, bucket, início do período) -> (quantidade, total, expira_em)
+    _closed: OrderedDict = OrderedDict()
+    _closed_lock = threading.Lock()
+
+    def __init__(self):
+        super().__init__()
+        self.DefaultBuckets = 30            # períodos devolvidos quando o cliente não manda "from"
+        self.MaxBuckets = 400
+        self.SettleTime = timedelta(hours=1)  # folga para doações gravadas com data um pouco atrasada
+        # Doações retroativas (importação, correções) num período fechado aparecem depois do TTL
+        self.CacheTtl = 3600.0
+        self.CacheSize = 50000
+
+    # ===== Cache dos períodos fechados =====
+
+    def Cached(self, receiver_id: int, bucket: str, start: date):
+        key = (receiver_id, bucket, start)
+        with DonationStatsHelper._closed_lock:
+            entry = DonationStatsHelper._closed.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                del DonationStatsHelper._closed[key]
+                return None
+            DonationStatsHelper._closed.move_to_end(key)
+            return entry[:2]
+
+    def _Remember(self, receiver_id: int, bucket: str, start: date, values: tuple):
+        key = (receiver_id, bucket, start)
+        with DonationStatsHelper._closed_lock:
+            DonationStatsHelper._closed[key] = values + (time.monotonic() + self.CacheTtl,)
+            DonationStatsHelper._closed.move_to_end(key)
+            while len(DonationStatsHelper._closed) > self.CacheSize:
+                DonationStatsHelper._closed.popitem(last=False)
+
+    def IsClosed(self, bucket: str, start: date, now: datetime) -> bool:
+        # Fechado quando o período inteiro terminou antes do início do dia de (agora - folga)
+        return next_bucket(bucket, start) <= (now - self.SettleTime).date()
+
+    # ===== Consulta =====
+
+    def Periods(self, bucket: str, start: date | None, end: date | None, today: date) -> list[date]:
+        """
+        Inícios dos períodos que cobrem [start, end]. Os períodos são sempre inteiros:
+        o primeiro começa antes de start e o último termina depois de end, se preciso.
+        """
+        end = end or today
+        if start is not None and start > end:
+            raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+        last = bucket_start(bucket, end)
+        if start is None:
+            first = last
+            for _ in range(self.DefaultBuckets - 1):
+                first = previous_bucket(bucket, first)
+        else:
+            first = bucket_start(bucket, start)
+
+        periods = []
+        current = first
+        while current <= last:
+            periods.append(current)
+            if len(periods) > self.MaxBuckets:
+                raise HTTPException(status_code=400, detail=f"Range too large: at most {self.MaxBuckets} buckets")
+            current = next_bucket(bucket, current)
+        return periods
+
+    async def GetStatsAsync(self, receiver_id: int, bucket: str, start: date | None = None,
+                            end: date | None = None) -> dict:
+        if bucket not in STATS_BUCKETS:
+            raise HTTPException(status_code=400, detail=f"Invalid bucket: {bucket}")
+
+        now = datetime.now()
+        periods = self.Periods(bucket, start, end, now.date())
+
+        values: dict[date, tuple] = {}
+        missing: list[date] = []
+        for period in periods:
+            cached = self.Cached(receiver_id, bucket, period) if self.IsClosed(bucket, period, now) else None
+            if cached is None:
+                missing.append(period)
+            else:
+                values[period] = cached
+
+        if missing:
+            # Um intervalo contínuo do primeiro ao último período faltando; em regime, só o atual
+            rows = await self.FetchAllAsync(DONATION_STATS_QUERY, (
+                bucket, receiver_id, missing[0], next_bucket(bucket, missing[-1])))
+            found = {row[0].date(): (row[1], row[2]) for row in rows}
+            for period in missing:
+                values[period] = found.get(period, (0, Decimal(0)))
+                if self.IsClosed(bucket, period, now):
+                    self._Remember(receiver_id, bucket, period, values[period])
+
+        buckets = []
+        count, total = 0, Decimal(0)
+        for period in periods:
+            period_count, period_total = values[period]
+            count += period_count
+            total += period_total
+            buckets.append({
+                "Start": period.isoformat(),
+                "Count": period_count,
+                "Total": float(period_total),
+                "Average": round(float(period_total) / period_count, 2) if period_count else None,
+            })
+
+        return {
+            "Bucket": bucket,
+            "From": periods[0].isoformat(),
+            "To": (next_bucket(bucket, periods[-1]) - timedelta(days=1)).isoformat(),
+            "Count": count,
+            "Total": float(total),
+            "Average": round(float(total) / count, 2) if count else None,
+            "AveragePerBucket": round(float(total) / len(periods), 2),
+            "Buckets": buckets,
+        }
+
+    @classmethod
+    def Reset(cls):
+        with cls._closed_lock:
+            cls._closed.clear()
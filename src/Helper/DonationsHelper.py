@@ -1,15 +1,13 @@
-from src.Helper.ConnectionHelper import ConnectionHelper
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.PreparedStatementHelper import prepared
+from src.Helper.PaginationHelper import DEFAULT_PAGE_SIZE, build_page, clamp_limit, keyset_query
+from src.Helper.RowMapperHelper import RowMapper
+from src.Model.PageModel import PageModel
 from fastapi import HTTPException
 from src.Model.DonationModel import DonationModel
 from src.Model.ListDonationModel import ListDonationModel
 
-class DonationsHelper(ConnectionHelper):
-    def list_donations_by_user(self, user_id):
-        connection = self.Connection()
-        try:
-            cursor = connection.cursor()
-
-            query = """SELECT d.id_doacao AS id,
+LIST_DONATIONS_BY_USER_QUERY = """SELECT d.id_doacao AS id,
                     u.nome AS Doador,
                     ub.nome AS Receptor,
                     d.valor_doacao AS valor,
@@ -19,6 +17,52 @@ class DonationsHelper(ConnectionHelper):
                     INNER JOIN usuarios u ON u.id_usuario = d.id_doador
                     INNER JOIN usuarios ub ON ub.id_usuario = d.id_causa 
                 WHERE u.id_usuario = %s"""
+
+LIST_DONATIONS_RECEIVED_QUERY = """SELECT d.id_doacao AS id,
+                    u.nome AS Doador,
+                    ub.nome AS Receptor,
+                    d.valor_doacao AS valor,
+                    d.mensagem,
+                    d.data_doacao
+                FROM doacoes d
+                    INNER JOIN usuarios u ON u.id_usuario = d.id_doador
+                    INNER JOIN usuarios ub ON ub.id_usuario = d.id_causa 
+                WHERE ub.id_usuario = %s"""
+
+DONATION_MAPPER = RowMapper(
+    ListDonationModel,
+    ("DonationId", "DonorName", "ReceiverName", "Amount", "Message", "Date"),
+    converters={"Amount": float, "Date": str},
+)
+
+ADD_DONATION_QUERY = "INSERT INTO doacoes (id_doador, id_causa, valor_doacao, mensagem, data_doacao) VALUES (%s, %s, %s, %s, %s)"
+
+# Lote de doações (carrinho, doação programada): no máximo isso por requisição
+MAX_DONATIONS_PER_REQUEST = 100
+ACTIVE_RECEIVERS_QUERY = """SELECT id_usuario FROM usuarios
+                WHERE id_usuario = ANY(%s) AND ativo AND tipo_usuario = 'receptor'"""
+# Um INSERT para o lote todo; o texto não muda com o tamanho, então o statement preparado
+# (e o plano) serve para qualquer lote
+ADD_DONATIONS_BATCH_QUERY = prepared("add_donations_batch", """INSERT INTO doacoes (id_doador, id_causa, valor_doacao, mensagem, data_doacao)
+                SELECT id_doador, id_causa, valor_doacao, mensagem, data_doacao
+                FROM unnest(%s::integer[], %s::integer[], %s::numeric[], %s::text[], %s::timestamp[])
+                    WITH ORDINALITY AS lote (id_doador, id_causa, valor_doacao, mensagem, data_doacao, ordem)
+                ORDER BY ordem
+                RETURNING id_doacao""")
+
+class DonationsHelper(AsyncConnectionHelper):
+    def _to_model(self, row) -> ListDonationModel:
+        return DONATION_MAPPER.ToModel(row)
+
+    def _donation_params(self, donation_info: DonationModel) -> tuple:
+        return (donation_info.DonorId, donation_info.ReceiverId, donation_info.Amount, donation_info.Message, donation_info.Date)
+
+    def list_donations_by_user(self, user_id):
+        connection = self.Connection()
+        try:
+            cursor = connection.cursor()
+
+            query = LIST_DONATIONS_BY_USER_QUERY
             
             params = (user_id,)
             
@@ -26,15 +70,7 @@ class DonationsHelper(ConnectionHelper):
             results: list[ListDonationModel] = []
 
             for row in cursor.fetchall():
-                donation = ListDonationModel(
-                    DonationId=row[0],
-                    DonorName=row[1],
-                    ReceiverName=row[2],
-                    Amount=row[3],
-                    Message=row[4],
-                    Date=str(row[5])
-                )
-                results.append(donation)
+                results.append(self._to_model(row))
             return results
 
         except HTTPException:
@@ -51,31 +87,14 @@ class DonationsHelper(ConnectionHelper):
         try:
             cursor = connection.cursor()
 
-            query = """SELECT d.id_doacao AS id,
-                    u.nome AS Doador,
-                    ub.nome AS Receptor,
-                    d.valor_doacao AS valor,
-                    d.mensagem,
-                    d.data_doacao
-                FROM doacoes d
-                    INNER JOIN usuarios u ON u.id_usuario = d.id_doador
-                    INNER JOIN usuarios ub ON ub.id_usuario = d.id_causa 
-                WHERE ub.id_usuario = %s"""
+            query = LIST_DONATIONS_RECEIVED_QUERY
             params = (receiver_id,)
             
             cursor.execute(query, params)
             results: list[ListDonationModel] = []
 
             for row in cursor.fetchall():
-                donation = ListDonationModel(
-                    DonationId=row[0],
-                    DonorName=row[1],
-                    ReceiverName=row[2],
-                    Amount=row[3],
-                    Message=row[4],
-                    Date=str(row[5])
-                )
-                results.append(donation)
+                results.append(self._to_model(row))
             return results
         
         except HTTPException:
@@ -90,8 +109,8 @@ class DonationsHelper(ConnectionHelper):
         connection = self.Connection()
 
         try:
-            query = "INSERT INTO doacoes (id_doador, id_causa, valor_doacao, mensagem, data_doacao) VALUES (%s, %s, %s, %s, %s)"
-            params = (donation_info.DonorId, donation_info.ReceiverId, donation_info.Amount, donation_info.Message, donation_info.Date)
+            query = ADD_DONATION_QUERY
+            params = self._donation_params(donation_info)
 
             cursor = connection.cursor()
             cursor.execute(query, params)
@@ -105,4 +124,58 @@ class DonationsHelper(ConnectionHelper):
             raise HTTPException(status_code=500, detail=str(e))
         finally:
             cursor.close()
-            self.CloseConnection(connection)
\ No newline at end of file
+            self.CloseConnection(connection)
+
+    async def _list_page_async(self, base_query: str, owner_id: int, ordering: str, limit: int, after: str) -> PageModel:
+        # Mais recentes primeiro; o id da doação é único, então a ordem é estável
+        limit = clamp_limit(limit)
+        query, params = keyset_query(base_query, True, ["d.id_doacao"], True, ordering, limit, after)
+        # Primeira página e páginas seguintes têm textos diferentes: cada uma vira um statement
+        rows = await self.FetchAllAsync(prepared(f"list_{ordering}", query), (owner_id,) + params)
+        return build_page(rows, limit, ordering, lambda row: (row[0],), self._to_model)
+
+    async def list_donations_by_user_async(self, user_id, limit: int = DEFAULT_PAGE_SIZE, after: str = None) -> PageModel:
+        try:
+            return await self._list_page_async(LIST_DONATIONS_BY_USER_QUERY, user_id, "donations_made", limit, after)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def list_donations_received_async(self, receiver_id, limit: int = DEFAULT_PAGE_SIZE, after: str = None) -> PageModel:
+        try:
+            return await self._list_page_async(LIST_DONATIONS_RECEIVED_QUERY, receiver_id, "donations_received", limit, after)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def add_donations_batch_async(self, donations: list[DonationModel]) -> list[int]:
+        """
+        Grava o lote inteiro com uma consulta de validação e um INSERT de várias linhas.
+        Devolve os ids na mesma ordem das doações recebidas.
+        """
+        try:
+            receiver_ids = sorted({donation.ReceiverId for donation in donations})
+            rows = await self.FetchAllAsync(ACTIVE_RECEIVERS_QUERY, (receiver_ids,))
+            invalid = sorted(set(receiver_ids) - {row[0] for row in rows})
+            if invalid:
+                raise HTTPException(status_code=400, detail=f"Invalid receiver ids: {invalid}")
+
+            params = tuple(list(column) for column in zip(*(self._donation_params(donation) for donation in donations)))
+            rows = await self.FetchAllAsync(ADD_DONATIONS_BATCH_QUERY, params)
+            # Os ids saem da sequence na ordem de inserção (ORDER BY ordem)
+            return sorted(row[0] for row in rows)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def add_donations_async(self, donation_info: DonationModel):
+        try:
+            await self.ExecuteAsync(ADD_DONATION_QUERY, self._donation_params(donation_info))
+            return {"message" : "Donation efetuated successfully"}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,132 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from fastapi import HTTPException
+
+class ExecutorSaturatedError(Exception):
+    pass
+
+class BoundedExecutor:
+    """
+    Pool de threads com fila limitada. Quando a fila enche, novas tarefas são
+    recusadas na hora em vez de se acumularem atrás das que já estão esperando.
+    """
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.Name = name
+        self.MaxWorkers = max_workers
+        self.MaxQueue = max_queue
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _run(self, func, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    def _on_done(self, future: Future):
+        # Tarefa cancelada antes de começar nunca passa por _run
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._queued >= self.MaxQueue:
+                self._rejected += 1
+                raise ExecutorSaturatedError(f"Executor '{self.Name}' queue is full ({self.MaxQueue})")
+            self._queued += 1
+
+        # Leva o contexto de quem chamou (prazo da requisição etc.) para a thread
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(context.run, self._run, func, args, kwargs)
+        except RuntimeError:
+            with self._lock:
+                self._queued -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Executa a função bloqueante numa thread do pool sem travar o event loop.
+        """
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.MaxWorkers,
+                "active": self._active,
+                "queued": self._queued,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+class ExecutorHelper:
+    # Subsistema -> (threads, tamanho máximo da fila). Cada um tem o seu pool,
+    # então uma chamada lenta ao ViaCEP ou uma listagem pesada não tomam as threads do /login.
+    # A soma das threads de banco (auth + reads + writes + exports + imports) acompanha o PoolMaxSize do ConnectionHelper,
+    # para nenhuma thread ficar parada esperando conexão.
+    PoolSizes = {
+        "auth": (2, 100),
+        "reads": (5, 200),
+        "writes": (3, 100),
+        "http": (8, 50),
+        # Exportações seguram a thread e a conexão enquanto o cliente baixa o arquivo
+        "exports": (2, 8),
+        # Importação em massa: uma carga por vez, as demais esperam na fila
+        "imports": (1, 4),
+    }
+
+    _executors: dict[str, BoundedExecutor] = {}
+    _executors_lock = threading.Lock()
+
+    def Executor(self, name: str) -> BoundedExecutor:
+        executor = ExecutorHelper._executors.get(name)
+        if executor is not None:
+            return executor
+
+        with ExecutorHelper._executors_lock:
+            executor = ExecutorHelper._executors.get(name)
+            if executor is None:
+                if name not in self.PoolSizes:
+                    raise ValueError(f"Unknown executor: {name}")
+                max_workers, max_queue = self.PoolSizes[name]
+                executor = BoundedExecutor(name, max_workers, max_queue)
+                ExecutorHelper._executors[name] = executor
+            return executor
+
+    async def RunAsync(self, name: str, func, *args, **kwargs):
+        try:
+            return await self.Executor(name).run(functools.partial(func, *args, **kwargs))
+        except ExecutorSaturatedError as e:
+            print(f"Executor saturated: {e}")
+            raise HTTPException(status_code=503, detail="Server busy, try again later")
+
+    def Stats(self) -> dict:
+        return {name: executor.stats() for name, executor in list(ExecutorHelper._executors.items())}
+
+    @classmethod
+    def ShutdownExecutors(cls):
+        with cls._executors_lock:
+            executors = list(cls._executors.values())
+            cls._executors.clear()
+        for executor in executors:
+            executor.shutdown()
@@ -1,10 +1,39 @@
-from src.Helper.ConnectionHelper import ConnectionHelper
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.PaginationHelper import DEFAULT_PAGE_SIZE, build_page, clamp_limit, keyset_query
+from src.Helper.RowMapperHelper import RowMapper
+from src.Model.PageModel import PageModel
 from src.Model.FavoriteModel import FavoriteModel
 from src.Model.AddFavoriteModel import AddFavoriteModel
 from datetime import datetime
 from fastapi import HTTPException
 
-class FavoriteHelper(ConnectionHelper):
+FIND_FAVORITE_QUERY = "SELECT id_favorito FROM favoritos WHERE id_usuario = %s AND id_causa = %s"
+INSERT_FAVORITE_QUERY = "INSERT INTO favoritos (id_usuario, id_causa, data_cadastro) VALUES (%s, %s, %s)"
+FIND_FAVORITE_BY_ID_QUERY = "SELECT id_favorito FROM favoritos WHERE id_favorito = %s"
+DELETE_FAVORITE_QUERY = "DELETE FROM favoritos WHERE id_favorito = %s"
+# Escritas em um só comando: a restrição única (id_usuario, id_causa) decide o 409 e o RETURNING o 404
+INSERT_FAVORITE_RETURNING_QUERY = INSERT_FAVORITE_QUERY + """
+                ON CONFLICT (id_usuario, id_causa) DO NOTHING
+                RETURNING id_favorito"""
+DELETE_FAVORITE_RETURNING_QUERY = DELETE_FAVORITE_QUERY + " RETURNING id_favorito"
+LIST_FAVORITES_QUERY = """SELECT 
+                        u.nome,
+                        u.descricao,
+                        u.cep,
+                        u.documento,
+                        f.id_usuario,
+                        f.id_favorito
+                    FROM favoritos f 
+                    INNER JOIN usuarios u 
+                        ON f.id_causa = u.id_usuario
+                    WHERE f.id_usuario = %s
+                    AND u.cep IS NOT NULL"""
+FAVORITE_MAPPER = RowMapper(FavoriteModel, ("CauseName", "CauseDescription", "CauseAddress", "CauseDocument"))
+
+class FavoriteHelper(AsyncConnectionHelper):
+    def _to_model(self, row) -> FavoriteModel:
+        return FAVORITE_MAPPER.ToModel(row)
+
     def add_favorite(self, fav_info: AddFavoriteModel):
         
         connection = self.Connection()
@@ -13,13 +42,13 @@ class FavoriteHelper(ConnectionHelper):
 
         try:
             cursor = connection.cursor()
-            cursor.execute("SELECT id_favorito FROM favoritos WHERE id_usuario = %s AND id_causa = %s", (fav_info.UserId, fav_info.CauseId))
+            cursor.execute(FIND_FAVORITE_QUERY, (fav_info.UserId, fav_info.CauseId))
             if cursor.fetchone():
                 raise HTTPException(status_code=409, detail="Cause already favorited")
 
             else:
                 cursor.execute(
-                    "INSERT INTO favoritos (id_usuario, id_causa, data_cadastro) VALUES (%s, %s, %s)",
+                    INSERT_FAVORITE_QUERY,
                     (fav_info.UserId, fav_info.CauseId, datetime.now())
                 )
             connection.commit()
@@ -31,7 +60,7 @@ class FavoriteHelper(ConnectionHelper):
             connection.rollback()
             raise HTTPException(status_code=500, detail=f"Error favoriting cause: {e}")
         finally:
-            connection.close()
+            self.CloseConnection(connection)
 
     def remove_favorite(self, fav_id: int):
         connection = self.Connection()
@@ -40,12 +69,12 @@ class FavoriteHelper(ConnectionHelper):
         
         try:
             cursor = connection.cursor()
-            cursor.execute("SELECT id_favorito FROM favoritos WHERE id_favorito = %s", (fav_id,))
+            cursor.execute(FIND_FAVORITE_BY_ID_QUERY, (fav_id,))
             
             if not cursor.fetchone():
                 raise HTTPException(status_code=404, detail="Favorite not found")
             
-            cursor.execute("DELETE FROM favoritos WHERE id_favorito = %s", (fav_id,))
+            cursor.execute(DELETE_FAVORITE_QUERY, (fav_id,))
             connection.commit()
             return {"message": f"Favorite with ID {fav_id} removed successfully"}
         except HTTPException:
@@ -54,7 +83,7 @@ class FavoriteHelper(ConnectionHelper):
             connection.rollback()
             raise HTTPException(status_code=500, detail=f"Error removing favorite: {e}")
         finally:
-            connection.close()
+            self.CloseConnection(connection)
 
     def list_favorites(self, user_id: int):
         connection = self.Connection()
@@ -63,29 +92,13 @@ class FavoriteHelper(ConnectionHelper):
         
         try:
             cursor = connection.cursor()
-            cursor.execute("""SELECT 
-                        u.nome,
-                        u.descricao,
-                        u.cep,
-                        u.documento,
-                        f.id_usuario
-                    FROM favoritos f 
-                    INNER JOIN usuarios u 
-                        ON f.id_causa = u.id_usuario
-                    WHERE f.id_usuario = %s
-                    AND u.cep IS NOT NULL""", (user_id,))
+            cursor.execute(LIST_FAVORITES_QUERY, (user_id,))
             
             favorites: list[FavoriteModel] = []
             rows = cursor.fetchall()
 
             for row in rows:
-                model = FavoriteModel(
-                    CauseName=row[0],
-                    CauseDescription=row[1],
-                    CauseAddress=row[2],
-                    CauseDocument=row[3])
-                
-                favorites.append(model)
+                favorites.append(self._to_model(row))
 
             return favorites
         except HTTPException:
@@ -93,5 +106,37 @@ class FavoriteHelper(ConnectionHelper):
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error listing favorites: {e}")
         finally:
-            connection.close()
-        
\ No newline at end of file
+            self.CloseConnection(connection)
+
+    async def add_favorite_async(self, fav_info: AddFavoriteModel):
+        try:
+            created = await self.FetchOneAsync(INSERT_FAVORITE_RETURNING_QUERY,
+                                               (fav_info.UserId, fav_info.CauseId, datetime.now()))
+            if not created:
+                raise HTTPException(status_code=409, detail="Cause already favorited")
+            return {"message": f"Cause with ID {fav_info.CauseId} favorited successfully"}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error favoriting cause: {e}")
+
+    async def remove_favorite_async(self, fav_id: int):
+        try:
+            if not await self.FetchOneAsync(DELETE_FAVORITE_RETURNING_QUERY, (fav_id,)):
+                raise HTTPException(status_code=404, detail="Favorite not found")
+            return {"message": f"Favorite with ID {fav_id} removed successfully"}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error removing favorite: {e}")
+
+    async def list_favorites_async(self, user_id: int, limit: int = DEFAULT_PAGE_SIZE, after: str = None) -> PageModel:
+        try:
+            limit = clamp_limit(limit)
+            query, params = keyset_query(LIST_FAVORITES_QUERY, True, ["f.id_favorito"], False, "favorites", limit, after)
+            rows = await self.FetchAllAsync(query, (user_id,) + params)
+            return build_page(rows, limit, "favorites", lambda row: (row[5],), self._to_model)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error listing favorites: {e}")
@@ -0,0 +1,165 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from fastapi import HTTPException
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.JsonResponseHelper import dumps
+from src.Helper.UnitOfWorkHelper import current_unit
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+# Reserva a chave na transação da requisição. Se outra requisição com a mesma chave
+# estiver em andamento, o INSERT espera ela terminar (índice único). Chave vencida é reaproveitada
+CLAIM_KEY_QUERY = """INSERT INTO chaves_idempotencia (id_usuario, chave, rota, hash_pedido)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (id_usuario, chave) DO UPDATE
+                    SET rota = EXCLUDED.rota, hash_pedido = EXCLUDED.hash_pedido,
+                        resposta = NULL, data_cadastro = CURRENT_TIMESTAMP
+                    WHERE chaves_idempotencia.data_cadastro < CURRENT_TIMESTAMP - %s * INTERVAL '1 second'
+                RETURNING 1"""
+STORED_RESPONSE_QUERY = """SELECT rota, hash_pedido, resposta FROM chaves_idempotencia
+                WHERE id_usuario = %s AND chave = %s"""
+SAVE_RESPONSE_QUERY = "UPDATE chaves_idempotencia SET resposta = %s WHERE id_usuario = %s AND chave = %s"
+# Limpeza das chaves vencidas, um lote por comando (o DELETE do Postgres não tem LIMIT).
+# Usa o ix_chaves_idempotencia_data (migração 0012); SKIP LOCKED pula chaves sendo reaproveitadas
+PURGE_EXPIRED_KEYS_QUERY = """DELETE FROM chaves_idempotencia
+                WHERE ctid = ANY(ARRAY(
+                    SELECT ctid FROM chaves_idempotencia
+                    WHERE data_cadastro < CURRENT_TIMESTAMP - %s * INTERVAL '1 second'
+                    ORDER BY data_cadastro
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED))"""
+
+def request_fingerprint(payload) -> str:
+    # Mesmo corpo -> mesmo hash, independente da ordem das chaves
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+class IdempotencyHelper(AsyncConnectionHelper):
+    """
+    Idempotency-Key nas rotas de criação: a primeira requisição com a chave executa a rota
+    e grava a resposta junto, na mesma transação; as repetições devolvem essa resposta sem
+    um segundo INSERT. As chaves já confirmadas ficam num LRU em memória, então a
+    repetição comum é resolvida com um acesso ao dicionário, sem ir ao banco.
+    As chaves vencidas são apagadas do banco no máximo uma vez por PurgeInterval em cada
+    processo, numa tarefa separada disparada pelas próprias requisições com chave nova.
+    """
+    # (usuário, chave) -> (rota, hash do pedido, resposta, expira_em)
+    _recent: OrderedDict = OrderedDict()
+    _recent_lock = threading.Lock()
+    # Próxima limpeza (time.monotonic) e a tarefa em andamento
+    _next_purge = 0.0
+    _purge_task = None
+
+    def __init__(self):
+        super().__init__()
+        self.KeyTtl = 24 * 3600.0   # segundos em que a chave vale
+        self.MemoryCacheSize = 10000
+        self.PurgeInterval = 300.0   # segundos entre limpezas das chaves vencidas
+        self.PurgeBatchSize = 1000   # chaves apagadas por comando
+
+    # ===== Cache em memória =====
+
+    def Cached(self, user_id: int, key: str):
+        with IdempotencyHelper._recent_lock:
+            entry = IdempotencyHelper._recent.get((user_id, key))
+            if entry is None:
+                return None
+            if entry[3] <= time.monotonic():
+                del IdempotencyHelper._recent[(user_id, key)]
+                return None
+            IdempotencyHelper._recent.move_to_end((user_id, key))
+            return entry
+
+    def _Remember(self, user_id: int, key: str, route: str, fingerprint: str, response):
+        with IdempotencyHelper._recent_lock:
+            IdempotencyHelper._recent[(user_id, key)] = (route, fingerprint, response, time.monotonic() + self.KeyTtl)
+            IdempotencyHelper._recent.move_to_end((user_id, key))
+            while len(IdempotencyHelper._recent) > self.MemoryCacheSize:
+                IdempotencyHelper._recent.popitem(last=False)
+
+    def _Replay(self, route: str, fingerprint: str, stored_route: str, stored_fingerprint: str, response):
+        if stored_route != route or stored_fingerprint != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key already used with a different request")
+        if response is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        return response
+
+    # ===== Limpeza das chaves vencidas =====
+
+    async def PurgeExpiredAsync(self) -> int:
+        """
+        Apaga as chaves vencidas em lotes curtos (cada um confirmado sozinho, sem travar
+        a tabela por muito tempo) até sobrar menos que um lote. Devolve quantas apagou.
+        """
+        purged = 0
+        while True:
+            deleted = await self.ExecuteAsync(PURGE_EXPIRED_KEYS_QUERY, (self.KeyTtl, self.PurgeBatchSize))
+            purged += deleted
+            if deleted < self.PurgeBatchSize:
+                return purged
+
+    async def _Purge(self):
+        try:
+            await self.PurgeExpiredAsync()
+        except Exception as e:
+            print(f"Error purging idempotency keys: {e}")
+
+    def _SchedulePurge(self):
+        with IdempotencyHelper._recent_lock:
+            now = time.monotonic()
+            running = IdempotencyHelper._purge_task is not None and not IdempotencyHelper._purge_task.done()
+            if running or now < IdempotencyHelper._next_purge:
+                return
+            IdempotencyHelper._next_purge = now + self.PurgeInterval
+            # Contexto vazio: fora da unidade de trabalho e do prazo da requisição que disparou
+            IdempotencyHelper._purge_task = asyncio.get_running_loop().create_task(
+                self._Purge(), context=contextvars.Context())
+
+    # ===== Execução =====
+
+    async def RunOnceAsync(self, user_id: int, route: str, key: str | None, payload, action):
+        """
+        Executa action() uma única vez por (usuário, chave). Precisa da unidade de trabalho da
+        requisição: a reserva da chave, a escrita da rota e a resposta são confirmadas juntas,
+        então uma falha no meio libera a chave para a próxima tentativa.
+        """
+        if key is None:
+            return await action()
+
+        unit = current_unit()
+        if unit is None:
+            raise RuntimeError("Idempotency keys require the request unit of work")
+
+        fingerprint = request_fingerprint(payload)
+        cached = self.Cached(user_id, key)
+        if cached is not None:
+            return self._Replay(route, fingerprint, *cached[:3])
+
+        claimed = await self.FetchOneAsync(CLAIM_KEY_QUERY, (user_id, key, route, fingerprint, self.KeyTtl))
+        if claimed is None:
+            stored = await self.FetchOneAsync(STORED_RESPONSE_QUERY, (user_id, key))
+            if stored is None:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+            response = self._Replay(route, fingerprint, *stored)
+            self._Remember(user_id, key, route, fingerprint, response)
+            return response
+
+        self._SchedulePurge()
+        response = await action()
+        await self.ExecuteAsync(SAVE_RESPONSE_QUERY, (dumps(response).decode(), user_id, key))
+        # Resposta no formato em que volta do banco (JSONB), para a repetição ser idêntica
+        stored_response = json.loads(dumps(response))
+        unit.AfterCommit(lambda: self._Remember(user_id, key, route, fingerprint, stored_response))
+        return response
+
+    @classmethod
+    def Reset(cls):
+        with cls._recent_lock:
+            cls._recent.clear()
+            cls._next_purge = 0.0
+            cls._purge_task = None
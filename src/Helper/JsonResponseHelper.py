@@ -0,0 +1,95 @@
+import json
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depende do ambiente
+    msgspec = None
+
+# Backend do JSON das respostas: "orjson", "msgspec" ou "json" (biblioteca padrão).
+# Se o pedido não estiver instalado, cai para o próximo disponível
+JSON_BACKEND_ENV = "GCA_JSON_BACKEND"
+DEFAULT_JSON_BACKEND = "orjson"
+
+def to_builtin(value):
+    """
+    Converte o que os encoders não conhecem: Decimal (mesmo critério do jsonable_encoder),
+    modelos pydantic, modelos simples do projeto (atributos no __dict__) e conjuntos.
+    Tipos já suportados pelo backend, como datetime, nem chegam aqui.
+    """
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            return None
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, "__dict__"):
+        return vars(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _dumps_orjson(content) -> bytes:
+    # OPT_NON_STR_KEYS: dicts com chave int (ex.: contagens por id) como no json padrão
+    return orjson.dumps(content, default=to_builtin, option=orjson.OPT_NON_STR_KEYS)
+
+def _dumps_msgspec(content) -> bytes:
+    return _msgspec_encoder.encode(content)
+
+def _dumps_json(content) -> bytes:
+    return json.dumps(content, default=to_builtin, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+_msgspec_encoder = msgspec.json.Encoder(enc_hook=to_builtin, decimal_format="number") if msgspec else None
+
+_BACKENDS = {
+    "orjson": _dumps_orjson if orjson else None,
+    "msgspec": _dumps_msgspec if msgspec else None,
+    "json": _dumps_json,
+}
+
+def resolve_backend(name: str = None) -> str:
+    name = (name or os.getenv(JSON_BACKEND_ENV) or DEFAULT_JSON_BACKEND).lower()
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    if _BACKENDS[name] is None:
+        # Pedido não instalado: usa o primeiro disponível
+        name = next(backend for backend in ("orjson", "msgspec", "json") if _BACKENDS[backend])
+    return name
+
+class JsonResponseHelper:
+    """
+    Escolhe o backend de JSON das respostas uma vez por processo.
+    """
+    Backend = resolve_backend()
+
+    def Dumps(self, content) -> bytes:
+        return _BACKENDS[JsonResponseHelper.Backend](content)
+
+    @classmethod
+    def UseBackend(cls, name: str):
+        cls.Backend = resolve_backend(name)
+
+def dumps(content) -> bytes:
+    return JsonResponseHelper().Dumps(content)
+
+class FastJSONResponse(JSONResponse):
+    """
+    Classe de resposta padrão do app: mesmo contrato do JSONResponse, com o
+    corpo gerado pelo backend configurado (orjson por padrão). Como default_response_class,
+    o FastAPI ainda passa o retorno da rota pelo jsonable_encoder antes; só o
+    FastJSONResponse criado na rota e o RowsResponse pulam esse passo.
+    """
+    def render(self, content) -> bytes:
+        return dumps(content)
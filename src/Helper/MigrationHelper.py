@@ -0,0 +1,209 @@
+import re
+import sys
+from pathlib import Path
+import psycopg2 as pg
+from src.Helper.ConnectionHelper import ConnectionHelper
+
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d+)_(\w+)\.sql$")
+# Chave fixa do advisory lock, para duas instâncias não migrarem ao mesmo tempo
+MIGRATION_LOCK_KEY = 7312004
+
+CREATE_MIGRATIONS_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version     INTEGER PRIMARY KEY,
+        name        VARCHAR(200) NOT NULL,
+        applied_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )"""
+APPLIED_VERSIONS_QUERY = "SELECT version FROM schema_migrations"
+REGISTER_MIGRATION_QUERY = "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)"
+
+# CREATE INDEX CONCURRENTLY que falha no meio deixa o índice INVALID, e o IF NOT EXISTS
+# pularia esse índice na próxima execução: a validade é conferida depois de cada um
+CONCURRENT_INDEX_PATTERN = re.compile(
+    r"^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.]+)", re.IGNORECASE)
+INDEX_VALID_QUERY = "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)"
+DROP_INDEX_QUERY = "DROP INDEX CONCURRENTLY IF EXISTS {}"
+DOLLAR_QUOTE_PATTERN = re.compile(r"\$[A-Za-z_]*\$")
+
+def split_statements(sql: str) -> list[str]:
+    """
+    Separa o SQL nos ";" de fim de comando, ignorando os que estão dentro de strings
+    ('...', "...", $$...$$ / $tag$...$tag$) e removendo os comentários de linha (--).
+    """
+    statements: list[str] = []
+    current: list[str] = []
+    quote = None
+    i = 0
+    while i < len(sql):
+        if quote is not None:
+            if sql.startswith(quote, i):
+                current.append(quote)
+                i += len(quote)
+                quote = None
+            else:
+                current.append(sql[i])
+                i += 1
+            continue
+
+        char = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = len(sql) if end < 0 else end
+            continue
+        if char == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += 1
+            continue
+        if char in ("'", '"'):
+            quote = char
+        elif char == "$":
+            match = DOLLAR_QUOTE_PATTERN.match(sql, i)
+            if match:
+                quote = match.group(0)
+                current.append(quote)
+                i = match.end()
+                continue
+        current.append(char)
+        i += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+class Migration:
+    def __init__(self, version: int, name: str, sql: str):
+        self.Version = version
+        self.Name = name
+        self.Sql = sql
+        self.NoTransaction = sql.lstrip().startswith(NO_TRANSACTION_MARKER)
+
+    def Statements(self) -> list[str]:
+        """
+        Separa o arquivo em comandos individuais (usado nas migrações sem transação,
+        como as de CREATE INDEX CONCURRENTLY).
+        """
+        return split_statements(self.Sql)
+
+class MigrationHelper(ConnectionHelper):
+    def __init__(self):
+        super().__init__()
+        self.MigrationsPath = Path(__file__).resolve().parent.parent / "Migrations"
+
+    def LoadMigrations(self) -> list[Migration]:
+        migrations: list[Migration] = []
+        for path in sorted(Path(self.MigrationsPath).glob("*.sql")):
+            match = MIGRATION_FILE_PATTERN.match(path.name)
+            if not match:
+                raise ValueError(f"Invalid migration file name: {path.name}")
+            migrations.append(Migration(int(match.group(1)), match.group(2), path.read_text(encoding="utf-8")))
+
+        versions = [m.Version for m in migrations]
+        if len(versions) != len(set(versions)):
+            raise ValueError("Duplicated migration version")
+        return sorted(migrations, key=lambda m: m.Version)
+
+    def _apply(self, connection, cursor, migration: Migration):
+        if migration.NoTransaction:
+            # Cada comando roda sozinho em autocommit; precisam ser idempotentes (IF NOT EXISTS)
+            connection.autocommit = True
+            try:
+                for statement in migration.Statements():
+                    index = CONCURRENT_INDEX_PATTERN.match(statement)
+                    if index:
+                        self._build_index(cursor, statement, index.group(1))
+                    else:
+                        cursor.execute(statement)
+                cursor.execute(REGISTER_MIGRATION_QUERY, (migration.Version, migration.Name))
+            finally:
+                connection.autocommit = False
+        else:
+            try:
+                cursor.execute(migration.Sql)
+                cursor.execute(REGISTER_MIGRATION_QUERY, (migration.Version, migration.Name))
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+
+    def _index_is_valid(self, cursor, name: str) -> bool | None:
+        """
+        True/False conforme pg_index.indisvalid; None se o índice não existe.
+        """
+        cursor.execute(INDEX_VALID_QUERY, (name,))
+        row = cursor.fetchone()
+        return None if row is None or row[0] is None else bool(row[0])
+
+    def _build_index(self, cursor, statement: str, name: str):
+        # Sobra inválida de uma execução anterior: remove para o CREATE construir de novo
+        if self._index_is_valid(cursor, name) is False:
+            print(f"Rebuilding invalid index {name}")
+            cursor.execute(DROP_INDEX_QUERY.format(name))
+
+        try:
+            cursor.execute(statement)
+        except Exception:
+            # Falha no meio (deadlock, duplicata num índice único) deixa o índice INVALID
+            try:
+                if self._index_is_valid(cursor, name) is False:
+                    cursor.execute(DROP_INDEX_QUERY.format(name))
+            except pg.Error:
+                pass
+            raise
+
+        valid = self._index_is_valid(cursor, name)
+        if valid is not True:
+            if valid is False:
+                cursor.execute(DROP_INDEX_QUERY.format(name))
+            raise RuntimeError(f"Index {name} was not built: CREATE INDEX CONCURRENTLY left it missing or invalid")
+
+    def Migrate(self, target: int = None) -> list[int]:
+        """
+        Aplica, em ordem, as migrações ainda não registradas em schema_migrations.
+        Retorna as versões aplicadas nesta execução.
+        """
+        migrations = self.LoadMigrations()
+
+        connection = self.Connection()
+        if not connection:
+            raise RuntimeError("Database connection failed")
+
+        applied_now: list[int] = []
+        cursor = connection.cursor()
+        try:
+            connection.autocommit = True
+            cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+            cursor.execute(CREATE_MIGRATIONS_TABLE_QUERY)
+            cursor.execute(APPLIED_VERSIONS_QUERY)
+            applied = {row[0] for row in cursor.fetchall()}
+            connection.autocommit = False
+
+            for migration in migrations:
+                if migration.Version in applied:
+                    continue
+                if target is not None and migration.Version > target:
+                    break
+                print(f"Applying migration {migration.Version:04d}_{migration.Name}")
+                self._apply(connection, cursor, migration)
+                applied_now.append(migration.Version)
+
+            return applied_now
+        finally:
+            connection.autocommit = True
+            try:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+            except pg.Error:
+                pass
+            connection.autocommit = False
+            cursor.close()
+            self.CloseConnection(connection)
+
+if __name__ == "__main__":
+    # Uso: python -m src.Helper.MigrationHelper [versão_alvo]
+    target_version = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    versions = MigrationHelper().Migrate(target_version)
+    print(f"{len(versions)} migration(s) applied")
@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from fastapi import HTTPException, Response
+from src.Model.PageModel import PageModel
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(ordering: str, values: tuple) -> str:
+    """
+    Gera um cursor opaco com a ordenação usada e a chave da última linha da página.
+    """
+    key = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    raw = json.dumps({"o": ordering, "k": key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, ordering: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        values = data["k"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+    # Um cursor só vale para a mesma ordenação em que foi gerado
+    if data.get("o") != ordering or not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+def clamp_limit(limit: int | None) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+def keyset_query(base_query: str, has_where: bool, columns: list[str], descending: bool,
+                 ordering: str, limit: int, after: str | None) -> tuple[str, tuple]:
+    """
+    Acrescenta à consulta o filtro de keyset (colunas > chave do cursor),
+    o ORDER BY estável pelas mesmas colunas e o LIMIT (uma linha a mais para saber se há próxima página).
+    """
+    query = base_query
+    params: tuple = ()
+
+    if after:
+        values = decode_cursor(after, ordering, len(columns))
+        operator = "<" if descending else ">"
+        query += " AND " if has_where else " WHERE "
+        query += f"({', '.join(columns)}) {operator} ({', '.join(['%s'] * len(columns))})"
+        params = tuple(values)
+
+    direction = "DESC" if descending else "ASC"
+    query += " ORDER BY " + ", ".join(f"{column} {direction}" for column in columns)
+    query += " LIMIT %s"
+    return query, params + (limit + 1,)
+
+def build_page(rows: list, limit: int, ordering: str, key, to_model) -> PageModel:
+    page = PageModel()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    page.Items = [to_model(row) for row in rows]
+    page.NextCursor = encode_cursor(ordering, key(rows[-1])) if has_more else None
+    return page
+
+def set_next_cursor(response: Response, page: PageModel):
+    if page.NextCursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.NextCursor
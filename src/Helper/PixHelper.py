@@ -1,11 +1,27 @@
 from src.Model.PixValidationModel import PixValidationModel
 from src.Model.PixDeleteModel import PixDeleteModel
 from src.Model.PixModel import PixModel
-from src.Helper.ConnectionHelper import ConnectionHelper
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.PreparedStatementHelper import prepared
 from fastapi import HTTPException
 import psycopg2 as pg
 
-class PixHelper(ConnectionHelper):
+VALIDATE_PIX_KEY_QUERY = prepared("validate_pix_key", """SELECT COUNT(1) FROM pix_chaves WHERE 
+            id_usuario = %s""")
+INSERT_PIX_KEY_QUERY = """INSERT INTO pix_chaves (id_usuario, chave, tipo_chave, data_cadastro)
+                VALUES (%s, %s, %s, %s)"""
+DELETE_PIX_KEY_QUERY = """DELETE FROM pix_chaves WHERE 
+                id_usuario = %s AND id_chave = %s"""
+# Uma chave por usuário, garantida pelo índice único ux_pix_chaves_usuario
+INSERT_PIX_KEY_RETURNING_QUERY = INSERT_PIX_KEY_QUERY + """
+                ON CONFLICT (id_usuario) DO NOTHING
+                RETURNING id_chave"""
+# Apaga e, no mesmo comando, diz se o usuário tinha chave (o SELECT vê a tabela de antes do DELETE).
+# Como no fluxo antigo: sem chave nenhuma é 404; com chave de outro id, nada é apagado e responde sucesso
+DELETE_PIX_KEY_RETURNING_QUERY = """WITH apagada AS (""" + DELETE_PIX_KEY_QUERY + """ RETURNING id_chave)
+                SELECT EXISTS (SELECT 1 FROM pix_chaves WHERE id_usuario = %s)"""
+
+class PixHelper(AsyncConnectionHelper):
     def validate_pix_key(self, pix: PixValidationModel) -> bool:
         conection = self.Connection()
         if not conection:
@@ -13,8 +29,7 @@ class PixHelper(ConnectionHelper):
         
         cursor = conection.cursor()
         try:
-            query = """SELECT COUNT(1) FROM pix_chaves WHERE 
-            id_usuario = %s"""
+            query = VALIDATE_PIX_KEY_QUERY
             cursor.execute(query, (str(pix.UserId),))
             result = cursor.fetchone()
             return result[0] == 0 
@@ -39,8 +54,7 @@ class PixHelper(ConnectionHelper):
             cursor = conection.cursor()
             
             try:
-                query = """INSERT INTO pix_chaves (id_usuario, chave, tipo_chave, data_cadastro)
-                VALUES (%s, %s, %s, %s)"""
+                query = INSERT_PIX_KEY_QUERY
                 cursor.execute(query, (pix.UserId, pix.PixKey, pix.KeyType, pix.CreatedAt))
                 conection.commit()
                 return "Pix key added successfully"
@@ -69,8 +83,7 @@ class PixHelper(ConnectionHelper):
             cursor = conection.cursor()
 
             try:
-                query = """DELETE FROM pix_chaves WHERE 
-                id_usuario = %s AND id_chave = %s"""
+                query = DELETE_PIX_KEY_QUERY
                 cursor.execute(query, (pix.UserId, pix.PixId))
                 conection.commit()
                 return "Pix key deleted successfully"
@@ -79,3 +92,31 @@ class PixHelper(ConnectionHelper):
             finally:
                 cursor.close()
                 self.CloseConnection(conection)
+
+    async def validate_pix_key_async(self, pix: PixValidationModel) -> bool:
+        try:
+            result = await self.FetchOneAsync(VALIDATE_PIX_KEY_QUERY, (str(pix.UserId),))
+            return result[0] == 0
+        except pg.Error as e:
+            raise HTTPException(status_code=403, detail=f"Error validating PIX key: {e}")
+
+    async def add_pix_key_async(self, pix: PixModel) -> str:
+        try:
+            created = await self.FetchOneAsync(INSERT_PIX_KEY_RETURNING_QUERY,
+                                               (pix.UserId, pix.PixKey, pix.KeyType, pix.CreatedAt))
+        except pg.Error as e:
+            raise HTTPException(status_code=500, detail=f"Error during adding pix key: {e}")
+
+        if not created:
+            raise HTTPException(status_code=409, detail="PIX key already exists")
+        return "Pix key added successfully"
+
+    async def delete_pix_key_async(self, pix: PixDeleteModel) -> str:
+        try:
+            had_key = await self.FetchOneAsync(DELETE_PIX_KEY_RETURNING_QUERY, (pix.UserId, pix.PixId, pix.UserId))
+        except pg.Error as e:
+            raise HTTPException(status_code=500, detail=f"Error during deleting pix key: {e}")
+
+        if not had_key or not had_key[0]:
+            raise HTTPException(status_code=404, detail="PIX key not found")
+        return "Pix key deleted successfully"
@@ -0,0 +1,131 @@
+import functools
+import hashlib
+import re
+import threading
+import weakref
+
+PLACEHOLDER_PATTERN = re.compile(r"%%|%s")
+
+class PreparedQuery(str):
+    """
+    Texto SQL marcado para rodar como prepared statement no servidor.
+    Continua sendo uma str, então quem não conhece o registro executa como sempre.
+    """
+    Name: str
+    ParamCount: int
+
+@functools.lru_cache(maxsize=256)
+def prepared(label: str, query: str) -> PreparedQuery:
+    """
+    Marca a consulta para ser preparada. O nome inclui um hash do texto, então
+    variações da mesma consulta (ex.: páginas com e sem cursor) viram statements diferentes.
+    """
+    statement = PreparedQuery(query)
+    statement.Name = f"{label}_{hashlib.sha1(query.encode()).hexdigest()[:8]}"
+    statement.ParamCount = query.count("%s")
+    return statement
+
+def to_positional(query: str) -> str:
+    """
+    Troca os %s do psycopg2 pelos $1, $2... do PREPARE (e %% por %).
+    """
+    counter = iter(range(1, query.count("%s") + 1))
+    return PLACEHOLDER_PATTERN.sub(lambda m: "%" if m.group(0) == "%%" else f"${next(counter)}", query)
+
+class PreparedStatementHelper:
+    """
+    Registro dos prepared statements: sabe quais já foram preparados em cada conexão
+    do pool e guarda as estatísticas de reaproveitamento.
+    """
+    # Conexão -> nomes já preparados nela. Some junto com a conexão quando o pool a descarta
+    _prepared = weakref.WeakKeyDictionary()
+    # Nome -> {"executions", "prepares", "planning_ms"}
+    _stats: dict[str, dict] = {}
+    _lock = threading.Lock()
+
+    def IsPrepared(self, connection, name: str) -> bool:
+        with PreparedStatementHelper._lock:
+            return name in PreparedStatementHelper._prepared.get(connection, ())
+
+    def MarkPrepared(self, connection, name: str):
+        with PreparedStatementHelper._lock:
+            PreparedStatementHelper._prepared.setdefault(connection, set()).add(name)
+            self._Entry(name)["prepares"] += 1
+
+    def Forget(self, connection):
+        # O servidor perdeu os statements da conexão (ex.: DISCARD ALL): prepara de novo
+        with PreparedStatementHelper._lock:
+            PreparedStatementHelper._prepared.pop(connection, None)
+
+    def PrepareSql(self, query: PreparedQuery) -> str:
+        return f"PREPARE {query.Name} AS {to_positional(query)}"
+
+    def ExecuteSql(self, query: PreparedQuery) -> str:
+        if not query.ParamCount:
+            return f"EXECUTE {query.Name}"
+        return f"EXECUTE {query.Name} ({', '.join(['%s'] * query.ParamCount)})"
+
+    def ExplainSql(self, query: PreparedQuery) -> str:
+        # Só planeja (sem ANALYZE) para medir quanto custa o planejamento da consulta
+        return f"EXPLAIN (SUMMARY true, FORMAT JSON) {query}"
+
+    def NeedsPlanningSample(self, name: str) -> bool:
+        with PreparedStatementHelper._lock:
+            return self._Entry(name)["planning_ms"] is None
+
+    def RecordPlanningSample(self, name: str, explain_row):
+        try:
+            planning_ms = float(explain_row[0][0]["Planning Time"])
+        except (TypeError, KeyError, IndexError, ValueError):
+            planning_ms = 0.0
+        with PreparedStatementHelper._lock:
+            self._Entry(name)["planning_ms"] = planning_ms
+
+    def RecordExecution(self, name: str):
+        with PreparedStatementHelper._lock:
+            self._Entry(name)["executions"] += 1
+
+    def _Entry(self, name: str) -> dict:
+        entry = PreparedStatementHelper._stats.get(name)
+        if entry is None:
+            entry = {"executions": 0, "prepares": 0, "planning_ms": None}
+            PreparedStatementHelper._stats[name] = entry
+        return entry
+
+    def Stats(self) -> dict:
+        """
+        Por statement: execuções, quantas reaproveitaram um PREPARE já feito (hits),
+        a taxa de acerto e o tempo de planejamento economizado (estimado pela amostra de EXPLAIN).
+        """
+        with PreparedStatementHelper._lock:
+            statements = {}
+            total_executions = total_hits = 0
+            total_saved = 0.0
+            for name, entry in PreparedStatementHelper._stats.items():
+                hits = max(entry["executions"] - entry["prepares"], 0)
+                saved = hits * (entry["planning_ms"] or 0.0)
+                statements[name] = {
+                    "executions": entry["executions"],
+                    "prepares": entry["prepares"],
+                    "hits": hits,
+                    "hit_rate": hits / entry["executions"] if entry["executions"] else 0.0,
+                    "planning_ms": entry["planning_ms"],
+                    "planning_ms_saved": saved,
+                }
+                total_executions += entry["executions"]
+                total_hits += hits
+                total_saved += saved
+
+            return {
+                "executions": total_executions,
+                "hits": total_hits,
+                "hit_rate": total_hits / total_executions if total_executions else 0.0,
+                "planning_ms_saved": total_saved,
+                "statements": statements,
+            }
+
+    @classmethod
+    def Reset(cls):
+        with cls._lock:
+            cls._prepared = weakref.WeakKeyDictionary()
+            cls._stats = {}
@@ -1,20 +1,35 @@
-from src.Helper.ConnectionHelper import ConnectionHelper
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.PaginationHelper import DEFAULT_PAGE_SIZE, build_page, clamp_limit, keyset_query
+from src.Helper.RowMapperHelper import RowMapper
+from src.Model.PageModel import PageModel
 from src.Model.ProductModel import ProductModel
 from src.Model.DeleteProductModel import DeleteProductModel
 from src.Model.ListProductModel import ListProductModel
 from fastapi import HTTPException
 from datetime import datetime
 
-class ProductHelper(ConnectionHelper):
-    def create_product(self, product: ProductModel):
-        
-        connection = self.Connection()
-        try:      
-            query = """
+CREATE_PRODUCT_QUERY = """
                 INSERT INTO produtos (id_causa, nome, descricao, valor, data_cadastro)
                 VALUES (%s, %s, %s, %s, %s)
                 RETURNING id_produto;
             """
+DELETE_PRODUCT_QUERY = """
+                DELETE FROM produtos 
+                WHERE id_produto = %s;
+            """
+LIST_PRODUCTS_QUERY = """SELECT id_produto, id_causa, nome, descricao, valor
+        FROM produtos"""
+PRODUCT_MAPPER = RowMapper(ListProductModel, ("ProductId", "CauseId", "ProductName", "Description", "Value"))
+
+class ProductHelper(AsyncConnectionHelper):
+    def _to_model(self, row) -> ListProductModel:
+        return PRODUCT_MAPPER.ToModel(row)
+
+    def create_product(self, product: ProductModel):
+        
+        connection = self.Connection()
+        try:      
+            query = CREATE_PRODUCT_QUERY
             
             createdAt = datetime.now()
             cursor = connection.cursor()
@@ -45,10 +60,7 @@ class ProductHelper(ConnectionHelper):
         connection = self.Connection()
         cursor = connection.cursor()
         try:    
-            query = """
-                DELETE FROM produtos 
-                WHERE id_produto = %s;
-            """
+            query = DELETE_PRODUCT_QUERY
             
             cursor.execute(query, (productId.ProductId,))
             
@@ -70,8 +82,7 @@ class ProductHelper(ConnectionHelper):
         connection = self.Connection()
         cursor = connection.cursor()
 
-        query = """SELECT id_produto, id_causa, nome, descricao, valor
-        FROM produtos"""
+        query = LIST_PRODUCTS_QUERY
 
         try:
             if UserId:
@@ -84,14 +95,7 @@ class ProductHelper(ConnectionHelper):
             rows = cursor.fetchall()
 
             for row in rows:
-                model = ListProductModel()
-                model.ProductId=row[0]
-                model.CauseId=row[1]
-                model.ProductName=row[2]
-                model.Description=row[3]
-                model.Value=row[4]
-                
-                products.append(model)
+                products.append(self._to_model(row))
             
             return products
         except HTTPException:
@@ -101,3 +105,41 @@ class ProductHelper(ConnectionHelper):
         finally:
             cursor.close()
             self.CloseConnection(connection)
+
+    async def create_product_async(self, product: ProductModel):
+        try:
+            row = await self.FetchOneAsync(CREATE_PRODUCT_QUERY, (
+                product.CauseId,
+                product.Name,
+                product.Description,
+                product.Value,
+                datetime.now()
+            ))
+            return {"message" : "Created new product", "ProductId" : row[0]}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error creating product: {e}")
+
+    async def delete_product_async(self, productId: DeleteProductModel):
+        try:
+            return await self.ExecuteAsync(DELETE_PRODUCT_QUERY, (productId.ProductId,)) > 0
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error deleting product: {e}")
+
+    async def list_products_async(self, UserId: int = None, limit: int = DEFAULT_PAGE_SIZE, after: str = None) -> PageModel:
+        try:
+            limit = clamp_limit(limit)
+            if UserId:
+                query, params = keyset_query(LIST_PRODUCTS_QUERY + " WHERE id_causa = %s", True, ["id_produto"], False, "products", limit, after)
+                params = (UserId,) + params
+            else:
+                query, params = keyset_query(LIST_PRODUCTS_QUERY, False, ["id_produto"], False, "products", limit, after)
+            rows = await self.FetchAllAsync(query, params)
+            return build_page(rows, limit, "products", lambda row: (row[0],), self._to_model)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error listing produtct: {e}")
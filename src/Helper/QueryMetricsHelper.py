@@ -0,0 +1,125 @@
+import functools
+import json
+import logging
+import re
+import threading
+import time
+from psycopg2 import extensions as pg_ext
+
+# Limites (ms) dos buckets do histograma de latência; o último pega todo o resto
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_PATTERN = re.compile(r"%s|\$\d+")
+VALUE_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+slow_query_logger = logging.getLogger("gca.slow_query")
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(query) -> str:
+    """
+    Normaliza o SQL para agrupar execuções da mesma consulta:
+    literais e parâmetros viram ?, listas de valores viram (...) e os espaços são compactados.
+    """
+    if isinstance(query, bytes):
+        query = query.decode(errors="replace")
+    text = STRING_LITERAL_PATTERN.sub("?", query)
+    text = PLACEHOLDER_PATTERN.sub("?", text)
+    text = NUMBER_LITERAL_PATTERN.sub("?", text)
+    text = VALUE_LIST_PATTERN.sub("(...)", text)
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+def redact(params):
+    """
+    Troca os valores dos parâmetros pelo tipo, para o log não expor senha, e-mail, chave PIX etc.
+    """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in params.items()}
+    return [f"<{type(value).__name__}>" for value in params]
+
+class QueryMetricsHelper:
+    """
+    Métricas por consulta (agrupadas pelo fingerprint): quantidade, tempo total/máximo,
+    linhas e histograma de latência. Consultas acima de SlowQueryThresholdMs vão para o
+    log "gca.slow_query" em JSON, com os parâmetros mascarados.
+    """
+    Enabled = True
+    SlowQueryThresholdMs = 200.0
+
+    _metrics: dict[str, dict] = {}
+    _lock = threading.Lock()
+
+    def Record(self, query, params, duration: float, rowcount: int):
+        if not QueryMetricsHelper.Enabled:
+            return
+
+        # psycopg2.sql.Composed e afins não são hasheáveis: agrupa pelo texto
+        key = fingerprint(query if isinstance(query, (str, bytes)) else str(query))
+        duration_ms = duration * 1000
+        rows = rowcount if rowcount and rowcount > 0 else 0
+
+        with QueryMetricsHelper._lock:
+            entry = QueryMetricsHelper._metrics.get(key)
+            if entry is None:
+                entry = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                         "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+                QueryMetricsHelper._metrics[key] = entry
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["rows"] += rows
+            bucket = next((i for i, limit in enumerate(LATENCY_BUCKETS_MS) if duration_ms <= limit),
+                          len(LATENCY_BUCKETS_MS))
+            entry["buckets"][bucket] += 1
+
+        if duration_ms >= QueryMetricsHelper.SlowQueryThresholdMs:
+            slow_query_logger.warning(json.dumps({
+                "event": "slow_query",
+                "fingerprint": key,
+                "duration_ms": round(duration_ms, 3),
+                "rows": rows,
+                "params": redact(params),
+            }))
+
+    def Stats(self) -> dict:
+        labels = [f"le_{limit}" for limit in LATENCY_BUCKETS_MS] + ["inf"]
+        with QueryMetricsHelper._lock:
+            return {
+                key: {
+                    "count": entry["count"],
+                    "total_ms": entry["total_ms"],
+                    "avg_ms": entry["total_ms"] / entry["count"],
+                    "max_ms": entry["max_ms"],
+                    "rows": entry["rows"],
+                    "histogram": dict(zip(labels, entry["buckets"])),
+                }
+                for key, entry in QueryMetricsHelper._metrics.items()
+            }
+
+    @classmethod
+    def Reset(cls):
+        with cls._lock:
+            cls._metrics = {}
+
+class InstrumentedCursor(pg_ext.cursor):
+    """
+    Cursor das conexões síncronas (cursor_factory do pool): mede cada execute/executemany.
+    As conexões assíncronas são medidas no AsyncConnectionHelper, depois do wait_ready.
+    """
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            QueryMetricsHelper().Record(query, vars, time.perf_counter() - start, self.rowcount)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            QueryMetricsHelper().Record(query, None, time.perf_counter() - start, self.rowcount)
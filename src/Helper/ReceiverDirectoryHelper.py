@@ -0,0 +1,158 @@
+import bisect
+import threading
+import time
+from datetime import datetime
+from src.Helper.PaginationHelper import build_page, decode_cursor
+from src.Model.PageModel import PageModel
+
+class _SortedView:
+    """
+    Receptores em ordem crescente de uma chave (ex.: (nome, id_usuario)).
+    Strings comparam por code point, como o COLLATE "C" da consulta paginada no banco.
+    A mesma lista atende a ordem crescente e a decrescente (lida de trás para frente).
+    """
+    def __init__(self, entries: list[tuple], key_size: int, starts_with_date: bool = False):
+        self.Entries = sorted(entries, key=lambda entry: entry[0])
+        self.Keys = [entry[0] for entry in self.Entries]
+        self.KeySize = key_size
+        self.StartsWithDate = starts_with_date
+
+    def cursor_key(self, values: list) -> tuple:
+        # O cursor guarda datas como texto ISO; volta para datetime para comparar com a chave
+        if self.StartsWithDate and isinstance(values[0], str):
+            values = [datetime.fromisoformat(values[0])] + values[1:]
+        return tuple(values)
+
+    def page(self, descending: bool, limit: int, after: tuple | None) -> list[tuple]:
+        if not descending:
+            start = bisect.bisect_right(self.Keys, after) if after is not None else 0
+            return self.Entries[start:start + limit + 1]
+
+        end = bisect.bisect_left(self.Keys, after) if after is not None else len(self.Entries)
+        return self.Entries[max(0, end - limit - 1):end][::-1]
+
+class ReceiverSnapshot:
+    """
+    Foto imutável do diretório de receptores ativos. Alterações geram uma nova foto,
+    então quem está lendo a atual nunca vê uma lista pela metade.
+    """
+    def __init__(self, rows: list[tuple], to_model, loaded_at: float = None):
+        self.Rows = list(rows)
+        self.LoadedAt = time.monotonic() if loaded_at is None else loaded_at
+        self._to_model = to_model
+
+        by_name, by_date, by_id = [], [], []
+        for row in self.Rows:
+            model = to_model(row)
+            by_name.append(((row[1], row[0]), model))
+            by_date.append(((row[6], row[0]), model))
+            by_id.append(((row[0],), model))
+
+        # TypeOfOrder -> (visão ordenada, decrescente)
+        name_view = _SortedView(by_name, 2)
+        date_view = _SortedView(by_date, 2, starts_with_date=True)
+        id_view = _SortedView(by_id, 1)
+        self._views = {
+            "name_asc": (name_view, False),
+            "name_desc": (name_view, True),
+            "created_at_asc": (date_view, False),
+            "created_at_desc": (date_view, True),
+            "": (id_view, False),
+        }
+
+    def page(self, ordering: str, limit: int, after: str = None) -> PageModel:
+        view, descending = self._views[ordering]
+
+        key = view.cursor_key(decode_cursor(after, ordering, view.KeySize)) if after else None
+        entries = view.page(descending, limit, key)
+        return build_page(entries, limit, ordering, lambda entry: entry[0], lambda entry: entry[1])
+
+    def with_row(self, row: tuple) -> "ReceiverSnapshot":
+        rows = [r for r in self.Rows if r[0] != row[0]]
+        rows.append(row)
+        return ReceiverSnapshot(rows, self._to_model, self.LoadedAt)
+
+    def without(self, user_id: int) -> "ReceiverSnapshot":
+        return ReceiverSnapshot([r for r in self.Rows if r[0] != user_id], self._to_model, self.LoadedAt)
+
+class ReceiverDirectoryHelper:
+    """
+    Diretório em memória dos receptores ativos, já ordenado para cada TypeOfOrder.
+    Cadastro e inativação de receptores atualizam o diretório deste processo na hora;
+    o TTL cobre alterações feitas por outros processos ou direto no banco.
+    """
+    Enabled = True
+    TimeToLive = 60.0  # segundos até recarregar do banco
+
+    _snapshot: ReceiverSnapshot | None = None
+    # Incrementada a cada alteração: uma carga iniciada antes dela é descartada
+    _generation = 0
+    _hits = 0
+    _misses = 0
+    _reloads = 0
+    _lock = threading.Lock()
+
+    def current(self) -> ReceiverSnapshot | None:
+        """
+        Retorna a foto atual se ainda estiver dentro do TTL, contando hit/miss.
+        """
+        cls = ReceiverDirectoryHelper
+        with cls._lock:
+            snapshot = cls._snapshot
+            if snapshot is not None and time.monotonic() - snapshot.LoadedAt < cls.TimeToLive:
+                cls._hits += 1
+                return snapshot
+            cls._misses += 1
+            return None
+
+    def generation(self) -> int:
+        return ReceiverDirectoryHelper._generation
+
+    def install(self, rows: list[tuple], to_model, generation: int) -> ReceiverSnapshot:
+        """
+        Guarda a foto carregada do banco, a menos que o diretório tenha mudado durante a carga.
+        """
+        snapshot = ReceiverSnapshot(rows, to_model)
+        cls = ReceiverDirectoryHelper
+        with cls._lock:
+            cls._reloads += 1
+            if cls._generation == generation:
+                cls._snapshot = snapshot
+        return snapshot
+
+    def add(self, row: tuple):
+        cls = ReceiverDirectoryHelper
+        with cls._lock:
+            cls._generation += 1
+            if cls._snapshot is not None:
+                cls._snapshot = cls._snapshot.with_row(row)
+
+    def remove(self, user_id: int):
+        cls = ReceiverDirectoryHelper
+        with cls._lock:
+            cls._generation += 1
+            if cls._snapshot is not None:
+                cls._snapshot = cls._snapshot.without(user_id)
+
+    def invalidate(self):
+        cls = ReceiverDirectoryHelper
+        with cls._lock:
+            cls._generation += 1
+            cls._snapshot = None
+
+    def stats(self) -> dict:
+        cls = ReceiverDirectoryHelper
+        with cls._lock:
+            return {
+                "hits": cls._hits,
+                "misses": cls._misses,
+                "reloads": cls._reloads,
+                "size": len(cls._snapshot.Rows) if cls._snapshot is not None else 0,
+            }
+
+    @classmethod
+    def Clear(cls):
+        with cls._lock:
+            cls._snapshot = None
+            cls._generation += 1
+            cls._hits = cls._misses = cls._reloads = 0
@@ -1,18 +1,66 @@
-from src.Helper.ConnectionHelper import ConnectionHelper
+import copy
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.PaginationHelper import DEFAULT_PAGE_SIZE, build_page, clamp_limit, keyset_query
+from src.Helper.PreparedStatementHelper import prepared
+from src.Helper.ReceiverDirectoryHelper import ReceiverDirectoryHelper
+from src.Helper.RowMapperHelper import RowMapper
+from src.Model.CauseTotalsModel import CauseTotalsModel
 from src.Model.ListReceiversModel import ListReceiversModel
 from src.Model.ListReceiversRequestModel import ListReceiversRequestModel
+from src.Model.PageModel import PageModel
 import psycopg2 as pg
 
-class ReceiversHelper(ConnectionHelper):
-    def get_receivers(self, param: str) -> list[ListReceiversModel]:
-        
-        connection = self.Connection()
+# Os totais vêm de totais_causa (mantida por trigger, migração 0008): uma linha por causa,
+# sem somar as doações a cada listagem
+RECEIVERS_BASE_QUERY = """SELECT u.id_usuario, u.nome, u.email, u.documento, u.cep, u.descricao, u.data_cadastro,
+            COALESCE(t.total_doado, 0), COALESCE(t.quantidade_doacoes, 0), t.ultima_doacao
+        FROM usuarios u
+            LEFT JOIN totais_causa t ON t.id_causa = u.id_usuario
+        WHERE u.ativo = true AND u.tipo_usuario = 'receptor'"""
 
-        cursor = connection.cursor()
+# Nome comparado byte a byte (collation "C" = ordem dos code points), a mesma ordem do sort do
+# Python no diretório em memória; assim um cursor vale nos dois caminhos. Índice na migração 0011
+RECEIVER_NAME_KEY = 'nome COLLATE "C"'
+
+# TypeOfOrder -> (colunas do keyset, ordem decrescente). O id_usuario desempata nomes/datas iguais
+RECEIVER_ORDERINGS = {
+    "name_asc": ([RECEIVER_NAME_KEY, "id_usuario"], False),
+    "name_desc": ([RECEIVER_NAME_KEY, "id_usuario"], True),
+    "created_at_asc": (["data_cadastro", "id_usuario"], False),
+    "created_at_desc": (["data_cadastro", "id_usuario"], True),
+    "": (["id_usuario"], False),
+}
+# Posição de cada coluna do keyset na linha do RECEIVERS_BASE_QUERY
+RECEIVER_COLUMN_INDEX = {"id_usuario": 0, RECEIVER_NAME_KEY: 1, "data_cadastro": 6}
+
+# Colunas do RECEIVERS_BASE_QUERY -> campos do ListReceiversModel (data_cadastro só serve ao cursor)
+RECEIVER_MAPPER = RowMapper(ListReceiversModel, ("UserId", "Name", "Email", "Document", "Address", "Description"))
+# Campos da listagem: os do RECEIVER_MAPPER mais os totais (colunas depois do data_cadastro)
+RECEIVER_TOTALS_MAPPER = RowMapper(
+    ListReceiversModel,
+    RECEIVER_MAPPER.Fields + ("TotalAmount", "DonationCount", "LastDonationAt"),
+    converters={"TotalAmount": float, "LastDonationAt": str},
+)
+
+CAUSE_TOTALS_QUERY = prepared("cause_totals", """SELECT id_causa, total_doado, quantidade_doacoes, ultima_doacao
+        FROM totais_causa
+        WHERE id_causa = %s""")
+# Totais atuais das causas de uma página servida pelo diretório em memória (que pode ter até
+# TimeToLive segundos): uma busca pela chave primária para no máximo MAX_PAGE_SIZE causas
+PAGE_TOTALS_QUERY = prepared("page_totals", """SELECT id_causa, total_doado, quantidade_doacoes, ultima_doacao
+        FROM totais_causa
+        WHERE id_causa = ANY(%s)""")
+CAUSE_TOTALS_MAPPER = RowMapper(
+    CauseTotalsModel,
+    ("CauseId", "TotalAmount", "DonationCount", "LastDonationAt"),
+    converters={"TotalAmount": float, "LastDonationAt": str},
+)
+
+VALIDATE_CAUSE_ID_QUERY = prepared("validate_cause_id", "SELECT id_usuario FROM usuarios WHERE id_usuario = %s AND tipo_usuario = 'receptor' AND ativo = true")
 
-        baseQuery = """SELECT id_usuario, nome, email, documento, cep, descricao
-        FROM usuarios
-        WHERE ativo = true AND tipo_usuario = 'receptor'"""
+class ReceiversHelper(AsyncConnectionHelper):
+    def _build_query(self, param: str) -> str:
+        baseQuery = RECEIVERS_BASE_QUERY
 
         match param:
             case "name_desc":
@@ -28,23 +76,30 @@ class ReceiversHelper(ConnectionHelper):
             case None:
                 query = baseQuery
 
-        cursor.execute(query)
-        receivers: list[ListReceiversModel] = []
-        rows = cursor.fetchall()
-
-        for row in rows:
-            model = ListReceiversModel()
-            model.UserId=row[0]
-            model.Name=row[1]
-            model.Email=row[2]
-            model.Document=row[3]
-            model.Address=row[4]
-            model.Description=row[5]
-            
-            receivers.append(model)
+        return query
+
+    def _to_model(self, row) -> ListReceiversModel:
+        # Pula o data_cadastro, que só serve ao cursor
+        return RECEIVER_TOTALS_MAPPER.ToModel(row[:6] + row[7:])
+
+    def get_receivers(self, param: str) -> list[ListReceiversModel]:
         
-        cursor.close()
-        connection.close()
+        connection = self.Connection()
+
+        cursor = connection.cursor()
+
+        query = self._build_query(param)
+
+        try:
+            cursor.execute(query)
+            receivers: list[ListReceiversModel] = []
+            rows = cursor.fetchall()
+
+            for row in rows:
+                receivers.append(self._to_model(row))
+        finally:
+            cursor.close()
+            self.CloseConnection(connection)
 
         return receivers
 
@@ -55,13 +110,71 @@ class ReceiversHelper(ConnectionHelper):
             return False
         try:
             cursor = connection.cursor()
-            cursor.execute(
-                "SELECT id_usuario FROM usuarios WHERE id_usuario = %s AND tipo_usuario = 'receptor' AND ativo = true",
-                (cause_id,)
-            )
+            cursor.execute(VALIDATE_CAUSE_ID_QUERY, (cause_id,))
             return cursor.fetchone() is not None
         except Exception:
             return False
         finally:
             cursor.close()
-            connection.close()
\ No newline at end of file
+            self.CloseConnection(connection)
+
+    async def get_receivers_async(self, param: str, limit: int = DEFAULT_PAGE_SIZE, after: str = None) -> PageModel:
+        ordering = param or ""
+        if ordering not in RECEIVER_ORDERINGS:
+            raise ValueError(f"Invalid order: {param}")
+
+        limit = clamp_limit(limit)
+        directory = ReceiverDirectoryHelper()
+        if directory.Enabled:
+            snapshot = directory.current()
+            if snapshot is None:
+                generation = directory.generation()
+                rows = await self.FetchAllAsync(RECEIVERS_BASE_QUERY)
+                snapshot = directory.install(rows, self._to_model, generation)
+            page = snapshot.page(ordering, limit, after)
+            page.Items = await self._with_current_totals(page.Items)
+            return page
+
+        columns, descending = RECEIVER_ORDERINGS[ordering]
+        query, params = keyset_query(RECEIVERS_BASE_QUERY, True, columns, descending, ordering, limit, after)
+        rows = await self.FetchAllAsync(query, params)
+
+        indexes = [RECEIVER_COLUMN_INDEX[column] for column in columns]
+        return build_page(rows, limit, ordering, lambda row: tuple(row[i] for i in indexes), self._to_model)
+
+    async def _with_current_totals(self, receivers: list) -> list:
+        """
+        Troca os totais da foto do diretório pelos de totais_causa agora, em cópias dos
+        modelos (os da foto são compartilhados entre as requisições).
+        """
+        if not receivers:
+            return receivers
+        rows = await self.FetchAllAsync(PAGE_TOTALS_QUERY, ([receiver.UserId for receiver in receivers],))
+        totals = {row[0]: CAUSE_TOTALS_MAPPER.ToModel(row) for row in rows}
+
+        current = []
+        for receiver in receivers:
+            receiver = copy.copy(receiver)
+            cause = totals.get(receiver.UserId)
+            if cause is None:
+                receiver.TotalAmount, receiver.DonationCount, receiver.LastDonationAt = 0.0, 0, None
+            else:
+                receiver.TotalAmount = cause.TotalAmount
+                receiver.DonationCount = cause.DonationCount
+                receiver.LastDonationAt = cause.LastDonationAt
+            current.append(receiver)
+        return current
+
+    async def validate_cause_id_async(self, cause_id: int) -> bool:
+        try:
+            return await self.FetchOneAsync(VALIDATE_CAUSE_ID_QUERY, (cause_id,)) is not None
+        except Exception:
+            return False
+
+    async def get_summary_async(self, receiver_id: int) -> dict:
+        """
+        Totais da causa lidos de totais_causa: custo constante, não importa quantas doações ela tenha.
+        """
+        row = await self.FetchOneAsync(CAUSE_TOTALS_QUERY, (receiver_id,))
+        # Causa que ainda não recebeu doações não tem linha na tabela
+        return CAUSE_TOTALS_MAPPER.ToDict(row or (receiver_id, 0, 0, None))
@@ -0,0 +1,120 @@
+import json
+import math
+import operator
+from datetime import date, datetime, time
+from decimal import Decimal
+from fastapi import Response
+from pydantic import BaseModel
+from src.Helper.JsonResponseHelper import JsonResponseHelper, dumps
+
+# Versão em C do json: escapa a string e já devolve entre aspas
+_encode_string = json.encoder.encode_basestring_ascii
+
+def _encode_float(value: float) -> str:
+    # NaN/Infinito não existem em JSON
+    return float.__repr__(value) if math.isfinite(value) else "null"
+
+def _encode_decimal(value: Decimal) -> str:
+    # Mesmo critério do jsonable_encoder: sem casas decimais vira inteiro, senão float
+    if not value.is_finite():
+        return "null"
+    if value.as_tuple().exponent >= 0:
+        return str(int(value))
+    return _encode_float(float(value))
+
+def _encode_temporal(value) -> str:
+    return '"' + value.isoformat() + '"'
+
+_VALUE_ENCODERS = {
+    str: _encode_string,
+    int: int.__repr__,
+    bool: lambda value: "true" if value else "false",
+    float: _encode_float,
+    Decimal: _encode_decimal,
+    type(None): lambda value: "null",
+    datetime: _encode_temporal,
+    date: _encode_temporal,
+    time: _encode_temporal,
+}
+
+def encode_value(value) -> str:
+    encoder = _VALUE_ENCODERS.get(type(value))
+    if encoder is None:
+        return json.dumps(value, default=str, ensure_ascii=True)
+    return encoder(value)
+
+class RowMapper:
+    """
+    Liga as colunas de uma consulta aos campos de um modelo de resposta.
+    Os modelos são montados sem validação (os dados já vêm tipados do banco) e a
+    serialização vai das tuplas/modelos direto para bytes JSON, sem passar pelo
+    jsonable_encoder do FastAPI. Com o backend "json" da biblioteca padrão, um template
+    por linha evita até os dicts intermediários.
+    """
+    def __init__(self, model, fields, converters: dict = None):
+        self.Model = model
+        self.Fields = tuple(fields)
+        # Conversões aplicadas antes de montar o modelo (ex.: data -> str)
+        self._converters = [(i, converters[field]) for i, field in enumerate(self.Fields)
+                            if converters and field in converters]
+        self._is_pydantic = issubclass(model, BaseModel)
+        getter = operator.attrgetter(*self.Fields)
+        self._getter = getter if len(self.Fields) > 1 else (lambda item: (getter(item),))
+        self._template = "{" + ",".join(f"{_encode_string(field)}:%s" for field in self.Fields) + "}"
+
+    def _Values(self, row) -> tuple:
+        # Consultas podem trazer colunas extras no fim (ex.: chave do cursor)
+        values = tuple(row[:len(self.Fields)])
+        if not self._converters:
+            return values
+        values = list(values)
+        for index, convert in self._converters:
+            if values[index] is not None:
+                values[index] = convert(values[index])
+        return tuple(values)
+
+    def ToModel(self, row):
+        values = dict(zip(self.Fields, self._Values(row)))
+        if self._is_pydantic:
+            return self.Model.model_construct(**values)
+        model = self.Model.__new__(self.Model)
+        model.__dict__.update(values)
+        return model
+
+    def ToRow(self, item) -> tuple:
+        if isinstance(item, tuple):
+            return self._Values(item)
+        return self._getter(item)
+
+    def EncodeItem(self, item) -> str:
+        if isinstance(item, (tuple, self.Model)):
+            return self._template % tuple(encode_value(value) for value in self.ToRow(item))
+        # Outros objetos (dicts, modelos de outro tipo) vão pelo encoder genérico das respostas
+        return dumps(item).decode()
+
+    def ToDict(self, item) -> dict:
+        return dict(zip(self.Fields, self.ToRow(item)))
+
+    def Dumps(self, items, root: str = None) -> bytes:
+        """
+        Serializa linhas do banco ou modelos já montados numa lista JSON.
+        Com root, a lista vai dentro de um objeto: {"root": [...]}.
+        """
+        if JsonResponseHelper.Backend != "json":
+            # Com orjson/msgspec, dicts montados pelo zip (em C) saem mais rápido que o template
+            records = [self.ToDict(item) if isinstance(item, (tuple, self.Model)) else item for item in items]
+            return dumps(records if root is None else {root: records})
+
+        body = "[" + ",".join(map(self.EncodeItem, items)) + "]"
+        if root is not None:
+            body = "{" + _encode_string(root) + ":" + body + "}"
+        return body.encode()
+
+class RowsResponse(Response):
+    """
+    Resposta JSON de listagens serializada pelo RowMapper.
+    """
+    media_type = "application/json"
+
+    def __init__(self, items, mapper: RowMapper, root: str = None, **kwargs):
+        super().__init__(content=mapper.Dumps(items, root), **kwargs)
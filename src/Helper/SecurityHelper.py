@@ -39,15 +39,19 @@ async def authenticate_request(request: Request, call_next):
     
     token = auth_header.split(" ", 1)[1]
 
-    # ✅ instância do TokenHelper
+    # ✅ instância do TokenHelper (verificações repetidas do mesmo token vêm do cache)
     token_helper = TokenHelper()
-    user = token_helper.get_current_user(token)
+    claims = token_helper.verify_token(token)
+    user = claims.get("sub") if claims else None
 
     if not user:
         raise HTTPException(status_code=401, detail="Token expired or invalid")
     
-    # Adiciona o usuário ao request para uso em rotas (opcional)
+    # Adiciona o usuário e as claims já verificadas ao request,
+    # para a dependency não precisar decodificar o token de novo
     request.state.user = user
+    request.state.claims = claims
+    request.state.token = token
     return await call_next(request)
 
 def add_security_middleware(app):
@@ -57,21 +61,55 @@ def add_security_middleware(app):
     app.middleware("http")(authenticate_request)
 
 
+async def is_token_revoked(claims: dict) -> bool:
+    """
+    Confere se o token foi emitido antes da última revogação do usuário (usuarios.tokens_revogados_em).
+    Consulta o banco a cada requisição (busca pela chave primária, prepared statement), então a
+    inativação vale na hora em todos os workers; só uma revogação já vista dispensa a consulta.
+    """
+    token_helper = TokenHelper()
+    if token_helper.is_revoked(claims):
+        return True
+    user_id = claims["uid"]
+    revoked_at = await SignInHelper().GetTokensRevokedAtAsync(user_id)
+    if revoked_at is None:
+        return False
+    token_helper.revoke_user(user_id, revoked_at)
+    return token_helper.is_revoked(claims)
+
+
 # ===== Dependency para usar nas rotas protegidas (Swagger sabe usar) =====
 
 async def get_current_user_from_token(
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
+    request: Request = None,
 ):
     """
     Dependency usada nas rotas protegidas.
     Faz o Swagger exibir o cadeado e valida o token.
+    Reaproveita as claims verificadas pelo middleware quando existirem.
     """
     token = credentials.credentials  # só o token, sem "Bearer "
 
-    token_helper = TokenHelper()
-    user = token_helper.get_current_user(token)
+    claims = None
+    if request is not None and getattr(request.state, "token", None) == token:
+        claims = getattr(request.state, "claims", None)
+    if claims is None:
+        claims = TokenHelper().verify_token(token)
+
+    user = claims.get("sub") if claims else None
 
     if not user:
         raise HTTPException(status_code=401, detail="Token expired or invalid")
 
-    return SignInHelper().GetKindOfUser(user)
+    # Tokens antigos não têm id/tipo nas claims: busca no banco como antes
+    if "uid" not in claims or "role" not in claims:
+        return await SignInHelper().GetKindOfUserAsync(user)
+
+    if await is_token_revoked(claims):
+        raise HTTPException(status_code=401, detail="Token expired or invalid")
+
+    res = TokenModel()
+    res.UserId = claims["uid"]
+    res.KindOfUser = claims["role"]
+    return res
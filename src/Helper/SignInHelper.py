@@ -1,11 +1,64 @@
 import psycopg2 as pg
-import re
-import requests
 from fastapi import HTTPException
-from src.Helper.ConnectionHelper import ConnectionHelper
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.CepHelper import CepHelper, normalize_cep
+from src.Helper.ExecutorHelper import ExecutorHelper
+from src.Helper.PreparedStatementHelper import prepared
+from src.Helper.ReceiverDirectoryHelper import ReceiverDirectoryHelper
 from src.Model import CadastrateModel, LoginModel, TokenModel
 
-class SignInHelper(ConnectionHelper):
+SIGN_IN_QUERY = prepared("sign_in", "SELECT COUNT(1) FROM usuarios WHERE email = %s AND senha = %s AND ativo = true")
+CADASTRATE_QUERY = """
+                INSERT INTO usuarios (nome, email, senha, tipo_usuario, documento, cep, descricao, data_cadastro, ativo)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, true)
+            """
+CADASTRATE_RETURNING_QUERY = CADASTRATE_QUERY.rstrip() + " RETURNING id_usuario, data_cadastro"
+KIND_OF_USER_QUERY = prepared("kind_of_user", "SELECT id_usuario, tipo_usuario FROM usuarios WHERE email = %s AND ativo = true")
+# Momento da última revogação de tokens do usuário (migração 0010), em epoch como o "iat" do JWT
+TOKENS_REVOKED_AT_QUERY = prepared("tokens_revoked_at", "SELECT extract(epoch FROM tokens_revogados_em) FROM usuarios WHERE id_usuario = %s")
+# Busca e inativa num só comando: devolve o tipo do usuário ativo e se a linha foi atualizada
+# (só é quando o tipo confere; ativo = true no UPDATE resolve duas inativações simultâneas)
+DEACTIVATE_USER_QUERY = """
+                WITH alvo AS (
+                    SELECT id_usuario, tipo_usuario FROM usuarios
+                    WHERE id_usuario = %s AND ativo = true
+                ), inativado AS (
+                    UPDATE usuarios u SET ativo = false, tokens_revogados_em = CURRENT_TIMESTAMP
+                    FROM alvo
+                    WHERE u.id_usuario = alvo.id_usuario
+                      AND u.ativo = true
+                      AND alvo.tipo_usuario = %s
+                    RETURNING u.id_usuario
+                )
+                SELECT alvo.tipo_usuario, EXISTS (SELECT 1 FROM inativado) FROM alvo"""
+
+class SignInHelper(AsyncConnectionHelper):
+    def __init__(self):
+        super().__init__()
+        # Login e cadastro têm threads próprias, que listagens pesadas não ocupam
+        self.ExecutorName = "auth"
+
+    def _cadastrate_params(self, params: CadastrateModel.CadastrateModel) -> tuple:
+        return (
+            params.Name,
+            params.Email,
+            params.Password,
+            params.IsReceiver,
+            params.Document,
+            params.Address,
+            params.Cause
+        )
+
+    def _to_token_model(self, result) -> TokenModel.TokenModel:
+        # Tratamento se usuário não encontrado (evita TypeError)
+        if not result:
+            raise HTTPException(status_code=404, detail="User not found in database")
+        
+        res = TokenModel.TokenModel()
+        res.UserId = result[0]
+        res.KindOfUser = result[1]
+        return res
+
     def SignIn(self, params: LoginModel.LoginModel) -> bool:
         connection = self.Connection()
         if not connection:
@@ -13,7 +66,7 @@ class SignInHelper(ConnectionHelper):
 
         try:
             cursor = connection.cursor()
-            query = "SELECT COUNT(1) FROM usuarios WHERE email = %s AND senha = %s AND ativo = true"
+            query = SIGN_IN_QUERY
             cursor.execute(query, (params.Username, params.Password))
             result = cursor.fetchone()
             cursor.close()
@@ -31,21 +84,12 @@ class SignInHelper(ConnectionHelper):
 
         try:
             cursor = connection.cursor()
-            query = """
-                INSERT INTO usuarios (nome, email, senha, tipo_usuario, documento, cep, descricao, data_cadastro, ativo)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP, true)
-            """
-            cursor.execute(query, (
-                params.Name,
-                params.Email,
-                params.Password,
-                params.IsReceiver,
-                params.Document,
-                params.Address,
-                params.Cause
-            ))
+            query = CADASTRATE_QUERY
+            cursor.execute(query, self._cadastrate_params(params))
             connection.commit()
             cursor.close()
+            if params.IsReceiver == "receptor":
+                ReceiverDirectoryHelper().invalidate()
             return True
         except pg.Error as e:
             print(f"Error during cadastrate: {e}")
@@ -59,45 +103,73 @@ class SignInHelper(ConnectionHelper):
             raise HTTPException(status_code=500, detail="Database connection failed")
         
         cursor = connection.cursor()
-        query = "SELECT id_usuario, tipo_usuario FROM usuarios WHERE email = %s AND ativo = true"
+        query = KIND_OF_USER_QUERY
         cursor.execute(query, (email,))
         result = cursor.fetchone()
         cursor.close()
         self.CloseConnection(connection)
         
-        # Tratamento se usuário não encontrado (evita TypeError)
-        if not result:
-            raise HTTPException(status_code=404, detail="User not found in database")
-        
-        res = TokenModel.TokenModel()
-        res.UserId = result[0]
-        res.KindOfUser = result[1]
-        return res
-    
-    def ValidateAddress(self, address: str) -> bool:
-        # mantém só dígitos
-        cep_digits = re.sub(r"\D", "", address)
+        return self._to_token_model(result)
 
-        # CEP precisa ter 8 dígitos
-        if len(cep_digits) != 8:
+    async def SignInAsync(self, params: LoginModel.LoginModel) -> bool:
+        try:
+            result = await self.FetchOneAsync(SIGN_IN_QUERY, (params.Username, params.Password))
+            return result[0] == 1
+        except pg.Error as e:
+            print(f"Error during sign-in: {e}")
             return False
 
-        session = requests.Session()
-        url = f"https://viacep.com.br/ws/{cep_digits}/json/"
-
+    async def CadastrateAsync(self, params: CadastrateModel.CadastrateModel) -> bool:
         try:
-            resp = session.get(url, timeout=5)
-        except requests.RequestException:
-            # erro de rede -> você pode decidir se isso deve ser True/False
+            created = await self.FetchOneAsync(CADASTRATE_RETURNING_QUERY, self._cadastrate_params(params))
+            if params.IsReceiver == "receptor":
+                # Entra direto no diretório em memória, na posição certa de cada ordenação
+                # (ainda sem doações: totais zerados, como o LEFT JOIN com totais_causa traria)
+                ReceiverDirectoryHelper().add((created[0], params.Name, params.Email, params.Document,
+                                               params.Address, params.Cause, created[1], 0, 0, None))
+            return True
+        except pg.Error as e:
+            print(f"Error during cadastrate: {e}")
             return False
 
-        if resp.status_code != 200:
-            return False
+    async def GetKindOfUserAsync(self, email: str) -> TokenModel.TokenModel:
+        result = await self.FetchOneAsync(KIND_OF_USER_QUERY, (email,))
+        return self._to_token_model(result)
 
-        data = resp.json()
+    async def DeactivateUserAsync(self, user_id: int, kind_of_user: str) -> str | None:
+        """
+        Inativa o usuário se ele estiver ativo e for do tipo informado.
+        Retorna o tipo encontrado, ou None se o usuário não existe ou já está inativo.
+        """
+        result = await self.FetchOneAsync(DEACTIVATE_USER_QUERY, (user_id, kind_of_user))
+        if not result:
+            return None
+        found_kind, deactivated = result
+        if found_kind == kind_of_user and not deactivated:
+            # Outra requisição inativou o usuário no meio tempo
+            return None
+        return found_kind
+    
+    async def GetTokensRevokedAtAsync(self, user_id: int) -> float | None:
+        result = await self.FetchOneAsync(TOKENS_REVOKED_AT_QUERY, (user_id,))
+        if not result or result[0] is None:
+            return None
+        return float(result[0])
 
-        # ViaCEP retorna {"erro": true} quando o CEP não existe
-        if data.get("erro") is True:
+    def ValidateAddress(self, address: str) -> bool:
+        cep = normalize_cep(address)
+        if cep is None:
             return False
+        # Cache em memória/banco e circuito do ViaCEP ficam no CepHelper
+        return CepHelper().IsValid(cep)
 
-        return True
\ No newline at end of file
+    async def ValidateAddressAsync(self, address: str) -> bool:
+        cep = normalize_cep(address)
+        if cep is None:
+            return False
+        # Tabela offline ou CEP já visto respondem direto da memória, sem passar por thread
+        cached = CepHelper().LocalResult(cep)
+        if cached is not None:
+            return cached
+        # A chamada ao ViaCEP é bloqueante: roda no executor de HTTP, fora do event loop
+        return await ExecutorHelper().RunAsync("http", self.ValidateAddress, address)
@@ -1,9 +1,27 @@
 import jwt
 import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 class TokenHelper:
+    # Cache de tokens já verificados: (segredo, algoritmo, sha256 do token) -> (payload, exp)
+    # Compartilhado pelo processo e limitado a VerifiedCacheSize entradas (LRU)
+    VerifiedCacheSize = 10000
+    _verified_cache: OrderedDict = OrderedDict()
+    _verified_cache_lock = threading.Lock()
+
+    # Revogações já vistas pelo processo: id_usuario -> momento (epoch) da revogação.
+    # A fonte é a coluna usuarios.tokens_revogados_em, conferida a cada requisição; aqui só
+    # ficam revogações, que não se desfazem para tokens emitidos antes delas. Um "não revogado"
+    # nunca é guardado, então a inativação feita em outro worker vale já na próxima requisição.
+    RevocationCacheSize = 10000
+    _revoked_users: OrderedDict = OrderedDict()
+    _revoked_users_lock = threading.Lock()
+
     def __init__(self):
         # Inicializa as variáveis como atributos de instância
         self.secret_key = "my_secret_key"  # Chave secreta fixa para desenvolvimento (mudar para .env depois se possivel)
@@ -15,23 +33,85 @@ class TokenHelper:
         Gera um token JWT com os dados fornecidos.
         """
         to_encode = data.copy()
-        expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=self.access_token_expire_minutes))
-        to_encode.update({"exp": expire})
+        now = datetime.now(timezone.utc)
+        expire = now + (expires_delta or timedelta(minutes=self.access_token_expire_minutes))
+        to_encode.update({"exp": expire, "iat": now})
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
         return encoded_jwt
 
+    def _cache_key(self, token: str) -> tuple:
+        return (self.secret_key, self.algorithm, hashlib.sha256(token.encode()).digest())
+
     def verify_token(self, token: str) -> Optional[dict]:
         """
         Verifica e decodifica um token JWT. Retorna os dados se válido, None se inválido.
+        Tokens já verificados são servidos do cache até o seu 'exp'.
         """
+        key = self._cache_key(token)
+        with TokenHelper._verified_cache_lock:
+            cached = TokenHelper._verified_cache.get(key)
+            if cached is not None:
+                payload, exp = cached
+                if exp > time.time():
+                    TokenHelper._verified_cache.move_to_end(key)
+                    return dict(payload)
+                del TokenHelper._verified_cache[key]
+
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return payload
         except jwt.ExpiredSignatureError:
             return None  # Token expirado
         except jwt.InvalidTokenError:
             return None  # Token inválido
 
+        # Só tokens com expiração entram no cache, para não guardar nada para sempre
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            with TokenHelper._verified_cache_lock:
+                TokenHelper._verified_cache[key] = (payload, exp)
+                while len(TokenHelper._verified_cache) > TokenHelper.VerifiedCacheSize:
+                    TokenHelper._verified_cache.popitem(last=False)
+        return dict(payload)
+
+    def revoke_user(self, user_id: int, revoked_at: float | None = None):
+        """
+        Invalida neste processo os tokens já emitidos para o usuário (ex.: conta inativada).
+        Chamar só depois do commit que gravou tokens_revogados_em no banco.
+        """
+        now = time.time()
+        revoked_at = revoked_at or now
+        # Depois do tempo de vida de um token a revogação não é mais necessária
+        horizon = now - self.access_token_expire_minutes * 60
+        with TokenHelper._revoked_users_lock:
+            # Guarda sempre a revogação mais recente do usuário
+            TokenHelper._revoked_users[user_id] = max(revoked_at, TokenHelper._revoked_users.get(user_id, revoked_at))
+            TokenHelper._revoked_users.move_to_end(user_id)
+            for uid, at in list(TokenHelper._revoked_users.items()):
+                if at < horizon:
+                    del TokenHelper._revoked_users[uid]
+            while len(TokenHelper._revoked_users) > TokenHelper.RevocationCacheSize:
+                TokenHelper._revoked_users.popitem(last=False)
+
+    def is_revoked(self, claims: dict) -> bool:
+        """
+        Confere, pelas revogações já vistas pelo processo, se o token foi emitido antes de uma delas.
+        False não garante nada: quem autentica ainda consulta o banco (SecurityHelper.is_token_revoked).
+        """
+        revoked_at = TokenHelper._revoked_users.get(claims.get("uid"))
+        if revoked_at is None:
+            return False
+        return claims.get("iat", 0) <= revoked_at
+
+    @classmethod
+    def ClearVerifiedCache(cls):
+        with cls._verified_cache_lock:
+            cls._verified_cache.clear()
+
+    @classmethod
+    def ClearRevocations(cls):
+        with cls._revoked_users_lock:
+            cls._revoked_users.clear()
+
     def get_current_user(self, token: str) -> Optional[str]:
         """
         Extrai o username do token (útil para rotas protegidas).
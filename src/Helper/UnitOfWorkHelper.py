@@ -0,0 +1,116 @@
+import asyncio
+import contextvars
+from fastapi import HTTPException
+from src.Helper.DeadlineHelper import DeadlineHelper, check_deadline
+
+# Unidade de trabalho da requisição atual; None fora das rotas que a pedem
+_current_unit: contextvars.ContextVar = contextvars.ContextVar("unit_of_work", default=None)
+
+def current_unit():
+    return _current_unit.get()
+
+class UnitOfWork:
+    """
+    Uma conexão e uma transação emprestadas a todos os helpers de uma requisição.
+    A conexão só é pega do pool na primeira consulta, então rotas que validam
+    e falham antes de ir ao banco não ocupam vaga.
+    """
+    def __init__(self):
+        self._helper = None
+        self._connection = None
+        # Uma conexão assíncrona do psycopg2 só roda uma consulta por vez
+        self._lock = asyncio.Lock()
+        self._broken = False
+        self._after_commit = []
+        self.Statements = 0
+
+    def AfterCommit(self, callback):
+        """
+        Agenda algo que só pode acontecer com a transação confirmada (ex.: guardar em cache
+        o resultado). Se a rota falhar ou o COMMIT der erro, o callback é descartado.
+        """
+        self._after_commit.append(callback)
+
+    async def _Begin(self, helper):
+        check_deadline()
+        connection = await helper.ConnectionAsync()
+        if not connection:
+            check_deadline()
+            raise HTTPException(status_code=500, detail="Database connection failed")
+        self._helper = helper
+        self._connection = connection
+        try:
+            await helper._RunOnConnectionAsync(connection, "BEGIN", None, "rowcount")
+        except BaseException:
+            self._broken = True
+            raise
+
+    async def Run(self, helper, query: str, params, fetch: str):
+        async with self._lock:
+            if self._broken:
+                raise HTTPException(status_code=500, detail="Database transaction aborted")
+            if self._connection is None:
+                await self._Begin(helper)
+            try:
+                result = await helper._RunOnConnectionAsync(self._connection, query, params, fetch)
+            except asyncio.CancelledError:
+                # A consulta foi cancelada no meio: a conexão não volta para o pool
+                self._broken = True
+                raise
+            self.Statements += 1
+            return result
+
+    async def Commit(self):
+        if self._broken:
+            return
+        if self._connection is not None:
+            async with self._lock:
+                await self._helper._RunOnConnectionAsync(self._connection, "COMMIT", None, "rowcount")
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error running after-commit callback: {e}")
+
+    async def Rollback(self):
+        if self._connection is None or self._broken:
+            return
+        # O ROLLBACK desfaz também um SET statement_timeout feito dentro da transação
+        DeadlineHelper().Forget(self._connection)
+        try:
+            async with self._lock:
+                await self._helper._RunOnConnectionAsync(self._connection, "ROLLBACK", None, "rowcount")
+        except Exception as e:
+            print(f"Error rolling back transaction: {e}")
+            self._broken = True
+
+    async def Close(self):
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        await self._helper.CloseConnectionAsync(connection, discard=self._broken)
+
+async def unit_of_work():
+    """
+    Dependency para as rotas de escrita: tudo que os helpers executarem na requisição
+    roda na mesma conexão e transação, confirmada ao fim da rota ou desfeita se ela falhar.
+    Use com Depends(unit_of_work, scope="function") para o COMMIT acontecer antes da resposta.
+    """
+    unit = UnitOfWork()
+    token = _current_unit.set(unit)
+    try:
+        try:
+            yield unit
+        except BaseException:
+            await unit.Rollback()
+            raise
+        try:
+            await unit.Commit()
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error committing transaction: {e}")
+    finally:
+        _current_unit.reset(token)
+        await unit.Close()
@@ -0,0 +1,47 @@
+-- Tabelas base usadas pelos helpers
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id_usuario     SERIAL PRIMARY KEY,
+    nome           VARCHAR(150) NOT NULL,
+    email          VARCHAR(150) NOT NULL UNIQUE,
+    senha          VARCHAR(255) NOT NULL,
+    tipo_usuario   VARCHAR(20)  NOT NULL CHECK (tipo_usuario IN ('doador', 'receptor', 'admin')),
+    documento      VARCHAR(20),
+    cep            VARCHAR(9),
+    descricao      TEXT,
+    data_cadastro  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ativo          BOOLEAN   NOT NULL DEFAULT true
+);
+
+CREATE TABLE IF NOT EXISTS doacoes (
+    id_doacao      SERIAL PRIMARY KEY,
+    id_doador      INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    id_causa       INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    valor_doacao   NUMERIC(12, 2) NOT NULL,
+    mensagem       TEXT,
+    data_doacao    TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS favoritos (
+    id_favorito    SERIAL PRIMARY KEY,
+    id_usuario     INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    id_causa       INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    data_cadastro  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS produtos (
+    id_produto     SERIAL PRIMARY KEY,
+    id_causa       INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    nome           VARCHAR(150) NOT NULL,
+    descricao      TEXT,
+    valor          NUMERIC(12, 2) NOT NULL,
+    data_cadastro  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS pix_chaves (
+    id_chave       SERIAL PRIMARY KEY,
+    id_usuario     INTEGER NOT NULL REFERENCES usuarios (id_usuario),
+    chave          VARCHAR(140) NOT NULL,
+    tipo_chave     VARCHAR(20)  NOT NULL,
+    data_cadastro  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
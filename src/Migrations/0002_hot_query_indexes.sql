@@ -0,0 +1,36 @@
+-- migrate:no-transaction
+-- Índices das consultas mais frequentes dos helpers.
+-- CONCURRENTLY não bloqueia escrita na tabela, mas não pode rodar dentro de transação.
+
+-- SignInHelper.SignIn / GetKindOfUser: email = ? AND senha = ? AND ativo
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuarios_login
+    ON usuarios (email) INCLUDE (senha, id_usuario, tipo_usuario)
+    WHERE ativo = true;
+
+-- ReceiversHelper.get_receivers: receptores ativos ordenados por nome ou data de cadastro
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuarios_receptores_nome
+    ON usuarios (nome, id_usuario)
+    WHERE ativo = true AND tipo_usuario = 'receptor';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuarios_receptores_data
+    ON usuarios (data_cadastro, id_usuario)
+    WHERE ativo = true AND tipo_usuario = 'receptor';
+
+-- DonationsHelper.list_donations_by_user / list_donations_received
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_doacoes_doador
+    ON doacoes (id_doador);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_doacoes_causa
+    ON doacoes (id_causa);
+
+-- FavoriteHelper: id_usuario = ? AND id_causa = ?, e listagem por id_usuario
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_favoritos_usuario_causa
+    ON favoritos (id_usuario, id_causa);
+
+-- ProductHelper.list_products por causa
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_produtos_causa
+    ON produtos (id_causa);
+
+-- PixHelper.validate_pix_key / delete_pix_key
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pix_chaves_usuario
+    ON pix_chaves (id_usuario);
@@ -0,0 +1,32 @@
+-- migrate:no-transaction
+-- Índices para a paginação por keyset: filtro do dono + coluna de ordenação,
+-- para cada página ser uma busca no índice em vez de ordenar o conjunto inteiro.
+
+-- DonationsHelper.list_donations_by_user / list_donations_received (id_doacao DESC)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_doacoes_doador_id
+    ON doacoes (id_doador, id_doacao);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_doacoes_causa_id
+    ON doacoes (id_causa, id_doacao);
+
+-- Os índices de uma coluna da 0002 ficam redundantes (são prefixo dos de cima) e só
+-- custariam escrita a mais em cada INSERT de doação
+DROP INDEX CONCURRENTLY IF EXISTS ix_doacoes_doador;
+
+DROP INDEX CONCURRENTLY IF EXISTS ix_doacoes_causa;
+
+-- FavoriteHelper.list_favorites (id_favorito)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_favoritos_usuario_id
+    ON favoritos (id_usuario, id_favorito);
+
+-- ProductHelper.list_products por causa (id_produto)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_produtos_causa_id
+    ON produtos (id_causa, id_produto);
+
+-- Redundante com o de cima
+DROP INDEX CONCURRENTLY IF EXISTS ix_produtos_causa;
+
+-- Listagem de receptores sem ordenação explícita (id_usuario)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuarios_receptores_id
+    ON usuarios (id_usuario)
+    WHERE ativo = true AND tipo_usuario = 'receptor';
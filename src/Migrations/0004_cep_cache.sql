@@ -0,0 +1,7 @@
+-- Cache persistente das consultas ao ViaCEP (CepHelper), compartilhado entre processos.
+-- Guarda também os CEPs inexistentes, com validade menor.
+CREATE TABLE IF NOT EXISTS cep_cache (
+    cep         CHAR(8) PRIMARY KEY,
+    valido      BOOLEAN NOT NULL,
+    expira_em   TIMESTAMP NOT NULL
+);
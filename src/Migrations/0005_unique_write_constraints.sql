@@ -0,0 +1,55 @@
+-- migrate:no-transaction
+-- Restrições únicas que sustentam as escritas em um só comando (INSERT ... ON CONFLICT).
+-- Os índices são criados com CONCURRENTLY. Dados de usuário não são apagados aqui:
+-- se houver duplicatas antigas, a migração para com a lista delas, para serem resolvidas
+-- à mão (e a 0005 roda de novo depois).
+
+-- FavoriteHelper.add_favorite_async: um favorito por (usuário, causa)
+DO $$
+DECLARE
+    duplicadas TEXT;
+BEGIN
+    SELECT string_agg(format('(id_usuario %s, id_causa %s: ids %s)', id_usuario, id_causa, ids), ', ')
+    INTO duplicadas
+    FROM (SELECT id_usuario, id_causa, string_agg(id_favorito::text, '/' ORDER BY id_favorito) AS ids
+          FROM favoritos
+          GROUP BY id_usuario, id_causa
+          HAVING count(*) > 1
+          ORDER BY id_usuario, id_causa
+          LIMIT 100) d;
+    IF duplicadas IS NOT NULL THEN
+        RAISE EXCEPTION 'favoritos has duplicate (id_usuario, id_causa) pairs; resolve them before migration 0005: %', duplicadas;
+    END IF;
+END
+$$;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_favoritos_usuario_causa
+    ON favoritos (id_usuario, id_causa);
+
+-- O índice comum da 0002 nas mesmas colunas passa a ser redundante
+DROP INDEX CONCURRENTLY IF EXISTS ix_favoritos_usuario_causa;
+
+-- PixHelper.add_pix_key_async: uma chave PIX por usuário
+DO $$
+DECLARE
+    duplicadas TEXT;
+BEGIN
+    SELECT string_agg(format('(id_usuario %s: ids %s)', id_usuario, ids), ', ')
+    INTO duplicadas
+    FROM (SELECT id_usuario, string_agg(id_chave::text, '/' ORDER BY id_chave) AS ids
+          FROM pix_chaves
+          GROUP BY id_usuario
+          HAVING count(*) > 1
+          ORDER BY id_usuario
+          LIMIT 100) d;
+    IF duplicadas IS NOT NULL THEN
+        RAISE EXCEPTION 'pix_chaves has more than one key per id_usuario; resolve them before migration 0005: %', duplicadas;
+    END IF;
+END
+$$;
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_pix_chaves_usuario
+    ON pix_chaves (id_usuario);
+
+-- Idem para o ix_pix_chaves_usuario da 0002
+DROP INDEX CONCURRENTLY IF EXISTS ix_pix_chaves_usuario;
@@ -0,0 +1,12 @@
+-- Chaves de idempotência das rotas de criação de doação (IdempotencyHelper).
+-- A chave é única por usuário: a primeira requisição a inserir a linha executa a rota,
+-- as repetições leem a resposta guardada aqui.
+CREATE TABLE IF NOT EXISTS chaves_idempotencia (
+    id_usuario     INTEGER      NOT NULL REFERENCES usuarios (id_usuario),
+    chave          VARCHAR(255) NOT NULL,
+    rota           VARCHAR(100) NOT NULL,
+    hash_pedido    CHAR(64)     NOT NULL,
+    resposta       JSONB,
+    data_cadastro  TIMESTAMP    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id_usuario, chave)
+);
@@ -0,0 +1,29 @@
+-- Avisa os workers (LISTEN doacoes_novas) a cada doação gravada, para o
+-- /receiver/donations/stream empurrar o evento sem ninguém consultar a tabela.
+-- Trigger por comando com tabela de transição: um INSERT de várias linhas
+-- (lote, importação) busca os nomes com um único join.
+CREATE OR REPLACE FUNCTION notificar_doacoes() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('doacoes_novas', json_build_object(
+            'DonationId', n.id_doacao,
+            'ReceiverId', n.id_causa,
+            'DonorName', u.nome,
+            'ReceiverName', ub.nome,
+            'Amount', n.valor_doacao,
+            -- o payload do NOTIFY tem limite de 8000 bytes
+            'Message', left(n.mensagem, 1000),
+            'Date', n.data_doacao::text
+        )::text)
+    FROM novas n
+        INNER JOIN usuarios u ON u.id_usuario = n.id_doador
+        INNER JOIN usuarios ub ON ub.id_usuario = n.id_causa
+    ORDER BY n.id_doacao;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tg_doacoes_notificar ON doacoes;
+CREATE TRIGGER tg_doacoes_notificar
+    AFTER INSERT ON doacoes
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION notificar_doacoes();
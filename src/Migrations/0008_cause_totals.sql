@@ -0,0 +1,83 @@
+-- Totais por causa (soma, quantidade e data da última doação) mantidos pelo próprio
+-- banco, para o /receiver/summary e o list_receivers lerem uma linha em vez de somar
+-- todas as doações da causa.
+CREATE TABLE IF NOT EXISTS totais_causa (
+    id_causa            INTEGER PRIMARY KEY REFERENCES usuarios (id_usuario),
+    total_doado         NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    quantidade_doacoes  BIGINT NOT NULL DEFAULT 0,
+    ultima_doacao       TIMESTAMP
+);
+
+-- Inserção: trigger por comando com tabela de transição. Um INSERT de várias linhas
+-- (lote, buffer, importação) vira um único upsert agregado por causa. O ORDER BY trava
+-- as linhas de totais sempre na mesma ordem, evitando deadlock entre lotes simultâneos.
+CREATE OR REPLACE FUNCTION somar_totais_causa() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO totais_causa AS t (id_causa, total_doado, quantidade_doacoes, ultima_doacao)
+    SELECT n.id_causa, sum(n.valor_doacao), count(*), max(n.data_doacao)
+    FROM novas n
+    GROUP BY n.id_causa
+    ORDER BY n.id_causa
+    ON CONFLICT (id_causa) DO UPDATE SET
+        total_doado = t.total_doado + EXCLUDED.total_doado,
+        quantidade_doacoes = t.quantidade_doacoes + EXCLUDED.quantidade_doacoes,
+        ultima_doacao = GREATEST(t.ultima_doacao, EXCLUDED.ultima_doacao);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Alteração e exclusão (correções feitas direto no banco): a data da última doação não
+-- dá para descontar, então as causas afetadas são recalculadas a partir das doações.
+CREATE OR REPLACE FUNCTION recalcular_totais_causas(causas INTEGER[]) RETURNS void AS $$
+    INSERT INTO totais_causa AS t (id_causa, total_doado, quantidade_doacoes, ultima_doacao)
+    SELECT c.id_causa, coalesce(sum(d.valor_doacao), 0), count(d.id_doacao), max(d.data_doacao)
+    FROM unnest(causas) AS c (id_causa)
+        LEFT JOIN doacoes d ON d.id_causa = c.id_causa
+    GROUP BY c.id_causa
+    ORDER BY c.id_causa
+    ON CONFLICT (id_causa) DO UPDATE SET
+        total_doado = EXCLUDED.total_doado,
+        quantidade_doacoes = EXCLUDED.quantidade_doacoes,
+        ultima_doacao = EXCLUDED.ultima_doacao;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION recalcular_totais_causa() RETURNS trigger AS $$
+BEGIN
+    -- A tabela "novas" só existe no UPDATE
+    IF TG_OP = 'UPDATE' THEN
+        PERFORM recalcular_totais_causas(ARRAY(SELECT id_causa FROM antigas UNION SELECT id_causa FROM novas));
+    ELSE
+        PERFORM recalcular_totais_causas(ARRAY(SELECT DISTINCT id_causa FROM antigas));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tg_doacoes_somar_totais ON doacoes;
+CREATE TRIGGER tg_doacoes_somar_totais
+    AFTER INSERT ON doacoes
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION somar_totais_causa();
+
+DROP TRIGGER IF EXISTS tg_doacoes_recalcular_totais_alteracao ON doacoes;
+CREATE TRIGGER tg_doacoes_recalcular_totais_alteracao
+    AFTER UPDATE ON doacoes
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION recalcular_totais_causa();
+
+DROP TRIGGER IF EXISTS tg_doacoes_recalcular_totais_exclusao ON doacoes;
+CREATE TRIGGER tg_doacoes_recalcular_totais_exclusao
+    AFTER DELETE ON doacoes
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION recalcular_totais_causa();
+
+-- Carga inicial. Roda na mesma transação que criou os triggers: o CREATE TRIGGER trava
+-- doacoes contra escrita até o commit, então nenhuma doação fica de fora nem conta duas vezes.
+INSERT INTO totais_causa (id_causa, total_doado, quantidade_doacoes, ultima_doacao)
+SELECT id_causa, sum(valor_doacao), count(*), max(data_doacao)
+FROM doacoes
+GROUP BY id_causa
+ON CONFLICT (id_causa) DO UPDATE SET
+    total_doado = EXCLUDED.total_doado,
+    quantidade_doacoes = EXCLUDED.quantidade_doacoes,
+    ultima_doacao = EXCLUDED.ultima_doacao;
@@ -0,0 +1,5 @@
+-- migrate:no-transaction
+-- DonationStatsHelper: doações de uma causa num intervalo de datas, agrupadas por dia/semana/mês.
+-- O valor no INCLUDE deixa a soma sair só do índice (index-only scan), sem ler a tabela.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_doacoes_causa_data
+    ON doacoes (id_causa, data_doacao) INCLUDE (valor_doacao);
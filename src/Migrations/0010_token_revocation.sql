@@ -0,0 +1,3 @@
+-- Revogação de tokens guardada no banco: vale para todos os workers e sobrevive a reinícios.
+-- Tokens com "iat" até esse momento são recusados (SecurityHelper.get_current_user_from_token).
+ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS tokens_revogados_em TIMESTAMPTZ;
@@ -0,0 +1,8 @@
+-- migrate:no-transaction
+-- list_receivers ordena por nome COLLATE "C" (mesma ordem do diretório em memória).
+-- O índice precisa da mesma collation para servir o ORDER BY e o filtro do keyset.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_usuarios_receptores_nome_c
+    ON usuarios ((nome COLLATE "C"), id_usuario)
+    WHERE ativo = true AND tipo_usuario = 'receptor';
+
+DROP INDEX CONCURRENTLY IF EXISTS ix_usuarios_receptores_nome;
@@ -0,0 +1,5 @@
+-- migrate:no-transaction
+-- IdempotencyHelper apaga as chaves vencidas em lotes (data_cadastro mais antiga primeiro);
+-- sem o índice, cada lote leria a tabela inteira.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chaves_idempotencia_data
+    ON chaves_idempotencia (data_cadastro);
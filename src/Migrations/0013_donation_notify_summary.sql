@@ -0,0 +1,37 @@
+-- Um comando com muitas doações (importação em massa) não manda mais um NOTIFY por linha:
+-- acima de 1000 linhas sai um resumo por causa (quantidade, total e maior id). O limite fica
+-- bem acima dos lotes do dia a dia (carrinho até 100, DonationBufferHelper até 200). Quem está no
+-- /receiver/donations/stream recebe o resumo e busca a lista se quiser; a reconexão com
+-- Last-Event-ID continua recuperando as doações uma a uma.
+CREATE OR REPLACE FUNCTION notificar_doacoes() RETURNS trigger AS $$
+BEGIN
+    IF (SELECT count(*) FROM novas) > 1000 THEN
+        PERFORM pg_notify('doacoes_novas', json_build_object(
+                'ReceiverId', n.id_causa,
+                'DonationCount', count(*),
+                'TotalAmount', sum(n.valor_doacao),
+                'LastDonationId', max(n.id_doacao)
+            )::text)
+        FROM novas n
+        GROUP BY n.id_causa
+        ORDER BY n.id_causa;
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('doacoes_novas', json_build_object(
+            'DonationId', n.id_doacao,
+            'ReceiverId', n.id_causa,
+            'DonorName', u.nome,
+            'ReceiverName', ub.nome,
+            'Amount', n.valor_doacao,
+            -- o payload do NOTIFY tem limite de 8000 bytes
+            'Message', left(n.mensagem, 1000),
+            'Date', n.data_doacao::text
+        )::text)
+    FROM novas n
+        INNER JOIN usuarios u ON u.id_usuario = n.id_doador
+        INNER JOIN usuarios ub ON ub.id_usuario = n.id_causa
+    ORDER BY n.id_doacao;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,5 @@
+class CauseTotalsModel:
+    CauseId: int
+    TotalAmount: float
+    DonationCount: int
+    LastDonationAt: str | None
\ No newline at end of file
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+class ImportErrorModel(BaseModel):
+    Line: int
+    Error: str
+
+class ImportResultModel(BaseModel):
+    Received: int = 0
+    Inserted: int = 0
+    Rejected: int = 0
+    Errors: list[ImportErrorModel] = []
@@ -4,4 +4,7 @@ class ListReceiversModel:
     Email: str
     Document: str
     Address: str
-    Description: str
\ No newline at end of file
+    Description: str
+    TotalAmount: float
+    DonationCount: int
+    LastDonationAt: str | None
\ No newline at end of file
@@ -0,0 +1,3 @@
+class PageModel:
+    Items: list
+    NextCursor: str | None
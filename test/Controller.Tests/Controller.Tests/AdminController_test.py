@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.Controller.AdminController import AdminController
+from src.Helper.DonationImportHelper import DonationImportHelper
+from src.Helper.SecurityHelper import get_current_user_from_token
+from src.Model.ImportResultModel import ImportErrorModel, ImportResultModel
+
+
+# ===================== FAKES GENÉRICOS =====================
+
+
+class FakeUserData:
+    def __init__(self, user_id: int, kind_of_user: str):
+        self.UserId = user_id
+        self.KindOfUser = kind_of_user
+
+
+def make_client(kind_of_user: str) -> TestClient:
+    app = FastAPI()
+    app.include_router(AdminController.router)
+    app.dependency_overrides[get_current_user_from_token] = (
+        lambda: FakeUserData(1, kind_of_user)
+    )
+    return TestClient(app)
+
+
+class FakeDonationImportHelper(DonationImportHelper):
+    """Leitura do corpo de verdade (_StreamLines), sem banco."""
+    calls = []
+
+    def __init__(self):
+        pass
+
+    async def ImportDonationsAsync(self, source, import_format):
+        # As linhas são lidas numa thread, como na carga real
+        text = await asyncio.to_thread(lambda: "".join(source))
+        FakeDonationImportHelper.calls.append((text, import_format))
+        return ImportResultModel(Received=2, Inserted=1, Rejected=1,
+                                 Errors=[ImportErrorModel(Line=3, Error="Amount: invalid")])
+
+
+@pytest.fixture
+def import_helper(monkeypatch):
+    FakeDonationImportHelper.calls = []
+    monkeypatch.setattr(
+        "src.Controller.AdminController.DonationImportHelper",
+        FakeDonationImportHelper,
+    )
+    return FakeDonationImportHelper
+
+
+# ===================== /admin/donations/import =====================
+
+
+def test_import_donations_success(import_helper):
+    client = make_client("admin")
+
+    body = "\ufeffDonorId,ReceiverId,Amount,Date\n1,2,3,2024-01-01\n"
+    response = client.post("/admin/donations/import?format=csv", content=body.encode("utf-8"))
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "Received": 2, "Inserted": 1, "Rejected": 1,
+        "Errors": [{"Line": 3, "Error": "Amount: invalid"}],
+    }
+    # BOM do Excel removido antes de chegar ao leitor de CSV
+    assert import_helper.calls == [("DonorId,ReceiverId,Amount,Date\n1,2,3,2024-01-01\n", "csv")]
+
+
+def test_import_donations_forbidden_for_non_admin(import_helper):
+    client = make_client("doador")
+
+    response = client.post("/admin/donations/import", content=b"")
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Unauthorized: Only admins can import donations"
+    assert import_helper.calls == []
+
+
+def test_import_donations_rejects_invalid_input(import_helper):
+    client = make_client("admin")
+
+    assert client.post("/admin/donations/import?format=xml", content=b"").status_code == 422
+    assert client.post("/admin/donations/import", content=b"\xff\xfe").status_code == 400
+    assert import_helper.calls == []
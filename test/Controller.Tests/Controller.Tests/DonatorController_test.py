@@ -3,6 +3,8 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from src.Controller.DonatorController import DonatorController
 from src.Helper.SecurityHelper import get_current_user_from_token
+from src.Helper.TokenHelper import TokenHelper
+from src.Model.PageModel import PageModel
 
 
 class FakeUserData:
@@ -15,35 +17,26 @@ def make_fake_user(user_id: int, kind_of_user: str) -> FakeUserData:
     return FakeUserData(user_id, kind_of_user)
 
 
-class FakeCursor:
-    def __init__(self):
-        self.to_fetch = []
-        self.executed = []
+def make_page(items, next_cursor=None) -> PageModel:
+    page = PageModel()
+    page.Items = items
+    page.NextCursor = next_cursor
+    return page
 
-    def execute(self, sql, params=None):
-        self.executed.append((sql, params))
 
-    def fetchone(self):
-        if self.to_fetch:
-            return self.to_fetch.pop(0)
-        return None
+class FakeSignInHelper:
+    """Simula SignInHelper.DeactivateUserAsync, guardando as chamadas."""
 
+    def __init__(self, found_kind):
+        self.found_kind = found_kind
+        self.calls = []
 
-class FakeConnection:
-    def __init__(self, cursor: FakeCursor):
-        self._cursor = cursor
-        self.committed = False
-        self.rolled_back = False
-        self.closed = False
+    def __call__(self):
+        return self
 
-    def cursor(self):
-        return self._cursor
-
-    def commit(self):
-        self.committed = True
-
-    def rollback(self):
-        self.rolled_back = True
+    async def DeactivateUserAsync(self, user_id: int, kind_of_user: str):
+        self.calls.append((user_id, kind_of_user))
+        return self.found_kind
 
 
 def test_get_donator_root():
@@ -57,10 +50,10 @@ def test_get_donator_root():
 
 
 class FakeReceiversHelper:
-    def get_receivers(self, type_of_order: str):
-        return [{"id": 1, "name": "Receiver 1", "type": type_of_order}]
+    async def get_receivers_async(self, type_of_order: str, limit: int = 50, after: str = None):
+        return make_page([{"id": 1, "name": "Receiver 1", "type": type_of_order}])
 
-    def validate_cause_id(self, cause_id: int) -> bool:
+    async def validate_cause_id_async(self, cause_id: int) -> bool:
         return True  # usado em /favorite; aqui não faz diferença
 
 
@@ -87,6 +80,48 @@ def test_list_receivers_success(monkeypatch):
     assert "receivers" in data
     assert len(data["receivers"]) == 1
     assert data["receivers"][0]["type"] == "food"
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_list_receivers_passes_page_params_and_returns_next_cursor(monkeypatch):
+    calls = []
+
+    class FakePagedReceiversHelper:
+        async def get_receivers_async(self, type_of_order: str, limit: int = 50, after: str = None):
+            calls.append((type_of_order, limit, after))
+            return make_page([{"id": 3}], next_cursor="abc")
+
+    monkeypatch.setattr(
+        "src.Controller.DonatorController.ReceiversHelper",
+        FakePagedReceiversHelper,
+    )
+
+    app = FastAPI()
+    app.include_router(DonatorController.router)
+    app.dependency_overrides[get_current_user_from_token] = (
+        lambda: make_fake_user(10, "doador")
+    )
+
+    client = TestClient(app)
+
+    response = client.get("/donator/list_receivers/name_asc?limit=1&after=xyz")
+    assert response.status_code == 200
+    assert response.json() == {"receivers": [{"id": 3}]}
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert calls == [("name_asc", 1, "xyz")]
+
+
+def test_list_receivers_rejects_limit_above_maximum():
+    app = FastAPI()
+    app.include_router(DonatorController.router)
+    app.dependency_overrides[get_current_user_from_token] = (
+        lambda: make_fake_user(10, "doador")
+    )
+
+    client = TestClient(app)
+
+    response = client.get("/donator/list_receivers/name_asc?limit=100000")
+    assert response.status_code == 422
 
 
 def test_list_receivers_forbidden_if_not_donator(monkeypatch):
@@ -112,21 +147,12 @@ def test_list_receivers_forbidden_if_not_donator(monkeypatch):
 
 def test_deactivate_donator_success(monkeypatch):
     # Fake ConnectionHelper -> retorna uma conexão com cursor configurado
-    cursor = FakeCursor()
-    # fetchone() irá retornar (ativo=True, tipo_usuario='doador')
-    cursor.to_fetch = [(True, "doador")]
-    connection = FakeConnection(cursor)
-
-    class FakeConnectionHelper:
-        def Connection(self):
-            return connection
-
-        def CloseConnection(self, conn):
-            conn.closed = True
+    # DeactivateUserAsync devolve o tipo do usuário ativo encontrado (None se não existe / inativo)
+    sign_in_helper = FakeSignInHelper("doador")
 
     monkeypatch.setattr(
-        "src.Controller.DonatorController.ConnectionHelper",
-        FakeConnectionHelper,
+        "src.Controller.DonatorController.SignInHelper",
+        sign_in_helper,
     )
 
     app = FastAPI()
@@ -145,7 +171,10 @@ def test_deactivate_donator_success(monkeypatch):
     assert response.status_code == 200
     data = response.json()
     assert data["message"] == "Donator with ID 10 deactivated successfully"
-    assert connection.committed is True
+    assert sign_in_helper.calls == [(10, "doador")]
+    # tokens do usuário inativado são revogados na hora
+    assert TokenHelper().is_revoked({"uid": 10, "iat": 0}) is True
+    TokenHelper.ClearRevocations()
 
 
 def test_deactivate_donator_forbidden_if_not_donator_or_admin(monkeypatch):
@@ -192,20 +221,12 @@ def test_deactivate_donator_forbidden_if_trying_to_deactivate_other_user(monkeyp
 
 def test_deactivate_donator_user_not_found(monkeypatch):
     # Admin pode desativar qualquer um, mas o usuário não existe / já inativo
-    cursor = FakeCursor()
-    cursor.to_fetch = [None]  # SELECT não encontrou nada
-    connection = FakeConnection(cursor)
-
-    class FakeConnectionHelper:
-        def Connection(self):
-            return connection
-
-        def CloseConnection(self, conn):
-            conn.closed = True
+    # DeactivateUserAsync devolve o tipo do usuário ativo encontrado (None se não existe / inativo)
+    sign_in_helper = FakeSignInHelper(None)
 
     monkeypatch.setattr(
-        "src.Controller.DonatorController.ConnectionHelper",
-        FakeConnectionHelper,
+        "src.Controller.DonatorController.SignInHelper",
+        sign_in_helper,
     )
 
     app = FastAPI()
@@ -232,12 +253,12 @@ def test_deactivate_donator_user_not_found(monkeypatch):
 def test_favorite_cause_success(monkeypatch):
     # Fake para ReceiversHelper validando a causa
     class FakeReceiversHelper:
-        def validate_cause_id(self, cause_id: int) -> bool:
+        async def validate_cause_id_async(self, cause_id: int) -> bool:
             return True
 
     # Fake para FavoriteHelper simulando sucesso
     class FakeFavoriteHelper:
-        def add_favorite(self, fav_info):
+        async def add_favorite_async(self, fav_info):
             # Garante que o controller está montando corretamente o modelo
             assert fav_info.CauseId == 123
             assert fav_info.UserId == 10
@@ -291,7 +312,7 @@ def test_favorite_cause_forbidden_if_not_donator(monkeypatch):
 
 def test_favorite_cause_not_found_if_invalid_cause(monkeypatch):
     class FakeReceiversHelperInvalid:
-        def validate_cause_id(self, cause_id: int) -> bool:
+        async def validate_cause_id_async(self, cause_id: int) -> bool:
             return False  # causa inválida / inativa
 
     monkeypatch.setattr(
@@ -317,12 +338,12 @@ def test_favorite_cause_not_found_if_invalid_cause(monkeypatch):
 
 def test_favorite_cause_conflict_if_already_favorited(monkeypatch):
     class FakeReceiversHelperOK:
-        def validate_cause_id(self, cause_id: int) -> bool:
+        async def validate_cause_id_async(self, cause_id: int) -> bool:
             return True
 
     # Fake FavoriteHelper que simula conflito (já favoritado)
     class FakeFavoriteHelper:
-        def add_favorite(self, fav_info):
+        async def add_favorite_async(self, fav_info):
             from fastapi import HTTPException
 
             raise HTTPException(
@@ -357,7 +378,7 @@ def test_favorite_cause_conflict_if_already_favorited(monkeypatch):
 
 def test_remove_favorite_success(monkeypatch):
     class FakeFavoriteHelper:
-        def remove_favorite(self, fav_id: int):
+        async def remove_favorite_async(self, fav_id: int):
             assert fav_id == 1
             return {"message": "Favorite removed successfully"}
 
@@ -401,12 +422,12 @@ def test_remove_favorite_forbidden_if_not_donator(monkeypatch):
 
 def test_list_favorites_success(monkeypatch):
     class FakeFavoriteHelper:
-        def list_favorites(self, user_id: int):
+        async def list_favorites_async(self, user_id: int, limit: int = 50, after: str = None):
             assert user_id == 10
-            return [
+            return make_page([
                 {"id": 1, "cause_id": 123},
                 {"id": 2, "cause_id": 456},
-            ]
+            ])
 
     monkeypatch.setattr(
         "src.Controller.DonatorController.FavoriteHelper",
@@ -447,3 +468,68 @@ def test_list_favorites_forbidden_if_not_donator(monkeypatch):
     assert response.status_code == 403
     data = response.json()
     assert data["detail"] == "Unauthorized: Only donators can view favorites"
+
+
+# ===================== /donator/add_donations =====================
+
+
+def test_add_donations_sets_donor_and_returns_ids(monkeypatch):
+    calls = []
+
+    class FakeDonationsHelper:
+        async def add_donations_batch_async(self, donations):
+            calls.append(donations)
+            return [7, 8]
+
+    monkeypatch.setattr(
+        "src.Controller.DonatorController.DonationsHelper",
+        FakeDonationsHelper,
+    )
+
+    app = FastAPI()
+    app.include_router(DonatorController.router)
+    app.dependency_overrides[get_current_user_from_token] = (
+        lambda: make_fake_user(10, "doador")
+    )
+
+    client = TestClient(app)
+
+    payload = [
+        {"DonorId": 999, "ReceiverId": 1, "Amount": 5.0, "Date": "2024-01-10"},
+        {"DonorId": 999, "ReceiverId": 2, "Amount": 6.0, "Date": "2024-01-10", "Message": "Oi"},
+    ]
+    response = client.post("/donator/add_donations", json=payload)
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "Donations efetuated successfully", "DonationIds": [7, 8]}
+    # O doador vem sempre do token, nunca do corpo
+    assert [d.DonorId for d in calls[0]] == [10, 10]
+    assert [d.ReceiverId for d in calls[0]] == [1, 2]
+
+
+def test_add_donations_rejects_empty_and_oversized_batches():
+    app = FastAPI()
+    app.include_router(DonatorController.router)
+    app.dependency_overrides[get_current_user_from_token] = (
+        lambda: make_fake_user(10, "doador")
+    )
+
+    client = TestClient(app)
+    donation = {"DonorId": 10, "ReceiverId": 1, "Amount": 5.0, "Date": "2024-01-10"}
+
+    assert client.post("/donator/add_donations", json=[]).status_code == 422
+    assert client.post("/donator/add_donations", json=[donation] * 101).status_code == 422
+
+
+def test_add_donations_forbidden_if_not_donator():
+    app = FastAPI()
+    app.include_router(DonatorController.router)
+    app.dependency_overrides[get_current_user_from_token] = (
+        lambda: make_fake_user(10, "receptor")
+    )
+
+    client = TestClient(app)
+    donation = {"DonorId": 10, "ReceiverId": 1, "Amount": 5.0, "Date": "2024-01-10"}
+
+    response = client.post("/donator/add_donations", json=[donation])
+    assert response.status_code == 403
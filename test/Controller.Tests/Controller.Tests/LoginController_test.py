@@ -7,20 +7,28 @@ class FakeSignInHelper:
     def __init__(self):
         pass
 
-    def ValidateAddress(self, address: str) -> bool:
+    async def ValidateAddressAsync(self, address: str) -> bool:
         return True
 
-    def Cadastrate(self, request) -> bool:
+    async def CadastrateAsync(self, request) -> bool:
         return True
 
-    def SignIn(self, request) -> bool:
+    async def SignInAsync(self, request) -> bool:
         return True
 
-    def GetKindOfUser(self, username: str):
-        return {"KindOfUser": "receptor"}
+    async def GetKindOfUserAsync(self, username: str):
+        return FakeUserInfo(42, "receptor")
+
+class FakeUserInfo:
+    def __init__(self, user_id: int, kind_of_user: str):
+        self.UserId = user_id
+        self.KindOfUser = kind_of_user
 
 class FakeTokenHelper:
+    issued: list = []
+
     def create_access_token(self, data: dict) -> str:
+        FakeTokenHelper.issued.append(data)
         return "fake-token"
 
 @pytest.fixture
@@ -87,11 +95,14 @@ def test_LoginWithSucces(client):
         "Password" : "12345"
     }
 
+    FakeTokenHelper.issued.clear()
     response = client.post("/login", json=payload)
     assert response.status_code == 200
     data = response.json()
 
     assert data["message"] == "Login successful"
+    # id e tipo do usuário vão nas claims do token
+    assert FakeTokenHelper.issued == [{"sub": "teste@gmail.com", "uid": 42, "role": "receptor"}]
 
 def test_LoginReturnErrorIfInvalidCredentials(monkeypatch):
 
@@ -99,17 +110,17 @@ def test_LoginReturnErrorIfInvalidCredentials(monkeypatch):
         def __init__(self):
             pass
 
-        def ValidateAddress(self, address: str) -> bool:
+        async def ValidateAddressAsync(self, address: str) -> bool:
             return True
 
-        def Cadastrate(self, request) -> bool:
+        async def CadastrateAsync(self, request) -> bool:
             return True
 
-        def SignIn(self, request) -> bool:
+        async def SignInAsync(self, request) -> bool:
             # Sempre falha o login
             return False
 
-        def GetKindOfUser(self, username: str):
+        async def GetKindOfUserAsync(self, username: str):
             return {"KindOfUser": "receptor"}
 
     # Mocka os helpers SÓ para esse teste
@@ -3,7 +3,11 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from src.Controller.ReceiverController import ReceiverController
+from src.Helper.ReceiverDirectoryHelper import ReceiverDirectoryHelper
 from src.Helper.SecurityHelper import get_current_user_from_token
+from src.Helper.TokenHelper import TokenHelper
+from src.Helper.UnitOfWorkHelper import UnitOfWork
+from src.Model.PageModel import PageModel
 
 
 # ===================== FAKES GENÉRICOS =====================
@@ -19,35 +23,26 @@ def make_fake_user(user_id: int, kind_of_user: str) -> FakeUserData:
     return FakeUserData(user_id, kind_of_user)
 
 
-class FakeCursor:
-    def __init__(self):
-        self.to_fetch = []   # resultados retornados por fetchone()
-        self.executed = []   # SQLs executados p/ conferência
-
-    def execute(self, sql, params=None):
-        self.executed.append((sql, params))
+def make_page(items, next_cursor=None) -> PageModel:
+    page = PageModel()
+    page.Items = items
+    page.NextCursor = next_cursor
+    return page
 
-    def fetchone(self):
-        if self.to_fetch:
-            return self.to_fetch.pop(0)
-        return None
 
+class FakeSignInHelper:
+    """Simula SignInHelper.DeactivateUserAsync, guardando as chamadas."""
 
-class FakeConnection:
-    def __init__(self, cursor: FakeCursor):
-        self._cursor = cursor
-        self.committed = False
-        self.rolled_back = False
-        self.closed = False
+    def __init__(self, found_kind):
+        self.found_kind = found_kind
+        self.calls = []
 
-    def cursor(self):
-        return self._cursor
+    def __call__(self):
+        return self
 
-    def commit(self):
-        self.committed = True
-
-    def rollback(self):
-        self.rolled_back = True
+    async def DeactivateUserAsync(self, user_id: int, kind_of_user: str):
+        self.calls.append((user_id, kind_of_user))
+        return self.found_kind
 
 
 class FakePixHelper:
@@ -55,11 +50,11 @@ class FakePixHelper:
         self.add_called_with = None
         self.delete_called_with = None
 
-    def add_pix_key(self, request):
+    async def add_pix_key_async(self, request):
         self.add_called_with = request
         return "Pix key added"
 
-    def delete_pix_key(self, request):
+    async def delete_pix_key_async(self, request):
         self.delete_called_with = request
         return "Pix key deleted"
 
@@ -212,21 +207,12 @@ def test_delete_pix_key_forbidden_if_not_receiver(monkeypatch):
 
 
 def test_deactivate_receiver_success(monkeypatch):
-    cursor = FakeCursor()
-    # SELECT retorna (ativo=True, tipo_usuario='receptor')
-    cursor.to_fetch = [(True, "receptor")]
-    connection = FakeConnection(cursor)
-
-    class FakeConnectionHelper:
-        def Connection(self):
-            return connection
-
-        def CloseConnection(self, conn):
-            conn.closed = True
+    # DeactivateUserAsync devolve o tipo do usuário ativo encontrado (None se não existe / inativo)
+    sign_in_helper = FakeSignInHelper("receptor")
 
     monkeypatch.setattr(
-        "src.Controller.ReceiverController.ConnectionHelper",
-        FakeConnectionHelper,
+        "src.Controller.ReceiverController.SignInHelper",
+        sign_in_helper,
     )
 
     app = FastAPI()
@@ -245,7 +231,60 @@ def test_deactivate_receiver_success(monkeypatch):
     assert response.status_code == 200
     data = response.json()
     assert data["message"] == "Receiver with ID 10 deactivated successfully"
-    assert connection.committed is True
+    assert sign_in_helper.calls == [(10, "receptor")]
+    # tokens do usuário inativado são revogados na hora
+    assert TokenHelper().is_revoked({"uid": 10, "iat": 0}) is True
+    TokenHelper.ClearRevocations()
+
+
+def install_directory(*user_ids):
+    ReceiverDirectoryHelper.Clear()
+    directory = ReceiverDirectoryHelper()
+    rows = [(user_id, f"ONG {user_id}", "", "", "", "", None) for user_id in user_ids]
+    directory.install(rows, lambda row: row[0], directory.generation())
+    return directory
+
+
+def directory_ids(directory):
+    return [row[0] for row in directory.current().Rows]
+
+
+def test_deactivate_receiver_removes_it_from_directory_after_commit(monkeypatch):
+    monkeypatch.setattr("src.Controller.ReceiverController.SignInHelper", FakeSignInHelper("receptor"))
+    directory = install_directory(10, 11)
+
+    app = FastAPI()
+    app.include_router(ReceiverController.router)
+    app.dependency_overrides[get_current_user_from_token] = lambda: make_fake_user(10, "receptor")
+
+    response = TestClient(app).post("/receiver/deactivate", json={"id_usuario": 10})
+
+    assert response.status_code == 200
+    assert directory_ids(directory) == [11]
+    TokenHelper.ClearRevocations()
+    ReceiverDirectoryHelper.Clear()
+
+
+def test_deactivate_receiver_rolled_back_keeps_directory(monkeypatch):
+    monkeypatch.setattr("src.Controller.ReceiverController.SignInHelper", FakeSignInHelper("receptor"))
+    directory = install_directory(10, 11)
+
+    async def failing_commit(self):
+        raise RuntimeError("could not serialize access")
+
+    monkeypatch.setattr(UnitOfWork, "Commit", failing_commit)
+
+    app = FastAPI()
+    app.include_router(ReceiverController.router)
+    app.dependency_overrides[get_current_user_from_token] = lambda: make_fake_user(10, "receptor")
+
+    response = TestClient(app).post("/receiver/deactivate", json={"id_usuario": 10})
+
+    # A inativação não foi confirmada: o receptor continua no diretório e os tokens valem
+    assert response.status_code == 500
+    assert directory_ids(directory) == [10, 11]
+    assert TokenHelper().is_revoked({"uid": 10, "iat": 0}) is False
+    ReceiverDirectoryHelper.Clear()
 
 
 def test_deactivate_receiver_forbidden_if_not_receiver_or_admin(monkeypatch):
@@ -290,20 +329,12 @@ def test_deactivate_receiver_forbidden_if_trying_to_deactivate_other_user(monkey
 
 
 def test_deactivate_receiver_user_not_found_or_inactive(monkeypatch):
-    cursor = FakeCursor()
-    cursor.to_fetch = [None]  # SELECT não encontrou usuário
-    connection = FakeConnection(cursor)
-
-    class FakeConnectionHelper:
-        def Connection(self):
-            return connection
-
-        def CloseConnection(self, conn):
-            conn.closed = True
+    # DeactivateUserAsync devolve o tipo do usuário ativo encontrado (None se não existe / inativo)
+    sign_in_helper = FakeSignInHelper(None)
 
     monkeypatch.setattr(
-        "src.Controller.ReceiverController.ConnectionHelper",
-        FakeConnectionHelper,
+        "src.Controller.ReceiverController.SignInHelper",
+        sign_in_helper,
     )
 
     app = FastAPI()
@@ -329,7 +360,7 @@ def test_deactivate_receiver_user_not_found_or_inactive(monkeypatch):
 
 def test_create_product_success(monkeypatch):
     class FakeProductHelper:
-        def create_product(self, product):
+        async def create_product_async(self, product):
             # garante que o controller está passando os dados
             assert product.CauseId == 10
             assert product.Name == "Produto Teste"
@@ -369,7 +400,7 @@ def test_create_product_success(monkeypatch):
 
 def test_create_product_forbidden_if_not_receiver(monkeypatch):
     class FakeProductHelper:
-        def create_product(self, product):
+        async def create_product_async(self, product):
             pytest.fail("Não deveria chamar o helper se não for receptor")
 
     monkeypatch.setattr(
@@ -405,7 +436,7 @@ def test_create_product_forbidden_if_not_receiver(monkeypatch):
 
 def test_create_product_internal_error_when_helper_returns_falsy(monkeypatch):
     class FakeProductHelper:
-        def create_product(self, product):
+        async def create_product_async(self, product):
             return None  # simula falha silenciosa no helper
 
     monkeypatch.setattr(
@@ -440,7 +471,7 @@ def test_create_product_internal_error_when_helper_returns_falsy(monkeypatch):
 
 def test_delete_product_success(monkeypatch):
     class FakeProductHelper:
-        def delete_product(self, request):
+        async def delete_product_async(self, request):
             assert request.ProductId == 99
             return True  # exclusão bem-sucedida
 
@@ -467,7 +498,7 @@ def test_delete_product_success(monkeypatch):
 
 def test_delete_product_forbidden_if_not_receiver(monkeypatch):
     class FakeProductHelper:
-        def delete_product(self, request):
+        async def delete_product_async(self, request):
             pytest.fail("Não deveria ser chamado se usuário não é receptor")
 
     monkeypatch.setattr(
@@ -500,9 +531,9 @@ def test_delete_product_forbidden_if_not_receiver(monkeypatch):
 
 def test_get_products_success(monkeypatch):
     class FakeProductHelper:
-        def list_products(self, UserId: int | None = None):
+        async def list_products_async(self, UserId: int | None = None, limit: int = 50, after: str = None):
             assert UserId is None
-            return [
+            return make_page([
                 {
                     "ProductId": 1,
                     "CauseId": 10,
@@ -517,7 +548,7 @@ def test_get_products_success(monkeypatch):
                     "Description": "Desc B",
                     "Value": 100.0,
                 },
-            ]
+            ], next_cursor="next")
 
     monkeypatch.setattr(
         "src.Controller.ReceiverController.ProductHelper",
@@ -540,11 +571,12 @@ def test_get_products_success(monkeypatch):
     assert len(data) == 2
     assert data[0]["ProductId"] == 1
     assert data[1]["ProductId"] == 2
+    assert response.headers["X-Next-Cursor"] == "next"
 
 
 def test_get_products_forbidden_if_not_receiver(monkeypatch):
     class FakeProductHelper:
-        def list_products(self, UserId: int | None = None):
+        async def list_products_async(self, UserId: int | None = None):
             pytest.fail("Não deveria ser chamado se usuário não é receptor")
 
     monkeypatch.setattr(
@@ -568,3 +600,45 @@ def test_get_products_forbidden_if_not_receiver(monkeypatch):
         data["detail"]
         == "Unauthorized access: Only receivers can list products"
     )
+
+
+# ===================== /receiver/summary =====================
+
+
+def test_get_summary_returns_cause_totals(monkeypatch):
+    calls = []
+
+    class FakeReceiversHelper:
+        async def get_summary_async(self, receiver_id: int):
+            calls.append(receiver_id)
+            return {"CauseId": receiver_id, "TotalAmount": 10.5, "DonationCount": 2,
+                    "LastDonationAt": "2024-05-01 10:30:00"}
+
+    monkeypatch.setattr("src.Controller.ReceiverController.ReceiversHelper", FakeReceiversHelper)
+
+    app = FastAPI()
+    app.include_router(ReceiverController.router)
+    app.dependency_overrides[get_current_user_from_token] = lambda: make_fake_user(10, "receptor")
+
+    response = TestClient(app).get("/receiver/summary")
+
+    assert response.status_code == 200
+    assert response.json() == {"CauseId": 10, "TotalAmount": 10.5, "DonationCount": 2,
+                               "LastDonationAt": "2024-05-01 10:30:00"}
+    assert calls == [10]
+
+
+def test_get_summary_forbidden_if_not_receiver(monkeypatch):
+    class FakeReceiversHelper:
+        async def get_summary_async(self, receiver_id: int):
+            pytest.fail("Não deveria ser chamado se usuário não é receptor")
+
+    monkeypatch.setattr("src.Controller.ReceiverController.ReceiversHelper", FakeReceiversHelper)
+
+    app = FastAPI()
+    app.include_router(ReceiverController.router)
+    app.dependency_overrides[get_current_user_from_token] = lambda: make_fake_user(10, "doador")
+
+    response = TestClient(app).get("/receiver/summary")
+
+    assert response.status_code == 403
@@ -0,0 +1,297 @@
+import asyncio
+import socket
+import threading
+
+import psycopg2 as pg
+import pytest
+from fastapi import HTTPException
+
+from src.Helper.AsyncConnectionHelper import (
+    AsyncConnectionHelper,
+    AsyncConnectionPool,
+    wait_ready,
+)
+from src.Helper.ConnectionHelper import PoolTimeoutError
+from src.Helper.ExecutorHelper import ExecutorHelper
+
+
+# O pool assíncrono usa o event loop do asyncio
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_pools():
+    AsyncConnectionHelper.CloseAsyncPools()
+    yield
+    AsyncConnectionHelper.CloseAsyncPools()
+
+
+# ===================== Fakes de conexão assíncrona =====================
+
+
+class FakeAsyncCursor:
+    def __init__(self, connection):
+        self._connection = connection
+        self.rowcount = len(connection.rows)
+        self.closed = False
+
+    def execute(self, query, params=None):
+        if self._connection.raise_on_execute:
+            raise self._connection.raise_on_execute
+        self._connection.executed.append((query, params))
+
+    def fetchall(self):
+        return self._connection.rows
+
+    def fetchone(self):
+        return self._connection.rows[0] if self._connection.rows else None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncConnection:
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.executed = []
+        self.raise_on_execute = None
+        self.closed = 0
+        self.transaction_status = pg.extensions.TRANSACTION_STATUS_IDLE
+
+    def poll(self):
+        return pg.extensions.POLL_OK
+
+    def cursor(self):
+        return FakeAsyncCursor(self)
+
+    def isexecuting(self):
+        return False
+
+    def get_transaction_status(self):
+        return self.transaction_status
+
+    def close(self):
+        self.closed = 1
+
+
+def patch_connect(monkeypatch, rows=None):
+    opened = []
+
+    def fake_connect(**kwargs):
+        assert kwargs["async_"] is True
+        conn = FakeAsyncConnection(rows)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr("src.Helper.AsyncConnectionHelper.pg.connect", fake_connect)
+    return opened
+
+
+# ===================== wait_ready =====================
+
+
+@pytest.mark.anyio
+async def test_wait_ready_waits_for_socket_before_polling_again():
+    reader, writer = socket.socketpair()
+
+    class PollingConnection:
+        def __init__(self):
+            self.states = [pg.extensions.POLL_READ, pg.extensions.POLL_OK]
+
+        def poll(self):
+            return self.states.pop(0)
+
+        def fileno(self):
+            return reader.fileno()
+
+    conn = PollingConnection()
+    asyncio.get_running_loop().call_later(0.01, writer.send, b"x")
+
+    await asyncio.wait_for(wait_ready(conn), timeout=1)
+
+    assert conn.states == []
+    reader.close()
+    writer.close()
+
+
+# ===================== AsyncConnectionPool =====================
+
+
+@pytest.mark.anyio
+async def test_async_pool_reuses_released_connection(monkeypatch):
+    opened = patch_connect(monkeypatch)
+    pool = AsyncConnectionPool(connect_kwargs={}, max_size=2)
+
+    first = await pool.acquire()
+    await pool.release(first)
+    second = await pool.acquire()
+
+    assert second is first
+    assert len(opened) == 1
+
+
+@pytest.mark.anyio
+async def test_async_pool_times_out_when_exhausted(monkeypatch):
+    patch_connect(monkeypatch)
+    pool = AsyncConnectionPool(connect_kwargs={}, max_size=1, timeout=0.05)
+
+    await pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        await pool.acquire()
+
+
+@pytest.mark.anyio
+async def test_async_pool_hands_released_connection_to_waiter(monkeypatch):
+    patch_connect(monkeypatch)
+    pool = AsyncConnectionPool(connect_kwargs={}, max_size=1, timeout=1)
+
+    conn = await pool.acquire()
+    waiter = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0)
+
+    assert pool.stats()["waiting"] == 1
+    await pool.release(conn)
+
+    assert await waiter is conn
+
+
+@pytest.mark.anyio
+async def test_async_pool_rolls_back_open_transaction_on_release(monkeypatch):
+    patch_connect(monkeypatch)
+    pool = AsyncConnectionPool(connect_kwargs={}, max_size=1)
+
+    conn = await pool.acquire()
+    conn.transaction_status = pg.extensions.TRANSACTION_STATUS_INTRANS
+    await pool.release(conn)
+
+    assert conn.executed == [("ROLLBACK", None)]
+    assert pool.stats()["idle"] == 1
+
+
+@pytest.mark.anyio
+async def test_async_pool_discards_connection_when_asked(monkeypatch):
+    patch_connect(monkeypatch)
+    pool = AsyncConnectionPool(connect_kwargs={}, max_size=1)
+
+    conn = await pool.acquire()
+    await pool.release(conn, discard=True)
+
+    assert conn.closed == 1
+    assert pool.stats()["size"] == 0
+
+
+@pytest.mark.anyio
+async def test_async_pool_warm_up_opens_min_size(monkeypatch):
+    opened = patch_connect(monkeypatch)
+    pool = AsyncConnectionPool(connect_kwargs={}, min_size=3, max_size=5)
+
+    await pool.warm_up()
+
+    assert len(opened) == 3
+    assert pool.stats()["idle"] == 3
+
+
+# ===================== AsyncConnectionHelper =====================
+
+
+@pytest.mark.anyio
+async def test_fetch_all_async_runs_query_and_returns_connection(monkeypatch):
+    opened = patch_connect(monkeypatch, rows=[(1, "a"), (2, "b")])
+    helper = AsyncConnectionHelper()
+
+    rows = await helper.FetchAllAsync("SELECT id, nome FROM t WHERE x = %s", (1,))
+
+    assert rows == [(1, "a"), (2, "b")]
+    assert opened[0].executed == [("SELECT id, nome FROM t WHERE x = %s", (1,))]
+    assert helper.AsyncPool().stats()["idle"] == 1
+
+
+@pytest.mark.anyio
+async def test_execute_async_returns_rowcount(monkeypatch):
+    patch_connect(monkeypatch, rows=[(1,), (2,)])
+
+    assert await AsyncConnectionHelper().ExecuteAsync("DELETE FROM t") == 2
+
+
+@pytest.mark.anyio
+async def test_fetch_one_async_raises_500_when_connection_fails(monkeypatch, capsys):
+    def fake_connect(**kwargs):
+        raise pg.OperationalError("could not connect")
+
+    monkeypatch.setattr("src.Helper.AsyncConnectionHelper.pg.connect", fake_connect)
+
+    with pytest.raises(HTTPException) as exc:
+        await AsyncConnectionHelper().FetchOneAsync("SELECT 1")
+
+    assert exc.value.status_code == 500
+    assert exc.value.detail == "Database connection failed"
+    assert "Error connecting to database" in capsys.readouterr().out
+
+
+@pytest.mark.anyio
+async def test_query_error_still_returns_connection_to_pool(monkeypatch):
+    opened = patch_connect(monkeypatch)
+    helper = AsyncConnectionHelper()
+    await helper.AsyncPool().warm_up()
+    opened[0].raise_on_execute = pg.ProgrammingError("syntax error")
+
+    with pytest.raises(pg.ProgrammingError):
+        await helper.FetchAllAsync("SELEC 1")
+
+    assert helper.AsyncPool().stats() == {
+        "size": 1, "idle": 1, "in_use": 0, "waiting": 0, "max_size": helper.AsyncPoolMaxSize,
+    }
+
+
+# ===================== Modo com threads =====================
+
+
+class FakeSyncConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+        self.commits = 0
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            rowcount = len(connection.rows)
+
+            def execute(self, query, params=None):
+                connection.executed.append((query, params, threading.current_thread().name))
+
+            def fetchall(self):
+                return connection.rows
+
+            def close(self):
+                pass
+
+        return Cursor()
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.anyio
+async def test_threaded_fallback_runs_query_in_subsystem_executor(monkeypatch):
+    connection = FakeSyncConnection([(1,)])
+    monkeypatch.setattr(AsyncConnectionHelper, "Connection", lambda self: connection)
+    monkeypatch.setattr(AsyncConnectionHelper, "CloseConnection", lambda self, conn: None)
+
+    helper = AsyncConnectionHelper()
+    helper.UseThreadedFallback = True
+
+    try:
+        assert await helper.FetchAllAsync("SELECT 1") == [(1,)]
+        assert await helper.ExecuteAsync("DELETE FROM t") == 1
+    finally:
+        ExecutorHelper.ShutdownExecutors()
+
+    threads = [name for _, _, name in connection.executed]
+    assert threads[0].startswith("reads-worker")
+    assert threads[1].startswith("writes-worker")
+    assert connection.commits == 2
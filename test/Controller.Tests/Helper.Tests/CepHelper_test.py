@@ -0,0 +1,192 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.Helper.CepHelper import CepHelper, CircuitBreaker, normalize_cep
+
+
+# ===================== ViaCEP local =====================
+
+
+class FakeViaCep:
+    """Servidor HTTP local que responde como o ViaCEP."""
+
+    def __init__(self):
+        self.requests = []
+        self.status = 200
+        self.unknown = set()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.requests.append(self.path)
+                cep = self.path.strip("/").split("/")[1]
+                body = {"erro": True} if cep in fake.unknown else {"cep": cep, "logradouro": "Rua X"}
+                payload = json.dumps(body).encode()
+                self.send_response(fake.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/ws"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def viacep():
+    server = FakeViaCep()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def persistent(monkeypatch):
+    """Substitui a tabela cep_cache por um dicionário."""
+    store = {}
+    monkeypatch.setattr(CepHelper, "_LoadPersistent", lambda self, cep: store.get(cep))
+    monkeypatch.setattr(
+        CepHelper, "_StorePersistent", lambda self, cep, valid, ttl: store.__setitem__(cep, (valid, ttl))
+    )
+    return store
+
+
+@pytest.fixture(autouse=True)
+def reset_cep_helper():
+    CepHelper.Reset()
+    yield
+    CepHelper.Reset()
+
+
+def make_helper(viacep) -> CepHelper:
+    helper = CepHelper()
+    helper.BaseUrl = viacep.url
+    helper.Timeout = 1.0
+    return helper
+
+
+# ===================== Testes =====================
+
+
+def test_normalize_cep():
+    assert normalize_cep("85123-000") == "85123000"
+    assert normalize_cep("123") is None
+    assert normalize_cep(None) is None
+
+
+def test_valid_cep_is_cached_in_memory_and_database(viacep, persistent):
+    helper = make_helper(viacep)
+
+    assert helper.IsValid("85123000") is True
+    assert helper.IsValid("85123000") is True
+
+    assert viacep.requests == ["/ws/85123000/json/"]
+    assert persistent["85123000"] == (True, helper.PositiveTtl)
+    assert helper.Stats()["memory_hits"] == 1
+
+
+def test_unknown_cep_is_cached_with_negative_ttl(viacep, persistent):
+    viacep.unknown.add("99999999")
+    helper = make_helper(viacep)
+
+    assert helper.IsValid("99999999") is False
+    assert helper.IsValid("99999999") is False
+
+    assert len(viacep.requests) == 1
+    assert persistent["99999999"] == (False, helper.NegativeTtl)
+
+
+def test_persistent_cache_answers_without_calling_viacep(viacep, persistent):
+    persistent["85123000"] = (True, 3600.0)
+    helper = make_helper(viacep)
+
+    assert helper.IsValid("85123000") is True
+    assert viacep.requests == []
+    assert helper.Stats()["persistent_hits"] == 1
+
+
+def test_server_errors_are_not_cached(viacep, persistent):
+    viacep.status = 503
+    helper = make_helper(viacep)
+
+    assert helper.IsValid("85123000") is False
+    viacep.status = 200
+    assert helper.IsValid("85123000") is True
+
+    assert len(viacep.requests) == 2
+
+
+@pytest.mark.parametrize("status", [429, 403, 404])
+def test_unexpected_client_errors_are_not_cached_as_invalid(viacep, persistent, status):
+    viacep.status = status
+    helper = make_helper(viacep)
+
+    assert helper.IsValid("85123000") is False
+    assert persistent == {}
+    assert helper.Stats()["remote_failures"] == 1
+
+    viacep.status = 200
+    assert helper.IsValid("85123000") is True
+    assert len(viacep.requests) == 2
+
+
+def test_malformed_cep_answer_is_cached_as_invalid(viacep, persistent):
+    viacep.status = 400
+    helper = make_helper(viacep)
+
+    assert helper.IsValid("85123000") is False
+    assert persistent["85123000"] == (False, helper.NegativeTtl)
+    assert helper.Stats()["remote_failures"] == 0
+
+
+def test_circuit_opens_after_repeated_failures(viacep, persistent):
+    viacep.status = 500
+    helper = make_helper(viacep)
+    CepHelper._breaker.FailureThreshold = 2
+
+    try:
+        for cep in ["11111111", "22222222", "33333333"]:
+            assert helper.IsValid(cep) is False
+    finally:
+        CepHelper._breaker.FailureThreshold = 5
+
+    # A terceira consulta nem chega ao servidor
+    assert len(viacep.requests) == 2
+    assert helper.Stats()["short_circuited"] == 1
+    assert helper.Stats()["breaker"] == CircuitBreaker.OPEN
+
+
+def test_session_is_reused_between_calls(viacep, persistent):
+    helper = make_helper(viacep)
+
+    helper.IsValid("85123000")
+    session = CepHelper._session
+    helper.IsValid("85123001")
+
+    assert CepHelper._session is session
+
+
+def test_circuit_breaker_half_open_allows_one_trial(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.Helper.CepHelper.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+
+    breaker.record_failure()
+    assert breaker.allow() is False
+
+    now[0] += 10
+    assert breaker.allow() is True     # chamada de teste
+    assert breaker.allow() is False    # as demais esperam o resultado
+    breaker.record_success()
+    assert breaker.State == CircuitBreaker.CLOSED
@@ -0,0 +1,106 @@
+import pytest
+
+from src.Helper.CepHelper import CepHelper
+from src.Helper.CepIndexHelper import CepRangeIndex, build_index, load_ranges_csv, merge_ranges
+
+
+@pytest.fixture(autouse=True)
+def reset_cep_helper():
+    CepHelper.Reset()
+    yield
+    CepHelper.Reset()
+
+
+def test_merge_ranges_sorts_and_joins_overlaps():
+    ranges = [(85000000, 85999999), (1000000, 1999999), (85500000, 86000000), (2000000, 2000000)]
+
+    assert merge_ranges(ranges) == [(1000000, 2000000), (85000000, 86000000)]
+
+    with pytest.raises(ValueError):
+        merge_ranges([(20, 10)])
+
+
+def test_index_finds_ceps_inside_ranges(tmp_path):
+    path = tmp_path / "cep_ranges.bin"
+    build_index([(1000000, 1999999), (85000000, 85999999), (99999999, 99999999)], path)
+
+    index = CepRangeIndex(path)
+    try:
+        assert len(index) == 3
+        assert index.contains("01000000") is True
+        assert index.contains("01999999") is True
+        assert index.contains("85123000") is True
+        assert index.contains("99999999") is True
+        assert index.contains("00999999") is False
+        assert index.contains("02000000") is False
+        assert index.contains("84999999") is False
+    finally:
+        index.close()
+
+
+def test_empty_index_covers_nothing(tmp_path):
+    path = tmp_path / "cep_ranges.bin"
+    build_index([], path)
+
+    index = CepRangeIndex(path)
+    assert index.contains("85123000") is False
+    index.close()
+
+
+def test_invalid_index_file_is_rejected(tmp_path):
+    path = tmp_path / "cep_ranges.bin"
+    path.write_bytes(b"NOPE" + bytes(8))
+
+    with pytest.raises(ValueError):
+        CepRangeIndex(path)
+
+
+def test_load_ranges_csv_accepts_hyphen_and_single_cep(tmp_path):
+    path = tmp_path / "faixas.csv"
+    path.write_text("cep_inicial,cep_final\n85000-000,85999-999\n01001000,\n", encoding="utf-8")
+
+    assert load_ranges_csv(path) == [(85000000, 85999999), (1001000, 1001000)]
+
+
+def test_cep_helper_answers_from_offline_index_without_network(tmp_path, monkeypatch):
+    path = tmp_path / "cep_ranges.bin"
+    build_index([(85000000, 85999999)], path)
+
+    def no_network(self, cep):
+        pytest.fail("ViaCEP não deveria ser chamado")
+
+    monkeypatch.setattr(CepHelper, "_FetchRemote", no_network)
+    helper = CepHelper()
+    helper.OfflineIndexPath = path
+
+    assert helper.LocalResult("85123000") is True
+    assert helper.IsValid("85123000") is True
+    assert helper.Stats()["offline_hits"] == 2
+
+
+def test_cep_outside_offline_index_falls_back_to_viacep(tmp_path, monkeypatch):
+    path = tmp_path / "cep_ranges.bin"
+    build_index([(85000000, 85999999)], path)
+    called = []
+
+    def fake_remote(self, cep):
+        called.append(cep)
+        return True
+
+    monkeypatch.setattr(CepHelper, "_FetchRemote", fake_remote)
+    monkeypatch.setattr(CepHelper, "_LoadPersistent", lambda self, cep: None)
+    monkeypatch.setattr(CepHelper, "_StorePersistent", lambda self, cep, valid, ttl: None)
+    helper = CepHelper()
+    helper.OfflineIndexPath = path
+
+    assert helper.LocalResult("01001000") is None
+    assert helper.IsValid("01001000") is True
+    assert called == ["01001000"]
+
+
+def test_missing_offline_index_disables_offline_mode(tmp_path):
+    helper = CepHelper()
+    helper.OfflineIndexPath = tmp_path / "missing.bin"
+
+    assert helper.OfflineIndex() is None
+    assert helper.LocalResult("85123000") is None
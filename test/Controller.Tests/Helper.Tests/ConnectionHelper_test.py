@@ -1,7 +1,9 @@
 import psycopg2 as pg
 import pytest
 
-from src.Helper.ConnectionHelper import ConnectionHelper
+from src.Helper.ConnectionHelper import ConnectionHelper, ConnectionPool, PoolTimeoutError
+from src.Helper.DeadlineHelper import DeadlineHelper, deadline_scope
+from src.Helper.QueryMetricsHelper import InstrumentedCursor
 
 
 class FakeConnection:
@@ -12,6 +14,63 @@ class FakeConnection:
         self.closed = True
 
 
+class FakePooledCursor:
+    def __init__(self, connection):
+        self._connection = connection
+
+    def execute(self, query, params=None):
+        if self._connection.broken:
+            raise pg.OperationalError("server closed the connection unexpectedly")
+        self._connection.pings += 1
+        self._connection.executed.append(query)
+
+    def close(self):
+        pass
+
+
+class FakePooledConnection(FakeConnection):
+    def __init__(self):
+        super().__init__()
+        self.broken = False
+        self.pings = 0
+        self.rolled_back = False
+        self.commits = 0
+        self.executed = []
+        self.transaction_status = pg.extensions.TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        return FakePooledCursor(self)
+
+    def rollback(self):
+        self.rolled_back = True
+        self.transaction_status = pg.extensions.TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        self.commits += 1
+
+    def get_transaction_status(self):
+        return self.transaction_status
+
+
+@pytest.fixture(autouse=True)
+def reset_pools():
+    ConnectionHelper.ClosePools()
+    yield
+    ConnectionHelper.ClosePools()
+
+
+def make_pool(monkeypatch, **kwargs):
+    opened = []
+
+    def fake_connect(**connect_kwargs):
+        conn = FakePooledConnection()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr("src.Helper.ConnectionHelper.pg.connect", fake_connect)
+    return ConnectionPool(connect_kwargs={}, **kwargs), opened
+
+
 def test_connection_success(monkeypatch):
     helper = ConnectionHelper()
     captured_kwargs = {}
@@ -38,6 +97,7 @@ def test_connection_success(monkeypatch):
     assert captured_kwargs["password"] == helper.Password
     assert captured_kwargs["host"] == helper.Host
     assert captured_kwargs["port"] == helper.Port
+    assert captured_kwargs["cursor_factory"] is InstrumentedCursor
 
 
 def test_connection_failure_returns_none(monkeypatch, capsys):
@@ -76,3 +136,166 @@ def test_close_connection_does_nothing_if_none():
 
     # Só garantir que não levanta exceção
     helper.CloseConnection(None)
+
+
+# ===================== TESTES DO POOL =====================
+
+
+def test_connection_reuses_pooled_connection(monkeypatch):
+    helper = ConnectionHelper()
+    calls = {"count": 0}
+
+    def fake_connect(**kwargs):
+        calls["count"] += 1
+        return FakePooledConnection()
+
+    monkeypatch.setattr("src.Helper.ConnectionHelper.pg.connect", fake_connect)
+
+    first = helper.Connection()
+    helper.CloseConnection(first)
+    second = ConnectionHelper().Connection()
+
+    # Mesma conexão devolvida ao pool e reutilizada, sem novo connect
+    assert second is first
+    assert first.closed is False
+    assert calls["count"] == 1
+
+
+def test_pool_warms_up_min_size(monkeypatch):
+    pool, opened = make_pool(monkeypatch, min_size=3, max_size=5)
+
+    assert len(opened) == 3
+    assert pool.stats() == {"size": 3, "idle": 3, "in_use": 0, "max_size": 5}
+
+
+def test_pool_acquire_times_out_when_exhausted(monkeypatch):
+    pool, opened = make_pool(monkeypatch, min_size=0, max_size=2, timeout=0.05)
+
+    pool.acquire()
+    pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+    assert len(opened) == 2
+
+
+def test_connection_returns_none_on_pool_timeout(monkeypatch, capsys):
+    helper = ConnectionHelper()
+    helper.PoolMaxSize = 1
+    helper.PoolTimeout = 0.05
+
+    monkeypatch.setattr(
+        "src.Helper.ConnectionHelper.pg.connect",
+        lambda **kwargs: FakePooledConnection(),
+    )
+
+    assert helper.Connection() is not None
+    assert helper.Connection() is None
+    assert "Error connecting to database" in capsys.readouterr().out
+
+
+def test_pool_release_wakes_up_waiter(monkeypatch):
+    pool, _ = make_pool(monkeypatch, min_size=1, max_size=1, timeout=0.05)
+
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert pool.acquire() is conn
+
+
+def test_pool_discards_closed_connection_on_borrow(monkeypatch):
+    pool, opened = make_pool(monkeypatch, min_size=1, max_size=1)
+
+    opened[0].closed = True
+    conn = pool.acquire()
+
+    assert conn is opened[1]
+    assert pool.stats()["size"] == 1
+
+
+def test_pool_health_check_recycles_broken_idle_connection(monkeypatch):
+    pool, opened = make_pool(monkeypatch, min_size=1, max_size=1, health_check_after=0)
+
+    opened[0].broken = True
+    conn = pool.acquire()
+
+    # A conexão quebrada é fechada e uma nova é aberta no lugar
+    assert conn is opened[1]
+    assert opened[0].closed is True
+
+
+def test_pool_health_check_pings_idle_connection(monkeypatch):
+    pool, opened = make_pool(monkeypatch, min_size=1, max_size=1, health_check_after=0)
+
+    conn = pool.acquire()
+
+    assert conn is opened[0]
+    assert conn.pings == 1
+
+
+def test_pool_recycles_connection_past_max_lifetime(monkeypatch):
+    pool, opened = make_pool(monkeypatch, min_size=1, max_size=1, max_lifetime=0)
+
+    conn = pool.acquire()
+
+    assert conn is opened[1]
+    assert opened[0].closed is True
+
+
+def test_pool_release_rolls_back_open_transaction(monkeypatch):
+    pool, _ = make_pool(monkeypatch, min_size=0, max_size=1)
+
+    conn = pool.acquire()
+    conn.transaction_status = pg.extensions.TRANSACTION_STATUS_INTRANS
+    pool.release(conn)
+
+    assert conn.rolled_back is True
+    assert pool.stats()["idle"] == 1
+
+
+def test_pool_release_resets_statement_timeout_left_by_a_deadline(monkeypatch):
+    DeadlineHelper.Reset()
+    pool, _ = make_pool(monkeypatch, min_size=0, max_size=1)
+
+    conn = pool.acquire()
+    with deadline_scope(5):
+        DeadlineHelper().MarkApplied(conn)
+    pool.release(conn)
+
+    assert conn.executed == ["RESET statement_timeout"]
+    assert conn.commits == 1
+    assert DeadlineHelper().Applied(conn) == 0
+    assert pool.acquire() is conn
+
+
+def test_pool_release_skips_reset_without_statement_timeout(monkeypatch):
+    DeadlineHelper.Reset()
+    pool, _ = make_pool(monkeypatch, min_size=0, max_size=1)
+
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert conn.executed == []
+    assert conn.commits == 0
+
+
+def test_pool_release_discards_connection_in_unknown_state(monkeypatch):
+    pool, _ = make_pool(monkeypatch, min_size=0, max_size=1)
+
+    conn = pool.acquire()
+    conn.transaction_status = pg.extensions.TRANSACTION_STATUS_UNKNOWN
+    pool.release(conn)
+
+    assert conn.closed is True
+    assert pool.stats() == {"size": 0, "idle": 0, "in_use": 0, "max_size": 1}
+
+
+def test_pool_release_closes_foreign_connection(monkeypatch):
+    pool, _ = make_pool(monkeypatch, min_size=0, max_size=1)
+    foreign = FakePooledConnection()
+
+    pool.release(foreign)
+
+    assert foreign.closed is True
+    assert pool.stats()["size"] == 0
@@ -0,0 +1,247 @@
+import asyncio
+import time
+
+import psycopg2 as pg
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.Helper import DeadlineHelper as deadlines
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.DeadlineHelper import DeadlineHelper, DeadlineMiddleware, check_deadline, deadline_for_path, deadline_scope, remaining
+
+
+# O middleware e o pool assíncrono usam o event loop do asyncio
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    DeadlineHelper.Reset()
+    AsyncConnectionHelper.CloseAsyncPools()
+    yield
+    DeadlineHelper.Reset()
+    AsyncConnectionHelper.CloseAsyncPools()
+
+
+# ===================== Prazos =====================
+
+
+def test_deadline_for_path_uses_longest_matching_prefix(monkeypatch):
+    monkeypatch.setattr(deadlines, "ROUTE_DEADLINES", {"/receiver": 20.0, "/receiver/donations/export": 300.0, "/login": 3.0})
+
+    assert deadline_for_path("/login") == 3.0
+    assert deadline_for_path("/receiver/donations/export") == 300.0
+    assert deadline_for_path("/receiver/list_receivers") == 20.0
+    # Prefixo só casa em fronteira de segmento
+    assert deadline_for_path("/loginx") == deadlines.DEFAULT_DEADLINE
+
+
+def test_no_deadline_outside_requests():
+    assert remaining() is None
+    assert check_deadline() is None
+
+
+def test_inner_scope_cannot_extend_outer_deadline():
+    with deadline_scope(1.0):
+        with deadline_scope(60.0):
+            assert remaining() <= 1.0
+    assert remaining() is None
+
+
+def test_expired_deadline_raises_504():
+    with deadline_scope(0.0):
+        with pytest.raises(HTTPException) as exc:
+            check_deadline()
+    assert exc.value.status_code == 504
+
+
+def test_statement_timeout_is_only_sent_when_it_changes():
+    connection = FakeConnection()
+    helper = DeadlineHelper()
+
+    # Sem prazo e sem SET anterior, a conexão já está no padrão
+    assert helper.StatementTimeoutSql(connection) is None
+
+    with deadline_scope(2.5):
+        assert helper.StatementTimeoutSql(connection) == "SET statement_timeout = 3000"
+        helper.MarkApplied(connection)
+        assert helper.StatementTimeoutSql(connection) is None
+
+    # Fora da requisição o limite volta a zero
+    assert helper.StatementTimeoutSql(connection) == "SET statement_timeout = 0"
+
+
+# ===================== Middleware =====================
+
+
+def make_app():
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(5)
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"remaining": remaining()}
+
+    app.add_middleware(DeadlineMiddleware)
+    return app
+
+
+def test_middleware_sets_route_deadline(monkeypatch):
+    monkeypatch.setattr(deadlines, "ROUTE_DEADLINES", {"/fast": 2.0})
+
+    response = TestClient(make_app()).get("/fast")
+
+    assert response.status_code == 200
+    assert 0 < response.json()["remaining"] <= 2.0
+
+
+def test_middleware_answers_504_when_deadline_expires(monkeypatch):
+    monkeypatch.setattr(deadlines, "ROUTE_DEADLINES", {"/slow": 0.05})
+
+    start = time.monotonic()
+    response = TestClient(make_app()).get("/slow")
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Request deadline exceeded"}
+    assert time.monotonic() - start < 2
+
+
+@pytest.mark.anyio
+async def test_middleware_cancels_handler_when_client_disconnects():
+    cancelled = asyncio.Event()
+
+    async def app(scope, receive, send):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    incoming = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if incoming:
+            return incoming.pop()
+        await asyncio.sleep(0.01)
+        return {"type": "http.disconnect"}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await asyncio.wait_for(DeadlineMiddleware(app)({"type": "http", "path": "/x"}, receive, send), timeout=2)
+
+    assert cancelled.is_set()
+    assert sent == []
+
+
+# ===================== Integração com o AsyncConnectionHelper =====================
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self._connection = connection
+        self.rowcount = 1
+
+    def execute(self, query, params=None):
+        self._connection.executed.append(query)
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+        self.cancelled = 0
+        self.closed = 0
+
+    def poll(self):
+        return pg.extensions.POLL_OK
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def cancel(self):
+        self.cancelled += 1
+
+    def isexecuting(self):
+        return False
+
+    def get_transaction_status(self):
+        return pg.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr("src.Helper.AsyncConnectionHelper.pg.connect", lambda **kwargs: conn)
+    return conn
+
+
+@pytest.mark.anyio
+async def test_deadline_becomes_statement_timeout(connection):
+    helper = AsyncConnectionHelper()
+
+    with deadline_scope(5.0):
+        await helper.FetchOneAsync("SELECT 1")
+        await helper.FetchOneAsync("SELECT 2")
+
+    assert connection.executed == ["SET statement_timeout = 5000", "SELECT 1", "SELECT 2"]
+
+
+@pytest.mark.anyio
+async def test_expired_deadline_does_not_take_a_connection(connection):
+    with deadline_scope(0.0):
+        with pytest.raises(HTTPException) as exc:
+            await AsyncConnectionHelper().FetchOneAsync("SELECT 1")
+
+    assert exc.value.status_code == 504
+    assert connection.executed == []
+
+
+@pytest.mark.anyio
+async def test_cancelled_query_is_cancelled_on_server_and_frees_pool_slot(connection, monkeypatch):
+    async def never_finishes(self, connection, cursor, query, params):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(AsyncConnectionHelper, "_ExecuteAsync", never_finishes)
+    helper = AsyncConnectionHelper()
+
+    task = asyncio.ensure_future(helper.FetchOneAsync("SELECT pg_sleep(60)"))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert connection.cancelled == 1
+    assert connection.closed == 1
+    assert helper.AsyncPool()._size == 0
+
+
+@pytest.mark.anyio
+async def test_statement_timeout_error_becomes_504(connection, monkeypatch):
+    async def times_out(self, connection, cursor, query, params):
+        raise pg.errors.QueryCanceled("canceling statement due to statement timeout")
+
+    monkeypatch.setattr(AsyncConnectionHelper, "_ExecuteAsync", times_out)
+
+    with deadline_scope(5.0):
+        with pytest.raises(HTTPException) as exc:
+            await AsyncConnectionHelper().FetchOneAsync("SELECT 1")
+
+    assert exc.value.status_code == 504
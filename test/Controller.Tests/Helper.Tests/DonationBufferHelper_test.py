@@ -0,0 +1,227 @@
+import asyncio
+
+import psycopg2 as pg
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.Controller.DonatorController import DonatorController
+from src.Helper.DeadlineHelper import deadline_scope, remaining
+from src.Helper.DonationBufferHelper import DONATION_BUFFER_ENV, DonationBufferHelper
+from src.Helper.SecurityHelper import get_current_user_from_token
+from src.Helper.UnitOfWorkHelper import current_unit
+from src.Model.DonationModel import DonationModel
+
+
+# O buffer usa as primitivas do asyncio
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_buffers():
+    DonationBufferHelper.Reset()
+    yield
+    DonationBufferHelper.Reset()
+
+
+class FakeDatabase:
+    """Simula o INSERT de várias linhas: cada chamada é um commit."""
+
+    def __init__(self, bad_receivers=()):
+        self.commits = []
+        self.bad_receivers = set(bad_receivers)
+        self.next_id = 1
+        self.contexts = []
+
+    def install(self, monkeypatch):
+        database = self
+
+        async def insert_batch(self, rows):
+            database.contexts.append((remaining(), current_unit()))
+            await asyncio.sleep(0)
+            if any(row[1] in database.bad_receivers for row in rows):
+                raise pg.IntegrityError("violates foreign key constraint")
+            ids = list(range(database.next_id, database.next_id + len(rows)))
+            database.next_id += len(rows)
+            database.commits.append([row[1] for row in rows])
+            return ids
+
+        monkeypatch.setattr(DonationBufferHelper, "InsertBatchAsync", insert_batch)
+        return database
+
+
+def donation(receiver_id: int) -> DonationModel:
+    return DonationModel(DonorId=1, ReceiverId=receiver_id, Amount=10.0, Date="2024-01-01")
+
+
+def make_helper(max_batch_size=200, max_delay=0.01) -> DonationBufferHelper:
+    helper = DonationBufferHelper()
+    helper.MaxBatchSize = max_batch_size
+    helper.MaxDelay = max_delay
+    return helper
+
+
+# ===================== Buffer =====================
+
+
+@pytest.mark.anyio
+async def test_concurrent_donations_share_one_commit(monkeypatch):
+    database = FakeDatabase().install(monkeypatch)
+    helper = make_helper()
+
+    buffer = helper.Buffer()
+    ids = await asyncio.gather(*(buffer.Submit((1, receiver, 10.0, None, "2024-01-01")) for receiver in range(5)))
+
+    assert ids == [1, 2, 3, 4, 5]
+    assert database.commits == [[0, 1, 2, 3, 4]]
+    assert buffer.Flushes == 1
+    assert buffer.Flushed == 5
+
+
+@pytest.mark.anyio
+async def test_full_batch_flushes_without_waiting_for_delay(monkeypatch):
+    database = FakeDatabase().install(monkeypatch)
+    helper = make_helper(max_batch_size=3, max_delay=60)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(helper.AddAsync(donation(receiver)) for receiver in range(6))), timeout=2)
+
+    assert len(results) == 6
+    assert database.commits == [[0, 1, 2], [3, 4, 5]]
+
+
+@pytest.mark.anyio
+async def test_invalid_donation_only_fails_its_own_request(monkeypatch):
+    database = FakeDatabase(bad_receivers={99}).install(monkeypatch)
+    buffer = make_helper().Buffer()
+
+    results = await asyncio.gather(
+        buffer.Submit((1, 10, 10.0, None, "2024-01-01")),
+        buffer.Submit((1, 99, 10.0, None, "2024-01-01")),
+        buffer.Submit((1, 11, 10.0, None, "2024-01-01")),
+        return_exceptions=True,
+    )
+
+    assert results[0] == 1
+    assert isinstance(results[1], HTTPException)
+    assert results[1].status_code == 500
+    assert results[2] == 2
+    assert database.commits == [[10], [11]]
+
+
+@pytest.mark.anyio
+async def test_database_failure_fails_the_whole_batch(monkeypatch):
+    async def insert_batch(self, rows):
+        raise pg.OperationalError("server closed the connection")
+
+    monkeypatch.setattr(DonationBufferHelper, "InsertBatchAsync", insert_batch)
+    buffer = make_helper().Buffer()
+
+    results = await asyncio.gather(
+        buffer.Submit((1, 10, 10.0, None, "2024-01-01")),
+        buffer.Submit((1, 11, 10.0, None, "2024-01-01")),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, HTTPException) for result in results)
+
+
+@pytest.mark.anyio
+async def test_cancelled_request_leaves_the_queue(monkeypatch):
+    database = FakeDatabase().install(monkeypatch)
+    buffer = make_helper(max_delay=0.05).Buffer()
+
+    waiting = asyncio.ensure_future(buffer.Submit((1, 10, 10.0, None, "2024-01-01")))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    kept = await buffer.Submit((1, 11, 10.0, None, "2024-01-01"))
+
+    assert kept == 1
+    assert database.commits == [[11]]
+
+
+@pytest.mark.anyio
+async def test_flush_runs_outside_the_request_context(monkeypatch):
+    database = FakeDatabase().install(monkeypatch)
+    buffer = make_helper().Buffer()
+
+    with deadline_scope(5):
+        await buffer.Submit((1, 10, 10.0, None, "2024-01-01"))
+
+    assert database.contexts == [(None, None)]
+
+
+@pytest.mark.anyio
+async def test_close_flushes_pending_and_rejects_new_donations(monkeypatch):
+    database = FakeDatabase().install(monkeypatch)
+    helper = make_helper(max_delay=60)
+
+    pending = asyncio.ensure_future(helper.AddAsync(donation(10)))
+    await asyncio.sleep(0)
+    await asyncio.wait_for(DonationBufferHelper.CloseBuffersAsync(), timeout=2)
+
+    assert (await pending) == {"message": "Donation efetuated successfully"}
+    assert database.commits == [[10]]
+
+    closed = make_helper().Buffer()
+    await closed.Close()
+    with pytest.raises(HTTPException) as error:
+        await closed.Submit((1, 10, 10.0, None, "2024-01-01"))
+    assert error.value.status_code == 503
+
+
+# ===================== /donator/add_donation =====================
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.include_router(DonatorController.router)
+    app.dependency_overrides[get_current_user_from_token] = lambda: type(
+        "User", (), {"UserId": 10, "KindOfUser": "doador"})()
+    return TestClient(app)
+
+
+def test_add_donation_uses_buffer_when_enabled(monkeypatch):
+    monkeypatch.setenv(DONATION_BUFFER_ENV, "1")
+    database = FakeDatabase().install(monkeypatch)
+
+    class FailingDonationsHelper:
+        async def add_donations_async(self, donation_info):
+            pytest.fail("O caminho direto não deveria ser usado com o buffer ligado")
+
+    monkeypatch.setattr("src.Controller.DonatorController.DonationsHelper", FailingDonationsHelper)
+
+    payload = {"DonorId": 999, "ReceiverId": 3, "Amount": 5.0, "Date": "2024-01-10"}
+    response = make_client().post("/donator/add_donation", json=payload)
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "Donation efetuated successfully"}
+    assert database.commits == [[3]]
+
+
+def test_add_donation_with_idempotency_key_bypasses_buffer(monkeypatch):
+    monkeypatch.setenv(DONATION_BUFFER_ENV, "1")
+    database = FakeDatabase().install(monkeypatch)
+    calls = []
+
+    class FakeIdempotencyHelper:
+        async def RunOnceAsync(self, user_id, route, key, payload, action):
+            calls.append(key)
+            return {"message": "direct"}
+
+    monkeypatch.setattr("src.Controller.DonatorController.IdempotencyHelper", FakeIdempotencyHelper)
+
+    payload = {"DonorId": 999, "ReceiverId": 3, "Amount": 5.0, "Date": "2024-01-10"}
+    response = make_client().post("/donator/add_donation", json=payload, headers={"Idempotency-Key": "k"})
+
+    assert response.json() == {"message": "direct"}
+    assert calls == ["k"]
+    assert database.commits == []
+
+
+def test_buffer_is_disabled_by_default(monkeypatch):
+    monkeypatch.delenv(DONATION_BUFFER_ENV, raising=False)
+
+    assert DonationBufferHelper().Enabled is False
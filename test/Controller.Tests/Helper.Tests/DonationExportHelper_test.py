@@ -0,0 +1,243 @@
+import asyncio
+import json
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.Controller.ReceiverController import ReceiverController
+from src.Helper.DeadlineHelper import DeadlineHelper
+from src.Helper.DonationExportHelper import DonationExportHelper
+from src.Helper.ExecutorHelper import ExecutorHelper, ExecutorSaturatedError
+from src.Helper.SecurityHelper import get_current_user_from_token
+
+
+# A ponte thread -> fila usa o event loop do asyncio
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_deadlines():
+    DeadlineHelper.Reset()
+    yield
+    DeadlineHelper.Reset()
+
+
+ROWS = [
+    (1, "Ana", "ONG Ação", Decimal("10.50"), None, datetime(2024, 5, 1, 10, 30)),
+    (2, "João", "ONG Ação", Decimal("100"), "Obrigado!", datetime(2024, 5, 2)),
+]
+
+
+# ===================== Fakes de conexão síncrona =====================
+
+
+class FakeCursor:
+    def __init__(self, connection, name=None):
+        self._connection = connection
+        self.name = name
+        self.itersize = None
+        self._rows = []
+
+    def mogrify(self, query, params):
+        return query.replace("%s", str(params[0])).encode()
+
+    def copy_expert(self, sql, file):
+        self._connection.executed.append(sql)
+        file.write('"DonationId","DonorName"\n')
+        for i in range(self._connection.copy_lines):
+            if self._connection.cancelled:
+                raise RuntimeError("canceling statement due to user request")
+            file.write(f"{i},Doador {i}\n")
+
+    def execute(self, query, params=None):
+        self._connection.executed.append(query)
+        self._rows = list(ROWS)
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, copy_lines=2):
+        self.executed = []
+        self.named_cursors = []
+        self.copy_lines = copy_lines
+        self.cancelled = 0
+        self.committed = 0
+        self.closed = 0
+
+    def cursor(self, name=None):
+        if name:
+            self.named_cursors.append(name)
+        return FakeCursor(self, name)
+
+    def commit(self):
+        self.committed += 1
+
+    def cancel(self):
+        self.cancelled += 1
+
+    def close(self):
+        self.closed = 1
+
+
+def make_helper(connection, chunk_size=64 * 1024):
+    helper = DonationExportHelper()
+    helper.ChunkSize = chunk_size
+    helper.QueueSize = 1
+    helper.released = threading.Event()
+    helper.Connection = lambda: connection
+    helper.CloseConnection = lambda conn: helper.released.set()
+    return helper
+
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+# ===================== Export =====================
+
+
+@pytest.mark.anyio
+async def test_csv_export_uses_copy_to_stdout():
+    connection = FakeConnection()
+    helper = make_helper(connection)
+
+    body = await collect(helper.Export(7, "csv"))
+
+    assert body == b'"DonationId","DonorName"\n0,Doador 0\n1,Doador 1\n'
+    copy = connection.executed[-1]
+    assert copy.startswith("COPY (SELECT")
+    assert "WHERE d.id_causa = 7" in copy
+    assert copy.endswith("TO STDOUT WITH (FORMAT csv, HEADER true)")
+    assert connection.committed == 1
+    assert helper.released.wait(1)
+
+
+@pytest.mark.anyio
+async def test_ndjson_export_uses_server_side_cursor():
+    connection = FakeConnection()
+    helper = make_helper(connection)
+
+    body = await collect(helper.Export(7, "ndjson"))
+
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert connection.named_cursors == ["export_donations"]
+    assert lines == [
+        {"DonationId": 1, "DonorName": "Ana", "ReceiverName": "ONG Ação",
+         "Amount": 10.5, "Message": None, "Date": "2024-05-01 10:30:00"},
+        {"DonationId": 2, "DonorName": "João", "ReceiverName": "ONG Ação",
+         "Amount": 100.0, "Message": "Obrigado!", "Date": "2024-05-02 00:00:00"},
+    ]
+
+
+@pytest.mark.anyio
+async def test_first_chunk_is_sent_before_buffer_fills():
+    connection = FakeConnection(copy_lines=10)
+    helper = make_helper(connection, chunk_size=1024 * 1024)
+
+    chunks = [chunk async for chunk in helper.Export(7, "csv")]
+
+    # Cabeçalho sai sozinho; o resto espera o bloco encher (ou o fim)
+    assert chunks[0] == b'"DonationId","DonorName"\n'
+    assert len(chunks) == 2
+
+
+@pytest.mark.anyio
+async def test_client_abort_cancels_query_and_discards_connection():
+    connection = FakeConnection(copy_lines=100000)
+    helper = make_helper(connection, chunk_size=16)
+
+    chunks = helper.Export(7, "csv")
+    assert await chunks.__anext__() == b'"DonationId","DonorName"\n'
+    await chunks.aclose()
+
+    assert await asyncio.to_thread(helper.released.wait, 2)
+    assert connection.cancelled == 1
+    assert connection.closed == 1
+    assert connection.committed == 0
+
+
+@pytest.mark.anyio
+async def test_never_iterated_stream_releases_thread_and_connection():
+    connection = FakeConnection(copy_lines=100000)
+    helper = make_helper(connection, chunk_size=16)
+    helper.IdleTimeout = 0.2
+
+    # Sem prazo na requisição e sem ninguém lendo: a thread não pode ficar presa no put
+    chunks = helper.Export(7, "csv")
+
+    assert await asyncio.to_thread(helper.released.wait, 2)
+    assert connection.cancelled == 1
+    assert connection.closed == 1
+    del chunks
+
+
+@pytest.mark.anyio
+async def test_database_error_interrupts_stream():
+    connection = FakeConnection()
+    connection.cursor = lambda name=None: (_ for _ in ()).throw(RuntimeError("boom"))
+    helper = make_helper(connection)
+
+    with pytest.raises(RuntimeError):
+        await collect(helper.Export(7, "csv"))
+    assert connection.closed == 1
+
+
+@pytest.mark.anyio
+async def test_saturated_executor_returns_503(monkeypatch):
+    def saturated(*args, **kwargs):
+        raise ExecutorSaturatedError("full")
+
+    monkeypatch.setattr(ExecutorHelper().Executor("exports"), "submit", saturated)
+
+    with pytest.raises(HTTPException) as error:
+        make_helper(FakeConnection()).Export(7, "csv")
+    assert error.value.status_code == 503
+
+
+# ===================== /receiver/donations/export =====================
+
+
+def make_client(monkeypatch, kind_of_user="receptor"):
+    connection = FakeConnection()
+    monkeypatch.setattr(DonationExportHelper, "Connection", lambda self: connection)
+    monkeypatch.setattr(DonationExportHelper, "CloseConnection", lambda self, conn: None)
+
+    app = FastAPI()
+    app.include_router(ReceiverController.router)
+    app.dependency_overrides[get_current_user_from_token] = lambda: type(
+        "User", (), {"UserId": 7, "KindOfUser": kind_of_user})()
+    return TestClient(app)
+
+
+def test_export_route_streams_attachment(monkeypatch):
+    client = make_client(monkeypatch)
+
+    response = client.get("/receiver/donations/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="donations.ndjson"'
+    assert len(response.text.splitlines()) == 2
+
+    response = client.get("/receiver/donations/export")
+    assert response.headers["content-type"].startswith("text/csv")
+
+
+def test_export_route_rejects_unknown_format_and_non_receivers(monkeypatch):
+    client = make_client(monkeypatch)
+    assert client.get("/receiver/donations/export", params={"format": "xml"}).status_code == 422
+
+    client = make_client(monkeypatch, kind_of_user="doador")
+    assert client.get("/receiver/donations/export").status_code == 403
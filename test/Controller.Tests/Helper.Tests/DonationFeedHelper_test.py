@@ -0,0 +1,311 @@
+import asyncio
+import json
+import socket
+from datetime import datetime
+from decimal import Decimal
+
+import psycopg2 as pg
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.Controller.ReceiverController import ReceiverController
+from src.Helper import DonationFeedHelper as feed_module
+from src.Helper.DonationFeedHelper import DonationFeedHelper
+from src.Helper.SecurityHelper import get_current_user_from_token
+
+
+# add_reader precisa do event loop do asyncio
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_feeds():
+    DonationFeedHelper.Reset()
+    yield
+    DonationFeedHelper.Reset()
+
+
+# ===================== Fake da conexão em LISTEN =====================
+
+
+class Notify:
+    def __init__(self, payload):
+        self.payload = payload
+
+
+class FakeListenConnection:
+    """
+    Conexão com um socket de verdade por baixo, para o add_reader do event loop
+    acordar quando o "servidor" manda um aviso.
+    """
+
+    def __init__(self):
+        self._server, self._client = socket.socketpair()
+        self._client.setblocking(False)
+        self._queued = []
+        self.notifies = []
+        self.closed = 0
+        self.broken = False
+
+    def fileno(self):
+        return self._client.fileno()
+
+    def notify(self, receiver_id, donation_id, **fields):
+        event = {"DonationId": donation_id, "ReceiverId": receiver_id, "DonorName": "Ana",
+                 "ReceiverName": "ONG", "Amount": 10.5, "Message": None, "Date": "2024-05-01 10:00:00"}
+        event.update(fields)
+        self._queued.append(Notify(json.dumps(event)))
+        self._server.send(b"x")
+
+    def drop(self):
+        self.broken = True
+        self._server.send(b"x")
+
+    def poll(self):
+        try:
+            self._client.recv(4096)
+        except BlockingIOError:
+            pass
+        if self.broken:
+            raise pg.OperationalError("server closed the connection unexpectedly")
+        self.notifies.extend(self._queued)
+        self._queued = []
+        return pg.extensions.POLL_OK
+
+    def close(self):
+        self.closed = 1
+        self._server.close()
+        self._client.close()
+
+
+@pytest.fixture
+def listen(monkeypatch):
+    opened = []
+
+    async def open_listen(self):
+        opened.append(FakeListenConnection())
+        return opened[-1]
+
+    monkeypatch.setattr(DonationFeedHelper, "OpenListenConnectionAsync", open_listen)
+    return opened
+
+
+async def next_event(events) -> bytes:
+    return await asyncio.wait_for(events.__anext__(), timeout=2)
+
+
+def parse(chunk: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    return {"id": int(fields["id"]), "event": fields["event"], "data": json.loads(fields["data"])}
+
+
+# ===================== Feed =====================
+
+
+@pytest.mark.anyio
+async def test_events_are_routed_to_the_right_receiver(listen):
+    helper = DonationFeedHelper()
+    first = await helper.StreamAsync(7)
+    second = await helper.StreamAsync(8)
+    assert await next_event(first) == b"retry: 3000\n\n"
+    assert await next_event(second) == b"retry: 3000\n\n"
+
+    listen[0].notify(8, 41)
+    listen[0].notify(7, 42, Message="Obrigado")
+
+    event = parse(await next_event(first))
+    assert event["id"] == 42
+    assert event["event"] == "donation"
+    assert event["data"] == {"DonationId": 42, "DonorName": "Ana", "ReceiverName": "ONG",
+                             "Amount": 10.5, "Message": "Obrigado", "Date": "2024-05-01 10:00:00"}
+    assert parse(await next_event(second))["id"] == 41
+
+    # Uma única conexão de LISTEN para todos os inscritos do worker
+    assert len(listen) == 1
+    assert helper.Feed().Subscribers() == 2
+
+    await first.aclose()
+    await second.aclose()
+    assert helper.Feed().Subscribers() == 0
+
+
+@pytest.mark.anyio
+async def test_reconnect_backfills_missed_donations_without_duplicates(listen, monkeypatch):
+    captured = {}
+
+    async def fake_fetch_all(self, query, params=None):
+        captured["query"], captured["params"] = query, params
+        return [(11, "Ana", "ONG", Decimal("5.00"), None, datetime(2024, 5, 1, 9, 0)),
+                (12, "Bia", "ONG", Decimal("7.00"), "Oi", datetime(2024, 5, 1, 9, 30))]
+
+    monkeypatch.setattr(DonationFeedHelper, "FetchAllAsync", fake_fetch_all)
+    events = await DonationFeedHelper().StreamAsync(7, last_event_id=10)
+    await next_event(events)
+
+    assert [parse(await next_event(events))["id"] for _ in range(2)] == [11, 12]
+    assert captured["query"] == feed_module.MISSED_DONATIONS_QUERY
+    assert captured["params"] == (7, 10, 100)
+
+    # Aviso que chegou durante a recuperação e já foi enviado é ignorado
+    listen[0].notify(7, 12)
+    listen[0].notify(7, 13)
+    assert parse(await next_event(events))["id"] == 13
+    await events.aclose()
+
+
+@pytest.mark.anyio
+async def test_out_of_order_commits_are_all_delivered(listen):
+    # 41 foi inserida antes, mas a transação dela confirmou depois da 42
+    events = await DonationFeedHelper().StreamAsync(7)
+    await next_event(events)
+
+    listen[0].notify(7, 42)
+    listen[0].notify(7, 41)
+
+    assert [parse(await next_event(events))["id"] for _ in range(2)] == [42, 41]
+    await events.aclose()
+
+
+@pytest.mark.anyio
+async def test_backfill_dedupe_does_not_drop_lower_live_ids(listen, monkeypatch):
+    async def fake_fetch_all(self, query, params=None):
+        return [(12, "Ana", "ONG", Decimal("5.00"), None, datetime(2024, 5, 1, 9, 0))]
+
+    monkeypatch.setattr(DonationFeedHelper, "FetchAllAsync", fake_fetch_all)
+    events = await DonationFeedHelper().StreamAsync(7, last_event_id=10)
+    await next_event(events)
+    assert parse(await next_event(events))["id"] == 12
+
+    listen[0].notify(7, 12)
+    listen[0].notify(7, 11)
+    assert parse(await next_event(events))["id"] == 11
+    await events.aclose()
+
+
+@pytest.mark.anyio
+async def test_bulk_insert_summary_is_sent_as_one_event(listen):
+    events = await DonationFeedHelper().StreamAsync(7)
+    await next_event(events)
+
+    # Payload do trigger para um comando com muitas linhas: um resumo por causa
+    listen[0]._queued.append(Notify(json.dumps(
+        {"ReceiverId": 7, "DonationCount": 5000, "TotalAmount": 123456.5, "LastDonationId": 9000})))
+    listen[0]._server.send(b"x")
+    listen[0].notify(7, 9001)
+
+    assert await next_event(events) == (b'event: donations\ndata: '
+                                        b'{"DonationCount":5000,"TotalAmount":123456.5,"LastDonationId":9000}\n\n')
+    assert parse(await next_event(events))["id"] == 9001
+    await events.aclose()
+
+
+@pytest.mark.anyio
+async def test_heartbeat_when_idle(listen):
+    helper = DonationFeedHelper()
+    helper.HeartbeatInterval = 0.01
+    events = await helper.StreamAsync(7)
+    await next_event(events)
+
+    assert await next_event(events) == b": keep-alive\n\n"
+    await events.aclose()
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_is_disconnected(listen):
+    helper = DonationFeedHelper()
+    helper.SubscriberQueueSize = 2
+    events = await helper.StreamAsync(7)
+    await next_event(events)
+
+    for donation_id in range(1, 5):
+        listen[0].notify(7, donation_id)
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(StopAsyncIteration):
+        await next_event(events)
+    assert helper.Feed().Subscribers() == 0
+
+
+@pytest.mark.anyio
+async def test_lost_connection_ends_streams_and_reconnects_on_next_subscribe(listen):
+    helper = DonationFeedHelper()
+    events = await helper.StreamAsync(7)
+    await next_event(events)
+
+    listen[0].drop()
+    with pytest.raises(StopAsyncIteration):
+        await next_event(events)
+    assert listen[0].closed == 1
+
+    again = await helper.StreamAsync(7)
+    await next_event(again)
+    assert len(listen) == 2
+    await again.aclose()
+
+
+@pytest.mark.anyio
+async def test_listen_failure_returns_503(monkeypatch):
+    async def open_listen(self):
+        raise pg.OperationalError("connection refused")
+
+    monkeypatch.setattr(DonationFeedHelper, "OpenListenConnectionAsync", open_listen)
+
+    with pytest.raises(HTTPException) as error:
+        await DonationFeedHelper().StreamAsync(7)
+    assert error.value.status_code == 503
+
+
+@pytest.mark.anyio
+async def test_close_feeds_ends_every_stream(listen):
+    events = await DonationFeedHelper().StreamAsync(7)
+    await next_event(events)
+
+    DonationFeedHelper.CloseFeeds()
+
+    with pytest.raises(StopAsyncIteration):
+        await next_event(events)
+    assert listen[0].closed == 1
+
+
+# ===================== /receiver/donations/stream =====================
+
+
+def test_stream_route_requires_receiver():
+    app = FastAPI()
+    app.include_router(ReceiverController.router)
+    app.dependency_overrides[get_current_user_from_token] = lambda: type(
+        "User", (), {"UserId": 7, "KindOfUser": "doador"})()
+
+    response = TestClient(app).get("/receiver/donations/stream")
+
+    assert response.status_code == 403
+
+
+def test_stream_route_returns_event_stream(monkeypatch):
+    calls = []
+
+    async def fake_stream(self, receiver_id, last_event_id=None):
+        calls.append((receiver_id, last_event_id))
+
+        async def events():
+            yield b"retry: 3000\n\n"
+
+        return events()
+
+    monkeypatch.setattr(DonationFeedHelper, "StreamAsync", fake_stream)
+
+    app = FastAPI()
+    app.include_router(ReceiverController.router)
+    app.dependency_overrides[get_current_user_from_token] = lambda: type(
+        "User", (), {"UserId": 7, "KindOfUser": "receptor"})()
+
+    response = TestClient(app).get("/receiver/donations/stream", headers={"Last-Event-ID": "40"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.text == "retry: 3000\n\n"
+    assert calls == [(7, 40)]
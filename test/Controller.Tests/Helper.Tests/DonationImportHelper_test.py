@@ -0,0 +1,278 @@
+import csv
+import io
+import json
+
+import psycopg2 as pg
+import pytest
+from fastapi import HTTPException
+
+from src.Helper.DeadlineHelper import DeadlineHelper, deadline_scope
+from src.Helper import DonationImportHelper as import_module
+from src.Helper.DonationImportHelper import DonationImportHelper
+
+
+# A leitura do corpo em streaming usa o event loop do asyncio
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_deadlines():
+    DeadlineHelper.Reset()
+    yield
+    DeadlineHelper.Reset()
+
+
+# ===================== Fakes de conexão síncrona =====================
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self._connection = connection
+
+    def execute(self, query, params=None):
+        if self._connection.fail_on and self._connection.fail_on in query:
+            raise self._connection.error
+        self._connection.executed.append(query)
+
+    def copy_expert(self, sql, file):
+        self._connection.executed.append(sql)
+        self._connection.copied.extend(csv.reader(io.StringIO(file.read())))
+
+    def fetchall(self):
+        # Resultado do merge: linhas recusadas (linha, doador_ok, causa_ok)
+        return self._connection.rejected
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rejected=None):
+        self.executed = []
+        self.copied = []
+        self.rejected = rejected or []
+        self.fail_on = None
+        self.error = None
+        self.committed = 0
+        self.rolled_back = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed += 1
+
+    def rollback(self):
+        self.rolled_back += 1
+
+
+def make_helper(connection, batch_size=5000):
+    helper = DonationImportHelper()
+    helper.BatchSize = batch_size
+    helper.released = []
+    helper.Connection = lambda: connection
+    helper.CloseConnection = lambda conn: helper.released.append(conn)
+    return helper
+
+
+CSV_BODY = (
+    "DonorId,ReceiverId,Amount,Date,Message\n"
+    "1,10,25.50,2024-05-01T10:00:00,Obrigado\n"
+    "2,10,abc,2024-05-01T10:00:00,\n"
+    "3,11,5,2024-05-02,\n"
+    "4,11,0,2024-05-02,\n"
+    "5,11,7,ontem,\n"
+)
+
+
+# ===================== Validação =====================
+
+
+def test_validate_batch_reports_each_invalid_row():
+    helper = DonationImportHelper()
+    records = list(helper.Records(io.StringIO(CSV_BODY), "csv"))
+
+    rows, errors = helper.ValidateBatch(records)
+
+    assert [row[0] for row in rows] == [2, 4]
+    assert rows[0] == (2, 1, 10, 25.5, "Obrigado", "2024-05-01T10:00:00")
+    assert rows[1][4] is None
+    assert [line for line, _ in errors] == [3, 5, 6]
+    assert errors[0][1].startswith("Amount:")
+    assert errors[1][1].startswith("Amount:")
+    assert errors[2][1] == "Date: invalid ISO 8601 date"
+
+
+def test_amount_is_checked_after_rounding_to_cents():
+    helper = DonationImportHelper()
+    body = ("DonorId,ReceiverId,Amount,Date\n"
+            "1,10,9999999999.99,2024-05-01\n"
+            "1,10,9999999999.995,2024-05-01\n"
+            "1,10,9999999999.999,2024-05-01\n"
+            "1,10,0.004,2024-05-01\n"
+            "1,10,0.005,2024-05-01\n")
+
+    rows, errors = helper.ValidateBatch(list(helper.Records(io.StringIO(body), "csv")))
+
+    # Arredondados, 9999999999.995+ e 0.004 não cabem em NUMERIC(12, 2) > 0
+    assert [row[0] for row in rows] == [2, 6]
+    assert [line for line, _ in errors] == [3, 4, 5]
+    assert all(error.startswith("Amount:") for _, error in errors)
+
+
+def test_ndjson_reader_reports_invalid_json_lines():
+    helper = DonationImportHelper()
+    body = "\n".join([
+        json.dumps({"DonorId": 1, "ReceiverId": 10, "Amount": 3, "Date": "2024-05-01", "Message": None}),
+        "",
+        "{quebrado",
+        "[1, 2]",
+        json.dumps({"ReceiverId": 10, "Amount": 3, "Date": "2024-05-01"}),
+    ])
+
+    rows, errors = helper.ValidateBatch(list(helper.Records(io.StringIO(body), "ndjson")))
+
+    assert [row[0] for row in rows] == [1]
+    assert [line for line, _ in errors] == [3, 4, 5]
+    assert errors[0][1].startswith("Invalid JSON")
+    assert errors[2][1].startswith("DonorId:")
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        DonationImportHelper().Records(io.StringIO(""), "xml")
+    assert error.value.status_code == 400
+
+
+# ===================== Carga =====================
+
+
+def test_import_copies_batches_and_merges_once():
+    connection = FakeConnection(rejected=[(4, True, False)])
+    helper = make_helper(connection, batch_size=2)
+
+    result = helper.ImportDonations(io.StringIO(CSV_BODY), "csv")
+
+    copies = [query for query in connection.executed if query.startswith("COPY")]
+    assert len(copies) == 2
+    assert [row[0] for row in connection.copied] == ["2", "4"]
+    assert connection.executed[0] == import_module.CREATE_STAGING_TABLE_QUERY
+    assert connection.executed[-1] == import_module.MERGE_STAGING_QUERY
+    assert connection.committed == 1
+    assert helper.released == [connection]
+
+    assert result.Received == 5
+    assert result.Inserted == 1
+    assert result.Rejected == 4
+    assert [error.Line for error in result.Errors] == [3, 4, 5, 6]
+    assert result.Errors[1].Error == "ReceiverId: not an active receiver"
+
+
+def test_merge_reports_every_invalid_reference():
+    connection = FakeConnection(rejected=[(2, False, False), (4, False, True)])
+    helper = make_helper(connection)
+
+    result = helper.ImportDonations(io.StringIO(CSV_BODY), "csv")
+
+    errors = {error.Line: error.Error for error in result.Errors}
+    assert errors[2] == "DonorId: not an active donor; ReceiverId: not an active receiver"
+    assert errors[4] == "DonorId: not an active donor"
+
+
+async def chunked(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.anyio
+async def test_import_stream_reads_body_in_pieces():
+    connection = FakeConnection()
+    helper = make_helper(connection)
+    body = ("\ufeffDonorId,ReceiverId,Amount,Date,Message\r\n"
+            '1,10,25.50,2024-05-01,"Muito\nobrigado, ação"\r\n'
+            "3,11,5,2024-05-02,\r\n").encode()
+    # Pedaços cortando linhas e um caractere de dois bytes ao meio
+    cut = body.index("ç".encode()) + 1
+    pieces = [body[:7], body[7:40], body[40:cut], body[cut:]]
+
+    result = await helper.ImportStreamAsync(chunked(*pieces), "csv")
+
+    assert result.Received == 2
+    assert result.Rejected == 0
+    # Registro com quebra de linha entre aspas: vale a última linha física (csv.reader.line_num)
+    assert [row[0] for row in connection.copied] == ["3", "4"]
+    assert connection.copied[0][4] == "Muito\nobrigado, ação"
+
+
+@pytest.mark.anyio
+async def test_import_stream_rejects_invalid_utf8():
+    connection = FakeConnection()
+    helper = make_helper(connection)
+
+    with pytest.raises(HTTPException) as error:
+        await helper.ImportStreamAsync(chunked(b"DonorId,ReceiverId\n", b"\xff\xfe\n"), "csv")
+
+    assert error.value.status_code == 400
+    assert connection.committed == 0
+
+
+def test_import_without_valid_rows_skips_merge():
+    connection = FakeConnection()
+    helper = make_helper(connection)
+
+    result = helper.ImportDonations(io.StringIO("DonorId,ReceiverId,Amount,Date\nx,1,1,2024-01-01\n"), "csv")
+
+    assert import_module.MERGE_STAGING_QUERY not in connection.executed
+    assert result.Inserted == 0
+    assert result.Rejected == 1
+
+
+def test_reported_errors_are_capped_but_counted():
+    connection = FakeConnection()
+    helper = make_helper(connection)
+    helper.MaxReportedErrors = 2
+    body = "DonorId,ReceiverId,Amount,Date\n" + "x,1,1,2024-01-01\n" * 5
+
+    result = helper.ImportDonations(io.StringIO(body), "csv")
+
+    assert result.Rejected == 5
+    assert len(result.Errors) == 2
+
+
+def test_database_error_rolls_back_everything():
+    connection = FakeConnection()
+    connection.fail_on = "WITH conferidas"
+    connection.error = pg.OperationalError("server closed the connection")
+    helper = make_helper(connection)
+
+    with pytest.raises(HTTPException) as error:
+        helper.ImportDonations(io.StringIO(CSV_BODY), "csv")
+
+    assert error.value.status_code == 500
+    assert connection.rolled_back == 1
+    assert connection.committed == 0
+    assert helper.released == [connection]
+
+
+def test_import_applies_request_deadline():
+    connection = FakeConnection()
+    helper = make_helper(connection)
+
+    with deadline_scope(30):
+        helper.ImportDonations(io.StringIO(CSV_BODY), "csv")
+
+    assert connection.executed[0] == "SET statement_timeout = 30000"
+
+
+def test_expired_deadline_stops_import():
+    connection = FakeConnection()
+    helper = make_helper(connection)
+
+    with deadline_scope(0):
+        with pytest.raises(HTTPException) as error:
+            helper.ImportDonations(io.StringIO(CSV_BODY), "csv")
+
+    assert error.value.status_code == 504
+    assert connection.rolled_back == 1
@@ -0,0 +1,201 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.Controller.ReceiverController import ReceiverController
+from src.Helper import DonationStatsHelper as stats_module
+from src.Helper.DonationStatsHelper import DonationStatsHelper, bucket_start, next_bucket, previous_bucket
+from src.Helper.SecurityHelper import get_current_user_from_token
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    DonationStatsHelper.Reset()
+    yield
+    DonationStatsHelper.Reset()
+
+
+class FakeDonations:
+    """Simula o GROUP BY date_trunc: devolve os períodos com doação dentro do intervalo pedido."""
+
+    def __init__(self, totals: dict):
+        self.totals = totals
+        self.calls = []
+
+    def install(self, monkeypatch):
+        donations = self
+
+        async def fetch_all(self, query, params=None):
+            assert query == stats_module.DONATION_STATS_QUERY
+            donations.calls.append(params)
+            _, _, start, end = params
+            return [(datetime.combine(period, datetime.min.time()), count, total)
+                    for period, (count, total) in sorted(donations.totals.items()) if start <= period < end]
+
+        monkeypatch.setattr(DonationStatsHelper, "FetchAllAsync", fetch_all)
+        return self
+
+
+def make_helper() -> DonationStatsHelper:
+    helper = DonationStatsHelper()
+    # Sem folga: o dia de ontem já conta como fechado, mesmo logo depois da meia-noite
+    helper.SettleTime = timedelta(0)
+    return helper
+
+
+# ===================== Períodos =====================
+
+
+def test_bucket_boundaries():
+    day = date(2024, 2, 14)  # quarta-feira
+
+    assert bucket_start("day", day) == day
+    assert bucket_start("week", day) == date(2024, 2, 12)
+    assert bucket_start("month", day) == date(2024, 2, 1)
+    assert next_bucket("month", date(2024, 1, 1)) == date(2024, 2, 1)
+    assert next_bucket("month", date(2024, 12, 1)) == date(2025, 1, 1)
+    assert previous_bucket("month", date(2024, 3, 1)) == date(2024, 2, 1)
+    assert next_bucket("week", date(2024, 2, 12)) == date(2024, 2, 19)
+
+
+# ===================== GetStatsAsync =====================
+
+
+@pytest.mark.anyio
+async def test_aggregates_buckets_and_fills_empty_periods(monkeypatch):
+    donations = FakeDonations({
+        date(2024, 5, 1): (2, Decimal("30.00")),
+        date(2024, 5, 3): (1, Decimal("10.00")),
+    }).install(monkeypatch)
+
+    stats = await make_helper().GetStatsAsync(7, "day", date(2024, 5, 1), date(2024, 5, 3))
+
+    assert donations.calls == [("day", 7, date(2024, 5, 1), date(2024, 5, 4))]
+    assert stats == {
+        "Bucket": "day", "From": "2024-05-01", "To": "2024-05-03",
+        "Count": 3, "Total": 40.0, "Average": 13.33, "AveragePerBucket": 13.33,
+        "Buckets": [
+            {"Start": "2024-05-01", "Count": 2, "Total": 30.0, "Average": 15.0},
+            {"Start": "2024-05-02", "Count": 0, "Total": 0.0, "Average": None},
+            {"Start": "2024-05-03", "Count": 1, "Total": 10.0, "Average": 10.0},
+        ],
+    }
+
+
+@pytest.mark.anyio
+async def test_month_range_covers_whole_periods(monkeypatch):
+    donations = FakeDonations({date(2024, 1, 1): (4, Decimal("100"))}).install(monkeypatch)
+
+    stats = await make_helper().GetStatsAsync(7, "month", date(2024, 1, 15), date(2024, 2, 10))
+
+    assert donations.calls == [("month", 7, date(2024, 1, 1), date(2024, 3, 1))]
+    assert stats["From"] == "2024-01-01"
+    assert stats["To"] == "2024-02-29"
+    assert [b["Count"] for b in stats["Buckets"]] == [4, 0]
+
+
+@pytest.mark.anyio
+async def test_closed_periods_come_from_memory(monkeypatch):
+    donations = FakeDonations({date(2024, 5, 1): (2, Decimal("30.00"))}).install(monkeypatch)
+    helper = make_helper()
+
+    first = await helper.GetStatsAsync(7, "day", date(2024, 5, 1), date(2024, 5, 3))
+    second = await helper.GetStatsAsync(7, "day", date(2024, 5, 1), date(2024, 5, 3))
+
+    assert first == second
+    assert len(donations.calls) == 1
+    # Cache separado por receptor
+    await helper.GetStatsAsync(8, "day", date(2024, 5, 1), date(2024, 5, 3))
+    assert len(donations.calls) == 2
+
+
+@pytest.mark.anyio
+async def test_only_the_current_period_is_recomputed(monkeypatch):
+    today = datetime.now().date()
+    donations = FakeDonations({today - timedelta(days=1): (1, Decimal("5")), today: (1, Decimal("7"))})
+    donations.install(monkeypatch)
+    helper = make_helper()
+
+    await helper.GetStatsAsync(7, "day", today - timedelta(days=2), today)
+    donations.totals[today] = (2, Decimal("12"))
+    stats = await helper.GetStatsAsync(7, "day", today - timedelta(days=2), today)
+
+    assert donations.calls[1] == ("day", 7, today, today + timedelta(days=1))
+    assert [b["Count"] for b in stats["Buckets"]] == [0, 1, 2]
+    assert stats["Total"] == 17.0
+
+
+@pytest.mark.anyio
+async def test_expired_cache_goes_back_to_database(monkeypatch):
+    donations = FakeDonations({}).install(monkeypatch)
+    helper = make_helper()
+    helper.CacheTtl = -1
+
+    await helper.GetStatsAsync(7, "week", date(2024, 5, 6), date(2024, 5, 12))
+    await helper.GetStatsAsync(7, "week", date(2024, 5, 6), date(2024, 5, 12))
+
+    assert len(donations.calls) == 2
+
+
+@pytest.mark.anyio
+async def test_default_range_ends_today(monkeypatch):
+    donations = FakeDonations({}).install(monkeypatch)
+    helper = make_helper()
+    helper.DefaultBuckets = 3
+
+    stats = await helper.GetStatsAsync(7, "day")
+
+    today = datetime.now().date()
+    assert stats["From"] == (today - timedelta(days=2)).isoformat()
+    assert stats["To"] == today.isoformat()
+    assert stats["Average"] is None
+    assert len(donations.calls) == 1
+
+
+@pytest.mark.anyio
+async def test_invalid_ranges_are_rejected():
+    helper = make_helper()
+
+    with pytest.raises(HTTPException) as reversed_range:
+        await helper.GetStatsAsync(7, "day", date(2024, 5, 3), date(2024, 5, 1))
+    with pytest.raises(HTTPException) as too_large:
+        await helper.GetStatsAsync(7, "day", date(2020, 1, 1), date(2024, 1, 1))
+    with pytest.raises(HTTPException) as bad_bucket:
+        await helper.GetStatsAsync(7, "year", date(2024, 1, 1), date(2024, 1, 1))
+
+    assert reversed_range.value.status_code == too_large.value.status_code == bad_bucket.value.status_code == 400
+
+
+# ===================== /receiver/stats =====================
+
+
+def make_client(kind_of_user: str) -> TestClient:
+    app = FastAPI()
+    app.include_router(ReceiverController.router)
+    app.dependency_overrides[get_current_user_from_token] = lambda: type(
+        "User", (), {"UserId": 7, "KindOfUser": kind_of_user})()
+    return TestClient(app)
+
+
+def test_stats_route_passes_range_to_helper(monkeypatch):
+    calls = []
+
+    async def fake_stats(self, receiver_id, bucket, start=None, end=None):
+        calls.append((receiver_id, bucket, start, end))
+        return {"Bucket": bucket, "Buckets": []}
+
+    monkeypatch.setattr(DonationStatsHelper, "GetStatsAsync", fake_stats)
+
+    response = make_client("receptor").get("/receiver/stats?bucket=week&from=2024-05-01&to=2024-05-31")
+
+    assert response.status_code == 200
+    assert response.json() == {"Bucket": "week", "Buckets": []}
+    assert calls == [(7, "week", date(2024, 5, 1), date(2024, 5, 31))]
+
+
+def test_stats_route_validates_bucket_and_user():
+    assert make_client("receptor").get("/receiver/stats?bucket=year").status_code == 422
+    assert make_client("doador").get("/receiver/stats").status_code == 403
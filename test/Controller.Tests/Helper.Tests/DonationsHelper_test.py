@@ -277,3 +277,140 @@ def test_add_donations_db_error(monkeypatch):
     assert connection.committed is False
     assert cursor.closed is True
     assert connection.closed is True
+
+
+# =========================
+# versões assíncronas
+# =========================
+
+@pytest.mark.anyio
+async def test_list_donations_received_async_maps_rows(monkeypatch):
+    rows = [(10, "Doador A", "Receptor A", 300.0, "Msg A", "2024-03-05")]
+    captured = {}
+
+    async def fake_fetch_all(self, query, params=None):
+        captured["params"] = params
+        return rows
+
+    monkeypatch.setattr(DonationsHelper, "FetchAllAsync", fake_fetch_all)
+
+    result = await DonationsHelper().list_donations_received_async(99)
+
+    # Dono da lista + LIMIT (tamanho da página + 1)
+    assert captured["params"] == (99, 51)
+    assert len(result.Items) == 1
+    assert isinstance(result.Items[0], ListDonationModel)
+    assert result.Items[0].DonorName == "Doador A"
+    assert result.NextCursor is None
+
+
+@pytest.mark.anyio
+async def test_list_donations_by_user_async_pages_by_donation_id(monkeypatch):
+    rows = [
+        (30, "Doador A", "Receptor A", 10.0, "", "2024-03-05"),
+        (20, "Doador A", "Receptor B", 20.0, "", "2024-03-04"),
+        (10, "Doador A", "Receptor C", 30.0, "", "2024-03-03"),
+    ]
+    captured = []
+
+    async def fake_fetch_all(self, query, params=None):
+        captured.append((query, params))
+        limit = params[-1]
+        after = params[1] if len(params) == 3 else None
+        remaining = [r for r in rows if after is None or r[0] < after]
+        return remaining[:limit]
+
+    monkeypatch.setattr(DonationsHelper, "FetchAllAsync", fake_fetch_all)
+    helper = DonationsHelper()
+
+    first = await helper.list_donations_by_user_async(7, limit=2)
+    second = await helper.list_donations_by_user_async(7, limit=2, after=first.NextCursor)
+
+    assert [d.DonationId for d in first.Items] == [30, 20]
+    assert [d.DonationId for d in second.Items] == [10]
+    assert second.NextCursor is None
+    assert "ORDER BY d.id_doacao DESC" in captured[0][0]
+    assert "(d.id_doacao) < (%s)" in captured[1][0]
+    assert captured[1][1] == (7, 20, 3)
+
+
+@pytest.mark.anyio
+async def test_add_donations_async_wraps_db_error(monkeypatch):
+    async def fake_execute(self, query, params=None):
+        raise Exception("DB error in execute")
+
+    monkeypatch.setattr(DonationsHelper, "ExecuteAsync", fake_execute)
+
+    donation_info = DonationModel(
+        DonorId=10,
+        ReceiverId=20,
+        Amount=150.0,
+        Message="Ajuda",
+        Date="2024-01-10",
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await DonationsHelper().add_donations_async(donation_info)
+
+    assert exc_info.value.status_code == 500
+    assert "DB error in execute" in exc_info.value.detail
+
+
+@pytest.mark.anyio
+async def test_add_donations_batch_async_validates_once_and_inserts_once(monkeypatch):
+    captured = []
+
+    async def fake_fetch_all(self, query, params=None):
+        captured.append((query, params))
+        if len(captured) == 1:
+            return [(20,), (30,)]
+        return [(102,), (101,), (103,)]
+
+    monkeypatch.setattr(DonationsHelper, "FetchAllAsync", fake_fetch_all)
+
+    donations = [
+        DonationModel(DonorId=10, ReceiverId=30, Amount=5.0, Date="2024-01-10"),
+        DonationModel(DonorId=10, ReceiverId=20, Amount=7.5, Message="Ajuda", Date="2024-01-11"),
+        DonationModel(DonorId=10, ReceiverId=30, Amount=9.0, Date="2024-01-12"),
+    ]
+
+    ids = await DonationsHelper().add_donations_batch_async(donations)
+
+    assert ids == [101, 102, 103]
+    assert len(captured) == 2
+    assert captured[0][1] == ([20, 30],)
+    # Uma lista por coluna, na ordem das doações
+    assert captured[1][1] == (
+        [10, 10, 10],
+        [30, 20, 30],
+        [5.0, 7.5, 9.0],
+        [None, "Ajuda", None],
+        ["2024-01-10", "2024-01-11", "2024-01-12"],
+    )
+    assert "unnest" in captured[1][0]
+    # Texto fixo para qualquer tamanho de lote: um único prepared statement
+    assert captured[1][0].Name.startswith("add_donations_batch_")
+
+
+@pytest.mark.anyio
+async def test_add_donations_batch_async_rejects_invalid_receivers(monkeypatch):
+    captured = []
+
+    async def fake_fetch_all(self, query, params=None):
+        captured.append(query)
+        return [(20,)]
+
+    monkeypatch.setattr(DonationsHelper, "FetchAllAsync", fake_fetch_all)
+
+    donations = [
+        DonationModel(DonorId=10, ReceiverId=20, Amount=5.0, Date="2024-01-10"),
+        DonationModel(DonorId=10, ReceiverId=99, Amount=5.0, Date="2024-01-10"),
+    ]
+
+    with pytest.raises(HTTPException) as exc_info:
+        await DonationsHelper().add_donations_batch_async(donations)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Invalid receiver ids: [99]"
+    # Nada é inserido quando algum receptor é inválido
+    assert len(captured) == 1
@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from src.Helper.ExecutorHelper import BoundedExecutor, ExecutorHelper, ExecutorSaturatedError
+
+
+# As threads são entregues ao event loop do asyncio
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_executors():
+    ExecutorHelper.ShutdownExecutors()
+    yield
+    ExecutorHelper.ShutdownExecutors()
+
+
+@pytest.mark.anyio
+async def test_run_executes_in_worker_thread():
+    executor = BoundedExecutor("reads", max_workers=1, max_queue=10)
+
+    name = await executor.run(lambda: threading.current_thread().name)
+
+    assert name.startswith("reads-worker")
+    assert executor.stats() == {"max_workers": 1, "active": 0, "queued": 0, "completed": 1, "rejected": 0}
+    executor.shutdown(wait=True)
+
+
+def test_submit_rejects_when_queue_is_full():
+    executor = BoundedExecutor("http", max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    running = executor.submit(blocking)
+    started.wait(5)
+    waiting = executor.submit(blocking)
+
+    assert executor.stats()["active"] == 1
+    assert executor.stats()["queued"] == 1
+    with pytest.raises(ExecutorSaturatedError):
+        executor.submit(blocking)
+    assert executor.stats()["rejected"] == 1
+
+    release.set()
+    running.result(5)
+    waiting.result(5)
+    assert executor.stats()["completed"] == 2
+    executor.shutdown(wait=True)
+
+
+def test_cancelled_task_leaves_the_queue():
+    executor = BoundedExecutor("writes", max_workers=1, max_queue=5)
+    release = threading.Event()
+
+    running = executor.submit(release.wait, 5)
+    waiting = executor.submit(lambda: None)
+
+    assert waiting.cancel()
+    assert executor.stats()["queued"] == 0
+
+    release.set()
+    running.result(5)
+    executor.shutdown(wait=True)
+
+
+@pytest.mark.anyio
+async def test_helper_keeps_one_executor_per_subsystem():
+    helper = ExecutorHelper()
+
+    assert helper.Executor("auth") is helper.Executor("auth")
+    assert helper.Executor("auth") is not helper.Executor("reads")
+    assert await helper.RunAsync("auth", lambda x, y: x + y, 1, y=2) == 3
+    assert helper.Stats()["auth"]["completed"] == 1
+
+    with pytest.raises(ValueError):
+        helper.Executor("unknown")
+
+
+@pytest.mark.anyio
+async def test_helper_turns_saturation_into_503(monkeypatch):
+    def saturated(self, func, *args, **kwargs):
+        raise ExecutorSaturatedError("full")
+
+    monkeypatch.setattr(BoundedExecutor, "submit", saturated)
+
+    with pytest.raises(HTTPException) as exc:
+        await ExecutorHelper().RunAsync("http", lambda: None)
+
+    assert exc.value.status_code == 503
@@ -357,3 +357,62 @@ def test_list_favorites_generic_db_error(monkeypatch):
     assert err.status_code == 500
     assert "Error listing favorites" in err.detail
     assert connection.closed is True
+
+
+# ==========================
+# Versões async (um comando só)
+# ==========================
+
+def patch_fetch_one(monkeypatch, result):
+    executed = []
+
+    async def fake_fetch_one(self, query, params=None):
+        executed.append((query, params))
+        return result
+
+    monkeypatch.setattr(FavoriteHelper, "FetchOneAsync", fake_fetch_one)
+    return executed
+
+
+@pytest.mark.anyio
+async def test_add_favorite_async_inserts_with_on_conflict(monkeypatch):
+    executed = patch_fetch_one(monkeypatch, (5,))
+
+    result = await FavoriteHelper().add_favorite_async(AddFavoriteModel(CauseId=123, UserId=10))
+
+    assert result["message"] == "Cause with ID 123 favorited successfully"
+    assert len(executed) == 1
+    assert "ON CONFLICT (id_usuario, id_causa) DO NOTHING" in executed[0][0]
+    assert executed[0][1][:2] == (10, 123)
+
+
+@pytest.mark.anyio
+async def test_add_favorite_async_conflict_returns_409(monkeypatch):
+    patch_fetch_one(monkeypatch, None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await FavoriteHelper().add_favorite_async(AddFavoriteModel(CauseId=123, UserId=10))
+
+    assert exc_info.value.status_code == 409
+    assert exc_info.value.detail == "Cause already favorited"
+
+
+@pytest.mark.anyio
+async def test_remove_favorite_async_uses_delete_returning(monkeypatch):
+    executed = patch_fetch_one(monkeypatch, (7,))
+
+    result = await FavoriteHelper().remove_favorite_async(7)
+
+    assert result["message"] == "Favorite with ID 7 removed successfully"
+    assert executed == [("DELETE FROM favoritos WHERE id_favorito = %s RETURNING id_favorito", (7,))]
+
+
+@pytest.mark.anyio
+async def test_remove_favorite_async_not_found_returns_404(monkeypatch):
+    patch_fetch_one(monkeypatch, None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await FavoriteHelper().remove_favorite_async(7)
+
+    assert exc_info.value.status_code == 404
+    assert exc_info.value.detail == "Favorite not found"
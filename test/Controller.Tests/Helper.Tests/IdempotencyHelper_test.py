@@ -0,0 +1,271 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.Controller.DonatorController import DonatorController
+from src.Helper import IdempotencyHelper as idempotency_module
+from src.Helper.IdempotencyHelper import IdempotencyHelper, request_fingerprint
+from src.Helper.SecurityHelper import get_current_user_from_token
+from src.Helper.UnitOfWorkHelper import current_unit, unit_of_work
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    IdempotencyHelper.Reset()
+    yield
+    IdempotencyHelper.Reset()
+
+
+class FakeKeyTable:
+    """
+    Tabela chaves_idempotencia em memória. As escritas só valem depois do COMMIT
+    da unidade de trabalho, como no banco.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.pending = {}
+        self.queries = []
+        # Chaves vencidas ainda no banco e a unidade de trabalho de cada limpeza
+        self.expired = 0
+        self.purge_units = []
+
+    def install(self, monkeypatch):
+        table = self
+
+        async def fetch_one(self, query, params=None):
+            table.queries.append(query)
+            if query == idempotency_module.CLAIM_KEY_QUERY:
+                user_id, key, route, fingerprint, _ = params
+                if (user_id, key) in table.rows:
+                    return None
+                table.pending[(user_id, key)] = [route, fingerprint, None]
+                return (1,)
+            if query == idempotency_module.STORED_RESPONSE_QUERY:
+                row = table.rows.get(params)
+                return tuple(row) if row else None
+            raise AssertionError(query)
+
+        async def execute(self, query, params=None):
+            table.queries.append(query)
+            if query == idempotency_module.PURGE_EXPIRED_KEYS_QUERY:
+                table.purge_units.append(current_unit())
+                deleted = min(table.expired, params[1])
+                table.expired -= deleted
+                return deleted
+            response, user_id, key = params
+            table.pending[(user_id, key)][2] = json.loads(response)
+
+        monkeypatch.setattr(IdempotencyHelper, "FetchOneAsync", fetch_one)
+        monkeypatch.setattr(IdempotencyHelper, "ExecuteAsync", execute)
+        return table
+
+    def commit(self):
+        self.rows.update(self.pending)
+        self.pending = {}
+
+
+async def run_in_unit(table, body):
+    dependency = unit_of_work()
+    await dependency.__anext__()
+    try:
+        result = await body()
+    except BaseException as e:
+        table.pending = {}
+        with pytest.raises(type(e)):
+            await dependency.athrow(e)
+        raise
+    table.commit()
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+    return result
+
+
+class Action:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    async def __call__(self):
+        self.calls += 1
+        if self.fail:
+            raise HTTPException(status_code=500, detail="insert failed")
+        return {"message": "ok", "DonationIds": [self.calls]}
+
+
+# ===================== RunOnceAsync =====================
+
+
+@pytest.mark.anyio
+async def test_retry_returns_original_response_without_running_again(monkeypatch):
+    table = FakeKeyTable().install(monkeypatch)
+    action = Action()
+    helper = IdempotencyHelper()
+
+    first = await run_in_unit(table, lambda: helper.RunOnceAsync(1, "add_donation", "k1", {"a": 1}, action))
+    second = await run_in_unit(table, lambda: helper.RunOnceAsync(1, "add_donation", "k1", {"a": 1}, action))
+
+    assert first == second == {"message": "ok", "DonationIds": [1]}
+    assert action.calls == 1
+    # A repetição foi resolvida pelo cache, sem consultar a tabela
+    assert table.queries.count(idempotency_module.CLAIM_KEY_QUERY) == 1
+
+
+@pytest.mark.anyio
+async def test_retry_in_another_process_reads_stored_response(monkeypatch):
+    table = FakeKeyTable().install(monkeypatch)
+    action = Action()
+    helper = IdempotencyHelper()
+
+    await run_in_unit(table, lambda: helper.RunOnceAsync(1, "add_donation", "k1", {"a": 1}, action))
+    IdempotencyHelper.Reset()
+    replay = await run_in_unit(table, lambda: helper.RunOnceAsync(1, "add_donation", "k1", {"a": 1}, action))
+
+    assert replay == {"message": "ok", "DonationIds": [1]}
+    assert action.calls == 1
+    assert helper.Cached(1, "k1") is not None
+
+
+@pytest.mark.anyio
+async def test_failed_request_releases_the_key(monkeypatch):
+    table = FakeKeyTable().install(monkeypatch)
+    helper = IdempotencyHelper()
+
+    with pytest.raises(HTTPException):
+        await run_in_unit(table, lambda: helper.RunOnceAsync(1, "add_donation", "k1", {"a": 1}, Action(fail=True)))
+
+    action = Action()
+    result = await run_in_unit(table, lambda: helper.RunOnceAsync(1, "add_donation", "k1", {"a": 1}, action))
+
+    assert action.calls == 1
+    assert result["DonationIds"] == [1]
+    assert helper.Cached(1, "k1") is not None
+
+
+@pytest.mark.anyio
+async def test_key_reused_with_different_payload_is_rejected(monkeypatch):
+    table = FakeKeyTable().install(monkeypatch)
+    helper = IdempotencyHelper()
+
+    await run_in_unit(table, lambda: helper.RunOnceAsync(1, "add_donation", "k1", {"a": 1}, Action()))
+
+    with pytest.raises(HTTPException) as error:
+        await run_in_unit(table, lambda: helper.RunOnceAsync(1, "add_donation", "k1", {"a": 2}, Action()))
+    assert error.value.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_keys_are_scoped_per_user(monkeypatch):
+    table = FakeKeyTable().install(monkeypatch)
+    action = Action()
+    helper = IdempotencyHelper()
+
+    await run_in_unit(table, lambda: helper.RunOnceAsync(1, "add_donation", "k1", {"a": 1}, action))
+    await run_in_unit(table, lambda: helper.RunOnceAsync(2, "add_donation", "k1", {"a": 1}, action))
+
+    assert action.calls == 2
+
+
+@pytest.mark.anyio
+async def test_without_key_the_action_always_runs():
+    action = Action()
+
+    await IdempotencyHelper().RunOnceAsync(1, "add_donation", None, {"a": 1}, action)
+    await IdempotencyHelper().RunOnceAsync(1, "add_donation", None, {"a": 1}, action)
+
+    assert action.calls == 2
+
+
+@pytest.mark.anyio
+async def test_key_requires_unit_of_work():
+    with pytest.raises(RuntimeError):
+        await IdempotencyHelper().RunOnceAsync(1, "add_donation", "k1", {"a": 1}, Action())
+
+
+def test_memory_cache_is_bounded_and_expires(monkeypatch):
+    helper = IdempotencyHelper()
+    helper.MemoryCacheSize = 2
+    for key in ("a", "b", "c"):
+        helper._Remember(1, key, "add_donation", "hash", {"key": key})
+
+    assert helper.Cached(1, "a") is None
+    assert helper.Cached(1, "c")[2] == {"key": "c"}
+
+    helper.KeyTtl = -1
+    helper._Remember(1, "d", "add_donation", "hash", {})
+    assert helper.Cached(1, "d") is None
+
+
+@pytest.mark.anyio
+async def test_purge_deletes_expired_keys_in_batches(monkeypatch):
+    table = FakeKeyTable().install(monkeypatch)
+    table.expired = 2500
+    helper = IdempotencyHelper()
+    helper.PurgeBatchSize = 1000
+
+    assert await helper.PurgeExpiredAsync() == 2500
+    assert table.expired == 0
+    assert table.queries.count(idempotency_module.PURGE_EXPIRED_KEYS_QUERY) == 3
+
+
+@pytest.mark.anyio
+async def test_new_keys_trigger_purge_once_per_interval_outside_the_unit(monkeypatch):
+    table = FakeKeyTable().install(monkeypatch)
+    table.expired = 10
+    helper = IdempotencyHelper()
+
+    for key in ("k1", "k2", "k3"):
+        await run_in_unit(table, lambda: helper.RunOnceAsync(1, "add_donation", key, {"a": 1}, Action()))
+    await asyncio.sleep(0)
+
+    assert table.expired == 0
+    # Uma limpeza só por intervalo, num comando próprio fora da transação da requisição
+    assert table.purge_units == [None]
+
+
+def test_fingerprint_ignores_key_order():
+    assert request_fingerprint({"a": 1, "b": 2}) == request_fingerprint({"b": 2, "a": 1})
+    assert request_fingerprint({"a": 1}) != request_fingerprint({"a": 2})
+
+
+# ===================== /donator/add_donation =====================
+
+
+def test_add_donation_retry_with_same_key_inserts_once(monkeypatch):
+    table = FakeKeyTable().install(monkeypatch)
+    inserts = []
+
+    class FakeDonationsHelper:
+        async def add_donations_async(self, donation_info):
+            inserts.append(donation_info)
+            return {"message": "Donation efetuated successfully"}
+
+    monkeypatch.setattr("src.Controller.DonatorController.DonationsHelper", FakeDonationsHelper)
+
+    app = FastAPI()
+    app.include_router(DonatorController.router)
+    app.dependency_overrides[get_current_user_from_token] = lambda: type(
+        "User", (), {"UserId": 10, "KindOfUser": "doador"})()
+    client = TestClient(app)
+
+    payload = {"DonorId": 10, "ReceiverId": 1, "Amount": 5.0, "Date": "2024-01-10"}
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = client.post("/donator/add_donation", json=payload, headers=headers)
+    second = client.post("/donator/add_donation", json=payload, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == {"message": "Donation efetuated successfully"}
+    assert len(inserts) == 1
+    assert table.queries.count(idempotency_module.CLAIM_KEY_QUERY) == 1
+
+    too_long = client.post("/donator/add_donation", json=payload, headers={"Idempotency-Key": "x" * 256})
+    assert too_long.status_code == 422
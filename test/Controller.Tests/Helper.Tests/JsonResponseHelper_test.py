@@ -0,0 +1,102 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.Helper import JsonResponseHelper as json_helper
+from src.Helper.JsonResponseHelper import FastJSONResponse, JsonResponseHelper, dumps, resolve_backend
+from src.Model.ListDonationModel import ListDonationModel
+from src.Model.ListReceiversModel import ListReceiversModel
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    backend = JsonResponseHelper.Backend
+    yield
+    JsonResponseHelper.Backend = backend
+
+
+def make_payload():
+    receiver = ListReceiversModel()
+    receiver.UserId = 7
+    receiver.Name = "ONG Ação"
+    receiver.Email = "ong@x.com"
+    receiver.Document = "123"
+    receiver.Address = "85123000"
+    receiver.Description = None
+
+    return {
+        "donation": ListDonationModel(DonationId=1, DonorName="Ana", ReceiverName="ONG",
+                                      Amount=10.5, Message="Obrigado", Date="2024-05-01"),
+        "receiver": receiver,
+        "amounts": [Decimal("10.50"), Decimal("100")],
+        "when": datetime(2024, 5, 1, 10, 30, 15),
+        "day": date(2024, 5, 1),
+        "ids": {3, 1},
+    }
+
+
+EXPECTED = {
+    "donation": {"DonationId": 1, "DonorName": "Ana", "ReceiverName": "ONG",
+                 "Amount": 10.5, "Message": "Obrigado", "Date": "2024-05-01"},
+    "receiver": {"UserId": 7, "Name": "ONG Ação", "Email": "ong@x.com",
+                 "Document": "123", "Address": "85123000", "Description": None},
+    "amounts": [10.5, 100],
+    "when": "2024-05-01T10:30:15",
+    "day": "2024-05-01",
+}
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+def test_backends_encode_project_types(backend):
+    JsonResponseHelper.UseBackend(backend)
+
+    decoded = json.loads(dumps(make_payload()))
+
+    assert sorted(decoded.pop("ids")) == [1, 3]
+    assert decoded == EXPECTED
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_backend("yaml")
+
+
+def test_missing_backend_falls_back_to_available_one(monkeypatch):
+    monkeypatch.setitem(json_helper._BACKENDS, "msgspec", None)
+
+    assert resolve_backend("msgspec") == "orjson"
+
+
+def test_backend_comes_from_environment(monkeypatch):
+    monkeypatch.setenv(json_helper.JSON_BACKEND_ENV, "json")
+
+    assert resolve_backend() == "json"
+
+
+def test_unsupported_object_raises_type_error():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_fast_response_is_the_app_default():
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/payload")
+    async def payload():
+        return {"amount": Decimal("2.50"), "when": datetime(2024, 1, 1)}
+
+    @app.get("/direct")
+    async def direct():
+        return FastJSONResponse(make_payload())
+
+    client = TestClient(app)
+
+    response = client.get("/payload")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"amount": 2.5, "when": "2024-01-01T00:00:00"}
+
+    assert client.get("/direct").json()["receiver"]["Name"] == "ONG Ação"
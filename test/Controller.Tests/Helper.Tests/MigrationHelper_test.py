@@ -0,0 +1,217 @@
+import pytest
+
+from src.Helper.MigrationHelper import INDEX_VALID_QUERY, MIGRATION_LOCK_KEY, MigrationHelper, split_statements
+
+
+# ===================== Fakes de cursor/conexão =====================
+
+
+class FakeCursor:
+    def __init__(self, connection, applied_versions=None, fail_on=None, index_states=None):
+        self._connection = connection
+        self.applied_versions = applied_versions or []
+        self.fail_on = fail_on
+        # índice -> respostas seguidas do pg_index.indisvalid (None = não existe); padrão: válido
+        self.index_states = index_states or {}
+        self._index_checked = None
+        self.closed = False
+
+    def execute(self, query, params=None):
+        if self.fail_on and self.fail_on in query:
+            raise Exception("DB error")
+        if query == INDEX_VALID_QUERY:
+            self._index_checked = params[0]
+        self._connection.executed.append((query.strip(), params, self._connection.autocommit))
+
+    def fetchall(self):
+        return [(v,) for v in self.applied_versions]
+
+    def fetchone(self):
+        states = self.index_states.get(self._index_checked)
+        state = states.pop(0) if states else True
+        return None if state is None else (state,)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, applied_versions=None, fail_on=None, index_states=None):
+        self.autocommit = False
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+        self._cursor = FakeCursor(self, applied_versions, fail_on, index_states)
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def make_helper(monkeypatch, tmp_path, connection):
+    (tmp_path / "0001_tables.sql").write_text(
+        "CREATE TABLE a (id INT);\nCREATE TABLE b (id INT);\n", encoding="utf-8"
+    )
+    (tmp_path / "0002_indexes.sql").write_text(
+        "-- migrate:no-transaction\n"
+        "-- comentário\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_a ON a (id);\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_b ON b (id);\n",
+        encoding="utf-8",
+    )
+
+    monkeypatch.setattr(MigrationHelper, "Connection", lambda self: connection)
+    monkeypatch.setattr(MigrationHelper, "CloseConnection", lambda self, conn: None)
+
+    helper = MigrationHelper()
+    helper.MigrationsPath = tmp_path
+    return helper
+
+
+def executed_queries(connection):
+    return [q for q, _, _ in connection.executed]
+
+
+# ===================== Testes =====================
+
+
+def test_migrate_applies_pending_migrations_in_order(monkeypatch, tmp_path):
+    connection = FakeConnection()
+    helper = make_helper(monkeypatch, tmp_path, connection)
+
+    applied = helper.Migrate()
+
+    assert applied == [1, 2]
+    queries = executed_queries(connection)
+
+    # Migração transacional roda o arquivo inteiro e registra a versão no mesmo commit
+    assert "CREATE TABLE a (id INT);\nCREATE TABLE b (id INT);" in queries
+    assert connection.commits == 1
+
+    # Migração sem transação roda comando a comando em autocommit
+    concurrent = [(q, auto) for q, _, auto in connection.executed if "CONCURRENTLY" in q]
+    assert concurrent == [
+        ("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_a ON a (id)", True),
+        ("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_b ON b (id)", True),
+    ]
+
+    registered = [p for q, p, _ in connection.executed if q.startswith("INSERT INTO schema_migrations")]
+    assert registered == [(1, "tables"), (2, "indexes")]
+
+    # Lock adquirido e liberado
+    assert queries[0] == "SELECT pg_advisory_lock(%s)"
+    assert connection.executed[0][1] == (MIGRATION_LOCK_KEY,)
+    assert queries[-1] == "SELECT pg_advisory_unlock(%s)"
+    assert connection.autocommit is False
+
+
+def test_migrate_skips_already_applied_versions(monkeypatch, tmp_path):
+    connection = FakeConnection(applied_versions=[1])
+    helper = make_helper(monkeypatch, tmp_path, connection)
+
+    assert helper.Migrate() == [2]
+    assert not any("CREATE TABLE a" in q for q in executed_queries(connection))
+
+
+def test_migrate_stops_at_target_version(monkeypatch, tmp_path):
+    connection = FakeConnection()
+    helper = make_helper(monkeypatch, tmp_path, connection)
+
+    assert helper.Migrate(target=1) == [1]
+
+
+def test_migrate_rolls_back_failed_transactional_migration(monkeypatch, tmp_path):
+    connection = FakeConnection(fail_on="CREATE TABLE a")
+    helper = make_helper(monkeypatch, tmp_path, connection)
+
+    with pytest.raises(Exception, match="DB error"):
+        helper.Migrate()
+
+    assert connection.rollbacks == 1
+    assert connection.commits == 0
+    # Lock é liberado mesmo com erro
+    assert executed_queries(connection)[-1] == "SELECT pg_advisory_unlock(%s)"
+
+
+def registered_versions(connection):
+    return [p[0] for q, p, _ in connection.executed if q.startswith("INSERT INTO schema_migrations")]
+
+
+def test_invalid_index_left_by_concurrent_build_fails_the_migration(monkeypatch, tmp_path):
+    # O CREATE "passou", mas o índice ficou INVALID (ex.: duplicata entrou durante a construção)
+    connection = FakeConnection(applied_versions=[1], index_states={"ix_a": [None, False]})
+    helper = make_helper(monkeypatch, tmp_path, connection)
+
+    with pytest.raises(RuntimeError, match="ix_a"):
+        helper.Migrate()
+
+    assert "DROP INDEX CONCURRENTLY IF EXISTS ix_a" in executed_queries(connection)
+    assert registered_versions(connection) == []
+    assert executed_queries(connection)[-1] == "SELECT pg_advisory_unlock(%s)"
+
+
+def test_failed_concurrent_build_drops_the_invalid_leftover(monkeypatch, tmp_path):
+    connection = FakeConnection(applied_versions=[1], fail_on="ON b (id)", index_states={"ix_b": [None, False]})
+    helper = make_helper(monkeypatch, tmp_path, connection)
+
+    with pytest.raises(Exception, match="DB error"):
+        helper.Migrate()
+
+    assert "DROP INDEX CONCURRENTLY IF EXISTS ix_b" in executed_queries(connection)
+    assert registered_versions(connection) == []
+
+
+def test_invalid_index_from_previous_run_is_rebuilt(monkeypatch, tmp_path):
+    connection = FakeConnection(applied_versions=[1], index_states={"ix_a": [False, True]})
+    helper = make_helper(monkeypatch, tmp_path, connection)
+
+    assert helper.Migrate() == [2]
+
+    queries = executed_queries(connection)
+    drop = queries.index("DROP INDEX CONCURRENTLY IF EXISTS ix_a")
+    assert queries[drop + 1] == "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_a ON a (id)"
+    assert registered_versions(connection) == [2]
+
+
+def test_split_statements_ignores_semicolons_in_strings_and_function_bodies():
+    sql = (
+        "-- comentário; com ponto e vírgula\n"
+        "CREATE FUNCTION f() RETURNS int AS $$ BEGIN PERFORM 1; RETURN 2; END; $$ LANGUAGE plpgsql;\n"
+        "INSERT INTO t VALUES ('a;b', 'it''s; ok');\n"
+        "CREATE FUNCTION g() RETURNS text AS $corpo$ SELECT ';' $corpo$ LANGUAGE sql;\n"
+        "SELECT 1 -- fim; de linha\n"
+    )
+
+    assert split_statements(sql) == [
+        "CREATE FUNCTION f() RETURNS int AS $$ BEGIN PERFORM 1; RETURN 2; END; $$ LANGUAGE plpgsql",
+        "INSERT INTO t VALUES ('a;b', 'it''s; ok')",
+        "CREATE FUNCTION g() RETURNS text AS $corpo$ SELECT ';' $corpo$ LANGUAGE sql",
+        "SELECT 1",
+    ]
+
+
+def test_load_migrations_rejects_invalid_file_name(tmp_path):
+    (tmp_path / "create_tables.sql").write_text("SELECT 1;", encoding="utf-8")
+    helper = MigrationHelper()
+    helper.MigrationsPath = tmp_path
+
+    with pytest.raises(ValueError):
+        helper.LoadMigrations()
+
+
+def test_bundled_migrations_are_valid():
+    migrations = MigrationHelper().LoadMigrations()
+
+    assert [m.Version for m in migrations][:2] == [1, 2]
+
+    # Toda criação de índice em tabela existente precisa ser CONCURRENTLY e fora de transação
+    for migration in migrations:
+        for statement in migration.Statements():
+            if statement.upper().startswith("CREATE INDEX") or statement.upper().startswith("CREATE UNIQUE INDEX"):
+                assert "CONCURRENTLY" in statement.upper(), statement
+                assert migration.NoTransaction, migration.Name
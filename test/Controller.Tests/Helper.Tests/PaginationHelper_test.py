@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException, Response
+
+from src.Helper.PaginationHelper import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    build_page,
+    clamp_limit,
+    decode_cursor,
+    encode_cursor,
+    keyset_query,
+    set_next_cursor,
+)
+
+
+def test_cursor_round_trip_keeps_values():
+    cursor = encode_cursor("name_asc", ("ONG A", 7))
+
+    assert decode_cursor(cursor, "name_asc", 2) == ["ONG A", 7]
+
+
+def test_cursor_serializes_datetimes_as_iso():
+    cursor = encode_cursor("created_at_desc", (datetime(2024, 1, 2, 3, 4, 5), 9))
+
+    assert decode_cursor(cursor, "created_at_desc", 2) == ["2024-01-02T03:04:05", 9]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!!", "bm90LWpzb24", encode_cursor("name_asc", (1,))])
+def test_decode_cursor_rejects_invalid_or_mismatched(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, "name_asc", 2)
+
+    assert exc.value.status_code == 400
+
+
+def test_clamp_limit():
+    assert clamp_limit(None) == DEFAULT_PAGE_SIZE
+    assert clamp_limit(0) == DEFAULT_PAGE_SIZE
+    assert clamp_limit(10) == 10
+    assert clamp_limit(MAX_PAGE_SIZE + 1) == MAX_PAGE_SIZE
+
+
+def test_keyset_query_first_page_only_orders_and_limits():
+    query, params = keyset_query("SELECT * FROM t WHERE a = %s", True, ["nome", "id"], False, "name_asc", 10, None)
+
+    assert query == "SELECT * FROM t WHERE a = %s ORDER BY nome ASC, id ASC LIMIT %s"
+    assert params == (11,)
+
+
+def test_keyset_query_with_cursor_adds_row_comparison():
+    after = encode_cursor("name_desc", ("ONG", 3))
+
+    query, params = keyset_query("SELECT * FROM t", False, ["nome", "id"], True, "name_desc", 10, after)
+
+    assert query == "SELECT * FROM t WHERE (nome, id) < (%s, %s) ORDER BY nome DESC, id DESC LIMIT %s"
+    assert params == ("ONG", 3, 11)
+
+
+def test_build_page_sets_cursor_only_when_there_are_more_rows():
+    rows = [(1,), (2,), (3,)]
+
+    full = build_page(rows, 2, "products", lambda row: (row[0],), lambda row: row[0])
+    last = build_page(rows, 3, "products", lambda row: (row[0],), lambda row: row[0])
+
+    assert full.Items == [1, 2]
+    assert decode_cursor(full.NextCursor, "products", 1) == [2]
+    assert last.Items == [1, 2, 3]
+    assert last.NextCursor is None
+
+
+def test_set_next_cursor_header():
+    response = Response()
+    page = build_page([(1,), (2,)], 1, "products", lambda row: (row[0],), lambda row: row[0])
+
+    set_next_cursor(response, page)
+
+    assert response.headers[NEXT_CURSOR_HEADER] == page.NextCursor
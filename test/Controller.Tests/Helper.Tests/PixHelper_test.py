@@ -393,3 +393,83 @@ def test_delete_pix_key_raises_500_on_pg_error(monkeypatch):
     assert "Error during deleting pix key" in exc.value.detail
     assert cursor.closed is True
     assert connection.closed is True
+
+
+# ===================== versões async (um comando só) =====================
+
+
+def patch_fetch_one(monkeypatch, result=None, error=None):
+    executed = []
+
+    async def fake_fetch_one(self, query, params=None):
+        executed.append((query, params))
+        if error:
+            raise error
+        return result
+
+    monkeypatch.setattr(PixHelper, "FetchOneAsync", fake_fetch_one)
+    return executed
+
+
+@pytest.mark.anyio
+async def test_add_pix_key_async_inserts_with_on_conflict(monkeypatch):
+    executed = patch_fetch_one(monkeypatch, result=(7,))
+    pix = type("Pix", (), {"UserId": 10, "PixKey": "abc", "KeyType": "email", "CreatedAt": "2024-01-01"})()
+
+    assert await PixHelper().add_pix_key_async(pix) == "Pix key added successfully"
+    assert len(executed) == 1
+    assert "ON CONFLICT (id_usuario) DO NOTHING" in executed[0][0]
+    assert executed[0][1] == (10, "abc", "email", "2024-01-01")
+
+
+@pytest.mark.anyio
+async def test_add_pix_key_async_conflict_returns_409(monkeypatch):
+    patch_fetch_one(monkeypatch, result=None)
+    pix = type("Pix", (), {"UserId": 10, "PixKey": "abc", "KeyType": "email", "CreatedAt": "2024-01-01"})()
+
+    with pytest.raises(HTTPException) as exc:
+        await PixHelper().add_pix_key_async(pix)
+
+    assert exc.value.status_code == 409
+    assert exc.value.detail == "PIX key already exists"
+
+
+@pytest.mark.anyio
+async def test_delete_pix_key_async_uses_returning(monkeypatch):
+    executed = patch_fetch_one(monkeypatch, result=(True,))
+    pix = type("PixDelete", (), {"UserId": 10, "PixId": 123})()
+
+    assert await PixHelper().delete_pix_key_async(pix) == "Pix key deleted successfully"
+    assert "RETURNING id_chave" in executed[0][0]
+    assert executed[0][1] == (10, 123, 10)
+
+
+@pytest.mark.anyio
+async def test_delete_pix_key_async_other_pix_id_keeps_baseline_success(monkeypatch):
+    # O usuário tem chave, mas com outro id: nada é apagado e, como antes, responde sucesso
+    patch_fetch_one(monkeypatch, result=(True,))
+    pix = type("PixDelete", (), {"UserId": 10, "PixId": 999})()
+
+    assert await PixHelper().delete_pix_key_async(pix) == "Pix key deleted successfully"
+
+
+@pytest.mark.anyio
+async def test_delete_pix_key_async_missing_key_returns_404(monkeypatch):
+    patch_fetch_one(monkeypatch, result=(False,))
+    pix = type("PixDelete", (), {"UserId": 10, "PixId": 123})()
+
+    with pytest.raises(HTTPException) as exc:
+        await PixHelper().delete_pix_key_async(pix)
+
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_delete_pix_key_async_pg_error_returns_500(monkeypatch):
+    patch_fetch_one(monkeypatch, error=pg.Error("db error"))
+    pix = type("PixDelete", (), {"UserId": 10, "PixId": 123})()
+
+    with pytest.raises(HTTPException) as exc:
+        await PixHelper().delete_pix_key_async(pix)
+
+    assert exc.value.status_code == 500
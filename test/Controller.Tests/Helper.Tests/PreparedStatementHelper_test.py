@@ -0,0 +1,190 @@
+import psycopg2 as pg
+import pytest
+
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.PreparedStatementHelper import PreparedStatementHelper, prepared, to_positional
+from src.Helper.UnitOfWorkHelper import unit_of_work
+
+
+# O pool assíncrono usa o event loop do asyncio
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_registry():
+    PreparedStatementHelper.Reset()
+    AsyncConnectionHelper.CloseAsyncPools()
+    yield
+    PreparedStatementHelper.Reset()
+    AsyncConnectionHelper.CloseAsyncPools()
+
+
+# ===================== Fakes de conexão assíncrona =====================
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self._connection = connection
+        self._last = None
+        self.rowcount = 1
+
+    def execute(self, query, params=None):
+        connection = self._connection
+        if connection.status == pg.extensions.TRANSACTION_STATUS_INERROR and query != "ROLLBACK":
+            raise pg.errors.InFailedSqlTransaction("current transaction is aborted")
+        if connection.fail_next_execute and query.startswith("EXECUTE"):
+            connection.fail_next_execute = False
+            if connection.status != pg.extensions.TRANSACTION_STATUS_IDLE:
+                connection.status = pg.extensions.TRANSACTION_STATUS_INERROR
+            raise pg.errors.InvalidSqlStatementName("prepared statement does not exist")
+        connection.executed.append((query, params))
+        if query == "BEGIN":
+            connection.status = pg.extensions.TRANSACTION_STATUS_INTRANS
+        elif query in ("COMMIT", "ROLLBACK"):
+            connection.status = pg.extensions.TRANSACTION_STATUS_IDLE
+        self._last = query
+
+    def fetchone(self):
+        if self._last.startswith("EXPLAIN"):
+            return ([{"Plan": {}, "Planning Time": 0.25}],)
+        return (1,)
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+        self.fail_next_execute = False
+        self.status = pg.extensions.TRANSACTION_STATUS_IDLE
+        self.closed = 0
+
+    def poll(self):
+        return pg.extensions.POLL_OK
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def isexecuting(self):
+        return False
+
+    def get_transaction_status(self):
+        return self.status
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr("src.Helper.AsyncConnectionHelper.pg.connect", lambda **kwargs: conn)
+    return conn
+
+
+QUERY = prepared("find_user", "SELECT id FROM usuarios WHERE email = %s AND nome LIKE 'a%%'")
+
+
+# ===================== Registro =====================
+
+
+def test_prepared_query_is_still_the_original_text():
+    assert QUERY == "SELECT id FROM usuarios WHERE email = %s AND nome LIKE 'a%%'"
+    assert QUERY.Name.startswith("find_user_")
+    assert QUERY.ParamCount == 1
+    # Textos diferentes geram nomes diferentes
+    assert prepared("find_user", "SELECT 1").Name != QUERY.Name
+
+
+def test_to_positional_numbers_placeholders():
+    assert to_positional("SELECT %s, %s WHERE x LIKE 'a%%'") == "SELECT $1, $2 WHERE x LIKE 'a%'"
+
+
+# ===================== Execução =====================
+
+
+@pytest.mark.anyio
+async def test_statement_is_prepared_once_per_connection(connection):
+    helper = AsyncConnectionHelper()
+
+    await helper.FetchOneAsync(QUERY, ("a@b.com",))
+    await helper.FetchOneAsync(QUERY, ("c@d.com",))
+
+    queries = [q for q, _ in connection.executed]
+    assert queries == [
+        f"EXPLAIN (SUMMARY true, FORMAT JSON) {QUERY}",
+        f"PREPARE {QUERY.Name} AS SELECT id FROM usuarios WHERE email = $1 AND nome LIKE 'a%'",
+        f"EXECUTE {QUERY.Name} (%s)",
+        f"EXECUTE {QUERY.Name} (%s)",
+    ]
+    assert connection.executed[-1][1] == ("c@d.com",)
+
+    stats = PreparedStatementHelper().Stats()
+    assert stats["executions"] == 2
+    assert stats["hits"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["planning_ms_saved"] == 0.25
+
+
+@pytest.mark.anyio
+async def test_prepared_statements_can_be_switched_off(connection):
+    helper = AsyncConnectionHelper()
+    helper.UsePreparedStatements = False
+
+    await helper.FetchOneAsync(QUERY, ("a@b.com",))
+
+    assert connection.executed == [(QUERY, ("a@b.com",))]
+    assert PreparedStatementHelper().Stats()["executions"] == 0
+
+
+@pytest.mark.anyio
+async def test_plain_queries_are_not_prepared(connection):
+    await AsyncConnectionHelper().FetchOneAsync("SELECT 1")
+
+    assert connection.executed == [("SELECT 1", None)]
+
+
+@pytest.mark.anyio
+async def test_lost_statement_is_prepared_again(connection):
+    helper = AsyncConnectionHelper()
+    await helper.FetchOneAsync(QUERY, ("a@b.com",))
+
+    connection.executed.clear()
+    connection.fail_next_execute = True
+    assert await helper.FetchOneAsync(QUERY, ("a@b.com",)) == (1,)
+
+    queries = [q for q, _ in connection.executed]
+    assert queries == [f"PREPARE {QUERY.Name} AS SELECT id FROM usuarios WHERE email = $1 AND nome LIKE 'a%'",
+                       f"EXECUTE {QUERY.Name} (%s)"]
+
+
+@pytest.mark.anyio
+async def test_lost_statement_inside_unit_of_work_is_not_retried(connection):
+    helper = AsyncConnectionHelper()
+    dependency = unit_of_work()
+    await dependency.__anext__()
+    await helper.ExecuteAsync("INSERT INTO t VALUES (1)")
+    await helper.FetchOneAsync(QUERY, ("a@b.com",))
+
+    connection.fail_next_execute = True
+    with pytest.raises(pg.errors.InvalidSqlStatementName) as error:
+        await helper.FetchOneAsync(QUERY, ("a@b.com",))
+    with pytest.raises(pg.errors.InvalidSqlStatementName):
+        await dependency.athrow(error.value)
+
+    # Nada de repetir na transação abortada: o erro sobe e a transação inteira é desfeita
+    queries = [q for q, _ in connection.executed]
+    assert queries[0] == "BEGIN"
+    assert queries[-1] == "ROLLBACK"
+    assert queries.count(f"EXECUTE {QUERY.Name} (%s)") == 1
+    assert "COMMIT" not in queries
+    # A próxima consulta fora da transação prepara o statement de novo
+    connection.executed.clear()
+    assert await helper.FetchOneAsync(QUERY, ("a@b.com",)) == (1,)
+    assert connection.executed[0][0].startswith(f"PREPARE {QUERY.Name}")
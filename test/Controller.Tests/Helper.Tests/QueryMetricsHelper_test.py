@@ -0,0 +1,118 @@
+import json
+import logging
+
+import psycopg2 as pg
+import pytest
+
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.QueryMetricsHelper import QueryMetricsHelper, fingerprint, redact
+
+
+# O pool assíncrono usa o event loop do asyncio
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    QueryMetricsHelper.Reset()
+    AsyncConnectionHelper.CloseAsyncPools()
+    yield
+    QueryMetricsHelper.Reset()
+    AsyncConnectionHelper.CloseAsyncPools()
+
+
+def test_fingerprint_normalizes_literals_params_and_spaces():
+    query = """SELECT id FROM usuarios
+               WHERE email = %s AND tipo_usuario = 'receptor' AND id IN (1, 2, 3) LIMIT 10"""
+
+    assert fingerprint(query) == "SELECT id FROM usuarios WHERE email = ? AND tipo_usuario = ? AND id IN (...) LIMIT ?"
+    assert fingerprint("EXECUTE sign_in_ab12cd34 ($1, $2)") == "EXECUTE sign_in_ab12cd34 (...)"
+
+
+def test_redact_keeps_only_types():
+    assert redact(("a@b.com", 10, None)) == ["<str>", "<int>", "<NoneType>"]
+    assert redact({"senha": "123"}) == {"senha": "<str>"}
+    assert redact(None) is None
+
+
+def test_record_builds_latency_histogram_per_fingerprint():
+    helper = QueryMetricsHelper()
+
+    helper.Record("SELECT * FROM t WHERE id = %s", (1,), 0.0005, 1)
+    helper.Record("SELECT * FROM t WHERE id = %s", (2,), 0.030, 3)
+    helper.Record("SELECT * FROM t  WHERE id = 5", None, 9.0, -1)
+
+    stats = helper.Stats()["SELECT * FROM t WHERE id = ?"]
+    assert stats["count"] == 3
+    assert stats["rows"] == 4
+    assert stats["max_ms"] == 9000.0
+    assert stats["histogram"]["le_1"] == 1
+    assert stats["histogram"]["le_50"] == 1
+    assert stats["histogram"]["inf"] == 1
+
+
+def test_slow_query_is_logged_with_redacted_params(caplog, monkeypatch):
+    monkeypatch.setattr(QueryMetricsHelper, "SlowQueryThresholdMs", 100.0)
+    helper = QueryMetricsHelper()
+
+    with caplog.at_level(logging.WARNING, logger="gca.slow_query"):
+        helper.Record("SELECT 1 WHERE senha = %s", ("segredo",), 0.050, 1)
+        helper.Record("SELECT 1 WHERE senha = %s", ("segredo",), 0.150, 1)
+
+    assert len(caplog.records) == 1
+    entry = json.loads(caplog.records[0].getMessage())
+    assert entry["event"] == "slow_query"
+    assert entry["fingerprint"] == "SELECT ? WHERE senha = ?"
+    assert entry["params"] == ["<str>"]
+    assert "segredo" not in caplog.text
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(QueryMetricsHelper, "Enabled", False)
+
+    QueryMetricsHelper().Record("SELECT 1", None, 1.0, 1)
+
+    assert QueryMetricsHelper().Stats() == {}
+
+
+@pytest.mark.anyio
+async def test_async_queries_are_recorded(monkeypatch):
+    class Cursor:
+        rowcount = 2
+
+        def execute(self, query, params=None):
+            pass
+
+        def fetchall(self):
+            return [(1,), (2,)]
+
+        def close(self):
+            pass
+
+    class Connection:
+        closed = 0
+
+        def poll(self):
+            return pg.extensions.POLL_OK
+
+        def cursor(self):
+            return Cursor()
+
+        def isexecuting(self):
+            return False
+
+        def get_transaction_status(self):
+            return pg.extensions.TRANSACTION_STATUS_IDLE
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr("src.Helper.AsyncConnectionHelper.pg.connect", lambda **kwargs: Connection())
+
+    await AsyncConnectionHelper().FetchAllAsync("SELECT id FROM t WHERE x = %s", (7,))
+
+    stats = QueryMetricsHelper().Stats()["SELECT id FROM t WHERE x = ?"]
+    assert stats["count"] == 1
+    assert stats["rows"] == 2
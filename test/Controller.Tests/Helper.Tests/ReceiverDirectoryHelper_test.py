@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import pytest
+
+from src.Helper.ReceiverDirectoryHelper import ReceiverDirectoryHelper, ReceiverSnapshot
+
+
+ROWS = [
+    (1, "Casa B", "b@ong.com", "1", "85123000", "Desc", datetime(2024, 1, 3)),
+    (2, "Casa A", "a@ong.com", "2", "85123000", "Desc", datetime(2024, 1, 1)),
+    (3, "Casa A", "c@ong.com", "3", "85123000", "Desc", datetime(2024, 1, 2)),
+]
+
+
+def to_id(row):
+    return row[0]
+
+
+@pytest.fixture(autouse=True)
+def clear_directory():
+    ReceiverDirectoryHelper.Clear()
+    yield
+    ReceiverDirectoryHelper.Clear()
+
+
+def collect(snapshot, ordering, limit):
+    ids, after = [], None
+    while True:
+        page = snapshot.page(ordering, limit, after)
+        ids.extend(page.Items)
+        if not page.NextCursor:
+            return ids
+        after = page.NextCursor
+
+
+@pytest.mark.parametrize(
+    "ordering, expected",
+    [
+        ("name_asc", [2, 3, 1]),
+        ("name_desc", [1, 3, 2]),
+        ("created_at_asc", [2, 3, 1]),
+        ("created_at_desc", [1, 3, 2]),
+        ("", [1, 2, 3]),
+    ],
+)
+def test_snapshot_pages_every_ordering_with_id_tie_break(ordering, expected):
+    snapshot = ReceiverSnapshot(ROWS, to_id)
+
+    assert snapshot.page(ordering, 10).Items == expected
+    assert collect(snapshot, ordering, 1) == expected
+
+
+def test_add_and_remove_update_current_snapshot():
+    directory = ReceiverDirectoryHelper()
+    directory.install(ROWS, to_id, directory.generation())
+
+    directory.add((4, "Casa 0", "d@ong.com", "4", "85123000", "Desc", datetime(2024, 1, 4)))
+    directory.remove(1)
+
+    snapshot = directory.current()
+    assert snapshot.page("name_asc", 10).Items == [4, 2, 3]
+    assert snapshot.page("created_at_desc", 10).Items == [4, 3, 2]
+
+
+def test_load_started_before_a_change_is_not_installed():
+    directory = ReceiverDirectoryHelper()
+    generation = directory.generation()
+
+    directory.remove(1)  # inativação acontece enquanto a carga está em andamento
+    directory.install(ROWS, to_id, generation)
+
+    assert directory.current() is None
+
+
+def test_current_respects_ttl_and_counts_hits_and_misses(monkeypatch):
+    directory = ReceiverDirectoryHelper()
+    directory.install(ROWS, to_id, directory.generation())
+
+    assert directory.current() is not None
+    monkeypatch.setattr(ReceiverDirectoryHelper, "TimeToLive", 0)
+    assert directory.current() is None
+
+    assert directory.stats() == {"hits": 1, "misses": 1, "reloads": 1, "size": 3}
+
+
+def test_invalidate_drops_snapshot():
+    directory = ReceiverDirectoryHelper()
+    directory.install(ROWS, to_id, directory.generation())
+
+    directory.invalidate()
+
+    assert directory.current() is None
@@ -1,6 +1,25 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
 import pytest
+from fastapi import HTTPException
+
+from src.Helper.ReceiverDirectoryHelper import ReceiverDirectoryHelper
+from src.Helper.ReceiversHelper import CAUSE_TOTALS_QUERY, PAGE_TOTALS_QUERY, RECEIVER_TOTALS_MAPPER, ReceiversHelper
+
+
+@pytest.fixture(autouse=True)
+def clear_directory():
+    ReceiverDirectoryHelper.Clear()
+    yield
+    ReceiverDirectoryHelper.Clear()
+
 
-from src.Helper.ReceiversHelper import ReceiversHelper
+@pytest.fixture
+def without_directory(monkeypatch):
+    # Força a consulta paginada direto no banco
+    monkeypatch.setattr(ReceiverDirectoryHelper, "Enabled", False)
 
 
 # ===================== FAKES DE CURSOR E CONEXÃO =====================
@@ -65,8 +84,8 @@ def make_helper_with_rows(rows, monkeypatch):
 
 def test_get_receivers_orders_by_name_desc(monkeypatch):
     rows = [
-        (1, "Zé", "ze@example.com", "123", "80000000", "desc Zé"),
-        (2, "Ana", "ana@example.com", "456", "80000001", "desc Ana"),
+        (1, "Zé", "ze@example.com", "123", "80000000", "desc Zé", datetime(2024, 1, 1), 0, 0, None),
+        (2, "Ana", "ana@example.com", "456", "80000001", "desc Ana", datetime(2024, 1, 2), 0, 0, None),
     ]
     helper, cursor, connection = make_helper_with_rows(rows, monkeypatch)
 
@@ -233,3 +252,236 @@ def test_validate_cause_id_returns_false_on_exception(monkeypatch):
     # mesmo com erro, finally deve fechar cursor e conexão
     assert cursor.closed is True
     assert connection.closed is True
+
+
+# ===================== versões assíncronas =====================
+
+
+@pytest.mark.anyio
+async def test_get_receivers_async_orders_and_maps_rows(monkeypatch, without_directory):
+    captured = {}
+
+    async def fake_fetch_all(self, query, params=None):
+        captured["query"] = query
+        return [(1, "ONG A", "a@ong.com", "123", "85123000", "Desc", "2024-01-01", 0, 0, None)]
+
+    monkeypatch.setattr(ReceiversHelper, "FetchAllAsync", fake_fetch_all)
+
+    result = await ReceiversHelper().get_receivers_async("name_asc")
+
+    # id_usuario desempata nomes iguais, mantendo a ordem estável entre páginas
+    assert 'ORDER BY nome COLLATE "C" ASC, id_usuario ASC' in captured["query"]
+    assert result.Items[0].UserId == 1
+    assert result.Items[0].Name == "ONG A"
+    assert result.NextCursor is None
+
+
+@pytest.mark.anyio
+async def test_get_receivers_async_continues_after_cursor(monkeypatch, without_directory):
+    captured = []
+
+    async def fake_fetch_all(self, query, params=None):
+        captured.append((query, params))
+        return [
+            (5, "ONG B", "b@ong.com", "1", "85123000", "Desc", "2024-01-02", 0, 0, None),
+            (2, "ONG A", "a@ong.com", "2", "85123000", "Desc", "2024-01-01", 0, 0, None),
+        ]
+
+    monkeypatch.setattr(ReceiversHelper, "FetchAllAsync", fake_fetch_all)
+    helper = ReceiversHelper()
+
+    first = await helper.get_receivers_async("created_at_desc", limit=1)
+    assert [r.UserId for r in first.Items] == [5]
+    assert first.NextCursor
+
+    await helper.get_receivers_async("created_at_desc", limit=1, after=first.NextCursor)
+
+    query, params = captured[1]
+    assert "(data_cadastro, id_usuario) < (%s, %s)" in query
+    assert "ORDER BY data_cadastro DESC, id_usuario DESC" in query
+    assert params == ("2024-01-02", 5, 2)
+
+
+@pytest.mark.anyio
+async def test_get_receivers_async_rejects_cursor_from_other_ordering(monkeypatch):
+    async def fake_fetch_all(self, query, params=None):
+        if query == PAGE_TOTALS_QUERY:
+            return []
+        return [
+            (5, "ONG B", "b@ong.com", "1", "85123000", "Desc", "2024-01-02", 0, 0, None),
+            (2, "ONG A", "a@ong.com", "2", "85123000", "Desc", "2024-01-01", 0, 0, None),
+        ]
+
+    monkeypatch.setattr(ReceiversHelper, "FetchAllAsync", fake_fetch_all)
+    helper = ReceiversHelper()
+    first = await helper.get_receivers_async("name_asc", limit=1)
+
+    with pytest.raises(HTTPException) as exc:
+        await helper.get_receivers_async("name_desc", after=first.NextCursor)
+
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_get_receivers_async_rejects_invalid_order():
+    with pytest.raises(ValueError):
+        await ReceiversHelper().get_receivers_async("price_asc")
+
+
+@pytest.mark.anyio
+async def test_validate_cause_id_async_returns_false_on_exception(monkeypatch):
+    async def fake_fetch_one(self, query, params=None):
+        raise Exception("DB error")
+
+    monkeypatch.setattr(ReceiversHelper, "FetchOneAsync", fake_fetch_one)
+
+    assert await ReceiversHelper().validate_cause_id_async(5) is False
+
+
+@pytest.mark.anyio
+async def test_get_receivers_async_serves_directory_from_memory(monkeypatch):
+    calls = []
+
+    async def fake_fetch_all(self, query, params=None):
+        if query == PAGE_TOTALS_QUERY:
+            return []
+        calls.append(query)
+        return [
+            (1, "Beta", "b@ong.com", "1", "85123000", "Desc", datetime(2024, 1, 2), 0, 0, None),
+            (2, "Alfa", "a@ong.com", "2", "85123000", "Desc", datetime(2024, 1, 3), 0, 0, None),
+        ]
+
+    monkeypatch.setattr(ReceiversHelper, "FetchAllAsync", fake_fetch_all)
+    helper = ReceiversHelper()
+
+    by_name = await helper.get_receivers_async("name_asc")
+    by_date = await helper.get_receivers_async("created_at_desc")
+
+    assert [r.Name for r in by_name.Items] == ["Alfa", "Beta"]
+    assert [r.UserId for r in by_date.Items] == [2, 1]
+    # Uma única carga do banco, sem ORDER BY: a ordenação é feita em memória
+    assert len(calls) == 1
+    assert "ORDER BY" not in calls[0]
+    assert ReceiverDirectoryHelper().stats()["hits"] == 1
+    assert ReceiverDirectoryHelper().stats()["misses"] == 1
+
+
+# ===================== totais por causa =====================
+
+
+@pytest.mark.anyio
+async def test_get_receivers_async_includes_cause_totals(monkeypatch, without_directory):
+    captured = {}
+
+    async def fake_fetch_all(self, query, params=None):
+        captured["query"] = query
+        return [
+            (1, "ONG A", "a@ong.com", "1", "85123000", "Desc", datetime(2024, 1, 1),
+             Decimal("150.50"), 3, datetime(2024, 5, 1, 10, 30)),
+            (2, "ONG B", "b@ong.com", "2", "85123000", "Desc", datetime(2024, 1, 2), 0, 0, None),
+        ]
+
+    monkeypatch.setattr(ReceiversHelper, "FetchAllAsync", fake_fetch_all)
+
+    page = await ReceiversHelper().get_receivers_async("name_asc")
+
+    # Uma linha de totais_causa por receptor, sem somar as doações
+    assert "LEFT JOIN totais_causa" in captured["query"]
+    assert "FROM doacoes" not in captured["query"]
+    assert json.loads(RECEIVER_TOTALS_MAPPER.Dumps(page.Items)) == [
+        {"UserId": 1, "Name": "ONG A", "Email": "a@ong.com", "Document": "1", "Address": "85123000",
+         "Description": "Desc", "TotalAmount": 150.5, "DonationCount": 3, "LastDonationAt": "2024-05-01 10:30:00"},
+        {"UserId": 2, "Name": "ONG B", "Email": "b@ong.com", "Document": "2", "Address": "85123000",
+         "Description": "Desc", "TotalAmount": 0.0, "DonationCount": 0, "LastDonationAt": None},
+    ]
+
+
+@pytest.mark.anyio
+async def test_directory_pages_show_current_totals(monkeypatch):
+    totals = {1: (1, Decimal("10.00"), 1, datetime(2024, 5, 1, 9, 0))}
+    captured = []
+
+    async def fake_fetch_all(self, query, params=None):
+        if query == PAGE_TOTALS_QUERY:
+            captured.append(params)
+            return [totals[cause_id] for cause_id in params[0] if cause_id in totals]
+        return [
+            (1, "ONG A", "a@ong.com", "1", "85123000", "Desc", datetime(2024, 1, 1),
+             Decimal("10.00"), 1, datetime(2024, 5, 1, 9, 0)),
+            (2, "ONG B", "b@ong.com", "2", "85123000", "Desc", datetime(2024, 1, 2), 0, 0, None),
+        ]
+
+    monkeypatch.setattr(ReceiversHelper, "FetchAllAsync", fake_fetch_all)
+    helper = ReceiversHelper()
+    await helper.get_receivers_async("name_asc")
+
+    # Doação confirmada depois da carga do diretório (trigger atualiza totais_causa)
+    totals[1] = (1, Decimal("35.50"), 2, datetime(2024, 5, 2, 8, 0))
+    totals[2] = (2, Decimal("5.00"), 1, datetime(2024, 5, 2, 8, 5))
+    page = await helper.get_receivers_async("name_asc")
+
+    assert [(r.TotalAmount, r.DonationCount, r.LastDonationAt) for r in page.Items] == [
+        (35.5, 2, "2024-05-02 08:00:00"), (5.0, 1, "2024-05-02 08:05:00")]
+    assert captured[-1] == ([1, 2],)
+    # A foto compartilhada não é alterada
+    assert ReceiverDirectoryHelper().current().page("name_asc", 10).Items[0].DonationCount == 1
+
+
+@pytest.mark.anyio
+async def test_get_summary_async_reads_single_totals_row(monkeypatch):
+    captured = {}
+
+    async def fake_fetch_one(self, query, params=None):
+        captured["query"], captured["params"] = query, params
+        return (7, Decimal("99.90"), 12, datetime(2024, 5, 1, 10, 30))
+
+    monkeypatch.setattr(ReceiversHelper, "FetchOneAsync", fake_fetch_one)
+
+    summary = await ReceiversHelper().get_summary_async(7)
+
+    assert captured["query"] == CAUSE_TOTALS_QUERY
+    assert captured["params"] == (7,)
+    assert summary == {"CauseId": 7, "TotalAmount": 99.9, "DonationCount": 12,
+                       "LastDonationAt": "2024-05-01 10:30:00"}
+
+
+@pytest.mark.anyio
+async def test_get_summary_async_without_donations_returns_zeros(monkeypatch):
+    async def fake_fetch_one(self, query, params=None):
+        return None
+
+    monkeypatch.setattr(ReceiversHelper, "FetchOneAsync", fake_fetch_one)
+
+    assert await ReceiversHelper().get_summary_async(7) == {
+        "CauseId": 7, "TotalAmount": 0.0, "DonationCount": 0, "LastDonationAt": None}
+
+
+@pytest.mark.anyio
+async def test_directory_and_database_share_name_ordering(monkeypatch):
+    names = ["ana", "Ávila", "Beto", "Ana", "Zé", "abc", "Édson", "zeca"]
+    rows = [(i, name, f"{i}@ong.com", str(i), "85123000", "Desc", datetime(2024, 1, i), 0, 0, None)
+            for i, name in enumerate(names, start=1)]
+    captured = []
+
+    async def fake_fetch_all(self, query, params=None):
+        if query == PAGE_TOTALS_QUERY:
+            return []
+        captured.append((query, params))
+        return rows
+
+    monkeypatch.setattr(ReceiversHelper, "FetchAllAsync", fake_fetch_all)
+    helper = ReceiversHelper()
+
+    page = await helper.get_receivers_async("name_asc", limit=3)
+
+    # Mesma ordem do COLLATE "C" do banco: bytes UTF-8, maiúsculas antes, acentos no fim
+    expected = sorted(names, key=lambda name: name.encode("utf-8"))
+    assert [r.Name for r in page.Items] == expected[:3] == ["Ana", "Beto", "Zé"]
+
+    # O cursor do diretório continua do mesmo ponto na consulta paginada do banco
+    monkeypatch.setattr(ReceiverDirectoryHelper, "Enabled", False)
+    await helper.get_receivers_async("name_asc", limit=3, after=page.NextCursor)
+
+    query, params = captured[-1]
+    assert '(nome COLLATE "C", id_usuario) > (%s, %s)' in query
+    assert params == ("Zé", 5, 4)
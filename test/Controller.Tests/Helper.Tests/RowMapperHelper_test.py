@@ -0,0 +1,91 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+
+from src.Helper.DonationsHelper import DONATION_MAPPER
+from src.Helper.ProductHelper import PRODUCT_MAPPER
+from src.Helper.ReceiversHelper import RECEIVER_MAPPER
+from src.Helper.RowMapperHelper import RowMapper, RowsResponse, encode_value
+from src.Model.ListDonationModel import ListDonationModel
+from src.Model.ListReceiversModel import ListReceiversModel
+
+
+DONATION_ROWS = [
+    (1, "Ana \"Doadora\"", "ONG Ação", Decimal("10.50"), None, datetime(2024, 5, 1, 10, 30)),
+    (2, "João", "ONG\nNova", Decimal("100"), "Obrigado!", datetime(2024, 5, 2)),
+]
+
+RECEIVER_ROWS = [
+    (7, "ONG Ação", "ong@x.com", "123", "85123000", "Ajuda", datetime(2024, 1, 1)),
+]
+
+
+def test_encode_value_matches_json_semantics():
+    assert encode_value("a\"bç") == json.dumps("a\"bç")
+    assert encode_value(None) == "null"
+    assert encode_value(True) == "true"
+    assert encode_value(3) == "3"
+    assert encode_value(1.5) == "1.5"
+    assert encode_value(float("nan")) == "null"
+    assert encode_value(Decimal("10.50")) == "10.5"
+    assert encode_value(Decimal("100")) == "100"
+    assert encode_value(datetime(2024, 5, 1, 10, 30)) == '"2024-05-01T10:30:00"'
+
+
+def test_to_model_skips_validation_but_applies_converters():
+    model = DONATION_MAPPER.ToModel(DONATION_ROWS[0])
+
+    assert isinstance(model, ListDonationModel)
+    assert model.Amount == 10.5
+    assert isinstance(model.Amount, float)
+    assert model.Date == "2024-05-01 10:30:00"
+    assert model.Message is None
+
+
+def test_to_model_builds_plain_classes_and_ignores_extra_columns():
+    model = RECEIVER_MAPPER.ToModel(RECEIVER_ROWS[0])
+
+    assert isinstance(model, ListReceiversModel)
+    assert model.UserId == 7
+    assert model.Description == "Ajuda"
+    assert not hasattr(model, "data_cadastro")
+
+
+def test_dumps_matches_fastapi_encoding_for_rows_and_models():
+    models = [DONATION_MAPPER.ToModel(row) for row in DONATION_ROWS]
+    expected = jsonable_encoder(models)
+
+    assert json.loads(DONATION_MAPPER.Dumps(DONATION_ROWS)) == expected
+    assert json.loads(DONATION_MAPPER.Dumps(models)) == expected
+
+
+def test_dumps_wraps_list_in_root_object():
+    body = RECEIVER_MAPPER.Dumps(RECEIVER_ROWS, root="receivers")
+
+    assert json.loads(body) == {"receivers": [{
+        "UserId": 7, "Name": "ONG Ação", "Email": "ong@x.com",
+        "Document": "123", "Address": "85123000", "Description": "Ajuda",
+    }]}
+
+
+def test_dumps_falls_back_for_unmapped_items():
+    assert json.loads(PRODUCT_MAPPER.Dumps([{"id": 1, "valor": Decimal("2.5")}])) == [{"id": 1, "valor": 2.5}]
+
+
+def test_single_field_mapper():
+    class Only:
+        Name: str
+
+    mapper = RowMapper(Only, ("Name",))
+
+    assert json.loads(mapper.Dumps([("a",), mapper.ToModel(("b",))])) == [{"Name": "a"}, {"Name": "b"}]
+
+
+def test_rows_response_is_json():
+    response = RowsResponse(RECEIVER_ROWS, RECEIVER_MAPPER, root="receivers")
+
+    assert response.media_type == "application/json"
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body)["receivers"][0]["UserId"] == 7
@@ -6,6 +6,7 @@ from src.Helper.SecurityHelper import (
     authenticate_request,
     get_current_user_from_token,
 )
+from src.Helper.TokenHelper import TokenHelper
 from src.Model import TokenModel
 
 
@@ -20,6 +21,9 @@ class FakeTokenHelperValid:
         # sempre considera token válido
         return "user@example.com"
 
+    def verify_token(self, token: str):
+        return {"sub": "user@example.com", "exp": 9999999999}
+
 
 class FakeTokenHelperInvalid:
     def __init__(self, *args, **kwargs):
@@ -29,6 +33,9 @@ class FakeTokenHelperInvalid:
         # sempre considera token inválido
         return None
 
+    def verify_token(self, token: str):
+        return None
+
 
 # ===================== Helper para criar Request =====================
 
@@ -143,6 +150,9 @@ async def test_middleware_allows_private_route_with_valid_token(monkeypatch):
     assert response.body == b"private ok"
     assert called["value"] is True
     assert captured_user["value"] == "user@example.com"
+    # claims verificadas ficam no request para a dependency reutilizar
+    assert request.state.claims["sub"] == "user@example.com"
+    assert request.state.token == "token-valido"
 
 
 # ===================== TESTES DA DEPENDENCY get_current_user_from_token =====================
@@ -165,7 +175,7 @@ async def test_get_current_user_from_token_valid(monkeypatch):
 
     # Mocka também o SignInHelper para não bater no banco
     class FakeSignInHelper:
-        def GetKindOfUser(self, email: str):
+        async def GetKindOfUserAsync(self, email: str):
             u = TokenModel.TokenModel()
             u.UserId = 123
             u.KindOfUser = "doador"
@@ -190,7 +200,7 @@ async def test_get_current_user_from_token_valid(monkeypatch):
 async def test_get_current_user_from_token_invalid(monkeypatch):
     # TokenHelper.get_current_user sempre retorna None
     class FakeSignInHelper:
-        def GetKindOfUser(self, email: str):
+        async def GetKindOfUserAsync(self, email: str):
             # Ignora o email e devolve um TokenModel válido (não será usado neste teste)
             u = TokenModel.TokenModel()
             u.UserId = 123
@@ -214,3 +224,138 @@ async def test_get_current_user_from_token_invalid(monkeypatch):
 
     assert exc.value.status_code == 401
     assert exc.value.detail == "Token expired or invalid"
+
+
+@pytest.mark.anyio
+async def test_get_current_user_from_token_reuses_claims_from_middleware(monkeypatch):
+    # Se o middleware já verificou o token, a dependency não decodifica de novo
+    class FailingTokenHelper:
+        def verify_token(self, token: str):
+            raise AssertionError("token não deveria ser verificado de novo")
+
+    class FakeSignInHelper:
+        async def GetKindOfUserAsync(self, email: str):
+            u = TokenModel.TokenModel()
+            u.UserId = 7
+            u.KindOfUser = "receptor"
+            assert email == "cached@example.com"
+            return u
+
+    monkeypatch.setattr("src.Helper.SecurityHelper.TokenHelper", FailingTokenHelper)
+    monkeypatch.setattr("src.Helper.SecurityHelper.SignInHelper", FakeSignInHelper)
+
+    request = make_request("/private")
+    request.state.token = "token-valido"
+    request.state.claims = {"sub": "cached@example.com", "exp": 9999999999}
+
+    user = await get_current_user_from_token(FakeCredentials("token-valido"), request)
+
+    assert user.UserId == 7
+
+
+@pytest.mark.anyio
+async def test_get_current_user_from_token_ignores_claims_of_other_token(monkeypatch):
+    monkeypatch.setattr(
+        "src.Helper.SecurityHelper.TokenHelper",
+        FakeTokenHelperInvalid,
+    )
+
+    request = make_request("/private")
+    request.state.token = "outro-token"
+    request.state.claims = {"sub": "cached@example.com", "exp": 9999999999}
+
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user_from_token(FakeCredentials("token-valido"), request)
+
+    assert exc.value.status_code == 401
+
+
+class NoDatabaseSignInHelper:
+    """Não busca o usuário no banco; só responde a revogação (tokens_revogados_em)."""
+    revoked_at = {}
+    lookups = []
+
+    async def GetKindOfUserAsync(self, email: str):
+        raise AssertionError("não deveria consultar o banco")
+
+    async def GetTokensRevokedAtAsync(self, user_id: int):
+        NoDatabaseSignInHelper.lookups.append(user_id)
+        return NoDatabaseSignInHelper.revoked_at.get(user_id)
+
+
+@pytest.fixture(autouse=True)
+def clear_revocations():
+    TokenHelper.ClearRevocations()
+    NoDatabaseSignInHelper.revoked_at = {}
+    NoDatabaseSignInHelper.lookups = []
+    yield
+    TokenHelper.ClearRevocations()
+
+
+@pytest.mark.anyio
+async def test_get_current_user_from_token_builds_user_from_claims(monkeypatch):
+    monkeypatch.setattr("src.Helper.SecurityHelper.SignInHelper", NoDatabaseSignInHelper)
+
+    token = TokenHelper().create_access_token({"sub": "doador@example.com", "uid": 15, "role": "doador"})
+
+    user = await get_current_user_from_token(FakeCredentials(token))
+
+    assert isinstance(user, TokenModel.TokenModel)
+    assert user.UserId == 15
+    assert user.KindOfUser == "doador"
+
+
+@pytest.mark.anyio
+async def test_get_current_user_from_token_rejects_revoked_user(monkeypatch):
+    monkeypatch.setattr("src.Helper.SecurityHelper.SignInHelper", NoDatabaseSignInHelper)
+
+    helper = TokenHelper()
+    token = helper.create_access_token({"sub": "doador@example.com", "uid": 16, "role": "doador"})
+    helper.revoke_user(16)
+
+    try:
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user_from_token(FakeCredentials(token))
+    finally:
+        TokenHelper.ClearRevocations()
+
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_get_current_user_from_token_rejects_user_revoked_by_another_worker(monkeypatch):
+    monkeypatch.setattr("src.Helper.SecurityHelper.SignInHelper", NoDatabaseSignInHelper)
+
+    helper = TokenHelper()
+    token = helper.create_access_token({"sub": "doador@example.com", "uid": 17, "role": "doador"})
+    claims = helper.verify_token(token)
+    # Inativação gravada no banco por outro processo: este worker não chamou revoke_user
+    NoDatabaseSignInHelper.revoked_at[17] = claims["iat"] + 1
+
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user_from_token(FakeCredentials(token))
+
+    assert exc.value.status_code == 401
+    assert NoDatabaseSignInHelper.lookups == [17]
+
+
+@pytest.mark.anyio
+async def test_revocation_is_checked_on_every_request(monkeypatch):
+    monkeypatch.setattr("src.Helper.SecurityHelper.SignInHelper", NoDatabaseSignInHelper)
+    helper = TokenHelper()
+    token = helper.create_access_token({"sub": "doador@example.com", "uid": 18, "role": "doador"})
+
+    await get_current_user_from_token(FakeCredentials(token))
+    await get_current_user_from_token(FakeCredentials(token))
+    assert NoDatabaseSignInHelper.lookups == [18, 18]
+
+    # Outro worker inativa o usuário: a requisição seguinte já é recusada
+    NoDatabaseSignInHelper.revoked_at[18] = helper.verify_token(token)["iat"] + 1
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user_from_token(FakeCredentials(token))
+    assert exc.value.status_code == 401
+
+    # Revogação já vista não volta ao banco
+    with pytest.raises(HTTPException):
+        await get_current_user_from_token(FakeCredentials(token))
+    assert NoDatabaseSignInHelper.lookups == [18, 18, 18]
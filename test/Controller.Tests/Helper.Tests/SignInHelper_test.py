@@ -1,8 +1,14 @@
+from datetime import datetime
+from decimal import Decimal
+
 import pytest
 from fastapi import HTTPException
 import requests
 
+from src.Helper.CepHelper import CepHelper
+from src.Helper.ReceiverDirectoryHelper import ReceiverDirectoryHelper
 from src.Helper.SignInHelper import SignInHelper, pg
+from src.Model import CadastrateModel
 
 
 # ===================== FAKES DE CONEXÃO E CURSOR =====================
@@ -310,6 +316,16 @@ def test_get_kind_of_user_raises_500_if_connection_fails(monkeypatch):
 # ===================== TESTES DE ValidateAddress =====================
 
 
+@pytest.fixture
+def no_cep_cache(monkeypatch):
+    # Sem cache no banco e com o cache em memória zerado
+    CepHelper.Reset()
+    monkeypatch.setattr(CepHelper, "_LoadPersistent", lambda self, cep: None)
+    monkeypatch.setattr(CepHelper, "_StorePersistent", lambda self, cep, valid, ttl: None)
+    yield
+    CepHelper.Reset()
+
+
 def test_validate_address_returns_false_if_invalid_length():
     helper = SignInHelper()
 
@@ -317,7 +333,7 @@ def test_validate_address_returns_false_if_invalid_length():
     assert helper.ValidateAddress("123456789") is False  # mais de 8 dígitos
 
 
-def test_validate_address_success(monkeypatch):
+def test_validate_address_success(monkeypatch, no_cep_cache):
     helper = SignInHelper()
 
     class FakeResponse:
@@ -337,15 +353,12 @@ def test_validate_address_success(monkeypatch):
 
     # CEP válido e ativo
     resp = FakeResponse(200, {"logradouro": "Rua X", "erro": False})
-    monkeypatch.setattr(
-        "src.Helper.SignInHelper.requests.Session",
-        lambda: FakeSession(resp),
-    )
+    monkeypatch.setattr(CepHelper, "Session", lambda self: FakeSession(resp))
 
     assert helper.ValidateAddress("85123-000") is True
 
 
-def test_validate_address_returns_false_if_viacep_returns_erro(monkeypatch):
+def test_validate_address_returns_false_if_viacep_returns_erro(monkeypatch, no_cep_cache):
     helper = SignInHelper()
 
     class FakeResponse:
@@ -365,15 +378,12 @@ def test_validate_address_returns_false_if_viacep_returns_erro(monkeypatch):
 
     # ViaCEP responde {"erro": true}
     resp = FakeResponse(200, {"erro": True})
-    monkeypatch.setattr(
-        "src.Helper.SignInHelper.requests.Session",
-        lambda: FakeSession(resp),
-    )
+    monkeypatch.setattr(CepHelper, "Session", lambda self: FakeSession(resp))
 
     assert helper.ValidateAddress("85123000") is False
 
 
-def test_validate_address_returns_false_on_non_200_status(monkeypatch):
+def test_validate_address_returns_false_on_non_200_status(monkeypatch, no_cep_cache):
     helper = SignInHelper()
 
     class FakeResponse:
@@ -391,24 +401,111 @@ def test_validate_address_returns_false_on_non_200_status(monkeypatch):
             return self._response
 
     resp = FakeResponse(500)
-    monkeypatch.setattr(
-        "src.Helper.SignInHelper.requests.Session",
-        lambda: FakeSession(resp),
-    )
+    monkeypatch.setattr(CepHelper, "Session", lambda self: FakeSession(resp))
 
     assert helper.ValidateAddress("85123000") is False
 
 
-def test_validate_address_returns_false_on_request_exception(monkeypatch):
+def test_validate_address_returns_false_on_request_exception(monkeypatch, no_cep_cache):
     helper = SignInHelper()
 
     class FakeSession:
         def get(self, url, timeout=5):
             raise requests.RequestException("network error")
 
-    monkeypatch.setattr(
-        "src.Helper.SignInHelper.requests.Session",
-        lambda: FakeSession(),
-    )
+    monkeypatch.setattr(CepHelper, "Session", lambda self: FakeSession())
 
     assert helper.ValidateAddress("85123000") is False
+
+
+# ===================== TESTES DE DeactivateUserAsync =====================
+
+
+def patch_async_queries(monkeypatch, found):
+    executed = []
+
+    async def fake_fetch_one(self, query, params=None):
+        executed.append((query, params))
+        return found
+
+    monkeypatch.setattr(SignInHelper, "FetchOneAsync", fake_fetch_one)
+    return executed
+
+
+@pytest.mark.anyio
+async def test_deactivate_user_async_deactivates_matching_kind(monkeypatch):
+    executed = patch_async_queries(monkeypatch, ("doador", True))
+
+    result = await SignInHelper().DeactivateUserAsync(10, "doador")
+
+    assert result == "doador"
+    # Busca e UPDATE vão num único comando
+    assert len(executed) == 1
+    assert "UPDATE usuarios u SET ativo = false" in executed[0][0]
+    assert executed[0][1] == (10, "doador")
+
+
+@pytest.mark.anyio
+async def test_get_tokens_revoked_at_async_reads_epoch(monkeypatch):
+    executed = patch_async_queries(monkeypatch, (Decimal("1714557600.5"),))
+
+    assert await SignInHelper().GetTokensRevokedAtAsync(10) == 1714557600.5
+    assert executed[0][1] == (10,)
+
+    patch_async_queries(monkeypatch, (None,))
+    assert await SignInHelper().GetTokensRevokedAtAsync(10) is None
+
+
+@pytest.mark.anyio
+async def test_deactivate_user_async_returns_none_if_inactive(monkeypatch):
+    patch_async_queries(monkeypatch, None)
+
+    assert await SignInHelper().DeactivateUserAsync(10, "doador") is None
+
+
+@pytest.mark.anyio
+async def test_deactivate_user_async_returns_none_if_deactivated_concurrently(monkeypatch):
+    patch_async_queries(monkeypatch, ("doador", False))
+
+    assert await SignInHelper().DeactivateUserAsync(10, "doador") is None
+
+
+@pytest.mark.anyio
+async def test_deactivate_user_async_does_not_touch_other_kind(monkeypatch):
+    patch_async_queries(monkeypatch, ("receptor", False))
+
+    assert await SignInHelper().DeactivateUserAsync(10, "doador") == "receptor"
+
+
+@pytest.mark.anyio
+async def test_deactivate_receiver_leaves_directory_to_the_caller(monkeypatch):
+    patch_async_queries(monkeypatch, ("receptor", True))
+    removed = []
+    monkeypatch.setattr(ReceiverDirectoryHelper, "remove", lambda self, user_id: removed.append(user_id))
+
+    # A inativação ainda não foi confirmada: quem tira do diretório é a rota, depois do commit
+    assert await SignInHelper().DeactivateUserAsync(10, "receptor") == "receptor"
+    assert removed == []
+
+
+@pytest.mark.anyio
+async def test_cadastrate_async_adds_receiver_to_directory(monkeypatch):
+    created_at = datetime(2024, 1, 1)
+    captured = {}
+    added = []
+
+    async def fake_fetch_one(self, query, params=None):
+        captured["query"] = query
+        return (55, created_at)
+
+    monkeypatch.setattr(SignInHelper, "FetchOneAsync", fake_fetch_one)
+    monkeypatch.setattr(ReceiverDirectoryHelper, "add", lambda self, row: added.append(row))
+
+    params = CadastrateModel.CadastrateModel(
+        Email="ong@x.com", Password="123", IsReceiver="receptor",
+        Document="123", Name="ONG", Cause="Ajuda", Address="85123000",
+    )
+
+    assert await SignInHelper().CadastrateAsync(params) is True
+    assert "RETURNING id_usuario, data_cadastro" in captured["query"]
+    assert added == [(55, "ONG", "ong@x.com", "123", "85123000", "Ajuda", created_at, 0, 0, None)]
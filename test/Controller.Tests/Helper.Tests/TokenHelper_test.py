@@ -1,9 +1,32 @@
 import jwt
+import pytest
+import time
 from datetime import timedelta
 
 from src.Helper.TokenHelper import TokenHelper
 
 
+@pytest.fixture(autouse=True)
+def clear_verified_cache():
+    TokenHelper.ClearVerifiedCache()
+    TokenHelper.ClearRevocations()
+    yield
+    TokenHelper.ClearVerifiedCache()
+    TokenHelper.ClearRevocations()
+
+
+def count_decodes(monkeypatch):
+    calls = {"count": 0}
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls["count"] += 1
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr("src.Helper.TokenHelper.jwt.decode", counting_decode)
+    return calls
+
+
 def test_create_access_token_generates_valid_jwt():
     helper = TokenHelper()
     data = {"sub": "user@example.com"}
@@ -63,3 +86,106 @@ def test_get_current_user_returns_none_when_token_is_invalid():
     current_user = helper.get_current_user("isso.nao.eh.um.jwt")
 
     assert current_user is None
+
+
+def test_verify_token_uses_cache_for_repeated_token(monkeypatch):
+    helper = TokenHelper()
+    token = helper.create_access_token({"sub": "user@example.com"})
+    calls = count_decodes(monkeypatch)
+
+    first = helper.verify_token(token)
+    second = TokenHelper().verify_token(token)
+
+    assert first == second
+    assert second["sub"] == "user@example.com"
+    # Só a primeira chamada verifica a assinatura
+    assert calls["count"] == 1
+
+
+def test_verify_token_cache_returns_copy():
+    helper = TokenHelper()
+    token = helper.create_access_token({"sub": "user@example.com"})
+
+    helper.verify_token(token)["sub"] = "alterado"
+
+    assert helper.verify_token(token)["sub"] == "user@example.com"
+
+
+def test_verify_token_cache_expires_with_token(monkeypatch):
+    helper = TokenHelper()
+    token = helper.create_access_token({"sub": "user@example.com"}, expires_delta=timedelta(seconds=60))
+    calls = count_decodes(monkeypatch)
+    helper.verify_token(token)
+
+    # Simula o relógio depois do exp do token: a entrada do cache não vale mais
+    future = time.time() + 120
+    monkeypatch.setattr("src.Helper.TokenHelper.time.time", lambda: future)
+
+    helper.verify_token(token)
+
+    assert calls["count"] == 2
+
+
+def test_verify_token_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(TokenHelper, "VerifiedCacheSize", 2)
+    helper = TokenHelper()
+
+    tokens = [helper.create_access_token({"sub": f"user{i}@example.com"}) for i in range(3)]
+    for token in tokens:
+        helper.verify_token(token)
+
+    assert len(TokenHelper._verified_cache) == 2
+    assert helper._cache_key(tokens[0]) not in TokenHelper._verified_cache
+
+
+def test_verify_token_cache_is_scoped_by_secret():
+    helper = TokenHelper()
+    token = helper.create_access_token({"sub": "user@example.com"})
+    helper.verify_token(token)
+
+    other = TokenHelper()
+    other.secret_key = "another_secret_key"
+
+    assert other.verify_token(token) is None
+
+
+def test_create_access_token_includes_issued_at():
+    helper = TokenHelper()
+
+    payload = helper.verify_token(helper.create_access_token({"sub": "user@example.com", "uid": 1, "role": "doador"}))
+
+    assert payload["uid"] == 1
+    assert payload["role"] == "doador"
+    assert "iat" in payload
+
+
+def test_revoke_user_invalidates_previously_issued_tokens():
+    helper = TokenHelper()
+    claims = helper.verify_token(helper.create_access_token({"sub": "user@example.com", "uid": 1, "role": "doador"}))
+
+    assert helper.is_revoked(claims) is False
+
+    helper.revoke_user(1)
+
+    assert helper.is_revoked(claims) is True
+    # Outros usuários não são afetados
+    assert helper.is_revoked({"uid": 2, "iat": claims["iat"]}) is False
+
+
+def test_revoke_user_does_not_affect_tokens_issued_afterwards(monkeypatch):
+    helper = TokenHelper()
+    helper.revoke_user(1)
+
+    assert helper.is_revoked({"uid": 1, "iat": time.time() + 5}) is False
+
+
+def test_revoke_user_prunes_revocations_older_than_token_lifetime(monkeypatch):
+    helper = TokenHelper()
+    helper.revoke_user(1)
+
+    later = time.time() + helper.access_token_expire_minutes * 60 + 10
+    monkeypatch.setattr("src.Helper.TokenHelper.time.time", lambda: later)
+    helper.revoke_user(2)
+
+    assert 1 not in TokenHelper._revoked_users
+    assert 2 in TokenHelper._revoked_users
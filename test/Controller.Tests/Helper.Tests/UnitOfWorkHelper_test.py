@@ -0,0 +1,226 @@
+import asyncio
+
+import psycopg2 as pg
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.Helper.AsyncConnectionHelper import AsyncConnectionHelper
+from src.Helper.DeadlineHelper import DeadlineHelper
+from src.Helper.UnitOfWorkHelper import UnitOfWork, current_unit, unit_of_work
+
+
+# O pool assíncrono usa o event loop do asyncio
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def reset_pools():
+    DeadlineHelper.Reset()
+    AsyncConnectionHelper.CloseAsyncPools()
+    yield
+    DeadlineHelper.Reset()
+    AsyncConnectionHelper.CloseAsyncPools()
+
+
+# ===================== Fakes de conexão assíncrona =====================
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self._connection = connection
+        self.rowcount = 1
+
+    def execute(self, query, params=None):
+        self._connection.executed.append(query)
+
+    def fetchone(self):
+        return (1,)
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+        self.cancelled = 0
+        self.closed = 0
+
+    def poll(self):
+        return pg.extensions.POLL_OK
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def cancel(self):
+        self.cancelled += 1
+
+    def isexecuting(self):
+        return False
+
+    def get_transaction_status(self):
+        return pg.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    opened = []
+
+    def connect(**kwargs):
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    monkeypatch.setattr("src.Helper.AsyncConnectionHelper.pg.connect", connect)
+    return opened
+
+
+class FirstHelper(AsyncConnectionHelper):
+    pass
+
+
+class SecondHelper(AsyncConnectionHelper):
+    pass
+
+
+async def run_in_unit(body):
+    dependency = unit_of_work()
+    unit = await dependency.__anext__()
+    try:
+        await body(unit)
+    except BaseException as e:
+        with pytest.raises(type(e)):
+            await dependency.athrow(e)
+        raise
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+
+
+# ===================== Unidade de trabalho =====================
+
+
+@pytest.mark.anyio
+async def test_helpers_share_one_connection_and_transaction(connections):
+    async def body(unit):
+        assert current_unit() is unit
+        await FirstHelper().FetchOneAsync("SELECT 1")
+        await SecondHelper().ExecuteAsync("INSERT INTO t VALUES (1)")
+
+    await run_in_unit(body)
+
+    assert len(connections) == 1
+    assert connections[0].executed == ["BEGIN", "SELECT 1", "INSERT INTO t VALUES (1)", "COMMIT"]
+    assert current_unit() is None
+    assert AsyncConnectionHelper().AsyncPool().stats()["idle"] == 1
+
+
+@pytest.mark.anyio
+async def test_failure_rolls_back_everything(connections):
+    async def body(unit):
+        await FirstHelper().ExecuteAsync("INSERT INTO t VALUES (1)")
+        raise HTTPException(status_code=409, detail="conflict")
+
+    with pytest.raises(HTTPException):
+        await run_in_unit(body)
+
+    assert connections[0].executed == ["BEGIN", "INSERT INTO t VALUES (1)", "ROLLBACK"]
+
+
+@pytest.mark.anyio
+async def test_after_commit_callbacks_run_only_on_commit(connections):
+    done = []
+
+    async def committed(unit):
+        await FirstHelper().ExecuteAsync("INSERT INTO t VALUES (1)")
+        unit.AfterCommit(lambda: done.append("committed"))
+
+    async def failed(unit):
+        unit.AfterCommit(lambda: done.append("failed"))
+        raise HTTPException(status_code=409, detail="conflict")
+
+    await run_in_unit(committed)
+    with pytest.raises(HTTPException):
+        await run_in_unit(failed)
+
+    assert done == ["committed"]
+
+
+@pytest.mark.anyio
+async def test_unit_without_queries_takes_no_connection(connections):
+    async def body(unit):
+        pass
+
+    await run_in_unit(body)
+
+    assert connections == []
+
+
+@pytest.mark.anyio
+async def test_cancelled_query_discards_the_connection(connections, monkeypatch):
+    async def never_finishes(self, connection, cursor, query, params):
+        if query == "BEGIN":
+            return
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(AsyncConnectionHelper, "_ExecuteAsync", never_finishes)
+
+    async def body(unit):
+        task = asyncio.ensure_future(FirstHelper().FetchOneAsync("SELECT pg_sleep(60)"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_in_unit(body)
+
+    assert connections[0].cancelled == 1
+    assert connections[0].closed == 1
+    assert AsyncConnectionHelper().AsyncPool().stats()["size"] == 0
+
+
+@pytest.mark.anyio
+async def test_aborted_unit_rejects_new_queries():
+    unit = UnitOfWork()
+    unit._broken = True
+
+    with pytest.raises(HTTPException) as exc:
+        await unit.Run(FirstHelper(), "SELECT 1", None, "one")
+    assert exc.value.status_code == 500
+
+
+# ===================== Dependency nas rotas =====================
+
+
+def test_route_commits_or_rolls_back_the_request_transaction(connections):
+    app = FastAPI()
+
+    @app.post("/write")
+    async def write(unit: UnitOfWork = Depends(unit_of_work, scope="function")):
+        await FirstHelper().FetchOneAsync("SELECT 1")
+        await SecondHelper().ExecuteAsync("UPDATE t SET x = 1")
+        return {"statements": unit.Statements, "executed": list(connections[0].executed)}
+
+    @app.post("/conflict")
+    async def conflict(unit: UnitOfWork = Depends(unit_of_work, scope="function")):
+        await FirstHelper().ExecuteAsync("UPDATE t SET x = 2")
+        raise HTTPException(status_code=409, detail="conflict")
+
+    client = TestClient(app)
+
+    response = client.post("/write")
+    assert response.status_code == 200
+    assert response.json()["statements"] == 2
+    assert connections[0].executed[-1] == "COMMIT"
+
+    connections[0].executed.clear()
+    response = client.post("/conflict")
+    assert response.status_code == 409
+    assert connections[0].executed == ["BEGIN", "UPDATE t SET x = 2", "ROLLBACK"]